@@ -35,6 +35,18 @@ const figmaColorToCss: FigmaColorToCssFunc = (color) => {
 };
 
 
+const formatOrder = (order: any) => ({
+  id: order.id,
+  dateTime: new Date(order.created_at).toLocaleString('ru-RU', { day: '2-digit', month: '2-digit', year: 'numeric', hour: '2-digit', minute: '2-digit' }).replace(',', ' |'),
+  location: order.location_name || 'Не указана',
+  spot: order.spot || 'Не указано',
+  items: order.items.map((item: any) => ({ name: item.menu_item_name, quantity: item.quantity })),
+  status: order.status || 'pending',
+  createdAt: new Date(order.created_at), // Добавляем поле для сортировки
+});
+
+const byCreatedAtDesc = (a: any, b: any) => b.createdAt.getTime() - a.createdAt.getTime();
+
 const AdminPage: React.FC = () => {
   const colors: ColorPalette = {
     background: figmaColorToCss({ r: 0.97, g: 0.97, b: 0.97 }),
@@ -105,20 +117,29 @@ const AdminPage: React.FC = () => {
       const response = await fetch(`${API_BASE_URL}/api/v1/orders/`, { headers: { 'Authorization': `Bearer ${token}` } });
       if (response.ok) {
         const data = await response.json();
-        const formattedOrders = data.map((order: any) => ({
-          id: order.id,
-          dateTime: new Date(order.created_at).toLocaleString('ru-RU', { day: '2-digit', month: '2-digit', year: 'numeric', hour: '2-digit', minute: '2-digit' }).replace(',', ' |'),
-          location: order.location_name || 'Не указана',
-          spot: order.spot_name || 'Не указано',
-          items: order.items.map((item: any) => ({ name: item.menu_item_name, quantity: item.quantity })),
-          status: order.status || 'pending',
-          createdAt: new Date(order.created_at), // Добавляем поле для сортировки
-        })).sort((a: any, b: any) => b.createdAt.getTime() - a.createdAt.getTime()); // Сортируем по убыванию даты создания
+        const formattedOrders = data.map(formatOrder).sort(byCreatedAtDesc); // Сортируем по убыванию даты создания
         setOrders(formattedOrders);
       } else { console.error("Failed to fetch orders:", response.statusText); setOrders([]); }
     } catch (error) { console.error("Error fetching orders:", error); setOrders([]); }
   }, []);
 
+  // Новые заказы и смена статусов приходят с сервера (SSE) вместо повторной загрузки списка.
+  // EventSource сам переподключается и передаёт Last-Event-ID; reset — пропущенные события
+  // на сервере уже не хранятся, список загружается заново.
+  useEffect(() => {
+    const token = localStorage.getItem('accessToken');
+    if (!token) return;
+    const source = new EventSource(`${API_BASE_URL}/api/v1/orders/stream?token=${encodeURIComponent(token)}`);
+    const upsertOrder = (event: MessageEvent) => {
+      const order = formatOrder(JSON.parse(event.data));
+      setOrders(prev => [order, ...prev.filter(o => o.id !== order.id)].sort(byCreatedAtDesc));
+    };
+    source.addEventListener('order_created', upsertOrder as EventListener);
+    source.addEventListener('order_updated', upsertOrder as EventListener);
+    source.addEventListener('reset', () => fetchOrders());
+    return () => source.close();
+  }, [fetchOrders]);
+
   const fetchScalingLocations = useCallback(async () => {
     const token = localStorage.getItem('accessToken');
     try {
@@ -215,7 +236,7 @@ const AdminPage: React.FC = () => {
           id: orderData.id,
           dateTime: new Date(orderData.created_at).toLocaleString('ru-RU', { day: '2-digit', month: '2-digit', year: 'numeric', hour: '2-digit', minute: '2-digit' }).replace(',', ' |'),
           location: orderData.location_name || 'Не указана',
-          spot: orderData.spot_name || 'Не указано',
+          spot: orderData.spot || 'Не указано',
           items: orderData.items.map((item: any) => ({ name: item.menu_item_name, quantity: item.quantity })),
           status: orderData.status,
         };
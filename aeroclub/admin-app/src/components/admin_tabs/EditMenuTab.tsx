@@ -204,7 +204,7 @@ const EditMenuTab: React.FC<EditMenuTabProps> = ({
               <div key={item.id} className="product-card">
                 <div className="product-card-image-name">
                   <img
-                    src={item.image_filename ? `${API_BASE_URL}/uploads/menu_images/${item.image_filename}` : `${process.env.PUBLIC_URL}/images/placeholder.png`}
+                    src={item.image_variants ? `${API_BASE_URL}${item.image_variants.card.jpeg}` : item.image_filename ? `${API_BASE_URL}/uploads/menu_images/${item.image_filename}` : `${process.env.PUBLIC_URL}/images/placeholder.png`}
                     alt={item.name}
                     className="product-image"
                     onError={e => {
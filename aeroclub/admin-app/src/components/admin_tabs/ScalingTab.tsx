@@ -60,6 +60,48 @@ const ScalingTab: React.FC<ScalingTabProps> = ({
     }
   };
 
+  // PDF-лист для печати: код локации или коды мест (столиков), например "1-40,VIP"
+  const handleDownloadQrSheet = async (locationId: string, locationAddress: string) => {
+    const token = localStorage.getItem('accessToken');
+    if (!token) {
+      alert("Ошибка авторизации. Пожалуйста, войдите снова.");
+      return;
+    }
+    const spots = window.prompt("Места (столики) для печати, например 1-40,VIP. Пусто — один код локации.", "");
+    if (spots === null) return;
+
+    try {
+      const params = new URLSearchParams({ location_id: locationId, format: 'pdf' });
+      if (spots.trim()) params.set('spots', spots.trim());
+      const response = await fetch(`${API_BASE_URL}/api/v1/locations/qr-sheet?${params}`, {
+        headers: {
+          'Authorization': `Bearer ${token}`,
+        },
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({ detail: `Ошибка загрузки листа QR-кодов. Статус: ${response.status}` }));
+        throw new Error(errorData.detail || `HTTP error ${response.status}`);
+      }
+
+      const blob = await response.blob();
+      const url = window.URL.createObjectURL(blob);
+      const a = document.createElement('a');
+      a.href = url;
+      const sanitizedAddress = locationAddress.replace(/[^a-z0-9_.-]/gi, '_').toLowerCase();
+      a.download = `qr_sheet_location_${locationId}_${sanitizedAddress || 'location'}.pdf`;
+      document.body.appendChild(a);
+      a.click();
+      a.remove();
+      window.URL.revokeObjectURL(url);
+      openSuccessModal(`Лист QR-кодов для локации "${locationAddress}" успешно скачан.`);
+
+    } catch (error: any) {
+      console.error("Error downloading QR sheet:", error);
+      alert(`Не удалось скачать лист QR-кодов: ${error.message}`);
+    }
+  };
+
   const handleCreateLocation = async () => {
     if (!newScalingLocationName.trim()) {
       alert("Название локации не может быть пустым.");
@@ -118,6 +160,13 @@ const ScalingTab: React.FC<ScalingTabProps> = ({
                 <ScalingGridIcon color={colors.white} size={20} style={{ marginRight: '8px' }} />
                 Скачать QR код
               </button>
+              <button
+                className="action-button qr-sheet-button"
+                style={{ backgroundColor: colors.white, color: colors.buttonDark, border: `1px solid ${colors.buttonDark}`, padding: '8px 16px', borderRadius: '4px', cursor: 'pointer' }}
+                onClick={() => handleDownloadQrSheet(loc.id, loc.address)}
+              >
+                Лист для печати
+              </button>
               <button
                 className="action-button delete-location-button"
                 style={{ backgroundColor: colors.white, color: colors.accentRed, border: `1px solid ${colors.accentRed}`, padding: '8px 16px', borderRadius: '4px', cursor: 'pointer' }}
@@ -7,6 +7,7 @@ export interface FrontendMenuItem {
   name: string;
   price: number;
   image_filename: string | null; // Optional image
+  image_variants?: Record<'thumbnail' | 'card' | 'full', { webp: string; jpeg: string }> | null; // Уменьшенные копии фото
 }
 
 export interface User {
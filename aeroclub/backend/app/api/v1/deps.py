@@ -1,4 +1,6 @@
-from fastapi import Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from pydantic import ValidationError
@@ -8,6 +10,7 @@ from app.core.config import settings
 from app import schemas, crud, models_db
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/token") # Adjusted tokenUrl to match endpoint
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl=f"/api/v1/auth/token", auto_error=False)
 
 async def get_current_user(token: str = Depends(oauth2_scheme)) -> models_db.UserInDB:
     credentials_exception = HTTPException(
@@ -31,6 +34,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> models_db.Use
         raise credentials_exception
     return user
 
+# EventSource in the browser cannot send an Authorization header,
+# so event streams also accept the same JWT in the ?token= query parameter.
+async def get_current_stream_user(
+    header_token: Optional[str] = Depends(oauth2_scheme_optional),
+    token: Optional[str] = Query(None, description="Access token, for clients that cannot set headers"),
+) -> models_db.UserInDB:
+    if not (header_token or token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return await get_current_user(token=header_token or token)
+
 async def get_current_active_user(current_user: models_db.UserInDB = Depends(get_current_user)) -> models_db.UserInDB:
     # In a real application, you might check if the user is active (e.g., not banned)
     # For this example, we'll just return the user.
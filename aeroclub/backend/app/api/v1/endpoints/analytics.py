@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, Union
+from datetime import date, datetime, timedelta, timezone
+import uuid
+
+from app import schemas, crud, models_db
+from app.api.v1 import deps
+from app.services import analytics
+
+router = APIRouter()
+
+MAX_REPORT_DAYS = 366 * 3
+
+
+@router.get("/sales", response_model=schemas.SalesReport)
+async def read_sales_report(
+    date_from: Optional[date] = Query(None, description="First day (UTC), 30 days before date_to by default"),
+    date_to: Optional[date] = Query(None, description="Last day (UTC), today by default"),
+    location_id: Optional[Union[uuid.UUID, int]] = Query(None, description="Only this location (UUID or Numeric ID)"),
+    current_admin: models_db.UserInDB = Depends(deps.get_current_admin_user)
+):
+    """
+    Revenue and order counts by location, day and menu item, and the status funnel,
+    for orders created in the period. Admin only.
+    Served from incrementally maintained daily aggregates, without reading the orders.
+    """
+    date_to = date_to or datetime.now(timezone.utc).date()
+    date_from = date_from or date_to - timedelta(days=29)
+    if date_from > date_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="date_from is after date_to")
+    if (date_to - date_from).days >= MAX_REPORT_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"The period is limited to {MAX_REPORT_DAYS} days")
+
+    location_uuid = None
+    if location_id is not None:
+        location = (
+            crud.get_location_by_numeric_id(location_id) if isinstance(location_id, int)
+            else crud.get_location_by_id(str(location_id))
+        )
+        if not location:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+        location_uuid = location["id"]
+
+    return analytics.sales_report(date_from, date_to, location_uuid)
+
+
+@router.post("/rebuild", response_model=schemas.AnalyticsRebuildResult)
+async def rebuild_analytics(
+    current_admin: models_db.UserInDB = Depends(deps.get_current_admin_user)
+):
+    """
+    Recomputes the aggregates from all stored orders. Admin only.
+    Also available as `python scripts/rebuild_analytics.py`.
+    """
+    orders = await run_in_threadpool(analytics.rebuild)
+    return schemas.AnalyticsRebuildResult(orders=orders)
@@ -1,17 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from fastapi.responses import StreamingResponse
-from typing import List, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, RedirectResponse
+from typing import List, Optional, Union
+import os
 import uuid
-import qrcode # Для генерации QR-кодов
-from PIL import Image # Для работы с изображениями QR-кодов
-import io # Для отправки изображения в ответе
 
 from app import schemas, crud, models_db
 from app.api.v1 import deps
 from app.core.config import settings # Импортируем настройки
+from app.services import qr_codes
 
 router = APIRouter()
 
+# QR code files are content-addressed: a URL never changes its content
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def _require_mini_app_base_url():
+    if not settings.TELEGRAM_MINI_APP_BASE_URL:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="TELEGRAM_MINI_APP_BASE_URL is not configured in the server settings. Please contact the administrator."
+        )
+
+
+@router.get("/qr-codes/{key}.png", summary="Cached QR code image")
+async def get_cached_qr_code(key: str):
+    """
+    A rendered QR code by the hash of its content. `/{location}/qr-code` redirects here.
+    """
+    path = qr_codes.cached_path(key) if qr_codes.DIGEST_RE.match(key) else None
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="QR code not found")
+    return FileResponse(path, media_type="image/png", headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+
+@router.get("/qr-sheet", summary="Printable sheet of QR codes")
+async def get_qr_sheet(
+    location_id: Optional[Union[uuid.UUID, int]] = Query(None, description="Only this location (UUID or Numeric ID); all locations by default"),
+    spots: Optional[str] = Query(None, description="Spots (tables) to print a code for, e.g. `1-40,VIP`; one code per location by default"),
+    fmt: str = Query("pdf", alias="format", pattern="^(pdf|png)$", description="`pdf` (A4 pages) or `png` (one page)"),
+    current_admin: models_db.UserInDB = Depends(deps.get_current_admin_user)
+):
+    """
+    Renders QR codes of locations (or of every spot of them) on A4 pages for printing. Admin only.
+    A spot code opens the mini-app with `<spot>__<numeric_id>` as the start parameter.
+    """
+    _require_mini_app_base_url()
+    if location_id is None:
+        locations = crud.get_locations()
+    else:
+        location = (
+            crud.get_location_by_numeric_id(location_id) if isinstance(location_id, int)
+            else crud.get_location_by_id(str(location_id))
+        )
+        if not location:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+        locations = [location]
+
+    try:
+        spot_list = qr_codes.parse_spots(spots)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    codes = [
+        qr_codes.QrCode(data=qr_codes.mini_app_link(loc["numeric_id"], spot), caption=f"{loc['address']}\n{spot}")
+        for loc in locations for spot in spot_list
+    ] if spot_list else [
+        qr_codes.QrCode(data=qr_codes.mini_app_link(loc["numeric_id"]), caption=loc["address"])
+        for loc in locations
+    ]
+
+    if not codes:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No locations to print")
+    if len(codes) > settings.QR_SHEET_MAX_CODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many QR codes ({len(codes)}), the limit is {settings.QR_SHEET_MAX_CODES}."
+        )
+    if fmt == "png" and len(codes) > qr_codes.sheet_capacity():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A PNG sheet holds {qr_codes.sheet_capacity()} codes, use format=pdf for {len(codes)}."
+        )
+
+    # CPU-bound: rendered in the process pool, composed off the event loop
+    path = await run_in_threadpool(qr_codes.render_sheet, codes, fmt)
+    return FileResponse(
+        path,
+        media_type="application/pdf" if fmt == "pdf" else "image/png",
+        filename=f"qr_codes.{fmt}",
+    )
+
 @router.post("/", response_model=schemas.Location, status_code=status.HTTP_201_CREATED)
 async def create_location(
     location_in: schemas.LocationCreate,
@@ -116,13 +195,17 @@ async def associate_menu_item_with_location(
 
 @router.get("/{location_id_or_numeric_id}/qr-code", summary="Get QR Code for Location")
 async def get_location_qr_code(
+    request: Request,
     location_id_or_numeric_id: Union[uuid.UUID, int] = Path(..., description="The ID (UUID) or Numeric ID of the location for the QR code"),
+    spot: Optional[str] = Query(None, pattern="^[A-Za-z0-9]+$", description="Spot (table) the code is printed for"),
     # No auth needed for QR code generation as per typical use case
 ):
     """
-    Generates and returns a QR code for the specified location.
+    Returns a QR code for the specified location.
     The QR code will contain the URL: `TELEGRAM_MINI_APP_BASE_URL` + `numeric_id`.
     Example: `https://t.me/yourbot/yourapp/?startapp=1001`
+    The code is rendered once and cached on disk; the response redirects to its
+    content-addressed URL (`/qr-codes/{hash}.png`), which browsers cache forever.
     """
     location_db = None
     if isinstance(location_id_or_numeric_id, uuid.UUID):
@@ -137,28 +220,10 @@ async def get_location_qr_code(
     if not numeric_id:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Location numeric ID is missing.")
 
-    if not settings.TELEGRAM_MINI_APP_BASE_URL:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="TELEGRAM_MINI_APP_BASE_URL is not configured in the server settings. Please contact the administrator."
-        )
-
-    # Убедимся, что базовый URL заканчивается на /?startapp=
-    base_url = settings.TELEGRAM_MINI_APP_BASE_URL
-    if not base_url.endswith("?startapp="):
-        if base_url.endswith("/"):
-            base_url += "?startapp="
-        else:
-            base_url += "/?startapp="
-            
-    qr_data = f"{base_url}{numeric_id}"
-
-    # Generate QR code
-    img = qrcode.make(qr_data)
-    
-    # Save QR code to a bytes buffer
-    buf = io.BytesIO()
-    img.save(buf, format="PNG")
-    buf.seek(0) # Go to the beginning of the buffer
-
-    return StreamingResponse(buf, media_type="image/png")
+    _require_mini_app_base_url()
+    qr_data = qr_codes.mini_app_link(numeric_id, spot)
+    await run_in_threadpool(qr_codes.get_png, qr_data)
+    return RedirectResponse(
+        request.url_for("get_cached_qr_code", key=qr_codes.digest(qr_data)).path,
+        status_code=status.HTTP_307_TEMPORARY_REDIRECT,
+    )
@@ -1,23 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Path
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Path, Request
 from typing import List, Optional
 import uuid
-import os
-import shutil
 
 from app import schemas, crud, models_db
 from app.api.v1 import deps
+from app.services import menu_images
+from app.services.menu_cache import menu_cache, snapshot_response
 
 router = APIRouter()
 
-# Define a directory to store uploaded images for menu items
-# This should ideally be configurable and outside the app code (e.g., a 'static' or 'media' folder served by a web server)
-# For simplicity, creating it within the backend structure.
-# Correct UPLOAD_DIR path to be relative to the 'backend' directory, consistent with static file serving in main.py
-# __file__ is aeroclub/backend/app/api/v1/endpoints/menu_items.py
-# We want aeroclub/backend/uploads/menu_images/
-_BACKEND_ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "..")) # Navigates up to 'aeroclub/backend/'
-UPLOAD_DIR = os.path.join(_BACKEND_ROOT_DIR, "uploads", "menu_images")
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+async def _save_image(image: UploadFile) -> str:
+    # resized WebP/JPEG variants under content-hashed names (services/menu_images.py)
+    try:
+        return await menu_images.save_upload(image)
+    except menu_images.InvalidImageError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        # Basic error handling for file save
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not save image: {e}")
 
 
 @router.post("/", response_model=schemas.MenuItem, status_code=status.HTTP_201_CREATED)
@@ -33,18 +34,7 @@ async def create_menu_item(
     """
     image_filename = None
     if image:
-        # Sanitize filename and save the file
-        # A more robust solution would check file type, size, and use a more secure way to generate filenames
-        image_filename = f"{uuid.uuid4()}_{image.filename}"
-        file_path = os.path.join(UPLOAD_DIR, image_filename)
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
-        except Exception as e:
-            # Basic error handling for file save
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not save image: {e}")
-        finally:
-            image.file.close()
+        image_filename = await _save_image(image)
 
     menu_item_in = schemas.MenuItemCreate(name=name, price=price, image_filename=image_filename)
     created_item_db = crud.create_menu_item(item_in=menu_item_in)
@@ -53,6 +43,7 @@ async def create_menu_item(
 
 @router.get("/", response_model=List[schemas.MenuItem])
 async def read_menu_items(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     location_id: Optional[uuid.UUID] = None, # Filter by location
@@ -60,7 +51,13 @@ async def read_menu_items(
 ):
     """
     Retrieve menu items. Can be filtered by location_id.
+    The whole menu of a location is served from the cached snapshot (ETag / 304).
     """
+    if location_id and skip == 0:
+        snapshot = menu_cache.get(str(location_id))
+        if snapshot and len(snapshot.items) <= limit:
+            return snapshot_response(snapshot, request)
+
     menu_items_db = crud.get_menu_items(location_id=str(location_id) if location_id else None)
     return [schemas.MenuItem(**item) for item in menu_items_db[skip : skip + limit]]
 
@@ -98,24 +95,7 @@ async def update_menu_item(
     image_filename = item_db.get("image_filename") # Keep old image if new one not provided
 
     if image:
-        # If a new image is uploaded, delete the old one if it exists
-        if image_filename and os.path.exists(os.path.join(UPLOAD_DIR, image_filename)):
-            try:
-                os.remove(os.path.join(UPLOAD_DIR, image_filename))
-            except OSError as e:
-                print(f"Error deleting old image {image_filename}: {e}") # Log error but continue
-
-        # Save the new image
-        new_image_filename = f"{uuid.uuid4()}_{image.filename}"
-        file_path = os.path.join(UPLOAD_DIR, new_image_filename)
-        try:
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(image.file, buffer)
-            image_filename = new_image_filename # Update to new filename
-        except Exception as e:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not save new image: {e}")
-        finally:
-            image.file.close()
+        image_filename = await _save_image(image)
 
     item_update_data = schemas.MenuItemUpdate(name=name, price=price, image_filename=image_filename)
     
@@ -138,6 +118,9 @@ async def update_menu_item(
     updated_item_db = crud.update_menu_item(item_id=str(item_id), item_in=schemas.MenuItemUpdate(**update_dict))
     if not updated_item_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found during update")
+    # The old image is deleted once the item no longer points to it (and no other item does)
+    if item_db.get("image_filename") != updated_item_db.get("image_filename"):
+        menu_images.delete_image(item_db.get("image_filename"), crud.get_menu_items())
     return schemas.MenuItem(**updated_item_db)
 
 
@@ -154,20 +137,11 @@ async def delete_menu_item(
     if not item_db:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu item not found")
 
-    # Delete image file if it exists
-    image_filename = item_db.get("image_filename")
-    if image_filename:
-        file_path = os.path.join(UPLOAD_DIR, image_filename)
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except OSError as e:
-                # Log error but proceed with deleting DB entry
-                print(f"Error deleting image file {file_path}: {e}")
-
     success = crud.delete_menu_item(item_id=str(item_id))
     if not success:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete menu item")
+    # Delete image files unless another item uses the same photo
+    menu_images.delete_image(item_db.get("image_filename"), crud.get_menu_items())
     return None
 
 
@@ -224,15 +198,15 @@ async def disassociate_menu_item_from_location(
 # Endpoint for Telegram bot to get menu for a specific location (using numeric_id)
 @router.get("/locations/{numeric_id}/menu", response_model=List[schemas.MenuItem])
 async def get_menu_for_location_numeric_id(
+    request: Request,
     numeric_id: int = Path(..., description="Numeric ID of the location for the Telegram bot")
 ):
     """
     Retrieve menu items for a specific location using its numeric_id.
-    This endpoint is intended for the Telegram bot.
+    This endpoint is intended for the Telegram bot and the mini-app.
+    The body is pre-serialized once per menu version; clients revalidate with If-None-Match.
     """
-    location = crud.get_location_by_numeric_id(numeric_id)
-    if not location:
+    snapshot = menu_cache.get_by_numeric_id(numeric_id)
+    if not snapshot:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Location with numeric ID {numeric_id} not found.")
-    
-    menu_items_db = crud.get_menu_items(location_id=location["id"])
-    return [schemas.MenuItem(**item) for item in menu_items_db]
+    return snapshot_response(snapshot, request)
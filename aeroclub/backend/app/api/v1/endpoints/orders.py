@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Path, Header
+from fastapi.responses import StreamingResponse
 from typing import List, Optional, Union
 import uuid
 
 from app import schemas, crud, models_db
 from app.api.v1 import deps
+from app.services.order_events import event_stream
 
 router = APIRouter()
 
@@ -20,17 +22,8 @@ async def create_order(
     It can also be used by authenticated users if needed in the future.
     """
     try:
-        # Validate menu items in the order
-        for item_in_order in order_in.items:
-            menu_item_db = crud.get_menu_item_by_id(str(item_in_order.menu_item_id))
-            if not menu_item_db:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail=f"Menu item with ID {item_in_order.menu_item_id} not found."
-                )
-            # Optionally, verify name_snapshot and price_snapshot against current menu_item_db details
-            # For now, we trust the snapshots provided by the client (Telegram bot)
-
+        # Location, items, availability and prices are checked in one pass over the menu
+        # (crud.validate_order); total_amount is recomputed from menu prices.
         created_order_db = crud.create_order(order_in=order_in)
         # Convert OrderInDB to Order Pydantic model
         # Need to convert items list as well
@@ -41,6 +34,8 @@ async def create_order(
         
         return schemas.Order(**response_order_data)
 
+    except crud.MenuItemNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
     except ValueError as e: # Catch ValueErrors from CRUD (e.g., location not found)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -80,6 +75,36 @@ async def read_orders(
     return result_orders
 
 
+@router.get("/stream", summary="Server-sent events with new orders and status changes")
+async def stream_orders(
+    location_id: Optional[Union[uuid.UUID, int]] = Query(None, description="Only orders of this location (UUID or Numeric ID)"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    last_event_id_query: Optional[int] = Query(None, alias="last_event_id", description="Resume after this event id"),
+    current_user: models_db.UserInDB = Depends(deps.get_current_stream_user)
+):
+    """
+    text/event-stream for the admin app instead of polling GET /orders/.
+    Events: `order_created` and `order_updated` (data is the order, as in GET /orders/),
+    `reset` when the missed events are no longer available and the list must be reloaded.
+    EventSource resumes after a reconnect with the Last-Event-ID header on its own.
+    """
+    location_uuid = None
+    if location_id is not None:
+        location = (
+            crud.get_location_by_numeric_id(location_id) if isinstance(location_id, int)
+            else crud.get_location_by_id(str(location_id))
+        )
+        if not location:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Location not found")
+        location_uuid = location["id"]
+
+    return StreamingResponse(
+        event_stream(location_id=location_uuid, last_event_id=last_event_id if last_event_id is not None else last_event_id_query),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # no buffering in nginx
+    )
+
+
 @router.get("/{order_id}", response_model=schemas.Order)
 async def read_order(
     order_id: uuid.UUID,
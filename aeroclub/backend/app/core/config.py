@@ -16,6 +16,14 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    MENU_CACHE_MAX_AGE: int = 60 # Cache-Control max-age (seconds) of location menus for the mini-app
+    ORDER_EVENTS_BUFFER_SIZE: int = 1000 # Order events kept for clients resuming the stream with Last-Event-ID
+    ORDER_EVENTS_HEARTBEAT: int = 15 # Seconds between keep-alive comments on an idle order stream
+    ORDER_EVENTS_RETRY_MS: int = 3000 # Reconnect delay suggested to EventSource clients
+    QR_SHEET_MAX_CODES: int = 1000 # Max QR codes in one printable sheet
+    QR_SHEET_FONT_PATH: str = "" # TrueType font with Cyrillic for sheet captions, DejaVuSans.ttf is tried by default
+    PROCESS_POOL_WORKERS: int = 0 # Processes for QR sheets and menu image variants, 0 = number of CPUs
+    MENU_IMAGE_MAX_BYTES: int = 20 * 1024 * 1024 # Max size of an uploaded menu item photo
 
     # Pydantic-settings configuration
     model_config = SettingsConfigDict(
@@ -1,6 +1,9 @@
+import fcntl
 import json
 import os
+import tempfile
 import uuid
+from contextlib import contextmanager
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any, Union
 
@@ -13,6 +16,7 @@ from .core.security import get_password_hash
 DB_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'db_json')
 MAIN_DB_PATH = os.path.join(DB_DIR, 'main_db.json')
 ORDERS_DB_PATH = os.path.join(DB_DIR, 'orders_db.json')
+ANALYTICS_DB_PATH = os.path.join(DB_DIR, 'analytics_db.json') # derived from orders_db.json, see services/analytics.py
 
 # Ensure db_json directory exists
 os.makedirs(DB_DIR, exist_ok=True)
@@ -46,10 +50,55 @@ def read_main_db() -> models_db.MainDB:
         return initial_data
 
 
+# Write JSON to a temp file in the same directory and rename it over the target,
+# so readers never see a half-written file.
+def _write_json_atomic(path: str, data: Any):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+# Exclusive lock around read-modify-write of a JSON DB file (shared by all worker processes)
+@contextmanager
+def _db_lock(path: str):
+    with open(path + ".lock", 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
 # Helper function to write main_db.json
 def write_main_db(db_data: models_db.MainDB):
-    with open(MAIN_DB_PATH, 'w') as f:
-        json.dump(db_data, f, indent=2)
+    _write_json_atomic(MAIN_DB_PATH, db_data)
+
+# Menu snapshots (services/menu_cache.py) are rebuilt after menu item and association writes
+def _invalidate_menu_cache():
+    from .services.menu_cache import menu_cache # imported here: menu_cache imports crud
+    menu_cache.invalidate()
+
+# Sales aggregates (services/analytics.py); None until the first rebuild
+def read_analytics_db() -> Optional[models_db.AnalyticsDB]:
+    try:
+        with open(ANALYTICS_DB_PATH, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        print(f"Error reading or parsing analytics_db.json: {e}")
+        return None # rebuilt from orders
+
+def write_analytics_db(db_data: models_db.AnalyticsDB):
+    _write_json_atomic(ANALYTICS_DB_PATH, db_data)
+
+# Order changes are pushed to the admin app stream (services/order_events.py)
+def _publish_order_event(event_type: str, order: models_db.OrderInDB):
+    from .services.order_events import publish_order # imported here: order_events imports crud
+    publish_order(event_type, order)
 
 # Helper function to read orders_db.json
 def read_orders_db() -> models_db.OrdersDB:
@@ -69,8 +118,7 @@ def read_orders_db() -> models_db.OrdersDB:
 
 # Helper function to write orders_db.json
 def write_orders_db(db_data: models_db.OrdersDB):
-    with open(ORDERS_DB_PATH, 'w') as f:
-        json.dump(db_data, f, indent=2)
+    _write_json_atomic(ORDERS_DB_PATH, db_data)
 
 # --- User CRUD ---
 def get_user_by_login(login: str) -> Optional[models_db.UserInDB]:
@@ -185,6 +233,7 @@ def delete_location(location_id: str) -> bool:
     ]
     if len(db["locations"]) < original_len:
         write_main_db(db)
+        _invalidate_menu_cache()
         return True
     return False
 
@@ -217,6 +266,7 @@ def create_menu_item(item_in: schemas.MenuItemCreate) -> models_db.MenuItemInDB:
     }
     db["menu_items"].append(new_item)
     write_main_db(db)
+    _invalidate_menu_cache()
     return new_item
 
 def update_menu_item(item_id: str, item_in: schemas.MenuItemUpdate) -> Optional[models_db.MenuItemInDB]:
@@ -228,6 +278,7 @@ def update_menu_item(item_id: str, item_in: schemas.MenuItemUpdate) -> Optional[
                 if value is not None: # Ensure optional fields are only updated if provided
                     db["menu_items"][i][key] = value # type: ignore
             write_main_db(db)
+            _invalidate_menu_cache()
             return db["menu_items"][i]
     return None
 
@@ -241,6 +292,7 @@ def delete_menu_item(item_id: str) -> bool:
     ]
     if len(db["menu_items"]) < original_len:
         write_main_db(db)
+        _invalidate_menu_cache()
         return True
     return False
 
@@ -262,6 +314,7 @@ def associate_item_to_location(location_id: str, item_id: str) -> bool:
     }
     db["location_menu_associations"].append(new_association)
     write_main_db(db)
+    _invalidate_menu_cache()
     return True
 
 def disassociate_item_from_location(location_id: str, item_id: str) -> bool:
@@ -273,6 +326,7 @@ def disassociate_item_from_location(location_id: str, item_id: str) -> bool:
     ]
     if len(db["location_menu_associations"]) < original_len:
         write_main_db(db)
+        _invalidate_menu_cache()
         return True
     return False
 
@@ -357,50 +411,96 @@ def get_order_by_id(order_id: str) -> Optional[models_db.OrderInDB]:
             return order_data_copy
     return None
 
-def create_order(order_in: schemas.OrderCreate) -> models_db.OrderInDB:
-    db_orders = read_orders_db()
-    new_id = str(uuid.uuid4())
-    now_iso = datetime.now(timezone.utc).isoformat()
+class MenuItemNotFoundError(LookupError):
+    pass
 
-    # Resolve location_id: if it's numeric, convert to UUID string
-    loc_id_str: str
-    if isinstance(order_in.location_id, int):
-        location = get_location_by_numeric_id(order_in.location_id)
+def _resolve_location(db: models_db.MainDB, location_id: Union[uuid.UUID, int]) -> models_db.LocationInDB:
+    # location_id can be a numeric_id (from the QR code) or a UUID
+    if isinstance(location_id, int):
+        location = next((loc for loc in db["locations"] if loc["numeric_id"] == location_id), None)
         if not location:
-            raise ValueError(f"Location with numeric_id {order_in.location_id} not found.")
-        loc_id_str = location["id"]
-    else: # It's a UUID
-        # Ensure it's a string representation of UUID
-        loc_id_str = str(order_in.location_id)
-        if not get_location_by_id(loc_id_str): # Validate UUID exists
-             raise ValueError(f"Location with id {loc_id_str} not found.")
+            raise ValueError(f"Location with numeric_id {location_id} not found.")
+    else:
+        location = next((loc for loc in db["locations"] if loc["id"] == str(location_id)), None)
+        if not location:
+            raise ValueError(f"Location with id {location_id} not found.")
+    return location
+
+def validate_order(order_in: schemas.OrderCreate) -> Dict[str, Any]:
+    """
+    Single pass over one snapshot of main_db.json: resolves the location, checks that
+    every item exists and is on the menu of that location, and takes names and prices
+    from the menu (client snapshots are not trusted). Returns location_id, items and
+    total_amount for the new order.
+    Raises MenuItemNotFoundError for unknown items, ValueError for anything else.
+    """
+    db = read_main_db()
+    location = _resolve_location(db, order_in.location_id)
+    menu = {item["id"]: item for item in db["menu_items"]}
+    available = {
+        assoc["menu_item_id"] for assoc in db["location_menu_associations"]
+        if assoc["location_id"] == location["id"]
+    }
 
+    if not order_in.items:
+        raise ValueError("Order has no items.")
+    items: List[models_db.OrderItemInDB] = []
+    total = 0.0
+    for item_in in order_in.items:
+        item_id = str(item_in.menu_item_id)
+        menu_item = menu.get(item_id)
+        if not menu_item:
+            raise MenuItemNotFoundError(f"Menu item with ID {item_id} not found.")
+        if item_id not in available:
+            raise ValueError(f"Menu item {menu_item['name']} is not available at this location.")
+        items.append({
+            "menu_item_id": item_id,
+            "name_snapshot": menu_item["name"],
+            "quantity": item_in.quantity,
+            "price_snapshot": menu_item["price"],
+        })
+        total += menu_item["price"] * item_in.quantity
+
+    return {"location_id": location["id"], "items": items, "total_amount": round(total, 2)}
 
+def create_order(order_in: schemas.OrderCreate) -> models_db.OrderInDB:
+    validated = validate_order(order_in)
+    now_iso = datetime.now(timezone.utc).isoformat()
     new_order: models_db.OrderInDB = {
-        "id": new_id,
-        "location_id": loc_id_str,
+        "id": str(uuid.uuid4()),
+        "location_id": validated["location_id"],
         "spot": order_in.spot,
         "telegram_user_id": order_in.telegram_user_id,
-        "items": [
-            # Explicitly convert UUID to string for JSON serialization
-            {**item.model_dump(), "menu_item_id": str(item.menu_item_id)}
-            for item in order_in.items
-        ],
-        "total_amount": order_in.total_amount,
+        "items": validated["items"],
+        "total_amount": validated["total_amount"],
         "status": order_in.status,
         "created_at": now_iso,
         "updated_at": now_iso,
     }
-    db_orders.append(new_order)
-    write_orders_db(db_orders)
+    # read + append + write under the lock: concurrent orders are not lost
+    with _db_lock(ORDERS_DB_PATH):
+        db_orders = read_orders_db()
+        db_orders.append(new_order)
+        write_orders_db(db_orders)
+        from .services import analytics # imported here: analytics imports crud
+        analytics.record_order_created(new_order)
+    _publish_order_event("order_created", new_order)
     return new_order
 
 def update_order_status(order_id: str, status: str) -> Optional[models_db.OrderInDB]:
-    db_orders = read_orders_db()
-    for i, order in enumerate(db_orders):
-        if order["id"] == order_id:
-            db_orders[i]["status"] = status
-            db_orders[i]["updated_at"] = datetime.now(timezone.utc).isoformat()
-            write_orders_db(db_orders)
-            return db_orders[i]
-    return None
+    updated_order = None
+    with _db_lock(ORDERS_DB_PATH):
+        db_orders = read_orders_db()
+        for i, order in enumerate(db_orders):
+            if order["id"] == order_id:
+                old_status = order["status"]
+                db_orders[i]["status"] = status
+                db_orders[i]["updated_at"] = datetime.now(timezone.utc).isoformat()
+                write_orders_db(db_orders)
+                updated_order = db_orders[i]
+                from .services import analytics # imported here: analytics imports crud
+                analytics.record_status_change(updated_order, old_status)
+                break
+    if updated_order:
+        _publish_order_event("order_updated", updated_order)
+    return updated_order
@@ -5,9 +5,10 @@ import os
 
 from app.api.v1.api import api_router_v1
 from app.core.config import settings # To potentially use settings for CORS origins
+from app.services import menu_images
 
 # Define the path for serving uploaded menu item images
-# UPLOAD_DIR is defined in menu_items.py, but we need a relative path for StaticFiles
+# UPLOAD_DIR is defined in services/menu_images.py, but we need a relative path for StaticFiles
 # Assuming UPLOAD_DIR is backend/uploads/menu_images
 # StaticFiles path should be relative to where main.py is or an absolute path.
 # Let's construct it relative to the backend directory.
@@ -46,7 +47,18 @@ app.include_router(api_router_v1, prefix="/api/v1")
 # e.g., if an image is at backend/uploads/menu_images/coffee.png, it would be /uploads/menu_images/coffee.png
 if not os.path.exists(STATIC_FILES_DIR):
     os.makedirs(STATIC_FILES_DIR) # Ensure the base 'uploads' directory exists
+os.makedirs(menu_images.UPLOAD_DIR, exist_ok=True)
 
+
+class ImmutableStaticFiles(StaticFiles):
+    # Menu images are written once under new (content-hashed or uuid) names and never modified
+    def file_response(self, *args, **kwargs):
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+# Mounted before /uploads: the first matching mount serves the request
+app.mount("/uploads/menu_images", ImmutableStaticFiles(directory=menu_images.UPLOAD_DIR), name="menu_images")
 app.mount("/uploads", StaticFiles(directory=STATIC_FILES_DIR), name="uploads")
 
 
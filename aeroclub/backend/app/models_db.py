@@ -1,4 +1,4 @@
-from typing import TypedDict, List, Optional
+from typing import TypedDict, Dict, List, Optional
 import uuid
 from datetime import datetime
 
@@ -53,3 +53,18 @@ class OrderInDB(TypedDict):
 
 # orders_db.json is a list of OrderInDB
 OrdersDB = List[OrderInDB]
+
+# For analytics_db.json (services/analytics.py): aggregates of orders by creation day and location
+class MenuItemSalesInDB(TypedDict):
+    name: str
+    quantity: int
+    revenue: float
+
+class SalesBucketInDB(TypedDict):
+    orders: int  # all orders created that day
+    revenue: float  # total_amount of the orders that are not cancelled
+    statuses: Dict[str, int]  # current status of the orders created that day
+    items: Dict[str, MenuItemSalesInDB]  # by menu_item_id, orders that are not cancelled
+
+class AnalyticsDB(TypedDict):
+    days: Dict[str, Dict[str, SalesBucketInDB]]  # "YYYY-MM-DD" -> location_id -> bucket
@@ -1,7 +1,7 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Union
+from pydantic import BaseModel, Field, ConfigDict, computed_field
+from typing import Dict, List, Optional, Union
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 
 # JWT Token Schemas
 class Token(BaseModel):
@@ -55,6 +55,13 @@ class MenuItem(MenuItemBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+    @computed_field
+    @property
+    def image_variants(self) -> Optional[Dict[str, Dict[str, str]]]:
+        # {"thumbnail" | "card" | "full": {"webp": url, "jpeg": url}}, None for images uploaded before resizing
+        from app.services.menu_images import variant_urls # imported here: services import schemas
+        return variant_urls(self.image_filename)
+
 # Location Schemas
 class LocationBase(BaseModel):
     address: str
@@ -77,7 +84,10 @@ class OrderItemBase(BaseModel):
     price_snapshot: float
 
 class OrderItemCreate(OrderItemBase):
-    pass
+    # Name and price are taken from the menu on the server; client snapshots are ignored
+    name_snapshot: Optional[str] = None
+    quantity: int = Field(gt=0)
+    price_snapshot: Optional[float] = None
 
 class OrderItem(OrderItemBase):
     menu_item_name: Optional[str] = None # Добавляем для отображения наименования
@@ -93,7 +103,7 @@ class OrderBase(BaseModel):
     status: str = "pending"
 
 class OrderCreate(OrderBase):
-    pass
+    total_amount: Optional[float] = None # Recomputed on the server from menu prices
 
 class Order(OrderBase):
     id: uuid.UUID = Field(default_factory=uuid.uuid4)
@@ -110,3 +120,32 @@ class OrderConfirmation(BaseModel):
 
 class OrderStatusUpdate(BaseModel):
     status: str
+
+# Sales analytics schemas (services/analytics.py)
+class SalesTotals(BaseModel):
+    orders: int # all orders created in the period, cancelled included
+    revenue: float # total_amount of the orders that are not cancelled
+
+class LocationSales(SalesTotals):
+    location_id: str
+    location_name: Optional[str] = None
+
+class DaySales(SalesTotals):
+    date: date
+
+class MenuItemSales(BaseModel):
+    menu_item_id: str
+    name: str
+    quantity: int
+    revenue: float
+
+class SalesReport(SalesTotals):
+    date_from: date
+    date_to: date
+    funnel: Dict[str, int] # current status -> number of orders created in the period
+    by_location: List[LocationSales]
+    by_day: List[DaySales]
+    by_menu_item: List[MenuItemSales]
+
+class AnalyticsRebuildResult(BaseModel):
+    orders: int
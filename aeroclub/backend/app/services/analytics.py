@@ -0,0 +1,155 @@
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from app import crud, models_db, schemas
+
+CANCELLED = "cancelled"
+
+
+def _order_day(order: models_db.OrderInDB) -> str:
+    return datetime.fromisoformat(order["created_at"]).date().isoformat()
+
+
+def _bucket(db: models_db.AnalyticsDB, order: models_db.OrderInDB) -> models_db.SalesBucketInDB:
+    locations = db["days"].setdefault(_order_day(order), {})
+    return locations.setdefault(order["location_id"], {"orders": 0, "revenue": 0.0, "statuses": {}, "items": {}})
+
+
+def _add_sales(bucket: models_db.SalesBucketInDB, order: models_db.OrderInDB, sign: int):
+    bucket["revenue"] = round(bucket["revenue"] + sign * order["total_amount"], 2)
+    for item in order["items"]:
+        sales = bucket["items"].setdefault(item["menu_item_id"], {"name": item["name_snapshot"], "quantity": 0, "revenue": 0.0})
+        sales["quantity"] += sign * item["quantity"]
+        sales["revenue"] = round(sales["revenue"] + sign * item["price_snapshot"] * item["quantity"], 2)
+
+
+def _add_status(bucket: models_db.SalesBucketInDB, status: str, sign: int):
+    bucket["statuses"][status] = bucket["statuses"].get(status, 0) + sign
+    if not bucket["statuses"][status]:
+        del bucket["statuses"][status]
+
+
+def _apply_created(db: models_db.AnalyticsDB, order: models_db.OrderInDB):
+    bucket = _bucket(db, order)
+    bucket["orders"] += 1
+    _add_status(bucket, order["status"], 1)
+    if order["status"] != CANCELLED:
+        _add_sales(bucket, order, 1)
+
+
+def record_order_created(order: models_db.OrderInDB):
+    """Adds a new order to its day and location. Called by crud under the orders lock."""
+    with crud._db_lock(crud.ANALYTICS_DB_PATH):
+        db = crud.read_analytics_db()
+        if db is None:
+            _rebuild_locked()  # the order is already in orders_db.json
+            return
+        _apply_created(db, order)
+        crud.write_analytics_db(db)
+
+
+def record_status_change(order: models_db.OrderInDB, old_status: str):
+    """
+    Moves an order between statuses in the funnel of its creation day; cancelling takes its
+    revenue out, restoring puts it back. Called by crud under the orders lock.
+    """
+    if old_status == order["status"]:
+        return
+    with crud._db_lock(crud.ANALYTICS_DB_PATH):
+        db = crud.read_analytics_db()
+        if db is None:
+            _rebuild_locked()
+            return
+        bucket = _bucket(db, order)
+        _add_status(bucket, old_status, -1)
+        _add_status(bucket, order["status"], 1)
+        if order["status"] == CANCELLED:
+            _add_sales(bucket, order, -1)
+        elif old_status == CANCELLED:
+            _add_sales(bucket, order, 1)
+        crud.write_analytics_db(db)
+
+
+def _rebuild_locked() -> int:
+    db: models_db.AnalyticsDB = {"days": {}}
+    orders = crud.read_orders_db()
+    for order in orders:
+        _apply_created(db, order)
+    crud.write_analytics_db(db)
+    return len(orders)
+
+
+def rebuild() -> int:
+    """Recomputes the aggregates from orders_db.json; returns the number of orders"""
+    # the orders lock first, as in create_order: no order is written while the backfill runs
+    with crud._db_lock(crud.ORDERS_DB_PATH), crud._db_lock(crud.ANALYTICS_DB_PATH):
+        return _rebuild_locked()
+
+
+def _read() -> models_db.AnalyticsDB:
+    db = crud.read_analytics_db()
+    if db is None:
+        rebuild()
+        db = crud.read_analytics_db()
+    return db
+
+
+def sales_report(date_from: date, date_to: date, location_id: Optional[str] = None) -> schemas.SalesReport:
+    """
+    Totals, status funnel and breakdowns by location, day and menu item for orders created
+    between date_from and date_to (inclusive). Reads only the daily aggregates: the cost
+    depends on the number of days, not on the number of orders.
+    """
+    days = _read()["days"]
+    totals = {"orders": 0, "revenue": 0.0}
+    funnel: Dict[str, int] = {}
+    by_location: Dict[str, Dict[str, float]] = {}
+    by_day: List[schemas.DaySales] = []
+    by_item: Dict[str, Dict] = {}
+
+    day = date_from
+    while day <= date_to:
+        day_totals = {"orders": 0, "revenue": 0.0}
+        for loc_id, bucket in days.get(day.isoformat(), {}).items():
+            if location_id and loc_id != location_id:
+                continue
+            location_totals = by_location.setdefault(loc_id, {"orders": 0, "revenue": 0.0})
+            for acc in (totals, day_totals, location_totals):
+                acc["orders"] += bucket["orders"]
+                acc["revenue"] += bucket["revenue"]
+            for status, count in bucket["statuses"].items():
+                funnel[status] = funnel.get(status, 0) + count
+            for item_id, sales in bucket["items"].items():
+                item = by_item.setdefault(item_id, {"name": sales["name"], "quantity": 0, "revenue": 0.0})
+                item["quantity"] += sales["quantity"]
+                item["revenue"] += sales["revenue"]
+        if day_totals["orders"]:
+            by_day.append(schemas.DaySales(date=day, orders=day_totals["orders"], revenue=round(day_totals["revenue"], 2)))
+        day += timedelta(days=1)
+
+    location_names = {loc["id"]: loc["address"] for loc in crud.get_locations()}
+    return schemas.SalesReport(
+        date_from=date_from,
+        date_to=date_to,
+        orders=totals["orders"],
+        revenue=round(totals["revenue"], 2),
+        funnel=funnel,
+        by_location=sorted(
+            (
+                schemas.LocationSales(
+                    location_id=loc_id, location_name=location_names.get(loc_id),
+                    orders=acc["orders"], revenue=round(acc["revenue"], 2),
+                )
+                for loc_id, acc in by_location.items()
+            ),
+            key=lambda row: -row.revenue,
+        ),
+        by_day=by_day,
+        by_menu_item=sorted(
+            (
+                schemas.MenuItemSales(menu_item_id=item_id, name=item["name"], quantity=item["quantity"], revenue=round(item["revenue"], 2))
+                for item_id, item in by_item.items() if item["quantity"]
+            ),
+            key=lambda row: -row.revenue,
+        ),
+    )
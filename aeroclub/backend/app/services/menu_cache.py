@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from fastapi import Request, Response, status
+
+from app import crud, schemas
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class MenuSnapshot:
+    """Menu of one location, serialized once per version of main_db.json"""
+    location_id: str
+    items: List[dict]
+    body: bytes
+    etag: str
+
+
+class MenuCache:
+    """
+    Per-location menu snapshots for the mini-app.
+
+    A snapshot is built once per version of main_db.json and reused until the menu changes:
+    - menu item and association writes in crud call invalidate();
+    - writes from other worker processes are noticed by the file version
+      (inode, mtime, size) - crud writes main_db.json with os.replace.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._menus: Dict[str, List[dict]] = {}
+        self._location_ids: Dict[int, str] = {}
+        self._snapshots: Dict[str, MenuSnapshot] = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._version = None
+
+    @staticmethod
+    def _file_version():
+        try:
+            st = os.stat(crud.MAIN_DB_PATH)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _sync(self):
+        # Caller holds the lock. One file read per version builds the index of all locations.
+        version = self._file_version()
+        if version is not None and version == self._version:
+            return
+        db = crud.read_main_db()
+        menu_items = {item["id"]: item for item in db["menu_items"]}
+        menus: Dict[str, List[dict]] = {loc["id"]: [] for loc in db["locations"]}
+        for assoc in db["location_menu_associations"]:
+            item = menu_items.get(assoc["menu_item_id"])
+            if item and assoc["location_id"] in menus:
+                menus[assoc["location_id"]].append(item)
+        # same order as crud.get_menu_items: the order of menu_items in the DB
+        order = {item_id: i for i, item_id in enumerate(menu_items)}
+        for items in menus.values():
+            items.sort(key=lambda item: order[item["id"]])
+        self._menus = menus
+        self._location_ids = {loc["numeric_id"]: loc["id"] for loc in db["locations"]}
+        self._snapshots = {}
+        self._version = version
+
+    def _build(self, location_id: str) -> MenuSnapshot:
+        items = self._menus[location_id]
+        payload = [schemas.MenuItem(**item).model_dump(mode="json") for item in items]
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        return MenuSnapshot(location_id=location_id, items=items, body=body, etag=etag)
+
+    def get(self, location_id: str) -> Optional[MenuSnapshot]:
+        with self._lock:
+            self._sync()
+            if location_id not in self._menus:
+                return None
+            snapshot = self._snapshots.get(location_id)
+            if snapshot is None:
+                snapshot = self._snapshots[location_id] = self._build(location_id)
+            return snapshot
+
+    def get_by_numeric_id(self, numeric_id: int) -> Optional[MenuSnapshot]:
+        with self._lock:
+            self._sync()
+            location_id = self._location_ids.get(numeric_id)
+        return self.get(location_id) if location_id else None
+
+
+menu_cache = MenuCache()
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in candidates
+
+
+def snapshot_response(snapshot: MenuSnapshot, request: Request) -> Response:
+    """200 with the pre-serialized body, or 304 when the client already has this version"""
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={settings.MENU_CACHE_MAX_AGE}",
+    }
+    if _etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
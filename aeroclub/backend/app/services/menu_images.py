@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+from typing import Dict, Optional
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from app.core.config import settings
+from app.services.process_pool import get_process_pool
+
+# aeroclub/backend/uploads/menu_images, served by the /uploads mount in main.py
+_BACKEND_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+UPLOAD_DIR = os.path.join(_BACKEND_ROOT_DIR, "uploads", "menu_images")
+UPLOAD_URL = "/uploads/menu_images"
+
+# variant -> longest side in pixels
+VARIANTS = {"thumbnail": 160, "card": 480, "full": 1280}
+FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True})}
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+CHUNK_SIZE = 1024 * 1024
+# <content hash>-<variant>.<ext>; image_filename of a processed item is its full JPEG
+VARIANT_RE = re.compile(r"^(?P<key>[0-9a-f]{32})-full\.jpg$")
+
+
+class InvalidImageError(ValueError):
+    pass
+
+
+def variant_filename(key: str, variant: str, fmt: str) -> str:
+    return f"{key}-{variant}.{EXTENSIONS[fmt]}"
+
+
+def variant_urls(image_filename: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """{variant: {format: url}} of a processed image; None for images uploaded before the pipeline"""
+    match = VARIANT_RE.match(image_filename or "")
+    if not match:
+        return None
+    key = match.group("key")
+    return {
+        variant: {fmt: f"{UPLOAD_URL}/{variant_filename(key, variant, fmt)}" for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def process_image(src_path: str, dest_dir: str, key: str) -> str:
+    """
+    Writes every variant of the image in every format to dest_dir and returns the image_filename
+    (the full JPEG). Runs in the process pool: decoding and resizing a photo takes a CPU for
+    a noticeable time.
+    """
+    image_filename = variant_filename(key, "full", "jpeg")
+    if os.path.exists(os.path.join(dest_dir, image_filename)):
+        return image_filename  # the same photo was uploaded before
+
+    try:
+        with Image.open(src_path) as img:
+            img = ImageOps.exif_transpose(img)
+            img.load()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(f"Not a valid image: {e}")
+
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+    # the full JPEG is written last: its presence means the whole set is there
+    for variant, size in sorted(VARIANTS.items(), key=lambda v: v[0] == "full"):
+        resized = img.copy()
+        resized.thumbnail((size, size), Image.LANCZOS)
+        for fmt, (pil_format, options) in sorted(FORMATS.items(), key=lambda f: f[0] == "jpeg"):
+            out = resized
+            if pil_format == "JPEG" and out.mode == "RGBA":
+                out = Image.new("RGB", out.size, (255, 255, 255))
+                out.paste(resized, mask=resized.getchannel("A"))
+            path = os.path.join(dest_dir, variant_filename(key, variant, fmt))
+            fd, tmp_path = tempfile.mkstemp(dir=dest_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    out.save(f, format=pil_format, **options)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+    return image_filename
+
+
+async def save_upload(upload: UploadFile) -> str:
+    """
+    Streams the upload to a temporary file in chunks (file I/O off the event loop), hashing it
+    on the way, then builds the variants in the process pool. Returns the new image_filename.
+    Raises InvalidImageError for files that are not images or are too large.
+    """
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, tmp_path = tempfile.mkstemp(dir=UPLOAD_DIR, suffix=".upload")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            while chunk := await upload.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MENU_IMAGE_MAX_BYTES:
+                    raise InvalidImageError(f"Image is larger than {settings.MENU_IMAGE_MAX_BYTES // (1024 * 1024)} MB")
+                digest.update(chunk)
+                await run_in_threadpool(f.write, chunk)
+        if not size:
+            raise InvalidImageError("Image is empty")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_process_pool(), process_image, tmp_path, UPLOAD_DIR, digest.hexdigest()[:32]
+        )
+    finally:
+        await upload.close()
+        os.unlink(tmp_path)
+
+
+def delete_image(image_filename: Optional[str], menu_items) -> None:
+    """
+    Removes the files of an image (all variants, or a legacy upload) unless another menu item
+    still uses it: variants are shared by content hash.
+    """
+    if not image_filename or any(item.get("image_filename") == image_filename for item in menu_items):
+        return
+    match = VARIANT_RE.match(image_filename)
+    if match:
+        names = [variant_filename(match.group("key"), v, fmt) for v in VARIANTS for fmt in FORMATS]
+    else:
+        names = [os.path.basename(image_filename)]
+    for name in names:
+        try:
+            os.remove(os.path.join(UPLOAD_DIR, name))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Error deleting image file {name}: {e}") # Log error but continue
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional, Set
+
+from app import crud, models_db, schemas
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ORDER_CREATED = "order_created"
+ORDER_UPDATED = "order_updated"
+# the client must reload the order list: the events it missed are no longer buffered
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class OrderEvent:
+    id: int
+    type: str
+    location_id: Optional[str]
+    data: str  # schemas.Order as JSON
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+
+
+class _Subscriber:
+    def __init__(self, location_id: Optional[str], queue_size: int):
+        self.loop = asyncio.get_running_loop()
+        self.location_id = location_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged = False
+
+    def wants(self, event: OrderEvent) -> bool:
+        return self.location_id is None or event.location_id == self.location_id
+
+    def _put(self, event: OrderEvent):
+        # runs on the subscriber's loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a client that does not read is dropped, it resumes from its Last-Event-ID
+            self.lagged = True
+
+    def push(self, event: OrderEvent):
+        self.loop.call_soon_threadsafe(self._put, event)
+
+
+class OrderEventBroker:
+    """
+    In-process broker of order events for the admin app stream (GET /api/v1/orders/stream).
+
+    crud.create_order and crud.update_order_status publish every change; subscribers get the
+    events of their location. The last events are kept in a ring buffer, so a client that
+    reconnects with Last-Event-ID gets what it missed; when they are gone it gets a reset.
+    Event ids start from the boot time in milliseconds: after a restart they are still greater
+    than the ids the clients have seen, and the old ids fall outside the new buffer.
+    """
+
+    def __init__(self, buffer_size: int, queue_size: int = 1000):
+        self._lock = threading.Lock()
+        self._last_id = int(time.time() * 1000)
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._subscribers: Set[_Subscriber] = set()
+        self._queue_size = queue_size
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, location_id: Optional[str], data: str) -> OrderEvent:
+        with self._lock:
+            self._last_id += 1
+            event = OrderEvent(id=self._last_id, type=event_type, location_id=location_id, data=data)
+            self._buffer.append(event)
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+        for subscriber in subscribers:
+            subscriber.push(event)
+        return event
+
+    def replay(self, last_event_id: int, location_id: Optional[str] = None) -> Optional[List[OrderEvent]]:
+        """Events after last_event_id, or None if some of them are no longer in the buffer"""
+        with self._lock:
+            if last_event_id > self._last_id:
+                return None  # an id from before a restart of the clock
+            first_id = self._buffer[0].id if self._buffer else self._last_id + 1
+            if last_event_id < first_id - 1:
+                return None
+            return [
+                event for event in self._buffer
+                if event.id > last_event_id and (location_id is None or event.location_id == location_id)
+            ]
+
+    @contextmanager
+    def subscribe(self, location_id: Optional[str] = None) -> Iterator[_Subscriber]:
+        subscriber = _Subscriber(location_id, self._queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        try:
+            yield subscriber
+        finally:
+            with self._lock:
+                self._subscribers.discard(subscriber)
+
+    def reset_event(self) -> OrderEvent:
+        # carries the current id: after reloading the list the client resumes from here
+        return OrderEvent(id=self._last_id, type=RESET, location_id=None, data="{}")
+
+
+order_events = OrderEventBroker(buffer_size=settings.ORDER_EVENTS_BUFFER_SIZE)
+
+
+def _order_payload(order: models_db.OrderInDB) -> str:
+    # the same shape as GET /api/v1/orders/
+    location = crud.get_location_by_id(order["location_id"]) if order.get("location_id") else None
+    data = dict(order)
+    data["location_name"] = location["address"] if location else None
+    data["items"] = [
+        schemas.OrderItem(**item, menu_item_name=item.get("name_snapshot")) for item in order["items"]
+    ]
+    return schemas.Order(**data).model_dump_json()
+
+
+def publish_order(event_type: str, order: models_db.OrderInDB):
+    # the order is already written: a failure here must not fail the request
+    try:
+        order_events.publish(event_type, order.get("location_id"), _order_payload(order))
+    except Exception:
+        logger.exception("Failed to publish %s for order %s", event_type, order.get("id"))
+
+
+async def event_stream(
+    location_id: Optional[str] = None,
+    last_event_id: Optional[int] = None,
+    broker: Optional[OrderEventBroker] = None,
+    heartbeat: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """
+    text/event-stream of order events: missed events after last_event_id (or a reset),
+    then live events, with a comment line every `heartbeat` seconds to keep proxies from
+    closing an idle connection.
+    """
+    broker = broker or order_events
+    heartbeat = heartbeat if heartbeat is not None else settings.ORDER_EVENTS_HEARTBEAT
+    # subscribe before the replay: events published in between are in both and skipped once
+    with broker.subscribe(location_id) as subscriber:
+        yield f"retry: {settings.ORDER_EVENTS_RETRY_MS}\n\n".encode()
+        last_sent = 0
+        if last_event_id is not None:
+            missed = broker.replay(last_event_id, location_id)
+            if missed is None:
+                reset = broker.reset_event()
+                last_sent = reset.id
+                yield reset.encode()
+            else:
+                for event in missed:
+                    yield event.encode()
+                last_sent = missed[-1].id if missed else last_event_id
+        while True:
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield b": ping\n\n"
+                continue
+            if subscriber.lagged:
+                yield broker.reset_event().encode()
+                return
+            if event.id <= last_sent:
+                continue
+            last_sent = event.id
+            yield event.encode()
@@ -0,0 +1,25 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from app.core.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Worker processes for CPU-bound work (QR sheets, menu image variants), started on first use.
+    Functions sent to the pool must be importable module-level functions.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: the server process has threads, forking it is not safe
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.PROCESS_POOL_WORKERS or None,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
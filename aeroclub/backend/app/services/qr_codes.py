@@ -0,0 +1,191 @@
+import hashlib
+import io
+import math
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import qrcode
+from PIL import Image, ImageDraw, ImageFont
+
+from app.core.config import settings
+from app.services.process_pool import get_process_pool
+
+# aeroclub/backend/cache/qr_codes, next to uploads/
+_BACKEND_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+QR_CACHE_DIR = os.path.join(_BACKEND_ROOT_DIR, "cache", "qr_codes")
+
+# bump when the rendering below changes: cached files are keyed by it
+RENDER_VERSION = "1"
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# A4 at 200 dpi, 4 x 5 codes per page
+SHEET_DPI = 200
+PAGE_SIZE = (1654, 2339)
+PAGE_MARGIN = 100
+SHEET_COLUMNS = 4
+SHEET_ROWS = 5
+CAPTION_HEIGHT = 70
+# fewer codes than this are rendered in the request thread, a process pool is not worth starting
+POOL_THRESHOLD = 16
+
+
+@dataclass(frozen=True)
+class QrCode:
+    data: str     # the encoded link
+    caption: str  # printed under the code on a sheet, up to two lines
+
+
+def mini_app_link(numeric_id: int, spot: Optional[str] = None) -> str:
+    """
+    TELEGRAM_MINI_APP_BASE_URL + start parameter. The mini-app takes the location from the last
+    `__`-separated part of the start parameter, so a spot goes before it: `<spot>__<numeric_id>`.
+    """
+    base_url = settings.TELEGRAM_MINI_APP_BASE_URL
+    # Убедимся, что базовый URL заканчивается на /?startapp=
+    if not base_url.endswith("?startapp="):
+        if base_url.endswith("/"):
+            base_url += "?startapp="
+        else:
+            base_url += "/?startapp="
+    return f"{base_url}{spot}__{numeric_id}" if spot else f"{base_url}{numeric_id}"
+
+
+def parse_spots(spots: Optional[str]) -> List[str]:
+    """'1-3,VIP' -> ['1', '2', '3', 'VIP']; spots are alphanumeric, '__' separates them from the location"""
+    result: List[str] = []
+    for part in (spots or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        bounds = part.split("-")
+        if len(bounds) == 2 and bounds[0].isdigit() and bounds[1].isdigit():
+            first, last = int(bounds[0]), int(bounds[1])
+            if first > last:
+                raise ValueError(f"Invalid spot range: {part}")
+            if last - first >= settings.QR_SHEET_MAX_CODES:
+                raise ValueError(f"Spot range is too large: {part}")
+            result.extend(str(n) for n in range(first, last + 1))
+        elif re.fullmatch(r"[A-Za-z0-9]+", part):
+            result.append(part)
+        else:
+            raise ValueError(f"Invalid spot: {part}")
+    return list(dict.fromkeys(result))
+
+
+def digest(data: str) -> str:
+    return hashlib.sha256(f"{RENDER_VERSION}:{data}".encode()).hexdigest()
+
+
+def cached_path(key: str, suffix: str = ".png") -> str:
+    return os.path.join(QR_CACHE_DIR, key[:2], key + suffix)
+
+
+def _write_atomic(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def render_png(data: str) -> bytes:
+    # runs in the worker processes of the pool as well
+    buf = io.BytesIO()
+    qrcode.make(data).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def get_png(data: str) -> str:
+    """Path of the cached PNG with this content, rendered on the first request"""
+    path = cached_path(digest(data))
+    if not os.path.exists(path):
+        _write_atomic(path, render_png(data))
+    return path
+
+
+def get_pngs(codes: List[QrCode]) -> Dict[str, str]:
+    """Cached PNG paths by data; missing codes are rendered in the process pool"""
+    paths = {code.data: cached_path(digest(code.data)) for code in codes}
+    missing = [data for data, path in paths.items() if not os.path.exists(path)]
+    if len(missing) < POOL_THRESHOLD:
+        rendered = map(render_png, missing)
+    else:
+        rendered = get_process_pool().map(render_png, missing, chunksize=max(1, len(missing) // 32))
+    for data, png in zip(missing, rendered):
+        _write_atomic(paths[data], png)
+    return paths
+
+
+def _font(size: int):
+    for name in filter(None, (settings.QR_SHEET_FONT_PATH, "DejaVuSans.ttf")):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+def _fit(draw: ImageDraw.ImageDraw, text: str, font, width: int) -> str:
+    if draw.textlength(text, font=font) <= width:
+        return text
+    while text and draw.textlength(text + "…", font=font) > width:
+        text = text[:-1]
+    return text + "…"
+
+
+def _render_pages(codes: List[QrCode], paths: Dict[str, str]) -> List[Image.Image]:
+    cell_width = (PAGE_SIZE[0] - 2 * PAGE_MARGIN) // SHEET_COLUMNS
+    cell_height = (PAGE_SIZE[1] - 2 * PAGE_MARGIN) // SHEET_ROWS
+    qr_size = min(cell_width, cell_height - CAPTION_HEIGHT) - 20
+    font = _font(26)
+    per_page = SHEET_COLUMNS * SHEET_ROWS
+
+    pages = []
+    for page_no in range(math.ceil(len(codes) / per_page)):
+        # 1-bit pages: lossless CCITT compression in the PDF, a few KB per page
+        page = Image.new("1", PAGE_SIZE, 1)
+        draw = ImageDraw.Draw(page)
+        for i, code in enumerate(codes[page_no * per_page:(page_no + 1) * per_page]):
+            left = PAGE_MARGIN + (i % SHEET_COLUMNS) * cell_width
+            top = PAGE_MARGIN + (i // SHEET_COLUMNS) * cell_height
+            with Image.open(paths[code.data]) as qr:
+                tile = qr.convert("1").resize((qr_size, qr_size), Image.NEAREST)
+            page.paste(tile, (left + (cell_width - qr_size) // 2, top))
+            for line_no, line in enumerate(code.caption.split("\n")[:2]):
+                line = _fit(draw, line, font, cell_width - 10)
+                draw.text((left + cell_width // 2, top + qr_size + 5 + line_no * 32), line, font=font, fill=0, anchor="mt")
+        pages.append(page)
+    return pages
+
+
+def render_sheet(codes: List[QrCode], fmt: str) -> str:
+    """
+    Printable sheet of codes: a multi-page A4 PDF, or one PNG page. Returns the path of the
+    cached file, keyed by format and content.
+    """
+    key = hashlib.sha256(
+        "\n".join([RENDER_VERSION, fmt] + [f"{code.data}\t{code.caption}" for code in codes]).encode()
+    ).hexdigest()
+    path = cached_path(key, "." + fmt)
+    if os.path.exists(path):
+        return path
+
+    pages = _render_pages(codes, get_pngs(codes))
+    buf = io.BytesIO()
+    if fmt == "pdf":
+        pages[0].save(buf, format="PDF", save_all=True, append_images=pages[1:], resolution=SHEET_DPI)
+    else:
+        pages[0].save(buf, format="PNG", dpi=(SHEET_DPI, SHEET_DPI))
+    _write_atomic(path, buf.getvalue())
+    return path
+
+
+def sheet_capacity() -> int:
+    return SHEET_COLUMNS * SHEET_ROWS
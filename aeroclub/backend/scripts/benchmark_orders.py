@@ -0,0 +1,125 @@
+"""
+Benchmark of POST /api/v1/orders/ with 50-item orders under concurrent load.
+
+Runs the app in-process (httpx.ASGITransport) against a temporary copy of the JSON DB:
+300 menu items, 20 locations with 100 items each. Reports latency percentiles,
+throughput and how many times main_db.json was read per order.
+
+Run from the 'backend' directory (needs the same env vars as the app):
+    python scripts/benchmark_orders.py [--orders 200] [--concurrency 20] [--items 50]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from app import crud  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def seed(db_dir: str, rng: random.Random) -> dict:
+    menu_items = [
+        {"id": f"00000000-0000-4000-8000-{i:012d}", "name": f"Item {i}", "image_filename": None,
+         "price": round(rng.uniform(50, 500), 2)}
+        for i in range(300)
+    ]
+    locations = [
+        {"id": f"10000000-0000-4000-8000-{i:012d}", "numeric_id": 1001 + i, "address": f"Gate {i}",
+         "qr_code_link": ""}
+        for i in range(20)
+    ]
+    menus = {loc["id"]: rng.sample(menu_items, 100) for loc in locations}
+    main_db = {
+        "users": [],
+        "locations": locations,
+        "menu_items": menu_items,
+        "location_menu_associations": [
+            {"location_id": loc_id, "menu_item_id": item["id"]} for loc_id, items in menus.items() for item in items
+        ],
+    }
+    crud.MAIN_DB_PATH = os.path.join(db_dir, "main_db.json")
+    crud.ORDERS_DB_PATH = os.path.join(db_dir, "orders_db.json")
+    with open(crud.MAIN_DB_PATH, "w") as f:
+        json.dump(main_db, f)
+    with open(crud.ORDERS_DB_PATH, "w") as f:
+        json.dump([], f)
+    return {"locations": locations, "menus": menus}
+
+
+def order_payload(data: dict, rng: random.Random, items: int) -> dict:
+    location = rng.choice(data["locations"])
+    lines = [
+        {"menu_item_id": item["id"], "name_snapshot": item["name"], "quantity": rng.randint(1, 3),
+         "price_snapshot": item["price"]}
+        for item in rng.sample(data["menus"][location["id"]], items)
+    ]
+    return {
+        "location_id": location["numeric_id"],
+        "telegram_user_id": str(rng.randint(1, 10_000)),
+        "items": lines,
+        "total_amount": round(sum(line["price_snapshot"] * line["quantity"] for line in lines), 2),
+    }
+
+
+async def run(args) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    reads = {"count": 0}
+    read_main_db = crud.read_main_db
+
+    def counting_read_main_db():
+        reads["count"] += 1
+        return read_main_db()
+
+    crud.read_main_db = counting_read_main_db
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        data = seed(db_dir, rng)
+        payloads = [order_payload(data, rng, args.items) for _ in range(args.orders)]
+        latencies, statuses = [], {}
+        queue = asyncio.Queue()
+        for payload in payloads:
+            queue.put_nowait(payload)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            async def worker():
+                while not queue.empty():
+                    payload = queue.get_nowait()
+                    started = time.perf_counter()
+                    response = await client.post("/api/v1/orders/", json=payload)
+                    latencies.append(time.perf_counter() - started)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+            elapsed = time.perf_counter() - started
+
+        stored = len(crud.read_orders_db())
+
+    q = statistics.quantiles(latencies, n=100, method="inclusive")
+    print(
+        f"{args.orders} orders x {args.items} items, concurrency {args.concurrency}: "
+        f"p50 {q[49] * 1000:.1f} ms, p95 {q[94] * 1000:.1f} ms, p99 {q[98] * 1000:.1f} ms, "
+        f"{args.orders / elapsed:.1f} orders/s, main_db reads/order {(reads['count'] - 1) / args.orders:.1f}, "
+        f"statuses {statuses}, stored {stored}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
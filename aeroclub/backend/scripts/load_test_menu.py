@@ -0,0 +1,65 @@
+"""
+Load test of GET /api/v1/menu-items/locations/{numeric_id}/menu for mini-app clients.
+
+Runs the app in-process (httpx.ASGITransport) against a temporary copy of the JSON DB:
+300 menu items, 20 locations with 100 items each. Every simulated client opens the menu
+--requests times; with --revalidate it sends If-None-Match with the last ETag it got,
+as a browser does for a cached response.
+
+Run from the 'backend' directory (needs the same env vars as the app):
+    python scripts/load_test_menu.py [--clients 1000] [--requests 5] [--revalidate]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from app.main import app  # noqa: E402
+from benchmark_orders import seed  # noqa: E402
+
+
+async def run(args) -> None:
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as db_dir:
+        data = seed(db_dir, rng)
+        statuses = {}
+        transport = httpx.ASGITransport(app=app)
+        limits = httpx.Limits(max_connections=None)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=limits) as client:
+            async def mini_app_client():
+                numeric_id = rng.choice(data["locations"])["numeric_id"]
+                etag = None
+                for _ in range(args.requests):
+                    headers = {"If-None-Match": etag} if etag and args.revalidate else {}
+                    response = await client.get(f"/api/v1/menu-items/locations/{numeric_id}/menu", headers=headers)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    etag = response.headers.get("etag", etag)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(mini_app_client() for _ in range(args.clients)))
+            elapsed = time.perf_counter() - started
+
+    total = args.clients * args.requests
+    print(
+        f"{args.clients} clients x {args.requests} requests"
+        f"{' (revalidate)' if args.revalidate else ''}: {total / elapsed:.0f} req/s, "
+        f"{elapsed:.1f}s, statuses {statuses}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5)
+    parser.add_argument("--revalidate", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    asyncio.run(run(parser.parse_args()))
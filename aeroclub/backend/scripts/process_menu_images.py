@@ -0,0 +1,50 @@
+"""
+Builds the resized WebP/JPEG variants (app/services/menu_images.py) for menu items whose
+photos were uploaded before the image pipeline, and points them at the new files.
+The original uploads are deleted once no item uses them.
+
+Run from the 'backend' directory (needs the same env vars as the app):
+    python scripts/process_menu_images.py [--dry-run]
+"""
+import argparse
+import hashlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import crud, schemas  # noqa: E402
+from app.services import menu_images  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="only list the items to process")
+    args = parser.parse_args()
+
+    for item in crud.get_menu_items():
+        image_filename = item.get("image_filename")
+        if not image_filename or menu_images.VARIANT_RE.match(image_filename):
+            continue
+        src_path = os.path.join(menu_images.UPLOAD_DIR, image_filename)
+        if not os.path.exists(src_path):
+            print(f"{item['name']}: {image_filename} is missing, skipped")
+            continue
+        if args.dry_run:
+            print(f"{item['name']}: {image_filename}")
+            continue
+
+        with open(src_path, "rb") as f:
+            key = hashlib.sha256(f.read()).hexdigest()[:32]
+        try:
+            new_filename = menu_images.process_image(src_path, menu_images.UPLOAD_DIR, key)
+        except menu_images.InvalidImageError as e:
+            print(f"{item['name']}: {e}, skipped")
+            continue
+        crud.update_menu_item(item["id"], schemas.MenuItemUpdate(image_filename=new_filename))
+        menu_images.delete_image(image_filename, crud.get_menu_items())
+        print(f"{item['name']}: {image_filename} -> {new_filename}")
+
+
+if __name__ == "__main__":
+    main()
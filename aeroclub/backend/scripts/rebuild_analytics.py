@@ -0,0 +1,25 @@
+"""
+Rebuilds the sales aggregates (db_json/analytics_db.json, app/services/analytics.py)
+from all orders in orders_db.json. Safe to run while the app is serving: orders are
+locked for the duration.
+
+Run from the 'backend' directory (needs the same env vars as the app):
+    python scripts/rebuild_analytics.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import analytics  # noqa: E402
+
+
+def main() -> None:
+    started = time.perf_counter()
+    orders = analytics.rebuild()
+    print(f"Rebuilt analytics from {orders} orders in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,12 +13,14 @@ from app.main import app # FastAPI application instance
 from app.core.config import settings # To get admin credentials
 from app.crud import MAIN_DB_PATH as REAL_MAIN_DB_PATH
 from app.crud import ORDERS_DB_PATH as REAL_ORDERS_DB_PATH
+from app.crud import ANALYTICS_DB_PATH as REAL_ANALYTICS_DB_PATH
 from app.crud import DB_DIR as REAL_DB_DIR
 
 # Define paths for temporary test database files
 TEST_DB_DIR = os.path.join(REAL_DB_DIR, "test_data")
 TEST_MAIN_DB_PATH = os.path.join(TEST_DB_DIR, "test_main_db.json")
 TEST_ORDERS_DB_PATH = os.path.join(TEST_DB_DIR, "test_orders_db.json")
+TEST_ANALYTICS_DB_PATH = os.path.join(TEST_DB_DIR, "test_analytics_db.json")
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_environment():
@@ -30,6 +32,7 @@ def setup_test_environment():
     """
     original_main_db_path = REAL_MAIN_DB_PATH
     original_orders_db_path = REAL_ORDERS_DB_PATH
+    original_analytics_db_path = REAL_ANALYTICS_DB_PATH
 
     # Create test DB directory if it doesn't exist
     os.makedirs(TEST_DB_DIR, exist_ok=True)
@@ -46,12 +49,14 @@ def setup_test_environment():
     import app.crud
     app.crud.MAIN_DB_PATH = TEST_MAIN_DB_PATH
     app.crud.ORDERS_DB_PATH = TEST_ORDERS_DB_PATH
+    app.crud.ANALYTICS_DB_PATH = TEST_ANALYTICS_DB_PATH
     
     yield # This is where the tests run
 
     # Teardown: Restore original paths and remove test DB files/directory
     app.crud.MAIN_DB_PATH = original_main_db_path
     app.crud.ORDERS_DB_PATH = original_orders_db_path
+    app.crud.ANALYTICS_DB_PATH = original_analytics_db_path
     if os.path.exists(TEST_DB_DIR):
         shutil.rmtree(TEST_DB_DIR)
 
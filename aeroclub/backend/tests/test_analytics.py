@@ -0,0 +1,101 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import httpx
+from fastapi import status
+
+from app import crud, schemas
+from app.api.v1 import deps
+from app.main import app
+from app.services import analytics
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def as_admin():
+    app.dependency_overrides[deps.get_current_admin_user] = lambda: {"login": "admin"}
+    yield
+    app.dependency_overrides.pop(deps.get_current_admin_user, None)
+
+
+@pytest.fixture
+def menu():
+    location = crud.create_location(schemas.LocationCreate(address="Terminal F"))
+    latte = crud.create_menu_item(schemas.MenuItemCreate(name="Latte", price=200.0))
+    cookie = crud.create_menu_item(schemas.MenuItemCreate(name="Cookie", price=50.0))
+    for item in (latte, cookie):
+        crud.associate_item_to_location(location["id"], item["id"])
+    return {"location": location, "latte": latte, "cookie": cookie}
+
+
+def place_order(menu, *items):
+    return crud.create_order(schemas.OrderCreate(
+        location_id=menu["location"]["id"],
+        items=[schemas.OrderItemCreate(menu_item_id=menu[name]["id"], quantity=qty) for name, qty in items],
+    ))
+
+
+def report(menu, **kwargs):
+    today = datetime.now(timezone.utc).date()
+    return analytics.sales_report(kwargs.get("date_from", today), kwargs.get("date_to", today), menu["location"]["id"])
+
+
+async def test_incremental_updates_match_rebuild(menu):
+    first = place_order(menu, ("latte", 2), ("cookie", 1))
+    second = place_order(menu, ("cookie", 3))
+    third = place_order(menu, ("latte", 1))
+    crud.update_order_status(first["id"], "processing")
+    crud.update_order_status(first["id"], "completed")
+    crud.update_order_status(second["id"], "cancelled")
+    crud.update_order_status(third["id"], "cancelled")
+    crud.update_order_status(third["id"], "pending")  # restored
+
+    result = report(menu)
+
+    assert (result.orders, result.revenue) == (3, 650.0)
+    assert result.funnel == {"completed": 1, "cancelled": 1, "pending": 1}
+    assert [(row.name, row.quantity, row.revenue) for row in result.by_menu_item] == [
+        ("Latte", 3, 600.0), ("Cookie", 1, 50.0),
+    ]
+    assert [(row.location_name, row.orders, row.revenue) for row in result.by_location] == [("Terminal F", 3, 650.0)]
+
+    incremental = crud.read_analytics_db()
+    analytics.rebuild()
+    assert crud.read_analytics_db() == incremental
+
+
+async def test_rebuild_backfills_existing_orders(menu):
+    order = place_order(menu, ("latte", 1))
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    orders = crud.read_orders_db()
+    for stored in orders:
+        if stored["id"] == order["id"]:
+            stored["created_at"] = yesterday.isoformat()
+    crud.write_orders_db(orders)
+    os.remove(crud.ANALYTICS_DB_PATH)
+
+    # a missing aggregate file is rebuilt on first use
+    assert report(menu).orders == 0
+    result = report(menu, date_from=yesterday.date())
+    assert [(row.date, row.orders, row.revenue) for row in result.by_day] == [(yesterday.date(), 1, 200.0)]
+
+
+async def test_sales_endpoint(client: httpx.AsyncClient, menu, as_admin):
+    place_order(menu, ("cookie", 4))
+
+    response = await client.get("/api/v1/analytics/sales", params={"location_id": menu["location"]["numeric_id"]})
+
+    assert response.status_code == status.HTTP_200_OK
+    body = response.json()
+    assert (body["orders"], body["revenue"], body["funnel"]) == (1, 200.0, {"pending": 1})
+    assert body["by_menu_item"][0]["name"] == "Cookie"
+
+    response = await client.get("/api/v1/analytics/sales", params={"date_from": "2025-02-01", "date_to": "2025-01-01"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = await client.post("/api/v1/analytics/rebuild")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["orders"] == len(crud.read_orders_db())
@@ -0,0 +1,69 @@
+import pytest
+import httpx
+from fastapi import status
+
+from app import crud, schemas
+from app.services.menu_cache import menu_cache
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def location():
+    location = crud.create_location(schemas.LocationCreate(address="Terminal B"))
+    for name, price in (("Latte", 180.0), ("Espresso", 120.0)):
+        item = crud.create_menu_item(schemas.MenuItemCreate(name=name, price=price))
+        crud.associate_item_to_location(location["id"], item["id"])
+    return location
+
+
+async def test_menu_has_etag_and_revalidates(client: httpx.AsyncClient, location):
+    url = f"/api/v1/menu-items/locations/{location['numeric_id']}/menu"
+
+    first = await client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert [item["name"] for item in first.json()] == ["Latte", "Espresso"]
+    etag = first.headers["etag"]
+    assert etag.startswith('"')
+    assert "max-age" in first.headers["cache-control"]
+
+    not_modified = await client.get(url, headers={"If-None-Match": f'"other", W/{etag}'})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    by_uuid = await client.get("/api/v1/menu-items/", params={"location_id": location["id"]})
+    assert by_uuid.json() == first.json()
+    assert by_uuid.headers["etag"] == etag
+
+
+async def test_menu_writes_change_the_etag(client: httpx.AsyncClient, location):
+    url = f"/api/v1/menu-items/locations/{location['numeric_id']}/menu"
+    etag = (await client.get(url)).headers["etag"]
+    latte = next(item for item in crud.get_menu_items(location["id"]) if item["name"] == "Latte")
+
+    crud.update_menu_item(latte["id"], schemas.MenuItemUpdate(price=190.0))
+    updated = await client.get(url, headers={"If-None-Match": etag})
+    assert updated.status_code == status.HTTP_200_OK
+    assert updated.json()[0]["price"] == 190.0
+
+    crud.disassociate_item_from_location(location["id"], latte["id"])
+    removed = await client.get(url, headers={"If-None-Match": updated.headers["etag"]})
+    assert [item["name"] for item in removed.json()] == ["Espresso"]
+
+
+async def test_snapshot_is_serialized_once_per_version(location):
+    first = menu_cache.get(location["id"])
+    assert menu_cache.get_by_numeric_id(location["numeric_id"]) is first
+
+    # a write from another process: the file is replaced, the in-process cache is not told
+    db = crud.read_main_db()
+    db["menu_items"][0]["name"] = db["menu_items"][0]["name"] + " (new)"
+    crud.write_main_db(db)
+    assert menu_cache.get(location["id"]) is not first
+
+
+async def test_unknown_location_menu_is_404(client: httpx.AsyncClient):
+    response = await client.get("/api/v1/menu-items/locations/987654/menu")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,116 @@
+import io
+import os
+
+import pytest
+import httpx
+from fastapi import status
+from PIL import Image
+
+from app.api.v1 import deps
+from app.core.config import settings
+from app.main import app
+from app.services import menu_images
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def as_admin():
+    app.dependency_overrides[deps.get_current_admin_user] = lambda: {"login": "admin"}
+    yield
+    app.dependency_overrides.pop(deps.get_current_admin_user, None)
+
+
+def photo(size=(2000, 1000), mode="RGB", color=(200, 100, 50), fmt="JPEG") -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, color).save(buf, format=fmt)
+    return buf.getvalue()
+
+
+def files_of(image_filename):
+    key = menu_images.VARIANT_RE.match(image_filename).group("key")
+    return [
+        os.path.join(menu_images.UPLOAD_DIR, menu_images.variant_filename(key, variant, fmt))
+        for variant in menu_images.VARIANTS for fmt in menu_images.FORMATS
+    ]
+
+
+async def test_process_image_writes_resized_variants(tmp_path):
+    src = tmp_path / "upload"
+    src.write_bytes(photo(mode="RGBA", color=(0, 0, 0, 0), fmt="PNG"))
+
+    image_filename = menu_images.process_image(str(src), str(tmp_path), "a" * 32)
+
+    assert image_filename == "a" * 32 + "-full.jpg"
+    sizes = {}
+    for name in os.listdir(tmp_path):
+        if name.startswith("a" * 32):
+            with Image.open(tmp_path / name) as img:
+                sizes[name] = (img.format, img.size, img.mode)
+    assert sizes["a" * 32 + "-thumbnail.webp"] == ("WEBP", (160, 80), "RGBA")
+    assert sizes["a" * 32 + "-card.jpg"] == ("JPEG", (480, 240), "RGB")  # transparency flattened
+    assert sizes["a" * 32 + "-full.webp"][1] == (1280, 640)
+    assert len(sizes) == 6
+
+
+async def test_process_image_rejects_non_images(tmp_path):
+    src = tmp_path / "upload"
+    src.write_bytes(b"not an image")
+
+    with pytest.raises(menu_images.InvalidImageError):
+        menu_images.process_image(str(src), str(tmp_path), "b" * 32)
+
+
+async def test_upload_serves_cached_variants(client: httpx.AsyncClient, as_admin):
+    image = photo()
+    first = await client.post(
+        "/api/v1/menu-items/", data={"name": "Cappuccino", "price": "190"},
+        files={"image": ("IMG_0001.JPG", image, "image/jpeg")},
+    )
+    second = await client.post(
+        "/api/v1/menu-items/", data={"name": "Cappuccino XL", "price": "250"},
+        files={"image": ("copy.jpg", image, "image/jpeg")},
+    )
+
+    assert first.status_code == status.HTTP_201_CREATED
+    item, same_photo = first.json(), second.json()
+    assert menu_images.VARIANT_RE.match(item["image_filename"])
+    assert same_photo["image_filename"] == item["image_filename"]
+    card = item["image_variants"]["card"]
+    assert card["webp"].startswith("/uploads/menu_images/")
+
+    response = await client.get(card["webp"])
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "image/webp"
+    assert "immutable" in response.headers["cache-control"]
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert img.size == (480, 240)
+
+    # the files are shared: deleted with the last item that uses them
+    await client.delete(f"/api/v1/menu-items/{item['id']}")
+    assert all(os.path.exists(path) for path in files_of(item["image_filename"]))
+    await client.delete(f"/api/v1/menu-items/{same_photo['id']}")
+    assert not any(os.path.exists(path) for path in files_of(item["image_filename"]))
+
+
+async def test_upload_validation(client: httpx.AsyncClient, as_admin, monkeypatch):
+    response = await client.post(
+        "/api/v1/menu-items/", data={"name": "Broken", "price": "1"},
+        files={"image": ("menu.pdf", b"%PDF-1.4", "application/pdf")},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    monkeypatch.setattr(settings, "MENU_IMAGE_MAX_BYTES", 1024)
+    response = await client.post(
+        "/api/v1/menu-items/", data={"name": "Huge", "price": "1"},
+        files={"image": ("huge.jpg", photo(), "image/jpeg")},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "larger" in response.json()["detail"]
+    assert not [name for name in os.listdir(menu_images.UPLOAD_DIR) if name.endswith(".upload")]
+
+
+async def test_legacy_images_have_no_variants():
+    assert menu_images.variant_urls("0b5c_coffee.png") is None
+    assert menu_images.variant_urls(None) is None
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+import httpx
+from fastapi import status
+
+from app import crud, schemas
+from app.core import security
+from app.main import app
+from app.services import order_events
+from app.services.order_events import OrderEventBroker, event_stream
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def menu():
+    location = crud.create_location(schemas.LocationCreate(address="Terminal C"))
+    other_location = crud.create_location(schemas.LocationCreate(address="Terminal D"))
+    coffee = crud.create_menu_item(schemas.MenuItemCreate(name="Flat white", price=210.0))
+    for loc in (location, other_location):
+        crud.associate_item_to_location(loc["id"], coffee["id"])
+    return {"location": location, "other_location": other_location, "coffee": coffee}
+
+
+@pytest.fixture
+def token():
+    # written directly: hashing a password is not needed to authenticate with a JWT
+    db = crud.read_main_db()
+    login = f"stream-{uuid.uuid4()}"
+    db["users"].append({"id": str(uuid.uuid4()), "login": login, "hashed_password": "-", "location_id": None})
+    crud.write_main_db(db)
+    yield security.create_access_token(login)
+    db = crud.read_main_db()
+    db["users"] = [user for user in db["users"] if user["login"] != login]
+    crud.write_main_db(db)
+
+
+def place_order(location, item, quantity=1):
+    return crud.create_order(schemas.OrderCreate(
+        location_id=location["id"],
+        items=[schemas.OrderItemCreate(menu_item_id=item["id"], quantity=quantity)],
+    ))
+
+
+def parse(chunk: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def test_replay_after_last_event_id():
+    broker = OrderEventBroker(buffer_size=3)
+    events = [broker.publish("order_created", loc, "{}") for loc in ("a", "b", "a", "a")]
+
+    assert broker.replay(events[1].id) == events[2:]
+    assert broker.replay(events[1].id, location_id="a") == events[2:]
+    assert broker.replay(events[2].id, location_id="b") == []
+    assert broker.replay(events[-1].id) == []
+    # events[0] fell out of the buffer, ids from the future come from before a restart
+    assert broker.replay(events[0].id - 1) is None
+    assert broker.replay(events[-1].id + 1) is None
+
+
+async def test_crud_publishes_order_changes(menu):
+    last_id = order_events.order_events.last_id
+
+    order = place_order(menu["location"], menu["coffee"], quantity=2)
+    crud.update_order_status(order["id"], "completed")
+
+    created, updated = order_events.order_events.replay(last_id)
+    assert (created.type, updated.type) == ("order_created", "order_updated")
+    assert created.location_id == menu["location"]["id"]
+    data = json.loads(updated.data)
+    assert data["id"] == order["id"]
+    assert data["status"] == "completed"
+    assert data["location_name"] == "Terminal C"
+    assert data["items"][0]["menu_item_name"] == "Flat white"
+    assert data["total_amount"] == 420.0
+
+
+async def test_stream_delivers_live_events_of_its_location(menu):
+    stream = event_stream(location_id=menu["location"]["id"], heartbeat=0.05)
+    assert (await anext(stream)).startswith(b"retry: ")
+
+    place_order(menu["other_location"], menu["coffee"])
+    order = place_order(menu["location"], menu["coffee"])
+
+    event = parse(await anext(stream))
+    assert event["event"] == "order_created"
+    assert event["data"]["id"] == order["id"]
+    assert await anext(stream) == b": ping\n\n"
+    await stream.aclose()
+
+
+async def test_stream_resumes_or_resets():
+    broker = OrderEventBroker(buffer_size=2)
+    first, second, third = (broker.publish("order_created", "a", "{}") for _ in range(3))
+
+    resumed = event_stream(last_event_id=second.id, broker=broker, heartbeat=0.05)
+    await anext(resumed)
+    assert int(parse(await anext(resumed))["id"]) == third.id
+    assert await anext(resumed) == b": ping\n\n"
+    await resumed.aclose()
+
+    stale = event_stream(last_event_id=first.id - 1, broker=broker, heartbeat=0.05)
+    await anext(stale)
+    reset = parse(await anext(stale))
+    assert reset["event"] == "reset"
+    assert int(reset["id"]) == third.id
+    await stale.aclose()
+
+
+async def test_stream_endpoint_requires_auth(client: httpx.AsyncClient, token):
+    response = await client.get("/api/v1/orders/stream")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = await client.get("/api/v1/orders/stream", params={"token": token, "location_id": 999999})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_stream_endpoint_with_query_token(menu, token):
+    # httpx.ASGITransport waits for the whole body, so the endpoint is driven directly
+    query = f"token={token}&location_id={menu['location']['numeric_id']}"
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/v1/orders/stream", "raw_path": b"/api/v1/orders/stream",
+        "root_path": "", "query_string": query.encode(), "headers": [(b"host", b"testserver")],
+        "client": ("test", 1), "server": ("testserver", 80),
+    }
+    disconnect = asyncio.Event()
+    sent = asyncio.Queue()
+
+    async def receive():
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        await sent.put(message)
+
+    task = asyncio.create_task(app(scope, receive, send))
+    start = await asyncio.wait_for(sent.get(), 5)
+    assert start["status"] == status.HTTP_200_OK
+    assert dict(start["headers"])[b"content-type"].startswith(b"text/event-stream")
+    assert (await asyncio.wait_for(sent.get(), 5))["body"].startswith(b"retry: ")
+
+    order = place_order(menu["location"], menu["coffee"])
+
+    event = parse((await asyncio.wait_for(sent.get(), 5))["body"])
+    assert event["data"]["id"] == order["id"]
+    disconnect.set()
+    await asyncio.wait_for(task, 5)
@@ -0,0 +1,90 @@
+import asyncio
+import uuid
+
+import pytest
+import httpx
+from fastapi import status
+
+from app import crud, schemas
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def menu():
+    """A location with two items on its menu and one item that is not."""
+    location = crud.create_location(schemas.LocationCreate(address="Terminal A"))
+    coffee = crud.create_menu_item(schemas.MenuItemCreate(name="Coffee", price=150.0))
+    tea = crud.create_menu_item(schemas.MenuItemCreate(name="Tea", price=99.5))
+    other = crud.create_menu_item(schemas.MenuItemCreate(name="Juice", price=200.0))
+    for item in (coffee, tea):
+        crud.associate_item_to_location(location["id"], item["id"])
+    return {"location": location, "coffee": coffee, "tea": tea, "other": other}
+
+
+def order_payload(location_id, *items, total_amount=1.0):
+    return {
+        "location_id": location_id,
+        "telegram_user_id": "42",
+        "items": [
+            {"menu_item_id": item["id"], "name_snapshot": "anything", "quantity": qty, "price_snapshot": 0.01}
+            for item, qty in items
+        ],
+        "total_amount": total_amount,
+    }
+
+
+async def test_create_order_uses_menu_prices(client: httpx.AsyncClient, menu):
+    payload = order_payload(menu["location"]["numeric_id"], (menu["coffee"], 2), (menu["tea"], 1))
+
+    response = await client.post("/api/v1/orders/", json=payload)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    order = response.json()
+    assert order["location_id"] == menu["location"]["id"]
+    assert order["total_amount"] == 399.5
+    assert [(i["name_snapshot"], i["price_snapshot"]) for i in order["items"]] == [("Coffee", 150.0), ("Tea", 99.5)]
+    assert crud.get_order_by_id(order["id"])["total_amount"] == 399.5
+
+
+async def test_create_order_without_client_snapshots(client: httpx.AsyncClient, menu):
+    payload = {
+        "location_id": menu["location"]["id"],
+        "items": [{"menu_item_id": menu["tea"]["id"], "quantity": 2}],
+    }
+
+    response = await client.post("/api/v1/orders/", json=payload)
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["total_amount"] == 199.0
+
+
+async def test_create_order_rejects_invalid_items(client: httpx.AsyncClient, menu):
+    location_id = menu["location"]["id"]
+    orders_before = len(crud.read_orders_db())
+
+    unknown = await client.post(
+        "/api/v1/orders/", json=order_payload(location_id, (menu["coffee"], 1), ({"id": str(uuid.uuid4())}, 1))
+    )
+    unavailable = await client.post("/api/v1/orders/", json=order_payload(location_id, (menu["other"], 1)))
+    no_location = await client.post("/api/v1/orders/", json=order_payload(999999, (menu["coffee"], 1)))
+    zero_quantity = await client.post("/api/v1/orders/", json=order_payload(location_id, (menu["coffee"], 0)))
+
+    assert unknown.status_code == status.HTTP_404_NOT_FOUND
+    assert unavailable.status_code == status.HTTP_400_BAD_REQUEST
+    assert "not available at this location" in unavailable.json()["detail"]
+    assert no_location.status_code == status.HTTP_400_BAD_REQUEST
+    assert zero_quantity.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert len(crud.read_orders_db()) == orders_before
+
+
+async def test_concurrent_orders_are_all_stored(menu):
+    orders_before = len(crud.read_orders_db())
+    order_in = schemas.OrderCreate(**order_payload(menu["location"]["id"], (menu["coffee"], 1)))
+
+    created = await asyncio.gather(*(asyncio.to_thread(crud.create_order, order_in) for _ in range(20)))
+
+    stored = {order["id"] for order in crud.read_orders_db()}
+    assert len(stored) == orders_before + 20
+    assert {order["id"] for order in created} <= stored
@@ -0,0 +1,125 @@
+import pytest
+import httpx
+from fastapi import status
+
+from app import crud, schemas
+from app.api.v1 import deps
+from app.main import app
+from app.services import qr_codes
+
+# All test coroutines will be treated as marked.
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(qr_codes, "QR_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    # counted in this process: the pool is used only by test_process_pool_renders_missing_codes
+    monkeypatch.setattr(qr_codes, "POOL_THRESHOLD", 1000)
+    rendered = []
+    render_png = qr_codes.render_png
+
+    def counting_render(data):
+        rendered.append(data)
+        return render_png(data)
+
+    monkeypatch.setattr(qr_codes, "render_png", counting_render)
+    return rendered
+
+
+@pytest.fixture
+def as_admin():
+    app.dependency_overrides[deps.get_current_admin_user] = lambda: {"login": "admin"}
+    yield
+    app.dependency_overrides.pop(deps.get_current_admin_user, None)
+
+
+@pytest.fixture
+def location():
+    return crud.create_location(schemas.LocationCreate(address="Terminal E"))
+
+
+async def test_mini_app_link_and_spots():
+    assert qr_codes.mini_app_link(1001).endswith("?startapp=1001")
+    assert qr_codes.mini_app_link(1001, "VIP").endswith("?startapp=VIP__1001")
+    assert qr_codes.parse_spots(" 1-3, VIP,2 ") == ["1", "2", "3", "VIP"]
+    for invalid in ("3-1", "a b", "1__2"):
+        with pytest.raises(ValueError):
+            qr_codes.parse_spots(invalid)
+
+
+async def test_qr_code_is_rendered_once_and_immutable(client: httpx.AsyncClient, location, renders):
+    url = f"/api/v1/locations/{location['numeric_id']}/qr-code"
+
+    first = await client.get(url)
+    second = await client.get(url, params={"spot": "7"})
+    again = await client.get(url)
+
+    assert first.status_code == status.HTTP_307_TEMPORARY_REDIRECT
+    assert again.headers["location"] == first.headers["location"]
+    assert second.headers["location"] != first.headers["location"]
+    assert len(renders) == 2
+
+    image = await client.get(first.headers["location"])
+    assert image.status_code == status.HTTP_200_OK
+    assert image.headers["content-type"] == "image/png"
+    assert "immutable" in image.headers["cache-control"]
+    assert image.content.startswith(b"\x89PNG")
+
+
+async def test_cached_qr_code_rejects_unknown_keys(client: httpx.AsyncClient):
+    for key in ("0" * 64, "..%2F..%2Fetc"):
+        response = await client.get(f"/api/v1/locations/qr-codes/{key}.png")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+async def test_qr_sheet_for_spots(client: httpx.AsyncClient, location, renders, as_admin):
+    params = {"location_id": location["id"], "spots": "1-25"}
+
+    pdf = await client.get("/api/v1/locations/qr-sheet", params=params)
+    assert pdf.status_code == status.HTTP_200_OK
+    assert pdf.headers["content-type"] == "application/pdf"
+    assert pdf.content.startswith(b"%PDF")
+    assert b"/Count 2" in pdf.content  # 25 codes on 20-code pages
+    assert len(renders) == 25
+
+    again = await client.get("/api/v1/locations/qr-sheet", params=params)
+    assert again.content == pdf.content
+    assert len(renders) == 25
+
+    png = await client.get("/api/v1/locations/qr-sheet", params={**params, "format": "png"})
+    assert png.status_code == status.HTTP_400_BAD_REQUEST
+
+    png = await client.get("/api/v1/locations/qr-sheet", params={**params, "spots": "1-4", "format": "png"})
+    assert png.status_code == status.HTTP_200_OK
+    assert png.content.startswith(b"\x89PNG")
+    assert len(renders) == 25  # the tiles of spots 1-4 are already cached
+
+
+async def test_qr_sheet_validation(client: httpx.AsyncClient, location, as_admin):
+    response = await client.get("/api/v1/locations/qr-sheet", params={"location_id": 999999})
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    response = await client.get("/api/v1/locations/qr-sheet", params={"location_id": location["id"], "spots": "a b"})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    app.dependency_overrides.pop(deps.get_current_admin_user)
+    response = await client.get("/api/v1/locations/qr-sheet")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+async def test_process_pool_renders_missing_codes(cache_dir, monkeypatch):
+    monkeypatch.setattr(qr_codes, "POOL_THRESHOLD", 1)
+    codes = [qr_codes.QrCode(data=qr_codes.mini_app_link(1001, str(n)), caption=str(n)) for n in range(4)]
+
+    paths = qr_codes.get_pngs(codes)
+
+    assert set(paths) == {code.data for code in codes}
+    for path in paths.values():
+        with open(path, "rb") as f:
+            assert f.read().startswith(b"\x89PNG")
@@ -29,6 +29,7 @@ interface MenuItem {
   id: string; // Changed from number
   name: string;
   image_filename: string | null; // Changed from image_url, added null
+  image_variants?: Record<'thumbnail' | 'card' | 'full', { webp: string; jpeg: string }> | null; // Уменьшенные копии фото
   price: number;
 }
 
@@ -39,6 +40,7 @@ const ClientAppPage: React.FC = () => {
   const [locationId, setLocationId] = useState<number | null>(null);
   const [locationNumberId, setLocationNumberId] = useState<number | null>(null);
   const [rawStartParam, setRawStartParam] = useState<string | null>(null); // New state for raw start param
+  const [spot, setSpot] = useState<string | null>(null); // Место (столик) из QR-кода '<spot>__<numeric_id>'
   const [currentOrderId, setCurrentOrderId] = useState<string | null>(null); // To store the ID of the created order
 
   const location = useLocation();
@@ -75,6 +77,7 @@ const ClientAppPage: React.FC = () => {
       // Assume the location ID is the last part after splitting by '__'
       // If no '__', it's the whole string.
       const idStrToParse = parts.length > 0 ? parts[parts.length - 1] : null;
+      setSpot(parts.length > 1 ? parts[parts.length - 2] : null);
 
       if (idStrToParse) {
         const parsedId = parseInt(idStrToParse, 10);
@@ -135,6 +138,7 @@ const ClientAppPage: React.FC = () => {
                 id: item.id,
                 name: item.name,
                 image_filename: item.image_filename,
+                image_variants: (item as any).image_variants || null,
                 price: item.price
             })) as MenuItem[];
 
@@ -216,6 +220,7 @@ const ClientAppPage: React.FC = () => {
 
     const orderPayload = {
       location_id: locationId,
+      spot: spot,
       items: itemsToOrder,
       total_amount: totalAmount,
       telegram_user_id: telegramUser.id.toString(), // Add user ID to payload
@@ -256,7 +261,8 @@ const ClientAppPage: React.FC = () => {
       if (scannedData.includes('startapp=')) {
         const startappIndex = scannedData.indexOf('startapp=');
         const afterStartapp = scannedData.substring(startappIndex + 'startapp='.length);
-        const numberPart = afterStartapp.split('&')[0];
+        // '<spot>__<numeric_id>' у кодов мест (столиков): номер локации — последняя часть
+        const numberPart = afterStartapp.split('&')[0].split('__').pop() || '';
         const parsed = parseInt(numberPart, 10);
         if (!isNaN(parsed)) {
           scannedNumberId = parsed;
@@ -338,7 +344,13 @@ const ClientAppPage: React.FC = () => {
           {menuItems.map((item: MenuItem) => (
             <div key={item.id} className="product-card">
               <div className="product-image-container">
-                {item.image_filename && <img src={`${SERVER_ROOT_URL}/uploads/menu_images/${item.image_filename}`} alt={item.name} className="product-image" />}
+                {item.image_variants && (
+                  <picture>
+                    <source srcSet={`${SERVER_ROOT_URL}${item.image_variants.card.webp}`} type="image/webp" />
+                    <img src={`${SERVER_ROOT_URL}${item.image_variants.card.jpeg}`} alt={item.name} className="product-image" loading="lazy" />
+                  </picture>
+                )}
+                {item.image_filename && !item.image_variants && <img src={`${SERVER_ROOT_URL}/uploads/menu_images/${item.image_filename}`} alt={item.name} className="product-image" />}
                 {!item.image_filename && <div className="product-image-placeholder">Image not available</div>}
                 <div className="image-gradient-overlay"></div>
                 <div className="product-name">{item.name}</div>
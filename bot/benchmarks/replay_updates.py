@@ -0,0 +1,120 @@
+"""
+Replay benchmark for the webhook ingestion layer (update_ingestion.py)
+
+Прогоняет записанные апдейты (jsonl, см. UPDATES_RECORD_PATH) через UpdateIngestor
+и сравнивает последовательную обработку (как до concurrent_updates) с
+ChatOrderedUpdateProcessor. Хендлеры имитируются задержкой по типу апдейта,
+сеть и Bot API не используются: ожидание Bot API — asyncio.sleep, синхронный
+httpx-вызов MainService в backend — time.sleep в asyncio.to_thread, как в
+хендлерах. С --inline-backend time.sleep выполняется прямо в цикле событий
+(поведение до переноса вызовов в поток): параллельность чатов тогда не помогает.
+
+    cd bot && python -m benchmarks.replay_updates [--updates path] [--rate 50] [--scale 0.1] [--inline-backend]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from update_ingestion import ChatOrderedUpdateProcessor, UpdateIngestor, ordering_key, update_type
+
+DEFAULT_UPDATES = Path(__file__).with_name("recorded_updates.jsonl")
+
+# примерное время реальных хендлеров, сек: (ожидание Bot API, блокирующий вызов backend)
+HANDLER_LATENCY = {
+    "my_chat_member": (0.5, 1.0),  # channel_handle_add: get_chat/get_chat_administrators + POST /api/channel/
+    "callback_query": (0.1, 0.3),  # answer + PATCH campaign-channel
+    "message": (0.1, 0.0),
+}
+DEFAULT_LATENCY = (0.05, 0.0)
+
+
+def load_updates(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+async def replay(
+    payloads: list[dict], concurrent: bool, rate: float, scale: float, inline_backend: bool = False
+) -> dict:
+    application = SimpleNamespace(bot=None, update_queue=asyncio.Queue())
+    ingestor = UpdateIngestor(application, max_queue_size=len(payloads) + 1)
+    processor = ChatOrderedUpdateProcessor() if concurrent else None
+    arrived: dict[int, float] = {}
+    latencies: list[float] = []
+    handled: dict[object, list[int]] = {}
+
+    async def handler(update):
+        api_wait, backend_call = HANDLER_LATENCY.get(update_type(update), DEFAULT_LATENCY)
+        await asyncio.sleep(api_wait * scale)
+        if backend_call and inline_backend:
+            time.sleep(backend_call * scale)
+        elif backend_call:
+            await asyncio.to_thread(time.sleep, backend_call * scale)
+        latencies.append(time.perf_counter() - arrived[update.update_id])
+        handled.setdefault(ordering_key(update), []).append(update.update_id)
+
+    async def feed():
+        feed_started = time.perf_counter()
+        for index, payload in enumerate(payloads):
+            # плановое время прихода: заблокированный цикл событий не должен занижать задержку
+            planned = feed_started + index / rate if rate else feed_started
+            arrived.setdefault(payload["update_id"], planned)
+            ingestor.submit(payload)
+            if rate:
+                await asyncio.sleep(max(planned + 1 / rate - time.perf_counter(), 0))
+
+    async def consume(expected: int):
+        tasks = []
+        for _ in range(expected):
+            update = await application.update_queue.get()
+            if processor:
+                tasks.append(asyncio.create_task(processor.process_update(update, handler(update))))
+            else:
+                await handler(update)
+        await asyncio.gather(*tasks)
+
+    unique = len({p["update_id"] for p in payloads})
+    started = time.perf_counter()
+    ingestor.start()
+    await asyncio.gather(feed(), consume(unique))
+    await ingestor.stop()
+    elapsed = time.perf_counter() - started
+
+    order_violations = sum(ids != sorted(ids) for key, ids in handled.items() if key is not None)
+    latencies.sort()
+    return {
+        "mode": "chat-ordered" if concurrent else "sequential",
+        "backend": "inline" if inline_backend else "thread",
+        "received": len(payloads),
+        "handled": len(latencies),
+        "duplicates_dropped": len(payloads) - len(latencies),
+        "wall_s": round(elapsed, 3),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 1),
+        "max_ms": round(latencies[-1] * 1000, 1),
+        "order_violations": order_violations,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=Path, default=DEFAULT_UPDATES)
+    parser.add_argument("--rate", type=float, default=50.0, help="arrival rate, updates/s (0 = burst)")
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier for simulated handler latency")
+    parser.add_argument(
+        "--inline-backend", action="store_true", help="run the blocking backend call on the event loop"
+    )
+    args = parser.parse_args()
+
+    payloads = load_updates(args.updates)
+    for concurrent in (False, True):
+        result = asyncio.run(replay(payloads, concurrent, args.rate, args.scale, args.inline_backend))
+        print(json.dumps(result, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
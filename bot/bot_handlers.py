@@ -1,3 +1,5 @@
+import asyncio
+
 from utils import channel_bot_status_handle, _public_message
 from logger import logger
 from parsers import UpdateFromUserParser, CampaignChannelParserIn
@@ -19,7 +21,7 @@ async def admin_start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
         logger.info(f"Preview token received: {token}")
 
         service = MainService()
-        preview_data = service.resolve_preview_token(token)
+        preview_data = await asyncio.to_thread(service.resolve_preview_token, token)
 
         if not preview_data:
             await context.bot.send_message(
@@ -100,7 +102,7 @@ async def admin_start_handler(update: Update, context: ContextTypes.DEFAULT_TYPE
     from_user = UpdateFromUserParser.model_validate(update.message.from_user)
     service = MainService()
     logger.info(f"channel_admin_join: {from_user} is joining")
-    service.channel_admin_join(from_user)
+    await asyncio.to_thread(service.channel_admin_join, from_user)
     welcome_text =("Добро пожаловать в ТЕЛЕВИН — платформу пассивного дохода на рекламе в Telegram!\n"+
     "Website – https://telewin.online/\n"+
     "Канал — https://t.me/telewin_online\n"+
@@ -128,15 +130,15 @@ async def handle_all_messages(update: Update, context: ContextTypes.DEFAULT_TYPE
 
     service: MainService = MainService(parser=CampaignChannelParserIn)
     words = service.parser.parse_tg_message(text)
-    service.unpublished_campaign_channel_by_words(
-        channel_tg_id=channel_tg_id, words=words
+    await asyncio.to_thread(
+        service.unpublished_campaign_channel_by_words, channel_tg_id=channel_tg_id, words=words
     )
     posted_data = await _public_message(context.bot, service.parse())
     if service.has_data():
         for public_message in posted_data:
             logger.info(f"SENDING {posted_data}")
-            service.update_public_messages_info(
-                public_message["campaign_channel_id"], public_message
+            await asyncio.to_thread(
+                service.update_public_messages_info, public_message["campaign_channel_id"], public_message
             )
 
 
@@ -151,7 +153,7 @@ async def campaign_channel_approve_button(
     await query.answer()
     _, campaign_channel_id = query.data.split(":")
     service = MainService()
-    service.campaign_channel_approve(campaign_channel_id)
+    await asyncio.to_thread(service.campaign_channel_approve, campaign_channel_id)
     await query.edit_message_text("Новая рекламная кампания одобрено ✅")
 
 
@@ -162,5 +164,5 @@ async def campaign_channel_decline_button(
     await query.answer()
     _, campaign_channel_id = query.data.split(":")
     service = MainService()
-    service.campaign_channel_decline(campaign_channel_id)
+    await asyncio.to_thread(service.campaign_channel_decline, campaign_channel_id)
     await query.edit_message_text("Новая рекламная кампания отклонено. ❌")
@@ -4,7 +4,9 @@ from datetime import datetime, timezone as dt_timezone
 import uvicorn
 from telegram.constants import ParseMode
 
-from parsers import CampaignChannelParserIn
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from parsers import ApprovalRequestParserIn, ApprovalRequestsParserIn, PublishPayloadParserIn
 from bot_handlers import (
     handle_channel,
     admin_start_handler,
@@ -13,6 +15,7 @@ from bot_handlers import (
     campaign_channel_decline_button,
 )
 from settings import bot_settings
+from update_ingestion import ChatOrderedUpdateProcessor, UpdateIngestor
 from webhooks_utils import CustomContext
 
 from telegram.ext import (
@@ -40,8 +43,18 @@ async def main():
         .token(bot_settings.BOT_TOKEN)
         .updater(None)
         .context_types(context_types)
+        .concurrent_updates(
+            ChatOrderedUpdateProcessor(
+                max_concurrent_handlers=bot_settings.MAX_CONCURRENT_HANDLERS
+            )
+        )
         .build()
     )
+    ingestor = UpdateIngestor(
+        application,
+        max_queue_size=bot_settings.INGEST_QUEUE_SIZE,
+        record_path=bot_settings.UPDATES_RECORD_PATH,
+    )
     await application.bot.set_my_description("""
         👑 Этот бот управляет сообщениями рекламных кампаний для каналов TG. 👑
             /start to add a Channel Admin
@@ -75,27 +88,70 @@ async def main():
     )
 
     async def telegram(request: Request) -> Response:
-        """Handle incoming Telegram updates by putting them into the `update_queue`"""
-        await application.update_queue.put(
-            Update.de_json(data=await request.json(), bot=application.bot)
-        )
+        """Acknowledge the update right away, parsing and handling happen in the background"""
+        try:
+            data = await request.json()
+        except ValueError:
+            return Response(status_code=400)
+        if not ingestor.submit(data):
+            return Response(status_code=503)
         return Response()
 
+    async def metrics(request: Request) -> Response:
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+    async def send_approval_request(approval: ApprovalRequestParserIn) -> None:
+        keyboard = [
+            [
+                InlineKeyboardButton(
+                    "Разрешить 👍",
+                    callback_data=f"@#!approve_campaign_:{approval.id}",
+                ),
+                InlineKeyboardButton(
+                    "Отклонить ⛔",
+                    callback_data=f"@#!decline_campaign_:{approval.id}",
+                ),
+            ]
+        ]
+        await application.bot.send_message(
+            chat_id=approval.tg_id,
+            text=approval.message_text,
+            parse_mode=ParseMode.HTML,
+            reply_markup=InlineKeyboardMarkup(keyboard),
+        )
+
+    async def approval_requests(request: Request) -> Response:
+        """Many approval requests in one call, answers which of them were delivered"""
+        try:
+            batch = ApprovalRequestsParserIn.model_validate(await request.json())
+        except ValueError:
+            return Response(status_code=400)
+        semaphore = asyncio.Semaphore(bot_settings.APPROVAL_SEND_CONCURRENCY)
+
+        async def deliver(approval: ApprovalRequestParserIn) -> bool:
+            async with semaphore:
+                try:
+                    await send_approval_request(approval)
+                    return True
+                except Exception as e:
+                    print(f"BOT:[approval_requests] {approval.id}: {e}")
+                    return False
+
+        delivered = await asyncio.gather(*(deliver(approval) for approval in batch.requests))
+        return JSONResponse(
+            {
+                "sent": [str(a.id) for a, ok in zip(batch.requests, delivered) if ok],
+                "failed": [str(a.id) for a, ok in zip(batch.requests, delivered) if not ok],
+            }
+        )
+
     async def public_campaign_channel(request: Request) -> Response:
         from utils import _public_message
 
-        request = await request.json()
-        campaign_channel: CampaignChannelParserIn = (
-            CampaignChannelParserIn.model_validate(request)
-        )
+        # slim payload (schema) или полный CampaignChannelSerializer от старых отправителей
+        campaign_channel: PublishPayloadParserIn = PublishPayloadParserIn.parse(await request.json())
         # НЕ перезаписываем channel.tg_id - он должен остаться tg_id канала, а не админа!
-
-        # Проверяем требует ли канал ручного подтверждения
-        auto_approve = getattr(campaign_channel.channel, "auto_approve_publications", None)
-        if auto_approve is None:
-            # Обратная совместимость со старым атрибутом
-            auto_approve = not getattr(campaign_channel.channel, "require_manual_approval", True)
-        require_manual_approval = not bool(auto_approve)
+        require_manual_approval = campaign_channel.require_manual_approval
 
         publish_at = campaign_channel.message_publish_date
         if isinstance(publish_at, str):
@@ -113,51 +169,14 @@ async def main():
             if posts_data:
                 service = MainService()
                 for post_data in posts_data:
-                    service.update_public_messages_info(
-                        post_data["campaign_channel_id"], post_data
+                    await asyncio.to_thread(
+                        service.update_public_messages_info, post_data["campaign_channel_id"], post_data
                     )
 
         # Если требуется ручное подтверждение - отправляем уведомление с кнопками
         if require_manual_approval:
-            keyboard = [
-                [
-                    InlineKeyboardButton(
-                        "Разрешить 👍",
-                        callback_data=f"@#!approve_campaign_:{campaign_channel.id}",
-                    ),
-                    InlineKeyboardButton(
-                        "Отклонить ⛔",
-                        callback_data=f"@#!decline_campaign_:{campaign_channel.id}",
-                    ),
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            format_label = (
-                campaign_channel.campaign.format_display or campaign_channel.campaign.format
-            )
-            scheduled_info = (
-                f", Публикация: {campaign_channel.scheduled_publication_at}"
-                if campaign_channel.scheduled_publication_at
-                else ""
-            )
-            slot = campaign_channel.publication_slot or {}
-            slot_info = ""
-            if slot:
-                slot_info = f", Слот: {slot.get('weekday')} {slot.get('start_time')}-{slot.get('end_time')}"
-
-            msg_txt: str = (
-                "Получен запрос на публикацию рекламного сообщения в вашем канале. "
-                f"Рекламодатель: {campaign_channel.campaign.client}, "
-                f"Бренд: {campaign_channel.campaign.brand}, "
-                f"Формат: {format_label}"
-                f"{scheduled_info}, План. CPM {campaign_channel.plan_cpm}{slot_info}"
-            )
-            await application.bot.send_message(
-                chat_id=campaign_channel.channel_admin.tg_id,
-                text=msg_txt,
-                parse_mode=ParseMode.HTML,
-                reply_markup=reply_markup,
-            )
+            if campaign_channel.approval:
+                await send_approval_request(campaign_channel.approval)
         else:
             # Автоматическое размещение - публикуем сразу
             if publish_at:
@@ -192,7 +211,9 @@ async def main():
     starlette_app = Starlette(
         routes=[
             Route("/telegram", telegram, methods=["POST"]),
+            Route("/metrics", metrics, methods=["GET"]),
             Route("/telegram/channeladmin-added", channeladmin_added, methods=["POST"]),
+            Route("/telegram/approval-requests", approval_requests, methods=["POST"]),
             Route(
                 "/telegram/public-campaign-channel",
                 public_campaign_channel,
@@ -213,7 +234,9 @@ async def main():
 
     async with application:
         await application.start()
+        ingestor.start()
         await webserver.serve()
+        await ingestor.stop()
         await application.stop()
 
 
@@ -266,6 +266,147 @@ class CampaignChannelParserIn(BaseModel):
         return ",".join(match)
 
 
+class ApprovalRequestParserIn(BaseModel):
+    """Slim approval request (/telegram/approval-requests), only the fields of the message"""
+
+    id: str | UUID
+    tg_id: int | str
+    client: str = ""
+    brand: str = ""
+    format: str | None = None
+    format_display: str | None = None
+    scheduled_at: str | datetime | None = None
+    plan_cpm: str | Decimal | None = Decimal(0)
+    publication_slot: dict | None = None
+
+    @classmethod
+    def from_campaign_channel(cls, campaign_channel: CampaignChannelParserIn) -> "ApprovalRequestParserIn":
+        return cls(
+            id=campaign_channel.id,
+            tg_id=campaign_channel.channel_admin.tg_id,
+            client=campaign_channel.campaign.client,
+            brand=campaign_channel.campaign.brand,
+            format=campaign_channel.campaign.format,
+            format_display=campaign_channel.campaign.format_display,
+            scheduled_at=campaign_channel.scheduled_publication_at or None,
+            plan_cpm=campaign_channel.plan_cpm,
+            publication_slot=campaign_channel.publication_slot,
+        )
+
+    @property
+    def message_text(self) -> str:
+        scheduled_at = self.scheduled_at
+        if isinstance(scheduled_at, datetime):
+            scheduled_at = scheduled_at.strftime("%Y-%m-%d %H:%M:%S")
+        scheduled_info = f", Публикация: {scheduled_at}" if scheduled_at else ""
+        slot = self.publication_slot or {}
+        slot_info = ""
+        if slot:
+            slot_info = f", Слот: {slot.get('weekday')} {slot.get('start_time')}-{slot.get('end_time')}"
+        return (
+            "Получен запрос на публикацию рекламного сообщения в вашем канале. "
+            f"Рекламодатель: {self.client}, "
+            f"Бренд: {self.brand}, "
+            f"Формат: {self.format_display or self.format}"
+            f"{scheduled_info}, План. CPM {self.plan_cpm}{slot_info}"
+        )
+
+
+class ApprovalRequestsParserIn(BaseModel):
+    requests: list[ApprovalRequestParserIn] = Field(default_factory=list)
+
+
+class PublishMessageParser(BaseModel):
+    """Message part of the publish payload, pre-rendered by Django (Message.as_text)"""
+
+    id: str | UUID
+    version: str = ""
+    text: str = ""
+    image: str | None = None
+    video: str | None = None
+    buttons: list[dict] = Field(default_factory=list)
+    is_external: bool = False
+
+    @property
+    def image_local_path(self) -> Path | str:
+        return BASE_DIR / "media" / self.image if self.image else ""
+
+    @property
+    def video_local_path(self) -> Path | str:
+        return BASE_DIR / "media" / self.video if self.video else ""
+
+    @property
+    def keyboard_buttons(self) -> list[tuple[str, str]]:
+        return [
+            (button.get("text"), button.get("url"))
+            for button in self.buttons
+            if button.get("text") and button.get("url")
+        ]
+
+
+class PublishChannelParser(BaseModel):
+    id: str | UUID
+    tg_id: int | str
+    auto_approve_publications: bool = False
+
+
+class PublishPayloadParserIn(BaseModel):
+    """
+    Slim publish payload (core.publish_payload.PublishPayloadService on the Django side)
+
+    The full CampaignChannelSerializer payload is still accepted and converted.
+    """
+
+    schema_version: int = Field(default=1, validation_alias="schema")
+    id: str | UUID
+    campaign_id: str | UUID | None = None
+    channel: PublishChannelParser
+    message_publish_date: str | datetime | None = None
+    is_approved: bool = False
+    path_click_analysis: str | None = ""
+    message: PublishMessageParser
+    approval: ApprovalRequestParserIn | None = None
+
+    @classmethod
+    def parse(cls, data: dict) -> "PublishPayloadParserIn":
+        if "schema" in data:
+            return cls.model_validate(data)
+        return cls.from_campaign_channel(CampaignChannelParserIn.model_validate(data))
+
+    @classmethod
+    def from_campaign_channel(cls, campaign_channel: CampaignChannelParserIn) -> "PublishPayloadParserIn":
+        message = campaign_channel.campaign.message
+        buttons = []
+        if message:
+            links = message.buttons or ([message.button] if message.button else [])
+            buttons = [{"text": link.title, "url": link.url} for link in links]
+        return cls(
+            schema=0,
+            id=campaign_channel.id,
+            campaign_id=campaign_channel.campaign.id,
+            channel=PublishChannelParser(
+                id=campaign_channel.channel.id,
+                tg_id=campaign_channel.channel.tg_id,
+            ),
+            message_publish_date=campaign_channel.message_publish_date,
+            is_approved=campaign_channel.is_approved,
+            path_click_analysis=campaign_channel.path_click_analysis,
+            message=PublishMessageParser(
+                id=message.id,
+                text=message.as_text,
+                image=message.image or None,
+                video=message.video or None,
+                buttons=buttons,
+                is_external=message.is_external,
+            ),
+            approval=ApprovalRequestParserIn.from_campaign_channel(campaign_channel),
+        )
+
+    @property
+    def require_manual_approval(self) -> bool:
+        return not self.channel.auto_approve_publications and not self.is_approved
+
+
 class UpdateFromUserParser(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     first_name: str = ""
@@ -1,7 +1,27 @@
-from httpx import Client
+from httpx import URL, Client
 
 url_base = "http://web-app:8000"
 
+# CHANGE: Request only the fields CampaignChannelParserIn reads (?fields= / ?expand=)
+# WHY: full campaign-channel rows carry channel balances, legal entity and slots
+CAMPAIGN_CHANNEL_FIELDS = ",".join(
+    [
+        "id", "created_at", "impressions_plan", "impressions_fact", "cpm", "plan_cpm",
+        "path_click_analysis", "channel_post_id", "message_publish_date",
+        "is_message_published", "is_approved", "publication_slot",
+        "channel.id", "channel.name", "channel.tg_id", "channel.is_bot_installed",
+        "channel.is_deleted", "channel.status", "channel.cpm", "channel.supported_formats",
+        "campaign.id", "campaign.name", "campaign.budget", "campaign.start_date",
+        "campaign.finish_date", "campaign.message", "campaign.black_list",
+        "campaign.white_list", "campaign.client", "campaign.brand", "campaign.format",
+        "campaign.format_display", "campaign.slot_publication_at",
+        "channel_admin.id", "channel_admin.username", "channel_admin.first_name",
+        "channel_admin.last_name", "channel_admin.phone_number", "channel_admin.tg_id",
+        "channel_admin.is_bot_installed",
+    ]
+)
+CAMPAIGN_CHANNEL_EXPAND = "publication_slot,campaign.message"
+
 
 class MainService:
     def __init__(self, parser=None):
@@ -26,6 +46,7 @@ class MainService:
             "preview_resolve": "/api/message/preview/resolve/",
         }
         self._response_raw = []
+        self._rows = []
 
     def campaign_channel_approve(self, campaign_channel_id):
         url = self.urls["campaign_channel_approve"].format(
@@ -52,10 +73,31 @@ class MainService:
             url, json=dict(status="rejected", is_bot_installed=False)
         )
 
+    @property
+    def campaign_channel_params(self):
+        return dict(fields=CAMPAIGN_CHANNEL_FIELDS, expand=CAMPAIGN_CHANNEL_EXPAND)
+
+    def _get_all_pages(self, url):
+        """
+        CHANGE: Follow the cursor of paginated list APIs ({"next", "results"})
+        WHY: list endpoints return pages instead of the whole table
+        """
+        self._rows = []
+        params = self.campaign_channel_params
+        while True:
+            self._response_raw = self.client.get(url, params=params)
+            if self._response_raw.status_code != 200:
+                return self._response_raw
+            page = self._response_raw.json()
+            self._rows.extend(page["results"])
+            if not page["next"]:
+                return self._response_raw
+            # ссылка абсолютная с Host: localhost — берём из неё только курсор
+            params = {**params, **dict(URL(page["next"]).params)}
+
     def get_channel_unpublished_messages(self, channel_tg_id):
         url = self.urls["unpublished_messages"].format(channel_tg_id=channel_tg_id)
-        self._response_raw = self.client.get(url)
-        return self._response_raw
+        return self._get_all_pages(url)
 
     def update_public_message_info(self, _id, data):
         url = self.urls["message_id"].format(id=_id)
@@ -70,7 +112,7 @@ class MainService:
     def parse(self):
         data = []
         try:
-            for row in self._response_raw.json():
+            for row in self._rows:
                 data.append(self.parser.model_validate(row))
         except Exception as e:
             print(f"{self._response_raw=}")
@@ -81,22 +123,24 @@ class MainService:
         # return [self.parser.model_validate(row) for row in self._response_raw.json()]
 
     def has_data(self):
-        return self._response_raw is not None and len(self._response_raw.json()) > 0
+        return len(self._rows) > 0
 
     def get_campaign_channel_by_words(self, channel_tg_id, words: str):
         words = ",".join(words.lower().split(" "))
         url = self.urls["campaign_channels_words"].format(
             channel_tg_id=channel_tg_id, words=words
         )
-        self._response_raw = self.client.get(url)
-        return self._response_raw
+        return self._get_all_pages(url)
 
     def unpublished_campaign_channel_by_words(self, channel_tg_id, words: str):
         data = dict(
             words=words, channel_tg_id=channel_tg_id, publish_status="confirmed"
         )
         url = self.urls["unpublished_campaign_channel_by_words"]
-        self._response_raw = self.client.post(url, json=data)
+        self._rows = []
+        self._response_raw = self.client.post(url, json=data, params=self.campaign_channel_params)
+        if self._response_raw.status_code == 200:
+            self._rows = self._response_raw.json()
         return self._response_raw
 
     def resolve_preview_token(self, token: str):
@@ -11,6 +11,12 @@ class BotSettings(BaseSettings):
     PORT: int = 8001
     BOT_USERNAME: str = ""
     BOT_NAME: str = ""
+    # webhook ingestion (update_ingestion.py)
+    MAX_CONCURRENT_HANDLERS: int = 16
+    INGEST_QUEUE_SIZE: int = 1000
+    UPDATES_RECORD_PATH: str = ""  # jsonl of raw updates for benchmarks/replay_updates.py
+    # /telegram/approval-requests: parallel send_message calls (Bot API limit ~30 msg/s)
+    APPROVAL_SEND_CONCURRENCY: int = 10
 
 
 bot_settings = BotSettings()
@@ -4,8 +4,11 @@ import pytest
 import datetime
 
 from parsers import (
+    ApprovalRequestParserIn,
+    ApprovalRequestsParserIn,
     CampaignChannelParserIn,
     ChannelParser,
+    PublishPayloadParserIn,
     MessageLink,
     MessageParser,
     CampaignParser,
@@ -362,3 +365,78 @@ def test_validate_campaign_channel_success(data):
     assert parser.cpm == data["cpm"]
     assert parser.path_click_analysis == data["path_click_analysis"]
     assert parser.scheduled_publication_at == data["campaign"]["slot_publication_at"]
+
+
+def test_slim_approval_request_matches_full_payload(campaignchannel_data, channeladmin_data):
+    slot = {"weekday": 1, "start_time": "10:00", "end_time": "11:00"}
+    full = CampaignChannelParserIn.model_validate(
+        dict(
+            id=uuid4(),
+            campaign=dict(
+                campaignchannel_data,
+                format="fixed_slot",
+                format_display="Фикс-слот",
+                slot_publication_at="2024-01-02 10:00:00",
+            ),
+            channel=dict(id=uuid4(), name="fake channel", tg_id="12163561"),
+            channel_admin=channeladmin_data,
+            plan_cpm="150",
+            publication_slot=slot,
+        )
+    )
+    slim = ApprovalRequestsParserIn.model_validate(
+        {
+            "requests": [
+                dict(
+                    id=str(full.id),
+                    tg_id=channeladmin_data["tg_id"],
+                    client=campaignchannel_data["client"],
+                    brand=campaignchannel_data["brand"],
+                    format="fixed_slot",
+                    format_display="Фикс-слот",
+                    scheduled_at="2024-01-02 10:00:00",
+                    plan_cpm="150",
+                    publication_slot=slot,
+                )
+            ]
+        }
+    ).requests[0]
+
+    from_full = ApprovalRequestParserIn.from_campaign_channel(full)
+    assert slim.message_text == from_full.message_text
+    assert slim.tg_id == from_full.tg_id
+    assert "Публикация: 2024-01-02 10:00:00" in slim.message_text
+    assert "Слот: 1 10:00-11:00" in slim.message_text
+
+
+def test_publish_payload_accepts_slim_and_full_payloads(campaignchannel_data, channeladmin_data):
+    slim = PublishPayloadParserIn.parse(
+        dict(
+            schema=1,
+            id=str(uuid4()),
+            channel=dict(id=str(uuid4()), tg_id=-100123, auto_approve_publications=True),
+            message=dict(
+                id=str(uuid4()),
+                text="<b>title</b>",
+                image="messages/1/a.png",
+                buttons=[{"text": "Go", "url": "https://go"}, {"text": "", "url": "https://skip"}],
+            ),
+        )
+    )
+    assert slim.schema_version == 1
+    assert not slim.require_manual_approval
+    assert slim.message.keyboard_buttons == [("Go", "https://go")]
+    assert str(slim.message.image_local_path).endswith("media/messages/1/a.png")
+
+    full = PublishPayloadParserIn.parse(
+        dict(
+            id=str(uuid4()),
+            campaign=campaignchannel_data,
+            channel=dict(id=str(uuid4()), name="fake channel", tg_id="12163561"),
+            channel_admin=channeladmin_data,
+        )
+    )
+    assert full.schema_version == 0
+    assert full.require_manual_approval
+    assert full.message.text == campaignchannel_data["message"]["as_text"]
+    assert full.approval.tg_id == channeladmin_data["tg_id"]
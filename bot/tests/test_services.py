@@ -10,3 +10,27 @@ def test_get_campaign_channels_success():
     # mocked_response_func.assert_called_once()
     parsed_response = service.parse()
     print(f"{parsed_response=}")
+
+
+def test_list_pages_are_followed_with_sparse_fields():
+    import httpx
+
+    requests = []
+
+    def handler(request):
+        requests.append(request.url)
+        if "cursor" not in request.url.params:
+            nxt = "http://localhost/api/campaign-channel/?channel_tg_id=1&cursor=abc"
+            return httpx.Response(200, json={"next": nxt, "results": [{"id": "1"}]})
+        return httpx.Response(200, json={"next": None, "results": [{"id": "2"}]})
+
+    service = MainService()
+    service.client = httpx.Client(base_url="http://web-app:8000", transport=httpx.MockTransport(handler))
+
+    service.get_channel_unpublished_messages(channel_tg_id=1)
+
+    assert [row["id"] for row in service._rows] == ["1", "2"]
+    assert service.has_data()
+    assert [url.host for url in requests] == ["web-app", "web-app"]
+    assert requests[1].params["cursor"] == "abc"
+    assert all(url.params["expand"] == "publication_slot,campaign.message" for url in requests)
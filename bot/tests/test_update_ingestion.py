@@ -0,0 +1,128 @@
+"""
+Tests for webhook ingestion: update_id dedup, per-chat ordering, backpressure.
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from telegram import Update
+
+from bot_handlers import campaign_channel_approve_button
+from update_ingestion import (
+    ChatOrderedUpdateProcessor,
+    UpdateDeduplicator,
+    UpdateIngestor,
+    ordering_key,
+)
+
+
+def make_update(update_id: int, chat_id: int) -> Update:
+    return Update.de_json(
+        {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id,
+                "date": 1735689600,
+                "chat": {"id": chat_id, "type": "private"},
+                "from": {"id": chat_id, "is_bot": False, "first_name": "Test"},
+                "text": f"msg {update_id}",
+            },
+        },
+        bot=None,
+    )
+
+
+def make_application():
+    application = MagicMock()
+    application.bot = None
+    application.update_queue = asyncio.Queue()
+    return application
+
+
+def test_deduplicator_expires_old_ids():
+    dedup = UpdateDeduplicator(max_size=2)
+    for update_id in (1, 2, 3):
+        dedup.add(update_id)
+    assert not dedup.seen(1)
+    assert dedup.seen(2) and dedup.seen(3)
+
+
+@pytest.mark.asyncio
+async def test_ingestor_drops_retried_updates():
+    application = make_application()
+    ingestor = UpdateIngestor(application)
+    ingestor.start()
+
+    payload = make_update(10, chat_id=1).to_dict()
+    assert ingestor.submit(payload)
+    assert ingestor.submit(payload)  # повторная доставка Telegram
+    await ingestor.stop()
+
+    assert application.update_queue.qsize() == 1
+    update = application.update_queue.get_nowait()
+    assert update.update_id == 10
+    assert ordering_key(update) == 1
+
+
+@pytest.mark.asyncio
+async def test_ingestor_rejects_when_full_and_accepts_retry():
+    ingestor = UpdateIngestor(make_application(), max_queue_size=1)
+    assert ingestor.submit(make_update(1, chat_id=1).to_dict())
+    assert not ingestor.submit(make_update(2, chat_id=1).to_dict())
+
+    ingestor.queue.get_nowait()
+    assert ingestor.submit(make_update(2, chat_id=1).to_dict())
+
+
+@pytest.mark.asyncio
+async def test_processor_keeps_chat_order_and_runs_chats_concurrently():
+    processor = ChatOrderedUpdateProcessor(max_concurrent_handlers=8)
+    handled = []
+
+    async def handler(update: Update, delay: float):
+        await asyncio.sleep(delay)
+        handled.append((update.effective_chat.id, update.update_id))
+
+    updates = [
+        (make_update(1, chat_id=100), 0.05),  # медленный хендлер первого чата
+        (make_update(2, chat_id=200), 0),
+        (make_update(3, chat_id=100), 0),
+        (make_update(4, chat_id=200), 0),
+    ]
+    async with processor:
+        await asyncio.gather(
+            *(processor.process_update(update, handler(update, delay)) for update, delay in updates)
+        )
+
+    assert [u for chat, u in handled if chat == 100] == [1, 3]
+    assert [u for chat, u in handled if chat == 200] == [2, 4]
+    # второй чат не ждёт медленный апдейт первого
+    assert handled.index((200, 4)) < handled.index((100, 1))
+    assert not processor._chat_locks
+
+
+@pytest.mark.asyncio
+async def test_backend_call_does_not_block_other_chats():
+    def slow_patch(campaign_channel_id):
+        time.sleep(0.2)  # синхронный httpx-запрос в backend
+
+    update = MagicMock()
+    update.callback_query.answer = AsyncMock()
+    update.callback_query.edit_message_text = AsyncMock()
+    update.callback_query.data = "@#!approve_campaign_:42"
+    ticks = []
+
+    async def other_chat():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    with patch("bot_handlers.MainService") as service:
+        service.return_value.campaign_channel_approve.side_effect = slow_patch
+        started = time.perf_counter()
+        await asyncio.gather(campaign_channel_approve_button(update, MagicMock()), other_chat())
+
+    service.return_value.campaign_channel_approve.assert_called_once_with("42")
+    # другой чат отработал, пока хендлер ждал backend
+    assert ticks[-1] - started < 0.15
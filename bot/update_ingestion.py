@@ -0,0 +1,234 @@
+"""
+CHANGE: Webhook ingestion layer for Telegram updates
+WHY: /telegram parsed every update inside the request and the application processed
+     updates one by one, so a slow handler (channel_handle_add: several Bot API calls
+     plus a backend POST) stalled every other chat
+
+- UpdateIngestor: вебхук только кладёт сырой JSON в ограниченную очередь и сразу
+  отвечает Telegram; повторные доставки отсекаются по update_id.
+- ChatOrderedUpdateProcessor: апдейты разных чатов обрабатываются параллельно,
+  апдейты одного чата — строго по порядку поступления.
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from logger import logger
+
+
+updates_received_total = Counter(
+    "bot_updates_received_total",
+    "Telegram updates received by the webhook",
+    ["result"],  # accepted, duplicate, rejected, invalid
+)
+
+update_queue_depth = Gauge(
+    "bot_update_queue_depth",
+    "Updates waiting to be processed",
+    ["queue"],  # ingest, application
+)
+
+updates_in_progress = Gauge(
+    "bot_updates_in_progress",
+    "Updates currently being handled",
+)
+
+update_handler_duration_seconds = Histogram(
+    "bot_update_handler_duration_seconds",
+    "Time spent handling one update",
+    ["update_type"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+update_wait_seconds = Histogram(
+    "bot_update_wait_seconds",
+    "Time an update waited for its chat turn and a free worker slot",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+def update_type(update: object) -> str:
+    if isinstance(update, Update):
+        for name in Update.ALL_TYPES:
+            if getattr(update, name, None) is not None:
+                return name
+    return type(update).__name__
+
+
+def ordering_key(update: object) -> Optional[int]:
+    """Updates sharing a key are handled sequentially; None means no ordering constraint"""
+    if not isinstance(update, Update):
+        return None
+    if update.effective_chat:
+        return update.effective_chat.id
+    if update.effective_user:
+        return update.effective_user.id
+    return None
+
+
+class UpdateDeduplicator:
+    """Remembers recently seen update_id values (Telegram re-sends on timeouts/5xx)"""
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._seen: OrderedDict[int, float] = OrderedDict()
+
+    def _evict(self, now: float) -> None:
+        while self._seen and (
+            len(self._seen) > self.max_size or next(iter(self._seen.values())) < now - self.ttl
+        ):
+            self._seen.popitem(last=False)
+
+    def seen(self, update_id: int) -> bool:
+        now = time.monotonic()
+        self._evict(now)
+        return update_id in self._seen
+
+    def add(self, update_id: int) -> None:
+        now = time.monotonic()
+        self._seen[update_id] = now
+        self._seen.move_to_end(update_id)
+        self._evict(now)
+
+    def forget(self, update_id: int) -> None:
+        self._seen.pop(update_id, None)
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Concurrent update processing with per-chat ordering
+
+    max_concurrent_updates bounds the updates accepted from the application queue
+    (including those waiting for their chat's turn); max_concurrent_handlers bounds
+    the handlers actually running, so one busy chat cannot take every worker slot.
+    """
+
+    def __init__(self, max_concurrent_updates: int = 256, max_concurrent_handlers: int = 16):
+        super().__init__(max_concurrent_updates)
+        self.max_concurrent_handlers = max_concurrent_handlers
+        self._handlers = asyncio.Semaphore(max_concurrent_handlers)
+        self._chat_locks: dict[int, asyncio.Lock] = {}
+        self._chat_waiters: dict[int, int] = {}
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        key = ordering_key(update)
+        queued_at = time.perf_counter()
+        if key is None:
+            async with self._handlers:
+                await self._run(update, coroutine, queued_at)
+            return
+
+        lock = self._chat_locks.setdefault(key, asyncio.Lock())
+        self._chat_waiters[key] = self._chat_waiters.get(key, 0) + 1
+        try:
+            async with lock, self._handlers:
+                await self._run(update, coroutine, queued_at)
+        finally:
+            self._chat_waiters[key] -= 1
+            if not self._chat_waiters[key]:
+                del self._chat_waiters[key]
+                del self._chat_locks[key]
+
+    async def _run(self, update: object, coroutine: Awaitable[Any], queued_at: float) -> None:
+        started = time.perf_counter()
+        update_wait_seconds.observe(started - queued_at)
+        updates_in_progress.inc()
+        try:
+            await coroutine
+        finally:
+            updates_in_progress.dec()
+            update_handler_duration_seconds.labels(update_type=update_type(update)).observe(
+                time.perf_counter() - started
+            )
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+class UpdateIngestor:
+    """
+    Accepts raw webhook payloads and feeds parsed updates to the application
+
+    submit() is called from the webhook handler and never waits on processing;
+    a full queue is reported to Telegram as 503 so that it retries later.
+    """
+
+    def __init__(
+        self,
+        application,
+        max_queue_size: int = 1000,
+        deduplicator: Optional[UpdateDeduplicator] = None,
+        record_path: str = "",
+    ):
+        self.application = application
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.deduplicator = deduplicator or UpdateDeduplicator()
+        self.record_path = record_path
+        self._worker: Optional[asyncio.Task] = None
+        update_queue_depth.labels(queue="ingest").set_function(self.queue.qsize)
+        update_queue_depth.labels(queue="application").set_function(
+            lambda: application.update_queue.qsize()
+        )
+
+    def submit(self, data: dict) -> bool:
+        """Returns False only when the update must be re-sent by Telegram"""
+        update_id = data.get("update_id") if isinstance(data, dict) else None
+        if update_id is None:
+            updates_received_total.labels(result="invalid").inc()
+            return True
+        if self.deduplicator.seen(update_id):
+            updates_received_total.labels(result="duplicate").inc()
+            return True
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            updates_received_total.labels(result="rejected").inc()
+            logger.warning(f"Ingest queue is full, update {update_id} rejected")
+            return False
+        self.deduplicator.add(update_id)
+        updates_received_total.labels(result="accepted").inc()
+        return True
+
+    def _record(self, data: dict) -> None:
+        with open(self.record_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+    async def run(self) -> None:
+        while True:
+            data = await self.queue.get()
+            try:
+                if self.record_path:
+                    self._record(data)
+                await self.application.update_queue.put(
+                    Update.de_json(data=data, bot=self.application.bot)
+                )
+            except Exception as e:
+                logger.error(f"Failed to ingest update {data.get('update_id')}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """Drain accepted updates, then stop the worker"""
+        if self._worker is None:
+            return
+        await self.queue.join()
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
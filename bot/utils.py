@@ -1,15 +1,17 @@
+import asyncio
+
 from telegram.error import TimedOut
 
 from helpers import _publish_messages_logic
 from services import MainService
-from parsers import CampaignChannelParserIn
+from parsers import CampaignChannelParserIn, PublishPayloadParserIn
 
 from telegram import Update
 from telegram.ext import ContextTypes
 from logger import logger
 
 
-async def _public_message(bot, campaign_channels: list[CampaignChannelParserIn]):
+async def _public_message(bot, campaign_channels: list[CampaignChannelParserIn | PublishPayloadParserIn]):
     posts_data = []
     kwargs = {}
     timedout_messages = []
@@ -18,6 +20,8 @@ async def _public_message(bot, campaign_channels: list[CampaignChannelParserIn])
         try:
             if not campaign_channel:
                 continue
+            if isinstance(campaign_channel, CampaignChannelParserIn):
+                campaign_channel = PublishPayloadParserIn.from_campaign_channel(campaign_channel)
             await _publish_messages_logic(bot, campaign_channel, kwargs, posts_data)
         except TimedOut:
             logger.error(f"PUBLISH ERROR: Timeout for {campaign_channel}")
@@ -32,20 +36,20 @@ async def channel_handle_kicked(update: Update, context):
     chat_name = update.my_chat_member.chat.title
     print(f"Bot kicked from {chat_name}")
     service = MainService()
-    service.bot_kicked(chat_id=update.my_chat_member.chat.id)
+    await asyncio.to_thread(service.bot_kicked, chat_id=update.my_chat_member.chat.id)
 
 
 async def publish_channel_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     update_dict = update.to_dict()
     chat_id = update_dict["my_chat_member"]["chat"]["id"]
     service: MainService = MainService(parser=CampaignChannelParserIn)
-    service.unpublished_campaign_channel_by_words(channel_tg_id=chat_id, words="-----")
+    await asyncio.to_thread(service.unpublished_campaign_channel_by_words, channel_tg_id=chat_id, words="-----")
     posted_data = await _public_message(context.bot, service.parse())
     if service.has_data():
         for public_message in posted_data:
             logger.info(f"SENDING {posted_data}")
-            service.update_public_messages_info(
-                public_message["campaign_channel_id"], public_message
+            await asyncio.to_thread(
+                service.update_public_messages_info, public_message["campaign_channel_id"], public_message
             )
 
 
@@ -89,7 +93,8 @@ async def channel_handle_add(update: Update, context: ContextTypes.DEFAULT_TYPE)
     logger.info(f"BOT ADDED TO CHANNEL: {chat_name} (tg_id={chat_id})")
     logger.info(f"Sending channel data to backend: {data}")
     service = MainService()
-    response = service.added_to_channel(data)
+    # синхронный httpx в потоке: POST в backend не блокирует обработку других чатов
+    response = await asyncio.to_thread(service.added_to_channel, data)
     logger.info(f"Backend response status: {response.status_code}")
     if response.status_code >= 400:
         logger.error(f"Backend error response: {response.text}")
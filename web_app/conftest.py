@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _strict_query_budget(settings):
+    # views exceeding their declared query_budget fail the test (core.request_profiler)
+    settings.QUERY_BUDGET_STRICT = True
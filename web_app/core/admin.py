@@ -12,9 +12,11 @@ from django.contrib import admin, messages
 from django.contrib.auth import login, logout
 from django.contrib.auth.admin import UserAdmin
 from django.core.exceptions import ValidationError
-from django.db.models import Sum, QuerySet, Q
+from django.contrib.admin.views.main import ORDER_VAR, SEARCH_VAR
+from django.db.models import F, Sum, QuerySet, Q
 from django.forms import Select
 from django.http import JsonResponse, FileResponse, HttpResponseRedirect, HttpResponse
+from django.template.response import TemplateResponse
 from django.urls import path, reverse
 from django.utils.safestring import mark_safe
 from django.utils.html import format_html
@@ -23,15 +25,19 @@ from web_app.logger import logger
 from core.ledger_service import DoubleEntryLedgerService as BalanceService, ChannelBalance
 from .admin_forms import (
     CampaignAdminForm,
+    CampaignAssignmentForm,
     ChannelAdminForm,
     ChannelForm,
     MessageModelForm, CampaignChannelInlinedForm, ChannelPublicationSlotInlineForm, ChannelPublicationSlotInlineFormset,
 )
+from .admin_scope import AdminScope, AdminScopeService
 from .admin_utils import (
     CustomDateFieldListFilter,
     can_change_channel_status, CustomChoiceFilter, CustomBooleanFilter, CustomAllValuesFieldListFilter,
     CustomRelatedFilterListFilter,
 )
+from .channel_search import SEARCH_FIELDS, ChannelSearch
+from .db_routing import reporting_reads
 from .exporter import QuerySetExporter
 from .external_clients import TGStatClient
 from .models import (
@@ -54,7 +60,6 @@ from .models import (
 from django.contrib.admin import register, ModelAdmin
 
 from .utils import budget_cpm_from_qs,  bulk_notify_channeladmin
-from .services import BalanceService, ChannelBalance
 
 
 class ChannelAdminInlinedForm(forms.ModelForm):
@@ -209,7 +214,10 @@ class ChannelModelAdmin(admin.ModelAdmin):
         "err_24",
     ]
     inlines = [ChannelAdminInlined, ChannelPublicationSlotInline, ChannelTransactionInline]
+    actions = ["assign_to_campaign"]
     ordering = ["-created_at"]
+    # поиск и ранжирование — core.channel_search (get_search_results)
+    search_fields = list(SEARCH_FIELDS)
     list_filter = [
         ("name",CustomAllValuesFieldListFilter),
         ("status", CustomChoiceFilter),
@@ -470,6 +478,59 @@ class ChannelModelAdmin(admin.ModelAdmin):
         self._remove_changelist_delete_obj(response)
         return response
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        # result_list кэширует выбранные строки, шаблон получит те же инстансы с балансом
+        BalanceService.prefetch_balances(changelist.result_list)
+        return changelist
+
+    @admin.action(description="Добавить в кампанию")
+    def assign_to_campaign(self, request, queryset):
+        """
+        CHANGE: Bulk assignment of selected channels to a campaign
+        WHY: Adding hundreds of channels through CampaignChannelInlined validated and saved them one by one
+        """
+        from django.utils import timezone
+
+        from core.campaign_assignment import CampaignAssignmentService
+
+        form = CampaignAssignmentForm(request.POST if "apply" in request.POST else None)
+        if not form.is_valid():
+            return TemplateResponse(
+                request,
+                "admin/core/channel/assign_to_campaign.html",
+                {
+                    **self.admin_site.each_context(request),
+                    "title": "Добавить каналы в кампанию",
+                    "opts": self.model._meta,
+                    "form": form,
+                    "channels": queryset,
+                    "action_checkbox_name": admin.helpers.ACTION_CHECKBOX_NAME,
+                },
+            )
+
+        result = CampaignAssignmentService.assign(
+            form.cleaned_data["campaign"],
+            queryset.values_list("id", flat=True),
+            cpm=form.cleaned_data.get("cpm") or 0,
+            plan_cpm=form.cleaned_data.get("plan_cpm") or 0,
+            impressions_plan=form.cleaned_data.get("impressions_plan") or 0,
+        )
+        if result.created:
+            messages.success(
+                request,
+                f"Добавлено каналов: {len(result.created)}, запросов на подтверждение: {result.notified}.",
+            )
+        names = {str(pk): name for pk, name in queryset.values_list("id", "name")}
+        for channel_id, reason in list(result.rejected.items())[:20]:
+            alternatives = result.alternatives.get(channel_id) or []
+            hint = ", ".join(timezone.localtime(w).strftime("%d.%m.%Y %H:%M") for w in alternatives)
+            name = names.get(channel_id, channel_id)
+            messages.warning(request, f"{name}: {reason}" + (f" Доступные окна: {hint}" if hint else ""))
+        if len(result.rejected) > 20:
+            messages.warning(request, f"... и ещё {len(result.rejected) - 20} отклонённых каналов")
+        return None
+
     def get_queryset(self, request):
         qs = super().get_queryset(request)
         user = request.user
@@ -486,6 +547,15 @@ class ChannelModelAdmin(admin.ModelAdmin):
             return [*filters, ("is_deleted", CustomBooleanFilter)]
         return filters
 
+    def get_search_results(self, request, queryset, search_term):
+        return ChannelSearch.search(queryset, search_term), False
+
+    def get_ordering(self, request):
+        # по релевантности, пока не выбрана сортировка по колонке
+        if request.GET.get(SEARCH_VAR, "").strip() and ORDER_VAR not in request.GET:
+            return [F(ChannelSearch.RANK).desc(), "name"]
+        return super().get_ordering(request)
+
     def has_add_permission(self, request):
         return False
 
@@ -761,6 +831,8 @@ class CampaignAdmin(admin.ModelAdmin):
         "total_planed_views",
         "avg_cpm",
         "link_to_statistics",
+        "spent_amount",
+        "budget_pacing",
     ]
     list_display = [
         "client",
@@ -812,6 +884,7 @@ class CampaignAdmin(admin.ModelAdmin):
                 ),
             },
         ),
+        ("Расход бюджета", {"classes": ["wide"], "fields": ("spent_amount", "budget_pacing")}),
         ("Креатив", {"classes": ["wide"], "fields": ("message",)}),
     )
     list_display_links = ['name_str']
@@ -883,6 +956,24 @@ class CampaignAdmin(admin.ModelAdmin):
     def avg_cpm(self, obj: Campaign):
         return obj.avg_cpm()
 
+    @admin.display(description="Прогноз исчерпания бюджета")
+    def budget_pacing(self, obj: Campaign) -> str:
+        from core.budget_service import CampaignBudgetService
+
+        if not obj.pk:
+            return "-"
+        forecast = CampaignBudgetService.forecast(obj)
+        if not forecast.exhaustion_date:
+            return "Нет расхода — прогноз недоступен"
+        date_str = forecast.exhaustion_date.strftime("%d.%m.%Y")
+        if forecast.remaining <= 0:
+            return f"Бюджет исчерпан (израсходовано {forecast.spent} руб.)"
+        hint = "до окончания кампании" if forecast.exhausts_before_finish else "после окончания кампании"
+        return (
+            f"{date_str} ({hint}); средний расход {forecast.daily_spend} руб./день,"
+            f" остаток {forecast.remaining} руб."
+        )
+
     def _remove_changelist_delete_obj(self, actions_dict):
         del actions_dict["delete_selected"]
 
@@ -1301,39 +1392,28 @@ class CampaignChannelAdmin(admin.ModelAdmin):
 
     def get_queryset(self, request):
         qs = super().get_queryset(request)
-        user = request.user
-        channel_admin = ChannelAdmin.objects.filter(user=user).first()
-        if channel_admin and user.groups.filter(name__in=["owner", "owners"]).exists() or user.is_owner:
-            return self._get_owner_qs(request, qs=qs, channel_admin=channel_admin)
+        scope = AdminScopeService.get(request)
+        if scope.is_owner_scoped:
+            return self._get_owner_qs(request, qs=qs, scope=scope)
         return qs
 
     def get_changelist_instance(self, request):
         res = super().get_changelist_instance(request)
-        res.show_text = getattr(self, 'show_text', False)
-        res.show_card = getattr(self, 'show_card', False)
+        scope = AdminScopeService.get(request)
+        res.show_text = scope.show_text
+        res.show_card = scope.show_card
         return res
 
     def _get_owner_qs(self,  request, *args, **kwargs):
         qs: QuerySet[CampaignChannel]  = kwargs.get('qs', super().get_queryset(request))
-        channel_admin = kwargs['channel_admin']
-
-        channels = ChannelAdmin.objects.channels_by_status(channel_admin.id, Channel.ChannelStatus.CONFIRMED)
-        if not channels.exists():
-            self.show_card = True
-            self.show_text = False
-            return qs.none()
-
-        if not CampaignChannel.objects.admin_channel_status_qs(channel_admin.id, Channel.ChannelStatus.CONFIRMED).exists():
-            self.show_card = False
-            self.show_text = True
+        scope: AdminScope = kwargs['scope']
+        if scope.show_card or scope.show_text:
             return qs.none()
-
-        return qs.filter(channel_admin=channel_admin, channel__in=channels.all())
+        return qs.filter(channel_admin_id=scope.channel_admin_id, channel_id__in=scope.confirmed_channel_ids)
 
     def get_list_display(self, request):
         response = super().get_list_display(request).copy()
-        user = request.user
-        if user.groups.filter(name__in=["owner", "owners"]):
+        if AdminScopeService.get(request).in_owner_group:
             fields = [
                 'campaign_client',
                 'campaign_brand',
@@ -1353,8 +1433,7 @@ class CampaignChannelAdmin(admin.ModelAdmin):
 
     def get_list_filter(self, request):
         response = super().get_list_filter(request).copy()
-        user = request.user
-        if user.groups.filter(name__in=["owners", "owner"]) and 'campaign' in response:
+        if AdminScopeService.get(request).in_owner_group and 'campaign' in response:
             response.remove("campaign")  # remove first col
             return response
         return response
@@ -1448,6 +1527,19 @@ class LegalEntityChannelInline(admin.TabularInline):
         qs = super().get_queryset(request)
         return qs.select_related("legal_entity")
 
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+
+        class BalancePrefetchFormSet(formset):
+            def get_queryset(self):
+                qs = super().get_queryset()
+                if not getattr(self, "_balances_prefetched", False):
+                    BalanceService.prefetch_balances(qs)
+                    self._balances_prefetched = True
+                return qs
+
+        return BalancePrefetchFormSet
+
     @staticmethod
     def _format_money(value: Decimal) -> str:
         return f"{value.quantize(Decimal('0.01'))} ₽"
@@ -1456,6 +1548,9 @@ class LegalEntityChannelInline(admin.TabularInline):
         cached = getattr(instance, "_balance_cache", None)
         if cached:
             return cached
+        if instance._state.adding:
+            # empty_form формсета: несохранённый канал
+            return ChannelBalance(Decimal("0"), Decimal("0"), Decimal("0"))
 
         balance = BalanceService.calculate_balance(instance)
         setattr(instance, "_balance_cache", balance)
@@ -1608,14 +1703,23 @@ class LegalEntityAdmin(admin.ModelAdmin):
     def channels_count(self, obj: LegalEntity):
         return obj.channels.filter(is_deleted=False).count()
 
+    def get_changelist_instance(self, request):
+        changelist = super().get_changelist_instance(request)
+        # остаётся на primary: промахи пишутся в общий кэш балансов (BalanceService.prefetch_balances)
+        BalanceService.prefetch_legal_entity_balances(changelist.result_list)
+        return changelist
+
     def _calc_balances(self, obj: LegalEntity) -> ChannelBalance:
         cache_attr = "_totals_cache"
         cached = getattr(obj, cache_attr, None)
         if cached:
             return cached
 
-        channels = list(obj.channels.filter(is_deleted=False))
-        balances = BalanceService.get_balance_for_channels(channels)
+        # CHANGE: rollup of the change page reads from the reporting database (core.db_routing)
+        # WHY: it is not cached and sums all transactions of every channel of the legal entity
+        with reporting_reads():
+            channels = list(obj.channels.filter(is_deleted=False))
+            balances = BalanceService.get_balance_for_channels(channels)
 
         total_balance = Decimal("0")
         total_frozen = Decimal("0")
@@ -403,6 +403,18 @@ class CampaignChannelInlinedForm(forms.ModelForm):
         return super().clean()
 
 
+class CampaignAssignmentForm(forms.Form):
+    """Intermediate form of ChannelModelAdmin.assign_to_campaign (core.campaign_assignment)"""
+
+    campaign = forms.ModelChoiceField(
+        queryset=Campaign.objects.filter(is_archived=False).exclude(status=Campaign.Statuses.DRAFT),
+        label="Кампания",
+    )
+    cpm = forms.IntegerField(required=False, min_value=0, initial=0, label="СРМ (руб.)")
+    plan_cpm = forms.IntegerField(required=False, min_value=0, initial=0, label="План. CPM")
+    impressions_plan = forms.IntegerField(required=False, min_value=0, initial=0, label="План. Количество показов")
+
+
 class ChannelPublicationSlotInlineForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -0,0 +1,130 @@
+"""
+CHANGE: Cached per-user scope of the CampaignChannel changelist
+WHY: CampaignChannelAdmin.get_queryset / _get_owner_qs looked up the ChannelAdmin
+     profile, the owner group and ran two exists() over confirmed channels on every
+     call (several per changelist render), get_list_display / get_list_filter queried
+     the groups again
+
+AdminScope — всё, что админка размещений знает о пользователе: профиль
+ChannelAdmin и его роль, членство в группах owner/owners (права роли, см.
+models_qs.change_channeladmin_group), id подтверждённых неудалённых каналов и
+есть ли у профиля размещения в них. Scope хранится в Redis по id пользователя и
+один раз за запрос — на объекте request.
+
+Кэш сбрасывается сигналами: сохранение/удаление ChannelAdmin, изменение его
+каналов и групп пользователя, смена статуса или удаление канала. Размещения
+сигналов не ждут: has_placements кэшируется только когда оно истинно (размещения
+не исчезают), ложное значение перепроверяется одним exists() — новый владелец
+увидит свои размещения сразу после назначения, в том числе через bulk_create.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+
+from core.models import CampaignChannel, Channel, ChannelAdmin
+
+OWNER_GROUPS = ("owner", "owners")
+
+
+@dataclass(frozen=True)
+class AdminScope:
+    user_id: Optional[int]
+    channel_admin_id: Optional[str] = None
+    role: Optional[str] = None
+    in_owner_group: bool = False
+    confirmed_channel_ids: tuple[str, ...] = ()
+    has_placements: bool = False
+
+    @property
+    def is_owner_scoped(self) -> bool:
+        """The changelist shows only the profile's placements in its confirmed channels"""
+        return bool(self.channel_admin_id) and (self.in_owner_group or self.role == ChannelAdmin.Role.OWNER)
+
+    @property
+    def show_card(self) -> bool:
+        """No confirmed channels yet: the changelist shows the 'add a channel' card"""
+        return self.is_owner_scoped and not self.confirmed_channel_ids
+
+    @property
+    def show_text(self) -> bool:
+        """Confirmed channels without placements: the changelist shows a hint"""
+        return self.is_owner_scoped and bool(self.confirmed_channel_ids) and not self.has_placements
+
+
+class AdminScopeService:
+    CACHE_TTL = 60 * 10
+    REQUEST_ATTR = "_admin_scope"
+
+    @classmethod
+    def _cache_key(cls, user_id) -> str:
+        return f"admin_scope:{user_id}"
+
+    @classmethod
+    def _has_placements(cls, scope: AdminScope) -> bool:
+        return CampaignChannel.objects.filter(
+            channel_admin_id=scope.channel_admin_id, channel_id__in=scope.confirmed_channel_ids
+        ).exists()
+
+    @classmethod
+    def build(cls, user) -> AdminScope:
+        channel_admin = ChannelAdmin.objects.filter(user_id=user.pk).only("id", "role").first()
+        in_owner_group = user.groups.filter(name__in=OWNER_GROUPS).exists()
+        if not channel_admin:
+            return AdminScope(user_id=user.pk, in_owner_group=in_owner_group)
+        scope = AdminScope(
+            user_id=user.pk,
+            channel_admin_id=str(channel_admin.pk),
+            role=channel_admin.role,
+            in_owner_group=in_owner_group,
+            confirmed_channel_ids=tuple(
+                str(channel_id)
+                for channel_id in channel_admin.channels.filter(
+                    status=Channel.ChannelStatus.CONFIRMED, is_deleted=False
+                ).values_list("id", flat=True)
+            ),
+        )
+        if scope.is_owner_scoped and scope.confirmed_channel_ids:
+            scope = replace(scope, has_placements=cls._has_placements(scope))
+        return scope
+
+    @classmethod
+    def for_user(cls, user) -> AdminScope:
+        if not user.is_authenticated:
+            return AdminScope(user_id=None)
+        key = cls._cache_key(user.pk)
+        scope = cache.get(key)
+        if scope is None:
+            scope = cls.build(user)
+            cache.set(key, scope, cls.CACHE_TTL)
+        elif scope.show_text and cls._has_placements(scope):
+            scope = replace(scope, has_placements=True)
+            cache.set(key, scope, cls.CACHE_TTL)
+        return scope
+
+    @classmethod
+    def get(cls, request) -> AdminScope:
+        """Scope of request.user, resolved once per request"""
+        scope = getattr(request, cls.REQUEST_ATTR, None)
+        if scope is None:
+            scope = cls.for_user(request.user)
+            setattr(request, cls.REQUEST_ATTR, scope)
+        return scope
+
+    @classmethod
+    def invalidate(cls, user_ids: Iterable) -> None:
+        keys = [cls._cache_key(user_id) for user_id in user_ids if user_id]
+        if keys:
+            cache.delete_many(keys)
+
+    @classmethod
+    def invalidate_channel_admins(cls, channel_admin_ids: Iterable) -> None:
+        cls.invalidate(ChannelAdmin.objects.filter(pk__in=list(channel_admin_ids)).values_list("user_id", flat=True))
+
+    @classmethod
+    def invalidate_channels(cls, channel_ids: Iterable) -> None:
+        cls.invalidate(
+            ChannelAdmin.objects.filter(channels__in=list(channel_ids)).values_list("user_id", flat=True).distinct()
+        )
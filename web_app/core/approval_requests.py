@@ -0,0 +1,131 @@
+"""
+CHANGE: Batched approval requests to channel owners
+WHY: Campaign._notify_pending_channels_on_exit_from_draft serialized the full
+     CampaignChannelSerializer, made a blocking requests.post and a separate
+     save(update_fields=["approval_notified_at"]) per channel inside Campaign.save
+
+Фан-аут выполняется Celery-задачей после коммита. Строки выбираются одним
+запросом, payload содержит только поля текста уведомления, пачки по BATCH_SIZE
+уходят в бот одним POST /telegram/approval-requests, отметка approval_notified_at
+ставится одним UPDATE на пачку — только для запросов, которые бот подтвердил.
+"""
+from __future__ import annotations
+
+import json
+from typing import Optional
+
+import requests
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from core.models import CampaignChannel
+from web_app.app_settings import app_settings
+from web_app.logger import logger
+
+
+class ApprovalRequestService:
+    """
+    Bulk fan-out of approval requests to the bot
+    """
+
+    BATCH_SIZE = 200
+    REQUEST_TIMEOUT = 60
+
+    @classmethod
+    def pending(cls, queryset: Optional[QuerySet] = None) -> QuerySet:
+        """
+        Same conditions as send_message_to_channel_admin, as one query:
+        manual approval, owner with the bot who still administers the channel
+        """
+        queryset = CampaignChannel.objects.all() if queryset is None else queryset
+        return (
+            queryset.filter(
+                publish_status__in=[
+                    CampaignChannel.PublishStatusChoices.PLANNED,
+                    CampaignChannel.PublishStatusChoices.REJECTED,
+                ],
+                approval_notified_at__isnull=True,
+                campaign__is_archived=False,
+                channel__auto_approve_publications=False,
+                channel__is_deleted=False,
+                channel_admin__is_bot_installed=True,
+                channel_admin__channels=F("channel"),
+            )
+            .select_related("campaign", "channel_admin", "publication_slot")
+            .only(
+                "id",
+                "plan_cpm",
+                "campaign__client",
+                "campaign__brand",
+                "campaign__format",
+                "campaign__slot_publication_at",
+                "channel_admin__tg_id",
+                "publication_slot__weekday",
+                "publication_slot__start_time",
+                "publication_slot__end_time",
+            )
+            .order_by()
+        )
+
+    @classmethod
+    def payload(cls, campaign_channel: CampaignChannel) -> dict:
+        """Slim payload: only what the bot puts into the approval message"""
+        campaign = campaign_channel.campaign
+        slot = campaign_channel.publication_slot
+        return {
+            "id": str(campaign_channel.id),
+            "tg_id": campaign_channel.channel_admin.tg_id,
+            "client": campaign.client,
+            "brand": campaign.brand,
+            "format": campaign.format,
+            "format_display": campaign.get_format_display(),
+            "scheduled_at": (
+                timezone.localtime(campaign.slot_publication_at).isoformat()
+                if campaign.slot_publication_at
+                else None
+            ),
+            "plan_cpm": str(campaign_channel.plan_cpm),
+            "publication_slot": (
+                {
+                    "weekday": slot.weekday,
+                    "start_time": slot.start_time.strftime("%H:%M"),
+                    "end_time": slot.end_time.strftime("%H:%M"),
+                }
+                if slot
+                else None
+            ),
+        }
+
+    @classmethod
+    def _post(cls, payloads: list[dict]) -> set[str]:
+        """One request per batch, returns ids the bot has delivered"""
+        try:
+            response = requests.post(
+                f"{app_settings.DOMAIN_URI}/telegram/approval-requests",
+                data=json.dumps({"requests": payloads}),
+                headers={"content-type": "application/json"},
+                timeout=cls.REQUEST_TIMEOUT,
+            )
+        except Exception as e:
+            logger.error(f"[ApprovalRequests] Error sending {len(payloads)} requests: {e}")
+            return set()
+        if response.status_code != 200:
+            logger.error(f"[ApprovalRequests] Bot answered {response.status_code} for {len(payloads)} requests")
+            return set()
+        return {str(campaign_channel_id) for campaign_channel_id in response.json().get("sent", [])}
+
+    @classmethod
+    def send(cls, queryset: Optional[QuerySet] = None) -> int:
+        """Send all pending requests of the queryset, returns the number marked as notified"""
+        rows = list(cls.pending(queryset))
+        notified = 0
+        for start in range(0, len(rows), cls.BATCH_SIZE):
+            batch = rows[start:start + cls.BATCH_SIZE]
+            sent = cls._post([cls.payload(campaign_channel) for campaign_channel in batch])
+            if sent:
+                notified += CampaignChannel.objects.filter(pk__in=sent, approval_notified_at__isnull=True).update(
+                    approval_notified_at=timezone.now()
+                )
+        failed = len(rows) - notified
+        logger.info(f"[ApprovalRequests] notified={notified} failed={failed}")
+        return notified
@@ -23,4 +23,6 @@ class CoreConfig(AppConfig):
             DjangoJSONField.from_db_value = safe_from_db_value
             DjangoJSONField._telewin_safe_patch = True
 
-        from . import signals  # noqa
+        from . import request_profiler, signals  # noqa
+
+        request_profiler.install()
@@ -0,0 +1,134 @@
+"""
+CHANGE: Outbound HTTP of request handlers that does not block an ASGI worker
+WHY: MessageViewSet.preview, request_publication and ChannelSerializer.create held a
+     sync worker for up to 30 s on calls to the bot, TGStat and avatar URLs; six slow
+     upstream calls took the whole gunicorn-cfg.py pool
+
+Внешний вызов описывается OutboundCall и отдаётся в send_or_defer(request, call):
+- WSGI (и ASGI при ASYNC_VIEWS=false) — вызов выполняется сразу через requests,
+  как раньше;
+- ASGI с ASYNC_VIEWS — view обёрнута async_view: DRF-часть (ORM, сериализаторы)
+  идёт через sync_to_async, вызовы копятся в request.outbound_calls и после неё
+  выполняются конкурентно общим httpx.AsyncClient, не занимая поток. Колбэк
+  on_done выполняется через sync_to_async (может писать в БД) до рендера ответа.
+
+Маршруты async-версий — core.urls.async_urls (подключаются при ASYNC_VIEWS).
+Middleware остаются синхронными: под ASGI каждый запрос обслуживается в своём
+потоке со своим соединением с БД — при быстрых upstream это дороже WSGI
+(см. manage.py benchmark_asgi).
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any, Callable, Optional
+
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+
+from web_app.logger import logger
+
+ASYNC_CLIENT_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+@dataclass
+class OutboundCall:
+    method: str
+    url: str
+    json: Any = None
+    content: Optional[bytes] = None
+    params: Optional[dict] = None
+    headers: dict = field(default_factory=dict)
+    timeout: float = 10
+    # вызывается с самим OutboundCall после ответа или ошибки
+    on_done: Optional[Callable[["OutboundCall"], None]] = None
+
+    response: Any = None
+    error: Optional[Exception] = None
+    elapsed: float = 0.0
+
+    def _kwargs(self) -> dict:
+        kwargs = {"headers": self.headers, "timeout": self.timeout}
+        if self.json is not None:
+            kwargs["json"] = self.json
+        if self.content is not None:
+            kwargs["data" if self.method == "POST" else "content"] = self.content
+        if self.params is not None:
+            kwargs["params"] = self.params
+        return kwargs
+
+    def _finish(self) -> None:
+        if self.error is not None:
+            logger.error(f"[OutboundCall] {self.method} {self.url} failed: {self.error}")
+        if self.on_done:
+            self.on_done(self)
+
+    def send(self) -> "OutboundCall":
+        """Blocking call, as the views did before"""
+        started = time.perf_counter()
+        try:
+            sender = requests.post if self.method == "POST" else requests.get
+            self.response = sender(self.url, **self._kwargs())
+        except Exception as e:
+            self.error = e
+        self.elapsed = time.perf_counter() - started
+        self._finish()
+        return self
+
+    async def asend(self) -> "OutboundCall":
+        started = time.perf_counter()
+        try:
+            kwargs = self._kwargs()
+            if "data" in kwargs:
+                kwargs["content"] = kwargs.pop("data")
+            self.response = await async_client().request(self.method, self.url, **kwargs)
+        except Exception as e:
+            self.error = e
+        self.elapsed = time.perf_counter() - started
+        await sync_to_async(self._finish)()
+        return self
+
+
+def async_client() -> httpx.AsyncClient:
+    """One AsyncClient (connection pool) per event loop of the worker"""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = httpx.AsyncClient(limits=ASYNC_CLIENT_LIMITS, follow_redirects=True)
+    return client
+
+
+def defers(request) -> bool:
+    """The request is served by async_view: outbound calls are collected, not sent"""
+    return getattr(request, "outbound_calls", None) is not None
+
+
+def send_or_defer(request, call: OutboundCall) -> Optional[OutboundCall]:
+    """Run the call now, or leave it to async_view when the request is served asynchronously"""
+    if not defers(request):
+        return call.send()
+    request.outbound_calls.append(call)
+    return None
+
+
+def async_view(view: Callable) -> Callable:
+    """
+    Async version of a DRF view: the view runs in a thread, its deferred outbound
+    calls are awaited concurrently on the event loop before the response is rendered
+    """
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.outbound_calls = []
+        response = await sync_to_async(view)(request, *args, **kwargs)
+        if request.outbound_calls:
+            await asyncio.gather(*(call.asend() for call in request.outbound_calls))
+        return response
+
+    return wrapper
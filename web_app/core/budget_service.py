@@ -0,0 +1,177 @@
+"""
+CHANGE: Incremental campaign budget tracking
+WHY: campaign_alter_activity rebuilt Sum(cpm * impressions_fact) over every campaign
+     channel on each beat tick just to find overspent campaigns
+
+Campaign.spent_amount хранит израсходованный бюджет (сумма cpm * impressions_fact / 1000
+по всем размещениям кампании). Обновляется дельтой при каждом сохранении/удалении
+CampaignChannel (синхронизация TGStat, ручное редактирование), перерасход ставит
+кампанию на паузу сразу, без ожидания периодической задачи.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+from django.utils import timezone
+
+from core.models import Campaign, CampaignChannel
+from web_app.logger import logger
+
+
+SPEND_PRECISION = Decimal("0.01")
+
+
+def campaign_channel_spend(cpm, impressions_fact) -> Decimal:
+    """Spend of one placement: CPM is the price per 1000 impressions"""
+    if not cpm or not impressions_fact:
+        return Decimal("0")
+    return (Decimal(str(cpm)) * Decimal(impressions_fact) / Decimal(1000)).quantize(SPEND_PRECISION)
+
+
+@dataclass
+class BudgetForecast:
+    """Pacing forecast for a campaign budget"""
+    spent: Decimal
+    remaining: Decimal
+    daily_spend: Decimal
+    exhaustion_date: Optional[date]
+    exhausts_before_finish: bool
+
+
+class CampaignBudgetService:
+    """
+    Spent-to-date tracking, overspend pause and pacing forecast
+    """
+
+    @classmethod
+    def apply_delta(cls, campaign_id, delta: Decimal) -> None:
+        """Atomically shift spent_amount and pause the campaign if it is now over budget"""
+        if not delta:
+            return
+        Campaign.objects.filter(pk=campaign_id).update(
+            spent_amount=F("spent_amount") + delta,
+            spent_updated_at=timezone.now(),
+        )
+        if delta > 0:
+            cls.pause_overspent([campaign_id])
+
+    @classmethod
+    def track_campaign_channel(cls, instance: CampaignChannel, created: bool = False, deleted: bool = False) -> None:
+        """
+        Apply the spend change of a saved/deleted CampaignChannel
+
+        The previous state is read from the database under a row lock in
+        CampaignChannel.save()/delete() (_spend_previous), so the delta is exact even
+        for stale or concurrently saved instances. Saves with update_fields that do not
+        touch cpm/impressions_fact/campaign are skipped. Rows deleted through
+        QuerySet.delete() come from a fresh SELECT and use their own values.
+        """
+        previous = instance.__dict__.pop("_spend_previous", None)
+        if previous is None:
+            if created:
+                previous = (None, Decimal("0"))
+            elif deleted:
+                previous = (instance.campaign_id, instance.spend)
+            else:
+                return
+
+        previous_campaign_id, previous_spend = previous
+        current_spend = Decimal("0") if deleted else instance.spend
+
+        if previous_campaign_id and previous_campaign_id != instance.campaign_id:
+            cls.apply_delta(previous_campaign_id, -previous_spend)
+            previous_spend = Decimal("0")
+
+        cls.apply_delta(instance.campaign_id, current_spend - previous_spend)
+
+    @classmethod
+    def pause_overspent(cls, campaign_ids: Optional[Iterable] = None) -> int:
+        """
+        Pause active campaigns whose spent_amount reached the budget
+
+        Indexed SELECT + UPDATE; without campaign_ids works as the periodic safety net.
+        """
+        qs = Campaign.objects.active().filter(spent_amount__gte=F("budget"))
+        if campaign_ids is not None:
+            qs = qs.filter(pk__in=list(campaign_ids))
+        paused_ids = list(qs.values_list("id", flat=True))
+        if not paused_ids:
+            return 0
+        updated = Campaign.objects.filter(
+            pk__in=paused_ids, status=Campaign.Statuses.ACTIVE
+        ).update(status=Campaign.Statuses.PAUSED)
+        logger.info(f"[CampaignBudget] paused overspent campaigns: {[str(i) for i in paused_ids]}")
+        return updated
+
+    @classmethod
+    def spend_subquery(cls):
+        """Correlated subquery: spend of a campaign recomputed from its placements"""
+        # rounded per placement, same as campaign_channel_spend
+        spend = Round(
+            ExpressionWrapper(
+                F("cpm") * F("impressions_fact") / Value(Decimal(1000)),
+                output_field=DecimalField(max_digits=16, decimal_places=4),
+            ),
+            2,
+        )
+        return Subquery(
+            CampaignChannel.objects.filter(campaign_id=OuterRef("pk"))
+            .order_by()
+            .values("campaign_id")
+            .annotate(total=Sum(spend))
+            .values("total")[:1],
+            output_field=DecimalField(max_digits=16, decimal_places=2),
+        )
+
+    @classmethod
+    def recalculate(cls, campaign_ids: Optional[Iterable] = None) -> int:
+        """
+        Rebuild spent_amount from placements (backfill / reconciliation after bulk updates
+        that bypass save(), e.g. QuerySet.update)
+        """
+        qs = Campaign.objects.all()
+        if campaign_ids is not None:
+            qs = qs.filter(pk__in=list(campaign_ids))
+        return qs.update(
+            spent_amount=Coalesce(cls.spend_subquery(), Value(Decimal("0"))),
+            spent_updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def forecast(cls, campaign: Campaign, today: Optional[date] = None) -> BudgetForecast:
+        """
+        Linear pacing forecast: average daily spend since start_date extrapolated
+        to the remaining budget
+        """
+        today = today or timezone.localdate()
+        spent = Decimal(campaign.spent_amount or 0)
+        budget = Decimal(campaign.budget or 0)
+        remaining = max(budget - spent, Decimal("0"))
+
+        elapsed_days = (today - campaign.start_date).days + 1 if campaign.start_date else 0
+        daily_spend = (
+            (spent / elapsed_days).quantize(SPEND_PRECISION) if elapsed_days > 0 and spent > 0 else Decimal("0")
+        )
+
+        if budget and spent >= budget:
+            exhaustion_date = today
+        elif daily_spend > 0:
+            exhaustion_date = today + timedelta(days=math.ceil(remaining / daily_spend))
+        else:
+            exhaustion_date = None
+
+        return BudgetForecast(
+            spent=spent,
+            remaining=remaining,
+            daily_spend=daily_spend,
+            exhaustion_date=exhaustion_date,
+            exhausts_before_finish=bool(
+                exhaustion_date and campaign.finish_date and exhaustion_date <= campaign.finish_date
+            ),
+        )
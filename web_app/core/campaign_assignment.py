@@ -0,0 +1,233 @@
+"""
+CHANGE: Set-based bulk assignment of channels to a campaign
+WHY: CampaignChannelInlined ran CampaignChannel.clean (clean_add_to_campaign,
+     clean_publication_slot, _validate_autopilot_interval) and save per row, and
+     campaignchannel_post_save made a blocking HTTP call to the bot for every
+     manual-approval channel
+
+Проверки кампании делаются один раз, проверки каналов — несколькими запросами на
+всю пачку: каналы, уже добавленные каналы, владельцы каналов, точные календари
+занятости (SlotCalendarService.build) и сумма бюджета размещений. Прошедшие
+проверку строки пишутся одним bulk_create, запросы на подтверждение уходят одной
+Celery-задачей после коммита. Отклонённые каналы возвращаются с причиной и
+ближайшими свободными окнами.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.utils import timezone
+
+from core.models import Campaign, CampaignChannel, Channel, ChannelAdmin, PlacementFormat
+from core.slot_calendar import SlotCalendarService
+from web_app.logger import logger
+
+
+@dataclass
+class AssignmentResult:
+    """Outcome of CampaignAssignmentService.assign"""
+
+    created: list[CampaignChannel] = field(default_factory=list)
+    # channel_id -> причина отказа
+    rejected: dict[str, str] = field(default_factory=dict)
+    alternatives: dict[str, list[datetime]] = field(default_factory=dict)
+    notified: int = 0
+
+    def reject(self, channel_id, reason: str, alternatives: Optional[list[datetime]] = None) -> None:
+        self.rejected[str(channel_id)] = reason
+        if alternatives:
+            self.alternatives[str(channel_id)] = alternatives
+
+
+class CampaignAssignmentService:
+    """
+    Bulk assignment of channels to a campaign
+    """
+
+    @classmethod
+    def campaign_error(cls, campaign: Campaign) -> Optional[str]:
+        """Campaign-level part of CampaignChannel.clean / clean_add_to_campaign"""
+        if campaign.is_draft:
+            return "Нельзя редактировать каналы для кампании в статусе «Черновик»."
+        if campaign.is_archived:
+            return "Нельзя добавлять каналы в архивную кампанию."
+        if not campaign.start_date or not campaign.finish_date:
+            return "У кампании не указаны даты начала и окончания."
+        if campaign.finish_date < timezone.now().date():
+            return "Невозможно добавить канал в завершенную кампанию"
+        if campaign.format == PlacementFormat.FIXED_SLOT and not campaign.slot_publication_at:
+            return "Для кампании не указаны дата и время публикации."
+        return None
+
+    @classmethod
+    def _channel_admins(cls, channel_ids: list[str]) -> dict[str, ChannelAdmin]:
+        """One admin per channel: the owner with the bot installed first"""
+        links = (
+            ChannelAdmin.channels.through.objects.filter(channel_id__in=channel_ids)
+            .select_related("channeladmin")
+            .order_by("channeladmin__created_at")
+        )
+        admins: dict[str, ChannelAdmin] = {}
+        for link in links:
+            admin = link.channeladmin
+            rank = (admin.role == ChannelAdmin.Role.OWNER, admin.is_bot_installed)
+            current = admins.get(str(link.channel_id))
+            if current is None or rank > (current.role == ChannelAdmin.Role.OWNER, current.is_bot_installed):
+                admins[str(link.channel_id)] = admin
+        return admins
+
+    @classmethod
+    def _committed_budget(cls, campaign: Campaign) -> Decimal:
+        total = CampaignChannel.objects.filter(
+            campaign=campaign, channel__is_deleted=False
+        ).aggregate(
+            total=Sum(
+                ExpressionWrapper(
+                    F("cpm") * F("impressions_plan") / Decimal(1000),
+                    output_field=DecimalField(max_digits=16, decimal_places=4),
+                )
+            )
+        )["total"]
+        return Decimal(total or 0)
+
+    @classmethod
+    def assign(
+        cls,
+        campaign: Campaign,
+        channels: Iterable,
+        cpm: Decimal = Decimal("0"),
+        plan_cpm: Decimal = Decimal("0"),
+        impressions_plan: int = 0,
+    ) -> AssignmentResult:
+        """
+        Validate all candidate channels at once and create their CampaignChannel rows
+
+        Same rules as CampaignChannelInlinedForm.clean + CampaignChannel.clean:
+        deleted channels, unsupported format, channel already in the campaign,
+        fixed slot / autopilot interval occupancy and the campaign budget.
+        """
+        result = AssignmentResult()
+        channel_ids = list(dict.fromkeys(str(getattr(channel, "pk", channel)) for channel in channels))
+        if not channel_ids:
+            return result
+
+        error = cls.campaign_error(campaign)
+        if error:
+            for channel_id in channel_ids:
+                result.reject(channel_id, error)
+            return result
+
+        rows = {
+            str(channel.pk): channel
+            for channel in Channel.objects.filter(pk__in=channel_ids).only(
+                "id", "name", "is_deleted", "supported_formats", "auto_approve_publications",
+                "autopilot_min_interval",
+            )
+        }
+        existing = {
+            str(channel_id)
+            for channel_id in CampaignChannel.objects.filter(
+                campaign=campaign, channel_id__in=channel_ids
+            ).values_list("channel_id", flat=True)
+        }
+
+        candidates = []
+        for channel_id in channel_ids:
+            channel = rows.get(channel_id)
+            if channel is None or channel.is_deleted:
+                result.reject(channel_id, "Канал не найден или помечен как удалён.")
+            elif not channel.supports_format(campaign.format):
+                result.reject(channel_id, "Канал не поддерживает формат кампании.")
+            elif channel_id in existing:
+                result.reject(channel_id, "Канал уже добавлен в кампанию.")
+            else:
+                candidates.append(channel)
+        if not candidates:
+            return result
+
+        candidate_ids = [str(channel.pk) for channel in candidates]
+        # то же, что CampaignChannel._scheduled_datetime: у фикс-слота slot_publication_at обязателен
+        moment = campaign.slot_publication_at or timezone.make_aware(
+            datetime.combine(campaign.start_date, datetime.min.time()), timezone.get_current_timezone()
+        )
+        plan = {}
+        if campaign.format in (PlacementFormat.FIXED_SLOT, PlacementFormat.AUTOPILOT):
+            max_interval = max((channel.autopilot_min_interval or 0) for channel in candidates)
+            # точные календари из БД, без кэша: результат пишется в базу
+            calendars = SlotCalendarService.build(candidate_ids, since=moment - timedelta(minutes=max_interval))
+            plan = SlotCalendarService.plan_campaign(campaign, candidate_ids, calendars=calendars)
+
+        placement_budget = Decimal(cpm or 0) * Decimal(impressions_plan or 0) / Decimal(1000)
+        budget_left = Decimal(campaign.budget or 0) - cls._committed_budget(campaign) if placement_budget else None
+        admins = cls._channel_admins(candidate_ids)
+
+        to_create = []
+        for channel in candidates:
+            channel_id = str(channel.pk)
+            option = plan.get(channel_id)
+            if option is not None and not option.available:
+                result.reject(channel_id, option.reason, option.alternatives)
+                continue
+            if budget_left is not None:
+                if placement_budget > budget_left:
+                    result.reject(channel_id, "Суммарный бюджет каналов больше чем указанный бюджет кампании")
+                    continue
+                budget_left -= placement_budget
+
+            instance = CampaignChannel(
+                campaign=campaign,
+                channel=channel,
+                channel_admin=admins.get(channel_id),
+                cpm=cpm or 0,
+                plan_cpm=plan_cpm or 0,
+                impressions_plan=impressions_plan or 0,
+                publication_slot_id=option.slot_id if option else None,
+                message_publish_date=moment,
+                # как campaignchannel_pre_save: без ручного подтверждения — сразу CONFIRMED
+                publish_status=(
+                    CampaignChannel.PublishStatusChoices.CONFIRMED
+                    if channel.auto_approve_publications
+                    else CampaignChannel.PublishStatusChoices.PLANNED
+                ),
+            )
+            to_create.append(instance)
+
+        if not to_create:
+            return result
+
+        with transaction.atomic():
+            result.created = CampaignChannel.objects.bulk_create(to_create)
+            cls._after_create(campaign, result)
+        logger.info(
+            f"[CampaignAssignment] campaign={campaign.pk} created={len(result.created)} "
+            f"rejected={len(result.rejected)} notified={result.notified}"
+        )
+        return result
+
+    @classmethod
+    def _after_create(cls, campaign: Campaign, result: AssignmentResult) -> None:
+        """post_save side effects that bulk_create does not trigger"""
+        from core.publication_scheduler import PublicationScheduler
+        from core.tasks import send_campaign_channel_approval_requests
+
+        SlotCalendarService.invalidate({str(instance.channel_id) for instance in result.created})
+        for instance in result.created:
+            PublicationScheduler.schedule(instance)
+
+        pending_ids = [
+            str(instance.pk)
+            for instance in result.created
+            if instance.publish_status == CampaignChannel.PublishStatusChoices.PLANNED
+            and instance.channel_admin
+            and instance.channel_admin.is_bot_installed
+        ]
+        result.notified = len(pending_ids)
+        if pending_ids:
+            transaction.on_commit(
+                lambda: send_campaign_channel_approval_requests.delay(campaign_channel_ids=pending_ids)
+            )
@@ -0,0 +1,93 @@
+"""
+CHANGE: Result storage policy of Celery tasks
+WHY: CELERY_RESULT_BACKEND = "django-db" with CELERY_TASK_TRACK_STARTED wrote two
+     django_celery_results rows per execution, including the sweep tick and every
+     per-post views update; the table grew without bound and slowed the admin
+
+- Результаты по умолчанию — в Redis (CELERY_RESULT_BACKEND) с TTL CELERY_RESULT_EXPIRES,
+  без состояния STARTED.
+- Задачи с аудитом (выплаты, чекпоинты книги) объявляются с base=AuditResultTask:
+  их результат и STARTED пишутся в БД (django_celery_results) и хранятся
+  AUDIT_RETENTION.
+- TaskResultRetention.cleanup (задача cleanup_task_results, раз в сутки) удаляет
+  из БД истёкшие строки пачками по BATCH_SIZE, не держа длинных блокировок.
+  Строки без task_name (до CELERY_RESULT_EXTENDED) считаются не аудитными.
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Optional
+
+from celery import Task
+from celery.app.backends import by_url
+from django.db.models import Q
+from django.utils import timezone
+
+AUDIT_RESULT_BACKEND = "django-db"
+
+_audit_backends: dict = {}
+
+
+def audit_result_backend(app):
+    """django_celery_results backend of the app, created once per process"""
+    backend = _audit_backends.get(app)
+    if backend is None:
+        backend_cls, url = by_url(AUDIT_RESULT_BACKEND, app.loader)
+        backend = _audit_backends[app] = backend_cls(app=app, url=url)
+    return backend
+
+
+class AuditResultTask(Task):
+    """Task whose state and result are kept in the database for audit"""
+
+    track_started = True
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = audit_result_backend(self.app)
+        return self._backend
+
+    @backend.setter
+    def backend(self, value):
+        self._backend = value
+
+
+class TaskResultRetention:
+    BATCH_SIZE = 5000
+    # результаты задач без аудита в БД попадают только из старых записей
+    RESULT_RETENTION = timedelta(days=1)
+    AUDIT_RETENTION = timedelta(days=365)
+
+    @classmethod
+    def audit_task_names(cls) -> list[str]:
+        from web_app.celery import app
+
+        return sorted(name for name, task in app.tasks.items() if isinstance(task, AuditResultTask))
+
+    @classmethod
+    def _delete_in_batches(cls, queryset, batch_size: int) -> int:
+        deleted = 0
+        while True:
+            pks = list(queryset.order_by().values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            deleted += queryset.model.objects.filter(pk__in=pks).delete()[0]
+
+    @classmethod
+    def cleanup(cls, now=None, batch_size: Optional[int] = None) -> dict:
+        from django_celery_results.models import GroupResult, TaskResult
+
+        now = now or timezone.now()
+        batch_size = batch_size or cls.BATCH_SIZE
+        audit_names = cls.audit_task_names()
+
+        expired_results = TaskResult.objects.filter(
+            Q(date_done__lt=now - cls.AUDIT_RETENTION)
+            | (~Q(task_name__in=audit_names) & Q(date_done__lt=now - cls.RESULT_RETENTION))
+        )
+        expired_groups = GroupResult.objects.filter(date_done__lt=now - cls.RESULT_RETENTION)
+        return {
+            "task_results": cls._delete_in_batches(expired_results, batch_size),
+            "group_results": cls._delete_in_batches(expired_groups, batch_size),
+        }
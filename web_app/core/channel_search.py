@@ -0,0 +1,123 @@
+"""
+CHANGE: Ranked channel search over name, username, category, about and language
+WHY: LegalEntityViewSet.channels filtered name__icontains | username__icontains and the
+     channel admin had no search; on a large catalogue both were sequential scans
+
+Каждое слово запроса должно встречаться (icontains) хотя бы в одном из SEARCH_FIELDS.
+На PostgreSQL условие UPPER(поле) LIKE '%слово%' идёт по GIN-индексам pg_trgm
+(миграция 0149_channel_search_trigram_indexes), результат ранжируется
+word_similarity с весами полей. Без pg_trgm (SQLite, тестовая база без миграций)
+фильтр тот же, ранг — по точному/префиксному/частичному совпадению названия.
+"""
+from __future__ import annotations
+
+from functools import reduce
+from operator import and_, or_
+
+from django.db import DatabaseError, connections
+from django.db.models import Case, F, FloatField, IntegerField, Q, QuerySet, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from web_app.logger import logger
+
+SEARCH_FIELDS = ("name", "username", "category", "about", "language")
+# вес совпадения в поле при ранжировании
+FIELD_WEIGHTS = {"name": 1.0, "username": 0.9, "category": 0.5, "about": 0.3, "language": 0.3}
+TRIGRAM_INDEXES = {field: f"channel_{field}_trgm_idx" for field in SEARCH_FIELDS}
+
+_trigram_available: dict[str, bool] = {}
+
+
+def create_trigram_indexes(schema_editor) -> None:
+    """GIN pg_trgm indexes on UPPER(field): the expression Django emits for icontains on PostgreSQL"""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # сервер без contrib: поиск работает, но последовательным сканированием
+            logger.warning("[ChannelSearch] pg_trgm is not available, trigram indexes are not created")
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for field, index in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS "{index}" ON "core_channel" USING gin (UPPER("{field}"::text) gin_trgm_ops)'
+        )
+    _trigram_available.pop(schema_editor.connection.alias, None)
+
+
+def drop_trigram_indexes(schema_editor) -> None:
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for index in TRIGRAM_INDEXES.values():
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{index}"')
+
+
+def trigram_available(alias: str = "default") -> bool:
+    """pg_trgm is installed in the database (checked once per process and alias)"""
+    if alias not in _trigram_available:
+        connection = connections[alias]
+        available = False
+        if connection.vendor == "postgresql":
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                    available = cursor.fetchone() is not None
+            except DatabaseError:
+                available = False
+        _trigram_available[alias] = available
+    return _trigram_available[alias]
+
+
+class ChannelSearch:
+    RANK = "search_rank"
+
+    @classmethod
+    def terms(cls, query: str) -> list[str]:
+        return [term for term in (query or "").split() if term]
+
+    @classmethod
+    def condition(cls, terms: list[str]) -> Q:
+        per_term = (reduce(or_, (Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS)) for term in terms)
+        return reduce(and_, per_term)
+
+    @classmethod
+    def rank(cls, query: str, alias: str):
+        if trigram_available(alias):
+            from django.contrib.postgres.search import TrigramWordSimilarity
+
+            return Greatest(
+                *(
+                    Coalesce(TrigramWordSimilarity(Value(query), field), Value(0.0)) * Value(weight)
+                    for field, weight in FIELD_WEIGHTS.items()
+                ),
+                output_field=FloatField(),
+            )
+        return Case(
+            When(name__iexact=query, then=Value(3)),
+            When(name__istartswith=query, then=Value(2)),
+            When(name__icontains=query, then=Value(1)),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+
+    @classmethod
+    def filter(cls, queryset: QuerySet, query: str) -> QuerySet:
+        """Channels matching every word of the query, in any of SEARCH_FIELDS"""
+        terms = cls.terms(query)
+        if not terms:
+            return queryset
+        return queryset.filter(cls.condition(terms))
+
+    @classmethod
+    def search(cls, queryset: QuerySet, query: str) -> QuerySet:
+        """filter() ordered by relevance (search_rank), ties by name"""
+        terms = cls.terms(query)
+        if not terms:
+            return queryset
+        query = " ".join(terms)
+        return (
+            queryset.filter(cls.condition(terms))
+            .annotate(**{cls.RANK: cls.rank(query, queryset.db)})
+            .order_by(F(cls.RANK).desc(), "name", "id")
+        )
@@ -58,14 +58,17 @@ class CampaignChannelQs(QuerySet):
         ).values("id", "name", "budget", "all_budget_fact", "all_budget_plan", "status")
 
     def update_campaign_activity(self):
+        """
+        Safety net for the event-driven pause: campaigns are paused as soon as
+        CampaignChannel changes push spent_amount over the budget, this
+        reconciles spent_amount of active campaigns (rows changed by bulk updates
+        that bypass save()) and pauses the overspent ones
+        """
+        from core.budget_service import CampaignBudgetService
         from core.models import Campaign
 
-        to_update = self.anon_campaign_statistics().filter(
-            all_budget_fact__gte=F("budget"), status=Campaign.Statuses.ACTIVE
-        )
-        return Campaign.objects.filter(id__in=to_update.values("id")).update(
-            status=Campaign.Statuses.PAUSED
-        )
+        CampaignBudgetService.recalculate(Campaign.objects.active().values_list("id", flat=True))
+        return CampaignBudgetService.pause_overspent()
 
     def recent_published_messages_since(self, *, minutes: int):
         now = timezone.now().replace(microsecond=0)
@@ -0,0 +1,129 @@
+"""
+CHANGE: Reporting database alias with lag-aware fallback to the primary
+WHY: admin statistics (campaign_channels_totals_bar, Campaign total_* properties),
+     QuerySetExporter, MediaPlanGenerator and LegalEntityAdmin rollups ran heavy
+     aggregates on the primary that serves the bot's publishing writes
+
+Псевдоним REPORTING_DB ("reporting") — read-реплика (REPORTING_DB_HOST). Отчётные
+чтения переводятся туда явно:
+- using_reporting(qs) — конкретный queryset;
+- with reporting_reads(): — код, который строит запросы сам (свойства модели,
+  related-менеджеры): ReportingRouter.db_for_read отправляет чтения блока в реплику.
+
+Без REPORTING_DB_HOST, при недоступной реплике или отставании больше
+REPORTING_MAX_LAG_SECONDS чтения остаются на primary (default). Отставание
+проверяется не чаще раза в REPORTING_LAG_CHECK_INTERVAL секунд на процесс.
+Запись всегда идёт в default, в том числе для объектов, прочитанных из реплики.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import QuerySet
+
+from web_app.logger import logger
+
+REPORTING_DB = "reporting"
+REPORTING_LAG_CHECK_INTERVAL = 10
+
+# на primary и на догнавшей реплике — 0; иначе время с последней применённой транзакции
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+_reporting_reads: ContextVar[bool] = ContextVar("reporting_reads", default=False)
+
+
+def replica_lag(alias: str = REPORTING_DB) -> Optional[float]:
+    """Replication lag of the alias in seconds, None when it cannot be queried"""
+    connection = connections[alias]
+    try:
+        if connection.vendor != "postgresql":
+            connection.ensure_connection()
+            return 0.0
+        with connection.cursor() as cursor:
+            cursor.execute(REPLICA_LAG_SQL)
+            return float(cursor.fetchone()[0])
+    except DatabaseError as e:
+        logger.warning(f"[ReportingDB] {alias} is unavailable: {e}")
+        connection.close()
+        return None
+
+
+class ReplicaHealth:
+    """Cached per process: whether reporting reads may go to the replica"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_at: Optional[float] = None
+        self._usable = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._checked_at = None
+
+    def is_usable(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < REPORTING_LAG_CHECK_INTERVAL:
+                return self._usable
+            self._checked_at = now
+            lag = replica_lag()
+            self._usable = lag is not None and lag <= settings.REPORTING_MAX_LAG_SECONDS
+            if lag is not None and not self._usable:
+                logger.warning(f"[ReportingDB] replica lag {lag:.1f}s, reading from {DEFAULT_DB_ALIAS}")
+            return self._usable
+
+
+replica_health = ReplicaHealth()
+
+
+def reporting_alias() -> str:
+    """Alias for reporting reads: the replica when configured and fresh enough, otherwise default"""
+    if settings.REPORTING_DB_ENABLED and replica_health.is_usable():
+        return REPORTING_DB
+    return DEFAULT_DB_ALIAS
+
+
+def using_reporting(queryset: QuerySet) -> QuerySet:
+    """The queryset evaluated on the reporting database (see reporting_alias)"""
+    return queryset.using(reporting_alias())
+
+
+@contextmanager
+def reporting_reads():
+    """Route the reads of the block through ReportingRouter to the reporting database"""
+    token = _reporting_reads.set(True)
+    try:
+        yield
+    finally:
+        _reporting_reads.reset(token)
+
+
+class ReportingRouter:
+    """settings.DATABASE_ROUTERS: reads of reporting_reads() blocks to the replica, all writes to default"""
+
+    def db_for_read(self, model, **hints):
+        if _reporting_reads.get():
+            return reporting_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # реплика содержит те же данные, что и primary
+        aliases = {DEFAULT_DB_ALIAS, REPORTING_DB}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
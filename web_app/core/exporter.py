@@ -1,6 +1,9 @@
 import io
 
 import pandas as pd
+from django.db.models import QuerySet
+
+from core.db_routing import using_reporting
 from core.serializers import ExporterSerializer
 
 
@@ -30,6 +33,8 @@ class ExporterContract:
 
 class QuerySetExporter(ExporterContract):
     def _prepare_data(self):
+        if isinstance(self._data, QuerySet):
+            self._data = using_reporting(self._data)
         self._prepare_cols()
         _rows = []
         if self._data:
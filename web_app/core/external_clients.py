@@ -2,6 +2,7 @@ from rest_framework import status
 
 from httpx import Client
 
+from core.async_http import OutboundCall
 from core.models import Channel
 from core.serializers import TGStatSerializer, TGChannelInfo, TGChannelStat
 from web_app.logger import logger
@@ -109,3 +110,25 @@ class TGStatClient(ExternalClient):
             return self.service.update_channel_stat(response=response, channel=channel)
         except Exception as e:
             logger.error(f"update_channel_stat Error: {str(e)}")
+
+    def channel_calls(self, channel: Channel) -> list[OutboundCall]:
+        """update_channel_info + update_channel_stat as deferred calls (core.async_http.async_view)"""
+        base_url = self.get_client_kwargs()["base_url"]
+        params = {"token": self.token, "channelId": channel.tg_id}
+
+        def on_done(update):
+            def done(call: OutboundCall):
+                if call.response is None:
+                    return
+                try:
+                    update(response=call.response, channel=channel)
+                except Exception as e:
+                    logger.error(f"{update.__name__} Error: {str(e)}")
+            return done
+
+        return [
+            OutboundCall("GET", f"{base_url}/channels/get", params=params,
+                         on_done=on_done(self.service.update_channel_info)),
+            OutboundCall("GET", f"{base_url}/channels/stat", params=params,
+                         on_done=on_done(self.service.update_channel_stat)),
+        ]
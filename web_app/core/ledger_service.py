@@ -16,16 +16,32 @@ Double-entry ledger service with transaction helpers.
 from __future__ import annotations
 
 import uuid
-from dataclasses import dataclass
+from collections import defaultdict
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional
+from datetime import datetime
+from typing import Iterable, Optional
 
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction as db_transaction
-from django.db.models import Sum, Q
+from django.db.models import Count, OuterRef, Subquery, Sum, Q
+from django.utils import timezone
 
-from core.models import Channel, Account, LedgerEntry, AccountType, LegalEntity
+from core.models import Channel, Account, LedgerEntry, AccountType, LegalEntity, LedgerCheckpoint
+from web_app.logger import logger
+
+
+LEDGER_ACCOUNT_TYPES = (AccountType.CASH, AccountType.FROZEN, AccountType.REVENUE, AccountType.EXPENSE)
+
+# transaction_type -> (debit account, credit account) for the standard two-leg postings
+POSTING_RULES = {
+    LedgerEntry.TransactionType.INCOME: (AccountType.CASH, AccountType.REVENUE),
+    LedgerEntry.TransactionType.FREEZE: (AccountType.FROZEN, AccountType.CASH),
+    LedgerEntry.TransactionType.UNFREEZE: (AccountType.CASH, AccountType.FROZEN),
+    LedgerEntry.TransactionType.PAYOUT: (AccountType.EXPENSE, AccountType.CASH),
+    LedgerEntry.TransactionType.COMMISSION: (AccountType.EXPENSE, AccountType.CASH),
+}
 
 
 @dataclass
@@ -74,15 +90,52 @@ class DoubleEntryLedgerService:
         Returns:
             Dictionary mapping account_type to Account instance
         """
-        accounts = {}
-        for account_type in [AccountType.CASH, AccountType.FROZEN, AccountType.REVENUE, AccountType.EXPENSE]:
-            account, created = Account.objects.get_or_create(
-                channel=channel,
-                account_type=account_type,
-                currency=currency,
+        return cls.ensure_accounts_for_channels([channel.id], currency)[channel.id]
+
+    @classmethod
+    def ensure_accounts_for_channels(
+        cls,
+        channel_ids: Iterable,
+        currency: str = "RUB",
+    ) -> dict:
+        """
+        CHANGE: Resolve accounts for many channels at once
+        WHY: get_or_create per account type cost 4 queries per channel
+
+        One SELECT when every account exists; missing accounts are inserted
+        with a single bulk INSERT (ON CONFLICT DO NOTHING) and re-read once.
+
+        Returns:
+            Dictionary mapping channel_id -> {account_type -> Account}
+        """
+        channel_ids = list(dict.fromkeys(channel_ids))
+        result = {channel_id: {} for channel_id in channel_ids}
+        if not channel_ids:
+            return result
+
+        def _collect(qs):
+            for account in qs:
+                result[account.channel_id][account.account_type] = account
+
+        _collect(Account.objects.filter(channel_id__in=channel_ids, currency=currency))
+
+        missing = [
+            Account(channel_id=channel_id, account_type=account_type, currency=currency)
+            for channel_id in channel_ids
+            for account_type in LEDGER_ACCOUNT_TYPES
+            if account_type not in result[channel_id]
+        ]
+        if missing:
+            # ignore_conflicts: a concurrent writer may have created the same account,
+            # so ids are re-read instead of trusting the client-side uuid
+            Account.objects.bulk_create(missing, ignore_conflicts=True)
+            _collect(
+                Account.objects.filter(
+                    channel_id__in={account.channel_id for account in missing},
+                    currency=currency,
+                )
             )
-            accounts[account_type] = account
-        return accounts
+        return result
 
     @classmethod
     def calculate_balance(
@@ -158,6 +211,13 @@ class DoubleEntryLedgerService:
         cache_key = cls._get_cache_key(str(channel.id))
         cache.delete(cache_key)
 
+    @classmethod
+    def invalidate_cache_many(cls, channel_ids: Iterable) -> None:
+        """Invalidate cached balances for several channels with one delete_many"""
+        keys = [cls._get_cache_key(str(channel_id)) for channel_id in channel_ids]
+        if keys:
+            cache.delete_many(keys)
+
     @classmethod
     def get_balance_for_channels(cls, channels: list[Channel]) -> dict[str, ChannelBalance]:
         """
@@ -177,10 +237,10 @@ class DoubleEntryLedgerService:
             return {}
 
         # Get all accounts for these channels
-        accounts = Account.objects.filter(
+        accounts = list(Account.objects.filter(
             channel_id__in=channel_ids,
             account_type__in=[AccountType.CASH, AccountType.FROZEN]
-        ).select_related('channel')
+        ))
 
         # Build mapping: channel_id -> {account_type -> account}
         channel_accounts = {}
@@ -189,22 +249,18 @@ class DoubleEntryLedgerService:
                 channel_accounts[account.channel_id] = {}
             channel_accounts[account.channel_id][account.account_type] = account
 
-        # Get balances for all accounts
-        account_ids = [a.id for a in accounts]
-
-        # Get debits
-        debit_sums = LedgerEntry.objects.filter(
-            account_id__in=account_ids,
-            entry_type=LedgerEntry.EntryType.DEBIT
-        ).values('account_id').annotate(total=Sum('amount'))
-        debit_map = {item['account_id']: item['total'] or Decimal('0') for item in debit_sums}
-
-        # Get credits
-        credit_sums = LedgerEntry.objects.filter(
-            account_id__in=account_ids,
-            entry_type=LedgerEntry.EntryType.CREDIT
-        ).values('account_id').annotate(total=Sum('amount'))
-        credit_map = {item['account_id']: item['total'] or Decimal('0') for item in credit_sums}
+        # Debit and credit totals per account in one aggregate
+        sums = LedgerEntry.objects.filter(
+            account_id__in=[a.id for a in accounts]
+        ).values('account_id').annotate(
+            debit=Sum('amount', filter=Q(entry_type=LedgerEntry.EntryType.DEBIT)),
+            credit=Sum('amount', filter=Q(entry_type=LedgerEntry.EntryType.CREDIT)),
+        ).order_by()
+        debit_map = {}
+        credit_map = {}
+        for item in sums:
+            debit_map[item['account_id']] = item['debit'] or Decimal('0')
+            credit_map[item['account_id']] = item['credit'] or Decimal('0')
 
         # Calculate balances for each channel
         result = {}
@@ -240,6 +296,79 @@ class DoubleEntryLedgerService:
 
         return result
 
+    @classmethod
+    def prefetch_balances(cls, channels: Iterable[Channel]) -> dict[str, ChannelBalance]:
+        """
+        CHANGE: Balance prefetch for list pages
+        WHY: calculate_balance per row cost a Redis round-trip on a hit and
+             ensure_accounts + aggregates per account on a miss
+
+        Cached balances are read with one get_many, misses are computed with
+        get_balance_for_channels (2 queries for the whole page) and written back
+        with one set_many. The result is also stored on each instance as
+        _balance_cache, which the serializers and admin displays read first.
+
+        Returns:
+            Dictionary mapping channel_id to ChannelBalance
+        """
+        channels = list(channels)
+        zero = ChannelBalance(balance=Decimal('0'), frozen=Decimal('0'), available=Decimal('0'))
+        result = {str(c.id): zero for c in channels if getattr(c, 'is_deleted', False)}
+        active = {str(c.id): c for c in channels if not getattr(c, 'is_deleted', False)}
+
+        if active:
+            keys = {cls._get_cache_key(channel_id): channel_id for channel_id in active}
+            for key, cached in cache.get_many(list(keys)).items():
+                if cached:
+                    result[keys[key]] = ChannelBalance(**cached)
+
+            missing = [c for channel_id, c in active.items() if channel_id not in result]
+            if missing:
+                computed = cls.get_balance_for_channels(missing)
+                for c in missing:
+                    computed.setdefault(str(c.id), zero)
+                cache.set_many({
+                    cls._get_cache_key(channel_id): {
+                        'balance': str(balance.balance),
+                        'frozen': str(balance.frozen),
+                        'available': str(balance.available),
+                    }
+                    for channel_id, balance in computed.items()
+                }, cls.CACHE_TTL)
+                result.update(computed)
+
+        for channel in channels:
+            channel._balance_cache = result[str(channel.id)]
+        return result
+
+    @classmethod
+    def prefetch_legal_entity_balances(cls, legal_entities: Iterable[LegalEntity]) -> dict[str, ChannelBalance]:
+        """
+        Totals for several legal entities: one query for their channels plus
+        prefetch_balances. Stored on each instance as _totals_cache.
+        """
+        legal_entities = list(legal_entities)
+        channels = list(Channel.objects.filter(
+            legal_entity_id__in=[le.id for le in legal_entities], is_deleted=False
+        ))
+        balances = cls.prefetch_balances(channels)
+
+        totals = defaultdict(lambda: [Decimal('0'), Decimal('0')])
+        for channel in channels:
+            cb = balances[str(channel.id)]
+            totals[channel.legal_entity_id][0] += cb.balance
+            totals[channel.legal_entity_id][1] += cb.frozen
+
+        result = {}
+        for legal_entity in legal_entities:
+            total_balance, total_frozen = totals[legal_entity.id]
+            legal_entity._totals_cache = result[str(legal_entity.id)] = ChannelBalance(
+                balance=total_balance,
+                frozen=total_frozen,
+                available=max(total_balance - total_frozen, Decimal('0')),
+            )
+        return result
+
     @classmethod
     def get_legal_entity_balance(cls, legal_entity: LegalEntity) -> ChannelBalance:
         """Aggregate balance for all non-deleted channels of a legal entity"""
@@ -580,6 +709,567 @@ class DoubleEntryLedgerService:
 
         return debits == credits
 
+    # --- Point-in-time balances -------------------------------------------------
+
+    @staticmethod
+    def _signed_balance(account_type: str, debit: Decimal, credit: Decimal) -> Decimal:
+        """Same sign convention as Account.balance"""
+        if account_type in (AccountType.CASH, AccountType.FROZEN):
+            return debit - credit
+        return credit - debit
+
+    @classmethod
+    def _account_totals(
+        cls,
+        account_ids: Iterable,
+        until: datetime,
+        inclusive: bool = True,
+        period: Optional[str] = None,
+    ) -> dict:
+        """
+        CHANGE: Cumulative debit/credit per account up to a moment in time
+        WHY: Point-in-time balances must not sum the whole history
+
+        Latest checkpoint with period_end <= until + entries since it.
+        Three queries regardless of the number of accounts: latest checkpoint ids,
+        checkpoint rows, delta aggregate (accounts grouped by checkpoint period_end,
+        each group is an (account, created_at) range scan on the ledger index).
+        period restricts which checkpoints may be used as a starting point.
+
+        Returns:
+            {account_id: {"debit": Decimal, "credit": Decimal, "count": int, "delta_count": int}}
+        """
+        account_ids = list(account_ids)
+        totals = {
+            account_id: {"debit": Decimal("0"), "credit": Decimal("0"), "count": 0, "delta_count": 0}
+            for account_id in account_ids
+        }
+        if not account_ids:
+            return totals
+
+        checkpoints = LedgerCheckpoint.objects.filter(account_id=OuterRef("pk"), period_end__lte=until)
+        if period:
+            checkpoints = checkpoints.filter(period=period)
+        latest_checkpoint = (
+            checkpoints.order_by("-period_end")
+            .values("id")[:1]
+        )
+        checkpoint_ids = [
+            checkpoint_id
+            for checkpoint_id in Account.objects.filter(id__in=account_ids)
+            .annotate(checkpoint_id=Subquery(latest_checkpoint))
+            .values_list("checkpoint_id", flat=True)
+            if checkpoint_id
+        ]
+
+        since_by_account = {}
+        for checkpoint in LedgerCheckpoint.objects.filter(id__in=checkpoint_ids):
+            totals[checkpoint.account_id].update(
+                debit=checkpoint.debit_total,
+                credit=checkpoint.credit_total,
+                count=checkpoint.entries_count,
+            )
+            since_by_account[checkpoint.account_id] = checkpoint.period_end
+
+        accounts_by_since = defaultdict(list)
+        for account_id in account_ids:
+            accounts_by_since[since_by_account.get(account_id)].append(account_id)
+
+        upper = Q(created_at__lte=until) if inclusive else Q(created_at__lt=until)
+        delta_filter = Q()
+        for since, ids in accounts_by_since.items():
+            group = Q(account_id__in=ids)
+            if since is not None:
+                group &= Q(created_at__gte=since)
+            delta_filter |= group
+
+        deltas = (
+            LedgerEntry.objects.filter(upper & delta_filter)
+            .order_by()
+            .values("account_id", "entry_type")
+            .annotate(total=Sum("amount"), count=Count("id"))
+        )
+        for row in deltas:
+            bucket = totals[row["account_id"]]
+            key = "debit" if row["entry_type"] == LedgerEntry.EntryType.DEBIT else "credit"
+            bucket[key] += row["total"] or Decimal("0")
+            bucket["count"] += row["count"]
+            bucket["delta_count"] += row["count"]
+        return totals
+
+    @classmethod
+    def _balance_accounts(cls, account_or_channel) -> list[Account]:
+        if isinstance(account_or_channel, Account):
+            return [account_or_channel]
+        if isinstance(account_or_channel, Channel):
+            channels = Q(channel=account_or_channel)
+        elif isinstance(account_or_channel, LegalEntity):
+            channels = Q(channel__legal_entity=account_or_channel, channel__is_deleted=False)
+        else:
+            raise TypeError(f"Unsupported ledger owner: {account_or_channel!r}")
+        return list(
+            Account.objects.filter(channels, account_type__in=[AccountType.CASH, AccountType.FROZEN])
+        )
+
+    @classmethod
+    def balance_as_of(cls, account_or_channel, timestamp: datetime):
+        """
+        Balance at a moment in time (entries created at or before timestamp)
+
+        Args:
+            account_or_channel: Account, Channel or LegalEntity
+
+        Returns:
+            Decimal for an Account, ChannelBalance for a Channel/LegalEntity
+        """
+        accounts = cls._balance_accounts(account_or_channel)
+        totals = cls._account_totals([account.id for account in accounts], timestamp)
+
+        if isinstance(account_or_channel, Account):
+            item = totals[account_or_channel.id]
+            return cls._signed_balance(account_or_channel.account_type, item["debit"], item["credit"])
+
+        cash = Decimal("0")
+        frozen = Decimal("0")
+        for account in accounts:
+            item = totals[account.id]
+            value = cls._signed_balance(account.account_type, item["debit"], item["credit"])
+            if account.account_type == AccountType.CASH:
+                cash += value
+            else:
+                frozen += value
+        return ChannelBalance(
+            balance=cash + frozen,
+            frozen=max(frozen, Decimal("0")),
+            available=max(cash, Decimal("0")),
+        )
+
+    @classmethod
+    def get_statement(cls, account_or_channel, date_from: datetime, date_to: datetime) -> "LedgerStatement":
+        """
+        Statement for [date_from, date_to): opening balance, turnovers, entries, closing balance
+
+        For a Channel/LegalEntity the statement covers CASH + FROZEN accounts.
+        Entries are returned as a lazy queryset ordered by created_at.
+        """
+        accounts = cls._balance_accounts(account_or_channel)
+        account_ids = [account.id for account in accounts]
+        types = {account.id: account.account_type for account in accounts}
+
+        opening_totals = cls._account_totals(account_ids, date_from, inclusive=False)
+        opening = sum(
+            (cls._signed_balance(types[account_id], item["debit"], item["credit"])
+             for account_id, item in opening_totals.items()),
+            Decimal("0"),
+        )
+
+        entries = LedgerEntry.objects.filter(
+            account_id__in=account_ids,
+            created_at__gte=date_from,
+            created_at__lt=date_to,
+        )
+        debit_turnover = Decimal("0")
+        credit_turnover = Decimal("0")
+        change = Decimal("0")
+        for row in entries.order_by().values("account_id", "entry_type").annotate(total=Sum("amount")):
+            amount = row["total"] or Decimal("0")
+            if row["entry_type"] == LedgerEntry.EntryType.DEBIT:
+                debit_turnover += amount
+                change += cls._signed_balance(types[row["account_id"]], amount, Decimal("0"))
+            else:
+                credit_turnover += amount
+                change += cls._signed_balance(types[row["account_id"]], Decimal("0"), amount)
+
+        return LedgerStatement(
+            date_from=date_from,
+            date_to=date_to,
+            opening_balance=opening,
+            debit_turnover=debit_turnover,
+            credit_turnover=credit_turnover,
+            closing_balance=opening + change,
+            entries=entries.select_related("account").order_by("created_at"),
+        )
+
+    @staticmethod
+    def period_start(moment: datetime, period: str) -> datetime:
+        """Start of the (local) day or month containing moment"""
+        local = timezone.localtime(moment)
+        start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        if period == LedgerCheckpoint.Period.MONTH:
+            start = start.replace(day=1)
+        return start
+
+    @classmethod
+    def create_checkpoints(
+        cls,
+        period: str = LedgerCheckpoint.Period.DAY,
+        period_end: Optional[datetime] = None,
+        chunk_size: int = 500,
+    ) -> int:
+        """
+        Write checkpoints for all accounts with activity since their previous checkpoint
+        of the same period (day checkpoints build on day checkpoints, month on month)
+
+        period_end defaults to the start of the current day/month, i.e. only closed
+        periods are checkpointed. Idempotent: existing (account, period, period_end)
+        rows are left untouched.
+
+        LedgerEntry.created_at is set before commit, so an entry committed after a
+        run may still have created_at < that run's period_end. Each run therefore
+        first reconciles the previous checkpoint of every account
+        (reconcile_checkpoints) and rebuilds the ones that missed such entries.
+        Entries committed more than one period late are not detected.
+
+        Returns:
+            number of checkpoints written
+        """
+        if period_end is None:
+            period_end = cls.period_start(timezone.now(), period)
+
+        created = 0
+        account_ids = list(Account.objects.order_by("id").values_list("id", flat=True))
+        for offset in range(0, len(account_ids), chunk_size):
+            chunk = account_ids[offset:offset + chunk_size]
+            cls.reconcile_checkpoints(chunk, period, before=period_end)
+            totals = cls._account_totals(chunk, period_end, inclusive=False, period=period)
+            checkpoints = [
+                LedgerCheckpoint(
+                    account_id=account_id,
+                    period=period,
+                    period_end=period_end,
+                    debit_total=item["debit"],
+                    credit_total=item["credit"],
+                    entries_count=item["count"],
+                )
+                for account_id, item in totals.items()
+                if item["delta_count"]
+            ]
+            LedgerCheckpoint.objects.bulk_create(checkpoints, ignore_conflicts=True)
+            created += len(checkpoints)
+        return created
+
+    @classmethod
+    def reconcile_checkpoints(cls, account_ids: Iterable, period: str, before: datetime) -> int:
+        """
+        Re-count the last checkpointed period of each account and drop stale checkpoints
+
+        For the latest checkpoint (period_end < before) the number of entries in
+        [previous checkpoint, latest checkpoint) must equal the difference of their
+        entries_count. A mismatch means entries were committed after the checkpoint
+        was written; the checkpoint is deleted together with later checkpoints of
+        other periods, and the next checkpoint is built from the previous one.
+        Two queries for any number of accounts, plus one DELETE if something is stale.
+
+        Returns:
+            number of checkpoints deleted
+        """
+        account_ids = list(account_ids)
+        checkpoints = LedgerCheckpoint.objects.filter(
+            account_id=OuterRef("pk"), period=period, period_end__lt=before
+        ).order_by("-period_end")
+        previous = LedgerCheckpoint.objects.filter(
+            account_id=OuterRef("pk"), period=period, period_end__lt=OuterRef("latest_end")
+        ).order_by("-period_end")
+        rows = (
+            Account.objects.filter(id__in=account_ids)
+            .annotate(
+                latest_end=Subquery(checkpoints.values("period_end")[:1]),
+                latest_count=Subquery(checkpoints.values("entries_count")[:1]),
+            )
+            .filter(latest_end__isnull=False)
+            .annotate(
+                previous_end=Subquery(previous.values("period_end")[:1]),
+                previous_count=Subquery(previous.values("entries_count")[:1]),
+            )
+            .order_by()
+            .values_list("id", "latest_end", "latest_count", "previous_end", "previous_count")
+        )
+
+        expected = {}
+        accounts_by_window = defaultdict(list)
+        for account_id, latest_end, latest_count, previous_end, previous_count in rows:
+            expected[account_id] = (latest_count - (previous_count or 0), latest_end, previous_end)
+            accounts_by_window[(previous_end, latest_end)].append(account_id)
+        if not expected:
+            return 0
+
+        window_filter = Q()
+        for (previous_end, latest_end), ids in accounts_by_window.items():
+            group = Q(account_id__in=ids, created_at__lt=latest_end)
+            if previous_end is not None:
+                group &= Q(created_at__gte=previous_end)
+            window_filter |= group
+        actual = dict(
+            LedgerEntry.objects.filter(window_filter)
+            .order_by()
+            .values("account_id")
+            .annotate(count=Count("id"))
+            .values_list("account_id", "count")
+        )
+
+        stale = Q()
+        for account_id, (count, latest_end, previous_end) in expected.items():
+            if actual.get(account_id, 0) != count:
+                logger.warning(
+                    f"[Ledger] Checkpoint of account {account_id} at {latest_end} missed late-committed "
+                    f"entries ({actual.get(account_id, 0)} != {count}), rebuilding"
+                )
+                group = Q(account_id=account_id)
+                if previous_end is not None:
+                    group &= Q(period_end__gt=previous_end)
+                stale |= group
+        if not stale:
+            return 0
+        deleted, _ = LedgerCheckpoint.objects.filter(stale).delete()
+        return deleted
+
+
+@dataclass
+class LedgerStatement:
+    """Account/channel statement for a date range (see DoubleEntryLedgerService.get_statement)"""
+    date_from: datetime
+    date_to: datetime
+    opening_balance: Decimal
+    debit_turnover: Decimal
+    credit_turnover: Decimal
+    closing_balance: Decimal
+    entries: object
+
+
+@dataclass
+class LedgerPosting:
+    """
+    One balanced ledger transaction waiting to be written by LedgerBatch
+
+    lines: (account_type, entry_type, amount) legs of the transaction
+    """
+    channel_id: uuid.UUID
+    transaction_type: str
+    lines: list[tuple[str, str, Decimal]]
+    description: str = ""
+    source_type: str = ""
+    source_id: Optional[uuid.UUID] = None
+    metadata: dict = field(default_factory=dict)
+    currency: str = "RUB"
+    transaction_id: uuid.UUID = field(default_factory=uuid.uuid4)
+
+    def validate(self) -> None:
+        """Debit must equal credit, every leg must be positive"""
+        if len(self.lines) < 2:
+            raise ValidationError("Transaction needs at least one debit and one credit line")
+        debit = Decimal("0")
+        credit = Decimal("0")
+        for account_type, entry_type, amount in self.lines:
+            if amount <= 0:
+                raise ValidationError("Amount must be positive")
+            if entry_type == LedgerEntry.EntryType.DEBIT:
+                debit += amount
+            else:
+                credit += amount
+        if debit != credit:
+            raise ValidationError(
+                f"Unbalanced transaction {self.transaction_id}: debit {debit} != credit {credit}"
+            )
+
+
+class LedgerBatch:
+    """
+    CHANGE: Batched ledger posting API
+    WHY: record_* per call = ensure_accounts (4 queries) + 2 INSERTs + 2 cache deletes;
+         crediting a 500-channel campaign took ~3000 queries
+
+    Collects postings in memory and writes them at once:
+    - accounts for all channels resolved in one SELECT (+ one INSERT for missing ones)
+    - debit = credit validated per transaction before touching the DB
+    - every entry inserted with one bulk_create
+    - balance caches invalidated with one delete_many
+
+    bulk_create bypasses LedgerEntry.save()/post_save, so validation and cache
+    invalidation are done here.
+
+    Usage:
+        batch = LedgerBatch()
+        for cc in campaign_channels:
+            batch.add_income(cc.channel, cc.earned_money, source_type="campaign_channel", source_id=cc.id)
+        tx_ids = batch.commit()
+    """
+
+    # transaction types that take money out of CASH/FROZEN and must be covered by the balance
+    OUTGOING = {
+        LedgerEntry.TransactionType.FREEZE: AccountType.CASH,
+        LedgerEntry.TransactionType.PAYOUT: AccountType.CASH,
+        LedgerEntry.TransactionType.COMMISSION: AccountType.CASH,
+        LedgerEntry.TransactionType.UNFREEZE: AccountType.FROZEN,
+    }
+
+    def __init__(self, check_balance: bool = True):
+        self.check_balance = check_balance
+        self.postings: list[LedgerPosting] = []
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def add(
+        self,
+        channel: Channel,
+        amount: Decimal,
+        transaction_type: str,
+        description: str = "",
+        source_type: str = "",
+        source_id: Optional[uuid.UUID] = None,
+        metadata: Optional[dict] = None,
+        currency: str = "RUB",
+    ) -> uuid.UUID:
+        """Queue a standard two-leg transaction (see POSTING_RULES)"""
+        if transaction_type not in POSTING_RULES:
+            raise ValidationError(f"Unsupported transaction type for batch posting: {transaction_type}")
+        amount = Decimal(str(amount))
+        debit_account, credit_account = POSTING_RULES[transaction_type]
+        label = LedgerEntry.TransactionType(transaction_type).name.capitalize()
+        return self.add_transaction(
+            channel,
+            transaction_type,
+            lines=[
+                (debit_account, LedgerEntry.EntryType.DEBIT, amount),
+                (credit_account, LedgerEntry.EntryType.CREDIT, amount),
+            ],
+            description=description or f"{label} {amount}",
+            source_type=source_type,
+            source_id=source_id,
+            metadata=metadata,
+            currency=currency,
+        )
+
+    def add_transaction(
+        self,
+        channel: Channel,
+        transaction_type: str,
+        lines: list[tuple[str, str, Decimal]],
+        description: str = "",
+        source_type: str = "",
+        source_id: Optional[uuid.UUID] = None,
+        metadata: Optional[dict] = None,
+        currency: str = "RUB",
+    ) -> uuid.UUID:
+        """Queue an arbitrary multi-leg transaction; validated immediately"""
+        posting = LedgerPosting(
+            channel_id=channel.id,
+            transaction_type=transaction_type,
+            lines=[(account_type, entry_type, Decimal(str(amount))) for account_type, entry_type, amount in lines],
+            description=description,
+            source_type=source_type,
+            source_id=source_id,
+            metadata=metadata or {},
+            currency=currency,
+        )
+        posting.validate()
+        self.postings.append(posting)
+        return posting.transaction_id
+
+    def add_income(self, channel: Channel, amount: Decimal, **kwargs) -> uuid.UUID:
+        return self.add(channel, amount, LedgerEntry.TransactionType.INCOME, **kwargs)
+
+    def add_freeze(self, channel: Channel, amount: Decimal, **kwargs) -> uuid.UUID:
+        return self.add(channel, amount, LedgerEntry.TransactionType.FREEZE, **kwargs)
+
+    def add_unfreeze(self, channel: Channel, amount: Decimal, **kwargs) -> uuid.UUID:
+        return self.add(channel, amount, LedgerEntry.TransactionType.UNFREEZE, **kwargs)
+
+    def add_payout(self, channel: Channel, amount: Decimal, **kwargs) -> uuid.UUID:
+        kwargs.setdefault("source_type", "payout")
+        return self.add(channel, amount, LedgerEntry.TransactionType.PAYOUT, **kwargs)
+
+    def add_commission(self, channel: Channel, amount: Decimal, **kwargs) -> uuid.UUID:
+        return self.add(channel, amount, LedgerEntry.TransactionType.COMMISSION, **kwargs)
+
+    def _check_balances(self) -> None:
+        """
+        Apply postings to current CASH/FROZEN balances in order and reject the batch
+        if any channel would go below zero (same rule as freeze_amount/record_payout)
+        """
+        channel_ids = {
+            posting.channel_id for posting in self.postings if posting.transaction_type in self.OUTGOING
+        }
+        if not channel_ids:
+            return
+
+        running = defaultdict(lambda: defaultdict(Decimal))
+        accounts = Account.objects.filter(
+            channel_id__in=channel_ids,
+            account_type__in=[AccountType.CASH, AccountType.FROZEN],
+        )
+        sums = (
+            LedgerEntry.objects.filter(account__in=accounts)
+            .values("account__channel_id", "account__account_type", "entry_type")
+            .annotate(total=Sum("amount"))
+        )
+        for row in sums:
+            sign = 1 if row["entry_type"] == LedgerEntry.EntryType.DEBIT else -1
+            running[row["account__channel_id"]][row["account__account_type"]] += sign * (row["total"] or 0)
+
+        for posting in self.postings:
+            if posting.channel_id not in channel_ids:
+                continue
+            balances = running[posting.channel_id]
+            for account_type, entry_type, amount in posting.lines:
+                if account_type not in (AccountType.CASH, AccountType.FROZEN):
+                    continue
+                balances[account_type] += amount if entry_type == LedgerEntry.EntryType.DEBIT else -amount
+            source_account = self.OUTGOING.get(posting.transaction_type)
+            if source_account and balances[source_account] < 0:
+                label = "frozen" if source_account == AccountType.FROZEN else "available"
+                raise ValidationError(
+                    f"Insufficient {label} balance for channel {posting.channel_id} "
+                    f"(transaction {posting.transaction_id})"
+                )
+
+    @db_transaction.atomic
+    def commit(self) -> list[uuid.UUID]:
+        """
+        Write all queued postings atomically
+
+        Returns:
+            transaction ids in the order postings were added
+        """
+        if not self.postings:
+            return []
+
+        if self.check_balance:
+            self._check_balances()
+
+        channel_ids_by_currency = defaultdict(list)
+        for posting in self.postings:
+            channel_ids_by_currency[posting.currency].append(posting.channel_id)
+        accounts = {
+            currency: DoubleEntryLedgerService.ensure_accounts_for_channels(channel_ids, currency)
+            for currency, channel_ids in channel_ids_by_currency.items()
+        }
+
+        entries = []
+        for posting in self.postings:
+            channel_accounts = accounts[posting.currency][posting.channel_id]
+            for account_type, entry_type, amount in posting.lines:
+                entries.append(
+                    LedgerEntry(
+                        account=channel_accounts[account_type],
+                        amount=amount,
+                        entry_type=entry_type,
+                        transaction_id=posting.transaction_id,
+                        transaction_type=posting.transaction_type,
+                        description=posting.description,
+                        source_type=posting.source_type,
+                        source_id=posting.source_id,
+                        metadata=posting.metadata,
+                    )
+                )
+        LedgerEntry.objects.bulk_create(entries)
+
+        DoubleEntryLedgerService.invalidate_cache_many({posting.channel_id for posting in self.postings})
+
+        tx_ids = [posting.transaction_id for posting in self.postings]
+        self.postings = []
+        return tx_ids
+
 
 # Backward compatibility: alias to new service
 BalanceService = DoubleEntryLedgerService
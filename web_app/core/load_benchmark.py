@@ -0,0 +1,438 @@
+"""
+CHANGE: Scenario benchmark of the hot API / admin paths on seeded volumes
+WHY: Only functional tests existed; regressions in query count or latency of the
+     bot polling, click redirects, request-publication, channel list, admin
+     changelists and media plan generation were found in production
+
+BenchmarkSeeder наполняет базу через фабрики core.tests.factories (build + bulk_create,
+сигналы не срабатывают) в объёмах SCALE_1 * scale: каналы со слотами по умолчанию,
+владельцы, активные кампании, размещения и пары проводок главной книги.
+BenchmarkRunner прогоняет сценарии SCENARIOS через django.test.Client и считает
+p50/p95/p99, пропускную способность (один клиент, в процессе) и число запросов к
+БД (core.request_profiler.profile_queries). Внешний мир не измеряется: POST в бот
+возвращает 200, постановка Celery-задач заглушена.
+
+Запуск — manage.py benchmark_api, результаты — JSON для сравнения между коммитами.
+"""
+from __future__ import annotations
+
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from datetime import time as dt_time
+from decimal import Decimal
+from typing import Callable, Optional
+from unittest import mock
+
+import requests
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from core.ledger_service import LEDGER_ACCOUNT_TYPES
+from core.models import (
+    Account,
+    AccountType,
+    Campaign,
+    CampaignChannel,
+    Channel,
+    ChannelAdmin,
+    ChannelPublicationSlot,
+    LedgerEntry,
+    Message,
+    PlacementFormat,
+    User,
+)
+from core.request_profiler import profile_queries
+from web_app.app_settings import app_settings
+
+SCALE_1 = {
+    "channels": 10_000,
+    "channel_admins": 2_000,
+    "campaigns": 500,
+    "campaign_channels": 50_000,
+    "ledger_entries": 1_000_000,
+}
+CHANNEL_PREFIX = "bench channel"
+BENCHMARK_USER = "benchmark"
+BENCHMARK_API_KEY = "benchmark-api-key"
+PUBLISH_STATUS_WEIGHTS = {
+    CampaignChannel.PublishStatusChoices.PUBLISHED: 60,
+    CampaignChannel.PublishStatusChoices.CONFIRMED: 15,
+    CampaignChannel.PublishStatusChoices.PLANNED: 20,
+    CampaignChannel.PublishStatusChoices.REJECTED: 5,
+}
+
+
+class _ModelsSchema(dict):
+    """MIGRATION_MODULES without migrations: the schema is built from the models, as in the test suite"""
+
+    def __contains__(self, item):
+        return True
+
+    def __getitem__(self, item):
+        return None
+
+
+@contextmanager
+def benchmark_database(keepdb: bool = False):
+    """Separate test_<NAME> database for the benchmark commands, working data is not touched"""
+    setup_test_environment()
+    with override_settings(MIGRATION_MODULES=_ModelsSchema()):
+        old_name = connection.creation.create_test_db(verbosity=0, keepdb=keepdb, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=keepdb)
+        teardown_test_environment()
+
+
+def percentile(values: list[float], pct: int) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+class BenchmarkSeeder:
+    """
+    Deterministic (seed) data set of SCALE_1 * scale rows
+    """
+
+    CHUNK = 5000
+
+    def __init__(self, scale: float = 1.0, seed: int = 42, log: Optional[Callable[[str], None]] = None):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+
+    def volumes(self) -> dict[str, int]:
+        return {name: max(1, int(count * self.scale)) for name, count in SCALE_1.items()}
+
+    def is_seeded(self) -> bool:
+        return Channel.objects.filter(name__startswith=CHANNEL_PREFIX).count() == self.volumes()["channels"]
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _bulk(self, model, rows: list) -> list:
+        for start in range(0, len(rows), self.CHUNK):
+            model.objects.bulk_create(rows[start:start + self.CHUNK])
+        self.log(f"{model._meta.model_name}: {len(rows)}")
+        return rows
+
+    def seed_data(self) -> dict[str, int]:
+        from core.tests import factories
+
+        factories.factory.random.reseed_random(self.seed)
+        volumes = self.volumes()
+        now = timezone.now()
+        today = timezone.localdate()
+
+        channels = self._bulk(Channel, [
+            factories.ChannelFactory.build(
+                id=self._uuid(),
+                name=f"{CHANNEL_PREFIX} {i}",
+                tg_id=str(-1_000_000_000 - i),
+                username=f"bench_channel_{i}",
+                members_count=self.rng.randint(100, 500_000),
+            )
+            for i in range(volumes["channels"])
+        ])
+        # как create_default_publication_slots: 8:00–21:00 по часу на каждый день недели
+        self._bulk(ChannelPublicationSlot, [
+            ChannelPublicationSlot(
+                channel=channel, weekday=weekday, start_time=dt_time(hour), end_time=dt_time(hour + 1)
+            )
+            for channel in channels
+            for weekday in range(7)
+            for hour in range(8, 21)
+        ])
+
+        admins = self._bulk(ChannelAdmin, [
+            factories.ChannelAdminFactory.build(
+                id=self._uuid(),
+                username=f"bench_admin_{i}",
+                tg_id=str(2_000_000_000 + i),
+                role=ChannelAdmin.Role.OWNER,
+                is_bot_installed=self.rng.random() < 0.8,
+            )
+            for i in range(volumes["channel_admins"])
+        ])
+        channel_admin = {channel.pk: admins[i % len(admins)] for i, channel in enumerate(channels)}
+        self._bulk(ChannelAdmin.channels.through, [
+            ChannelAdmin.channels.through(channeladmin_id=admin.pk, channel_id=channel_id)
+            for channel_id, admin in channel_admin.items()
+        ])
+
+        formats = [PlacementFormat.FIXED_SLOT, PlacementFormat.AUTOPILOT, PlacementFormat.SPONSORSHIP]
+        messages = self._bulk(Message, [
+            factories.MessageFactory.build(id=self._uuid(), format=formats[i % len(formats)])
+            for i in range(volumes["campaigns"])
+        ])
+        campaigns = self._bulk(Campaign, [
+            factories.CampaignFactory.build(
+                id=self._uuid(),
+                name=f"bench campaign {i}",
+                status=Campaign.Statuses.ACTIVE,
+                message=message,
+                format=message.format,
+                budget=Decimal(500_000),
+                start_date=today - timedelta(days=30),
+                finish_date=today + timedelta(days=30),
+                slot_publication_at=timezone.make_aware(
+                    datetime.combine(today + timedelta(days=i % 30), dt_time(8 + i % 13))
+                ),
+            )
+            for i, message in enumerate(messages)
+        ])
+
+        per_campaign = min(len(channels), -(-volumes["campaign_channels"] // len(campaigns)))
+        statuses, weights = zip(*PUBLISH_STATUS_WEIGHTS.items())
+        placements = []
+        for k, campaign in enumerate(campaigns):
+            offset = (k * per_campaign) % len(channels)
+            for j in range(per_campaign):
+                if len(placements) == volumes["campaign_channels"]:
+                    break
+                channel = channels[(offset + j) % len(channels)]
+                placement = factories.CampaignChannelFactory.build(
+                    id=self._uuid(),
+                    campaign=campaign,
+                    channel=channel,
+                    channel_admin=channel_admin[channel.pk],
+                    message_publish_date=now + timedelta(hours=self.rng.randint(-24 * 30, 24 * 30)),
+                )
+                placement.publish_status = self.rng.choices(statuses, weights)[0]
+                placements.append(placement)
+        self._bulk(CampaignChannel, placements)
+
+        accounts = self._bulk(Account, [
+            factories.AccountFactory.build(id=self._uuid(), channel=channel, account_type=account_type)
+            for channel in channels
+            for account_type in LEDGER_ACCOUNT_TYPES
+        ])
+        cash = [account for account in accounts if account.account_type == AccountType.CASH]
+        revenue = {account.channel_id: account for account in accounts if account.account_type == AccountType.REVENUE}
+        entries = []
+        # пары дебет/кредит одной транзакции начисления дохода
+        for _ in range(volumes["ledger_entries"] // 2):
+            account = self.rng.choice(cash)
+            amount = Decimal(self.rng.randint(100, 1_000_000)) / 100
+            transaction_id = self._uuid()
+            for entry_type, target in (
+                (LedgerEntry.EntryType.DEBIT, account),
+                (LedgerEntry.EntryType.CREDIT, revenue[account.channel_id]),
+            ):
+                entries.append(factories.LedgerEntryFactory.build(
+                    id=self._uuid(),
+                    account=target,
+                    amount=amount,
+                    entry_type=entry_type,
+                    transaction_id=transaction_id,
+                ))
+            if len(entries) >= self.CHUNK:
+                LedgerEntry.objects.bulk_create(entries)
+                entries = []
+        LedgerEntry.objects.bulk_create(entries)
+        self.log(f"ledgerentry: {volumes['ledger_entries'] // 2 * 2}")
+
+        if not User.objects.filter(username=BENCHMARK_USER).exists():
+            User.objects.create_superuser(username=BENCHMARK_USER, password=BENCHMARK_USER)
+        return volumes
+
+
+@dataclass
+class BenchmarkContext:
+    """Ids sampled from the seeded data, requests pick from them with the runner's rng"""
+
+    channel_tg_ids: list[str]
+    channel_ids: list[str]
+    campaign_ids: list[str]
+    published_ids: list[str]
+    user: User
+    # курсор страницы из последних 10% размещений — глубокая страница keyset-пагинации
+    deep_cursor: str = ""
+
+    @classmethod
+    def load(cls, sample: int = 1000) -> "BenchmarkContext":
+        channels = Channel.objects.filter(name__startswith=CHANNEL_PREFIX, is_deleted=False).order_by("name")
+        published = CampaignChannel.objects.filter(
+            publish_status=CampaignChannel.PublishStatusChoices.PUBLISHED,
+            campaign__is_archived=False,
+            channel__is_deleted=False,
+        ).order_by("id")
+        return cls(
+            channel_tg_ids=[str(tg_id) for tg_id in channels.values_list("tg_id", flat=True)[:sample]],
+            channel_ids=[str(pk) for pk in channels.values_list("id", flat=True)[:sample]],
+            campaign_ids=[
+                str(pk) for pk in Campaign.objects.filter(is_archived=False).order_by("id").values_list("id", flat=True)[:sample]
+            ],
+            published_ids=[str(pk) for pk in published.values_list("id", flat=True)[:sample]],
+            user=User.objects.get(username=BENCHMARK_USER),
+            deep_cursor=cls._deep_cursor(),
+        )
+
+    @staticmethod
+    def _deep_cursor() -> str:
+        from core.pagination import KeysetPagination
+
+        paginator = KeysetPagination()
+        rows = CampaignChannel.objects.order_by(*paginator.ordering)
+        position = rows.values_list(*paginator.ordering)[int(rows.count() * 0.9)]
+        return paginator.encode_cursor(position)
+
+
+# name -> (rng, context) -> (method, path, client kwargs, authenticated)
+SCENARIOS: dict[str, Callable] = {
+    "unpublished_campaigns": lambda rng, ctx: (
+        "post",
+        "/api/campaign-channel/unpublished-campaigns/",
+        {"data": {"channel_tg_id": rng.choice(ctx.channel_tg_ids), "is_message_published": False},
+         "content_type": "application/json"},
+        False,
+    ),
+    "click_redirect": lambda rng, ctx: (
+        "get", f"/api/campaign-channel/{rng.choice(ctx.published_ids)}/click/", {"data": {"button_index": 0}}, False,
+    ),
+    "request_publication": lambda rng, ctx: (
+        "post",
+        "/api/publication-request/request-publication/",
+        {"data": {"channel_id": rng.choice(ctx.channel_ids), "format": PlacementFormat.FIXED_SLOT},
+         "content_type": "application/json",
+         "HTTP_AUTHORIZATION": f"Bearer {BENCHMARK_API_KEY}"},
+        False,
+    ),
+    # первая страница keyset-пагинации (core.pagination)
+    "channel_list": lambda rng, ctx: ("get", "/api/channel/", {}, True),
+    "campaign_channel_list": lambda rng, ctx: ("get", "/api/campaign-channel/", {}, False),
+    "campaign_channel_deep_page": lambda rng, ctx: (
+        "get", "/api/campaign-channel/", {"data": {"cursor": ctx.deep_cursor}}, False,
+    ),
+    # узкий набор полей (?fields=, core.sparse_fields) против полного ответа
+    "campaign_channel_list_sparse": lambda rng, ctx: (
+        "get",
+        "/api/campaign-channel/",
+        {"data": {
+            "fields": "id,publish_status,channel.tg_id,campaign.name,campaign.message",
+            "expand": "campaign.message",
+        }},
+        False,
+    ),
+    "channel_by_tg_id": lambda rng, ctx: ("get", "/api/channel/", {"data": {"tg_id": rng.choice(ctx.channel_tg_ids)}}, False),
+    "admin_campaign_changelist": lambda rng, ctx: ("get", "/admin/core/campaign/", {}, True),
+    "admin_channel_changelist": lambda rng, ctx: ("get", "/admin/core/channel/", {}, True),
+    "admin_campaignchannel_changelist": lambda rng, ctx: ("get", "/admin/core/campaignchannel/", {}, True),
+    "generate_media_plan": lambda rng, ctx: (
+        "post",
+        "/api/campaign/generate-media-plan/",
+        {"data": {"campaign_ids": rng.sample(ctx.campaign_ids, min(5, len(ctx.campaign_ids)))},
+         "content_type": "application/json"},
+        True,
+    ),
+}
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    latencies: list[float] = field(default_factory=list)
+    queries: list[int] = field(default_factory=list)
+    errors: int = 0
+    statuses: dict[str, int] = field(default_factory=dict)
+
+    def add(self, elapsed: float, queries: int, status_code: int) -> None:
+        self.latencies.append(elapsed)
+        self.queries.append(queries)
+        self.statuses[str(status_code)] = self.statuses.get(str(status_code), 0) + 1
+        # 4xx — ответ сценария (например, 404 «нет подходящего креатива»), видны в statuses
+        if status_code >= 500:
+            self.errors += 1
+
+    def as_dict(self) -> dict:
+        total = sum(self.latencies)
+        to_ms = lambda value: round(value * 1000, 3)  # noqa: E731
+        return {
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "statuses": self.statuses,
+            "p50_ms": to_ms(percentile(self.latencies, 50)),
+            "p95_ms": to_ms(percentile(self.latencies, 95)),
+            "p99_ms": to_ms(percentile(self.latencies, 99)),
+            "mean_ms": to_ms(total / len(self.latencies)) if self.latencies else 0.0,
+            "throughput_rps": round(len(self.latencies) / total, 2) if total else 0.0,
+            "queries_p50": percentile(self.queries, 50),
+            "queries_max": max(self.queries, default=0),
+        }
+
+
+class BenchmarkRunner:
+    """
+    Replays SCENARIOS sequentially against the current database
+    """
+
+    def __init__(self, context: BenchmarkContext, requests_per_scenario: int = 200, warmup: int = 10, seed: int = 42):
+        self.context = context
+        self.requests = requests_per_scenario
+        self.warmup = warmup
+        self.rng = random.Random(seed)
+        self.anonymous = Client(raise_request_exception=False)
+        self.authenticated = Client(raise_request_exception=False)
+        self.authenticated.force_login(context.user)
+
+    def _stubs(self, stack: ExitStack) -> None:
+        bot_response = requests.Response()
+        bot_response.status_code = 200
+        bot_response._content = b'{"sent": [], "failed": []}'
+        stack.enter_context(mock.patch("requests.post", return_value=bot_response))
+        stack.enter_context(mock.patch("celery.app.task.Task.apply_async"))
+        stack.enter_context(mock.patch.object(app_settings, "PARSER_MICROSERVICE_API_KEY", BENCHMARK_API_KEY))
+        stack.enter_context(override_settings(
+            QUERY_BUDGET_STRICT=False, MEDIA_ROOT=stack.enter_context(tempfile.TemporaryDirectory())
+        ))
+
+    def _request(self, scenario: Callable):
+        method, path, kwargs, authenticated = scenario(self.rng, self.context)
+        client = self.authenticated if authenticated else self.anonymous
+        with profile_queries() as profile:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, **kwargs)
+            elapsed = time.perf_counter() - started
+        return elapsed, profile.queries, response.status_code
+
+    def run(self, names: Optional[list[str]] = None) -> dict[str, ScenarioResult]:
+        results = {}
+        with ExitStack() as stack:
+            self._stubs(stack)
+            for name in names or list(SCENARIOS):
+                scenario = SCENARIOS[name]
+                for _ in range(self.warmup):
+                    self._request(scenario)
+                result = ScenarioResult(name)
+                for _ in range(self.requests):
+                    result.add(*self._request(scenario))
+                results[name] = result
+        return results
+
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """Human-readable p95 / query deltas of two benchmark_api JSON results"""
+    lines = []
+    for name, now in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        change = (now["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        lines.append(
+            f"{name}: p95 {before['p95_ms']:.1f} -> {now['p95_ms']:.1f} ms ({change:+.0f}%), "
+            f"queries {before['queries_p50']:g} -> {now['queries_p50']:g}"
+        )
+    return lines
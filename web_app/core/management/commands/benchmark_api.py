@@ -0,0 +1,98 @@
+import json
+import subprocess
+import time
+
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.load_benchmark import (
+    SCALE_1,
+    SCENARIOS,
+    BenchmarkContext,
+    BenchmarkRunner,
+    BenchmarkSeeder,
+    benchmark_database,
+    compare,
+)
+
+
+class Command(BaseCommand):
+    """
+    Scenario benchmark on a separate seeded database (core.load_benchmark)
+
+        python manage.py benchmark_api [--scale 1.0] [--requests 200] [--scenario channel_list ...]
+                                       [--keepdb] [--output result.json] [--compare baseline.json]
+
+    База — тестовая (test_<NAME>, схема по моделям, как в тестах), рабочие данные
+    не трогаются. С --keepdb база и данные сохраняются между запусками и повторно
+    не наполняются. --scale 1 —
+    10k каналов, 50k размещений, 1M проводок; для быстрой проверки хватает 0.01.
+    Нужен factory-boy (dev-зависимости).
+    """
+
+    help = "Seed benchmark volumes and replay hot API / admin scenarios"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", type=float, default=1.0)
+        parser.add_argument("--requests", type=int, default=200, help="measured requests per scenario")
+        parser.add_argument("--warmup", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), dest="scenarios")
+        parser.add_argument("--keepdb", action="store_true")
+        parser.add_argument("--output", help="write JSON results to this file")
+        parser.add_argument("--compare", help="JSON results of a previous run to print deltas against")
+
+    @staticmethod
+    def _git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        with benchmark_database(options["keepdb"]):
+            seeder = BenchmarkSeeder(options["scale"], options["seed"], log=lambda line: self.stdout.write(f"  {line}"))
+            seeded = not seeder.is_seeded()
+            if seeded:
+                started = time.perf_counter()
+                self.stdout.write(f"Seeding {seeder.volumes()}")
+                seeder.seed_data()
+                self.stdout.write(f"Seeded in {time.perf_counter() - started:.0f}s")
+
+            runner = BenchmarkRunner(
+                BenchmarkContext.load(), options["requests"], warmup=options["warmup"], seed=options["seed"]
+            )
+            results = runner.run(options["scenarios"])
+
+        report = {
+            "commit": self._git("rev-parse", "HEAD"),
+            "dirty": bool(self._git("status", "--porcelain", "--untracked-files=no")),
+            "created_at": timezone.now().isoformat(),
+            "scale": options["scale"],
+            "seed": options["seed"],
+            "volumes": seeder.volumes(),
+            "full_volumes": SCALE_1,
+            "seeded": seeded,
+            "scenarios": {name: result.as_dict() for name, result in results.items()},
+        }
+        for name, values in report["scenarios"].items():
+            self.stdout.write(
+                f"{name}: p50 {values['p50_ms']:.1f} p95 {values['p95_ms']:.1f} p99 {values['p99_ms']:.1f} ms, "
+                f"{values['throughput_rps']:.1f} rps, queries {values['queries_p50']:g} (max {values['queries_max']}), "
+                f"errors {values['errors']}"
+            )
+        if baseline:
+            for line in compare(baseline, report):
+                self.stdout.write(line)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Results written to {options['output']}")
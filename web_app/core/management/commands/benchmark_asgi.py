@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import httpx
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+from django.urls import include, path
+from rest_framework.authtoken.models import Token
+
+from core.load_benchmark import ScenarioResult, benchmark_database
+from core.models import User
+from core.tests.factories import MessageFactory
+from web_app.app_settings import app_settings
+
+
+class _SlowUpstream(BaseHTTPRequestHandler):
+    delay = 1.0
+
+    def _answer(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    do_GET = do_POST = _answer
+
+    def log_message(self, format, *args):
+        pass
+
+
+def asgi_urlconf():
+    """ROOT_URLCONF as under web_app/asgi.py: async routes of core.urls first"""
+    from core import urls as core_urls
+    from web_app import urls as web_urls
+
+    module = types.ModuleType("benchmark_asgi_urls")
+    module.urlpatterns = [path("api/", include((core_urls.async_urls, "core"))), *web_urls.urlpatterns]
+    return module
+
+
+class Command(BaseCommand):
+    """
+    Concurrency of MessageViewSet.preview with a slow bot (fake upstream answering after --delay)
+
+        python manage.py benchmark_asgi [--delay 1] [--concurrency 50] [--workers 6]
+
+    sync — как gunicorn-cfg.py: --workers sync-воркеров (потоки с WSGI-обработчиком),
+    бот уведомляется задачей Celery после коммита (core.preview_tokens);
+    asgi — ASGIHandler с async-маршрутами core.urls.async_urls (core.async_http),
+    все --concurrency запросов одновременно. База — отдельная тестовая.
+    """
+
+    help = "Compare sync workers and ASGI async views under a slow upstream"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--delay", type=float, default=1.0, help="upstream answer delay, seconds")
+        parser.add_argument("--concurrency", type=int, default=50, help="simultaneous requests")
+        parser.add_argument("--workers", type=int, default=6, help="sync workers, as in gunicorn-cfg.py")
+        parser.add_argument("--output", help="write JSON results to this file")
+
+    def _sync(self, url, headers, options) -> tuple[ScenarioResult, float]:
+        result = ScenarioResult("sync")
+        local = threading.local()
+
+        handler = WSGIHandler()
+
+        def call(_):
+            if not hasattr(local, "client"):
+                local.client = httpx.Client(transport=httpx.WSGITransport(app=handler), base_url="http://testserver")
+            started = time.perf_counter()
+            response = local.client.post(url, headers=headers)
+            return time.perf_counter() - started, response.status_code
+
+        call(None)  # прогрев: загрузка middleware и URLconf не входит в замер
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as pool:
+            for elapsed, status_code in pool.map(call, range(options["concurrency"])):
+                result.add(elapsed, 0, status_code)
+        return result, time.perf_counter() - started
+
+    def _asgi(self, url, headers, options) -> tuple[ScenarioResult, float]:
+        result = ScenarioResult("asgi")
+
+        async def run():
+            transport = httpx.ASGITransport(app=ASGIHandler())
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver", timeout=None) as client:
+
+                async def call():
+                    started = time.perf_counter()
+                    response = await client.post(url, headers=headers)
+                    result.add(time.perf_counter() - started, 0, response.status_code)
+
+                await client.post(url, headers=headers)  # прогрев, как в _sync
+                started = time.perf_counter()
+                await asyncio.gather(*(call() for _ in range(options["concurrency"])))
+                return time.perf_counter() - started
+
+        with override_settings(ROOT_URLCONF=asgi_urlconf()):
+            wall = asyncio.run(run())
+        return result, wall
+
+    def handle(self, *args, **options):
+        _SlowUpstream.delay = options["delay"]
+        upstream = ThreadingHTTPServer(("127.0.0.1", 0), _SlowUpstream)
+        threading.Thread(target=upstream.serve_forever, daemon=True).start()
+        domain = f"http://127.0.0.1:{upstream.server_address[1]}"
+
+        report = {"delay": options["delay"], "concurrency": options["concurrency"], "modes": {}}
+        try:
+            with benchmark_database(), mock.patch.object(app_settings, "DOMAIN_URI", domain):
+                user = User.objects.create_superuser(username="benchmark", password="benchmark")
+                headers = {"authorization": f"Token {Token.objects.create(user=user).key}"}
+                url = f"/api/message/{MessageFactory().pk}/preview/"
+                for mode, run in (("sync", self._sync), ("asgi", self._asgi)):
+                    result, wall = run(url, headers, options)
+                    values = result.as_dict()
+                    report["modes"][mode] = {
+                        "wall_s": round(wall, 3),
+                        "throughput_rps": round(options["concurrency"] / wall, 2),
+                        "p50_ms": values["p50_ms"],
+                        "p95_ms": values["p95_ms"],
+                        "statuses": values["statuses"],
+                    }
+        finally:
+            upstream.shutdown()
+
+        for mode, values in report["modes"].items():
+            self.stdout.write(
+                f"{mode}: {options['concurrency']} requests in {values['wall_s']:.2f}s "
+                f"({values['throughput_rps']:.1f} rps), p50 {values['p50_ms']:.0f} ms, "
+                f"p95 {values['p95_ms']:.0f} ms, statuses {values['statuses']}"
+            )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(report, f, indent=2)
@@ -0,0 +1,97 @@
+import random
+import statistics
+import time
+
+from django.core.management import BaseCommand
+from django.db import connection
+
+from core import channel_search
+from core.channel_search import ChannelSearch, create_trigram_indexes, drop_trigram_indexes
+from core.load_benchmark import benchmark_database
+from core.models import Channel
+
+WORDS = [
+    "новости", "спорт", "крипто", "финансы", "юмор", "кино", "музыка", "технологии", "путешествия", "еда",
+    "игры", "бизнес", "маркетинг", "дизайн", "наука", "здоровье", "авто", "мода", "книги", "политика",
+]
+LANGUAGES = ["ru", "en", "uk", "kz", "uz"]
+SEARCH_TERMS = ["крипто", "sport_4", "финансы юмор", "news_19999", "нетакогослова"]
+
+
+class Command(BaseCommand):
+    """
+    Channel search (core.channel_search) on a separate seeded database:
+    sequential scan vs pg_trgm GIN indexes
+
+        python manage.py benchmark_channel_search [--channels 200000] [--rounds 5] [--keepdb]
+
+    База — тестовая (core.load_benchmark.benchmark_database). Для каждого запроса —
+    медиана времени первой страницы (25 строк) с ранжированием и план запроса.
+    Без pg_trgm на сервере измеряется только вариант без индексов.
+    """
+
+    help = "Benchmark ranked channel search with and without trigram indexes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--channels", type=int, default=200_000)
+        parser.add_argument("--rounds", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--keepdb", action="store_true")
+
+    def _seed(self, count: int, seed: int) -> None:
+        if Channel.objects.count() >= count:
+            return
+        rng = random.Random(seed)
+        rows = []
+        for i in range(count):
+            topic = rng.sample(WORDS, 3)
+            rows.append(Channel(
+                name=f"{topic[0].capitalize()} {topic[1]} {i}",
+                username=f"{rng.choice(['sport', 'news', 'crypto', 'fun'])}_{i}",
+                category=topic[2],
+                about=" ".join(rng.choices(WORDS, k=12)),
+                language=rng.choice(LANGUAGES),
+                tg_id=str(-1_000_000_000 - i),
+            ))
+            if len(rows) == 5000:
+                Channel.objects.bulk_create(rows)
+                rows = []
+        Channel.objects.bulk_create(rows)
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE core_channel")
+
+    def _measure(self, term: str, rounds: int) -> tuple[float, str]:
+        qs = ChannelSearch.search(Channel.objects.all(), term)[:25]
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            list(qs.all())
+            timings.append((time.perf_counter() - started) * 1000)
+        plan = qs.explain()
+        scan = "trigram index" if "_trgm_idx" in plan else "seq scan" if "Seq Scan" in plan else "other"
+        return statistics.median(timings), scan
+
+    def _run(self, label: str, rounds: int) -> None:
+        channel_search._trigram_available.clear()
+        for term in SEARCH_TERMS:
+            ms, scan = self._measure(term, rounds)
+            self.stdout.write(f"{label}: {term!r}: {ms:.1f} ms ({scan})")
+
+    def handle(self, *args, **options):
+        with benchmark_database(keepdb=options["keepdb"]):
+            started = time.perf_counter()
+            self._seed(options["channels"], options["seed"])
+            self.stdout.write(f"{Channel.objects.count()} channels, seeded in {time.perf_counter() - started:.0f}s")
+
+            with connection.schema_editor() as schema_editor:
+                drop_trigram_indexes(schema_editor)
+            self._run("no index", options["rounds"])
+
+            with connection.schema_editor() as schema_editor:
+                create_trigram_indexes(schema_editor)
+            if not channel_search.trigram_available():
+                self.stderr.write("pg_trgm is not available on the server, indexed variant skipped")
+                return
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE core_channel")
+            self._run("trigram", options["rounds"])
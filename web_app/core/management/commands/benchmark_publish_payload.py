@@ -0,0 +1,66 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from core.ledger_service import DoubleEntryLedgerService as BalanceService
+from core.models import CampaignChannel
+from core.publish_payload import PublishPayloadService
+from core.serializers import CampaignChannelSerializer
+
+
+class Command(BaseCommand):
+    """
+    Serialization cost of the bot publish payload per 1000 publications:
+    full CampaignChannelSerializer vs PublishPayloadService (core.publish_payload)
+
+        python manage.py benchmark_publish_payload [--count 1000] [--rounds 3]
+
+    Берутся существующие CampaignChannel (по кругу до --count), изменения
+    не сохраняются. Перед каждым прогоном кэш балансов и креативов очищается.
+    """
+
+    help = "Compare full and slim publish payload serialization cost"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument("--rounds", type=int, default=3)
+
+    def _run(self, rows, render) -> dict:
+        BalanceService.invalidate_cache_many({row.channel_id for row in rows})
+        cache.delete_many([PublishPayloadService._message_key(row.campaign.message) for row in rows])
+        size = 0
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for row in rows:
+                size += len(render(row))
+            elapsed = time.perf_counter() - started
+        return {"ms": elapsed * 1000, "queries": len(queries.captured_queries), "bytes": size}
+
+    def handle(self, *args, **options):
+        base = list(
+            PublishPayloadService.queryset().filter(campaign__message__isnull=False)[: options["count"]]
+        )
+        if not base:
+            self.stderr.write("No campaign channels with a message to benchmark")
+            return
+        rows = [base[i % len(base)] for i in range(options["count"])]
+        renderer = JSONRenderer()
+        variants = {
+            "full": lambda row: renderer.render(CampaignChannelSerializer(row).data),
+            "slim": lambda row: renderer.render(PublishPayloadService.build(row)),
+        }
+        per_thousand = 1000 / len(rows)
+        with transaction.atomic():
+            for name, render in variants.items():
+                results = [self._run(rows, render) for _ in range(options["rounds"])]
+                self.stdout.write(
+                    f"{name}: {statistics.median(r['ms'] for r in results) * per_thousand:.1f} ms/1000, "
+                    f"{statistics.median(r['queries'] for r in results) * per_thousand:.0f} queries/1000, "
+                    f"{results[0]['bytes'] / len(rows):.0f} bytes/payload"
+                )
+            transaction.set_rollback(True)
@@ -19,6 +19,7 @@ from openpyxl import Workbook
 from openpyxl.styles import Alignment, Font, PatternFill
 from openpyxl.utils import get_column_letter
 
+from core.db_routing import using_reporting
 from core.media_plan.template import MediaPlanTemplate, MEDIA_PLAN_TEMPLATE
 from core.models import Campaign, CampaignChannel
 
@@ -63,14 +64,14 @@ class MediaPlanGenerator:
 
     def _prepare_campaigns(self, campaigns: QuerySet[Campaign] | Iterable[Campaign]) -> list[Campaign]:
         if isinstance(campaigns, QuerySet):
-            qs = campaigns.select_related("message").order_by("start_date", "name")
+            qs = using_reporting(campaigns.select_related("message").order_by("start_date", "name"))
             return list(qs)
         return list(campaigns)
 
     def _build_rows(self, campaigns: Sequence[Campaign]) -> list[dict]:
         """Aggregate per-campaign values for template columns."""
         stats = (
-            CampaignChannel.objects.filter(campaign__in=campaigns)
+            using_reporting(CampaignChannel.objects.filter(campaign__in=campaigns))
             .values("campaign_id")
             .annotate(
                 channels_count=Count("id", distinct=True),
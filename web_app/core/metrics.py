@@ -104,3 +104,52 @@ webhook_retry_total = Counter(
     'Number of webhook retry attempts',
     ['event_type', 'attempt']
 )
+
+# Scheduled publication lag: actual send time minus message_publish_date
+publication_publish_lag_seconds = Histogram(
+    'publication_publish_lag_seconds',
+    'Delay between planned and actual publication send',
+    ['source'],  # eta, sweep
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 900.0, 3600.0)
+)
+
+# Per-view instrumentation (core.request_profiler.RequestProfilerMiddleware)
+view_duration_seconds = Histogram(
+    'view_duration_seconds',
+    'Request processing time per resolved view',
+    ['view'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+view_db_queries = Histogram(
+    'view_db_queries',
+    'Number of database queries per request',
+    ['view'],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000)
+)
+
+view_db_duration_seconds = Histogram(
+    'view_db_duration_seconds',
+    'Time spent in database queries per request',
+    ['view'],
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+view_external_http_duration_seconds = Histogram(
+    'view_external_http_duration_seconds',
+    'Time spent in outgoing HTTP calls (requests, httpx) per request',
+    ['view'],
+    buckets=(0.0, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
+view_cache_requests_total = Counter(
+    'view_cache_requests_total',
+    'Cache reads per view',
+    ['view', 'result']  # hit, miss
+)
+
+view_query_budget_exceeded_total = Counter(
+    'view_query_budget_exceeded_total',
+    'Requests that made more queries than the view query_budget',
+    ['view']
+)
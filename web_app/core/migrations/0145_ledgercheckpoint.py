@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:51
+
+import django.db.models.deletion
+import django_prometheus.models
+import uuid
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0144_mediaplangeneration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerCheckpoint',
+            fields=[
+                ('id', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Обновлено')),
+                ('period', models.CharField(choices=[('day', 'День'), ('month', 'Месяц')], default='day', max_length=10, verbose_name='Период')),
+                ('period_end', models.DateTimeField(help_text='Учтены записи, созданные строго раньше этого момента', verbose_name='Конец периода')),
+                ('debit_total', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=16, verbose_name='Дебет (нарастающий итог)')),
+                ('credit_total', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=16, verbose_name='Кредит (нарастающий итог)')),
+                ('entries_count', models.PositiveIntegerField(default=0, verbose_name='Записей (нарастающий итог)')),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='checkpoints', to='core.account', verbose_name='Счёт')),
+            ],
+            options={
+                'verbose_name': 'Чекпоинт главной книги',
+                'verbose_name_plural': 'Чекпоинты главной книги',
+                'ordering': ['-period_end'],
+                'indexes': [models.Index(fields=['account', '-period_end'], name='core_ledger_account_29f4cf_idx')],
+                'unique_together': {('account', 'period', 'period_end')},
+            },
+            bases=(django_prometheus.models.ExportModelOperationsMixin('ledgercheckpoint'), models.Model),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:55
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import DecimalField, ExpressionWrapper, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_campaign_spent_amount(apps, schema_editor):
+    """Initial spent_amount = Σ round(cpm * impressions_fact / 1000, 2) per campaign"""
+    Campaign = apps.get_model('core', 'Campaign')
+    CampaignChannel = apps.get_model('core', 'CampaignChannel')
+
+    spend = Round(
+        ExpressionWrapper(
+            F('cpm') * F('impressions_fact') / Value(Decimal(1000)),
+            output_field=DecimalField(max_digits=16, decimal_places=4),
+        ),
+        2,
+    )
+    per_campaign = (
+        CampaignChannel.objects.filter(campaign_id=OuterRef('pk'))
+        .order_by()
+        .values('campaign_id')
+        .annotate(total=Sum(spend))
+        .values('total')[:1]
+    )
+    Campaign.objects.update(
+        spent_amount=Coalesce(
+            Subquery(per_campaign, output_field=DecimalField(max_digits=16, decimal_places=2)),
+            Value(Decimal('0')),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0145_ledgercheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='campaign',
+            name='spent_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), editable=False, help_text='Сумма CPM × показы-факт / 1000 по всем размещениям, обновляется при изменении статистики', max_digits=12, verbose_name='Израсходовано (руб.)'),
+        ),
+        migrations.AddField(
+            model_name='campaign',
+            name='spent_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Расход обновлён'),
+        ),
+        migrations.RunPython(backfill_campaign_spent_amount, migrations.RunPython.noop),
+    ]
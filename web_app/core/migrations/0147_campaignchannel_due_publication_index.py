@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0146_campaign_spent_amount'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='campaignchannel',
+            index=models.Index(condition=models.Q(('channel_post_id__isnull', True), ('message_publish_date__isnull', False), ('publish_status', 'confirmed')), fields=['message_publish_date'], name='campaignchannel_due_pub_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0147_campaignchannel_due_publication_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='channel',
+            index=models.Index(fields=['created_at', 'id'], name='channel_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='campaignchannel',
+            index=models.Index(fields=['created_at', 'id'], name='campaignchannel_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payout',
+            index=models.Index(fields=['created_at', 'id'], name='payout_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from core.channel_search import create_trigram_indexes, drop_trigram_indexes
+
+
+def forwards(apps, schema_editor):
+    create_trigram_indexes(schema_editor)
+
+
+def backwards(apps, schema_editor):
+    drop_trigram_indexes(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0148_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
@@ -15,7 +15,7 @@ except ImportError:
 
 from django.contrib import admin
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
 from web_app.logger import logger
 
 from django.db.models import JSONField, Sum, Avg, F, Q
@@ -25,6 +25,7 @@ from web_app.logger import logger
 
 from core.base_models import BaseModel
 from core.db_proxies import CampaignQS, CampaignChannelQs
+from core.db_routing import using_reporting
 from core.models_qs import ChannelAdminManager
 from core.models_validators import campaign_budget_validator
 from core.utils import sanitize_message_body
@@ -554,25 +555,27 @@ class Channel(ExportModelOperationsMixin("channel"), BaseModel):
             return timedelta(minutes=self.autopilot_min_interval)
         return None
 
+    @property
+    def slot_calendar(self):
+        """Cached occupancy calendar (core.slot_calendar)"""
+        from core.slot_calendar import SlotCalendarService
+
+        return SlotCalendarService.get(self)
+
     def allows_publication_datetime(self, scheduled_at: datetime | None) -> bool:
-        if not scheduled_at:
-            return True
-        return self.publication_slots.filter(
-            weekday=scheduled_at.weekday(),
-            start_time__lte=scheduled_at.time(),
-            end_time__gt=scheduled_at.time(),
-        ).exists()
+        return self.slot_calendar.allows(scheduled_at)
 
     def get_weekday_slot_labels(self, weekday: int) -> list[str]:
-        return [
-            slot.label
-            for slot in self.publication_slots.filter(weekday=weekday).order_by("start_time")
-        ]
+        return self.slot_calendar.slot_labels(weekday)
 
     class Meta:
         verbose_name_plural = "Каналы"
         verbose_name = "Канал"
         ordering = ["-created_at"]
+        indexes = [
+            # keyset-пагинация API (core.pagination.KeysetPagination)
+            models.Index(fields=["created_at", "id"], name="channel_keyset_idx"),
+        ]
 
 
 class ChannelPublicationSlot(BaseModel):
@@ -626,6 +629,8 @@ class Campaign(ExportModelOperationsMixin("campaign"), BaseModel):
         ACTIVE = "active", "Активна"
         PAUSED = "paused", "На паузе"
 
+    SPEND_FIELDS = ("spent_amount", "spent_updated_at")
+
     STATUS_TRANSITIONS: dict[str, set[str]] = {
         Statuses.DRAFT: {Statuses.DRAFT, Statuses.PAUSED, Statuses.ACTIVE},
         Statuses.ACTIVE: {Statuses.ACTIVE, Statuses.PAUSED},
@@ -700,6 +705,17 @@ class Campaign(ExportModelOperationsMixin("campaign"), BaseModel):
         blank=True, default="", verbose_name="Рекламодатель", help_text="Клиент"
     )
     brand = models.CharField(default="", verbose_name="Бренд", help_text="Бренд")
+    spent_amount = models.DecimalField(
+        verbose_name="Израсходовано (руб.)",
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0"),
+        editable=False,
+        help_text="Сумма CPM × показы-факт / 1000 по всем размещениям, обновляется при изменении статистики",
+    )
+    spent_updated_at = models.DateTimeField(
+        null=True, blank=True, editable=False, verbose_name="Расход обновлён"
+    )
 
     objects = CampaignQS.as_manager()
 
@@ -758,13 +774,15 @@ class Campaign(ExportModelOperationsMixin("campaign"), BaseModel):
             val = f"{self.total_clicks / self.total_impressions_fact * 100:.2f}%"
         return val
 
+    # CHANGE: admin statistics above and below read from the reporting database (core.db_routing)
+    # WHY: these aggregates run per changelist row and per change page
     @property
     def active_campaign_channels(self):
-        return self.campaigns_channel.filter(channel__is_deleted=False)
+        return using_reporting(self.campaigns_channel.filter(channel__is_deleted=False))
 
     @property
     def active_channels(self):
-        return self.channels.filter(is_deleted=False)
+        return using_reporting(self.channels.filter(is_deleted=False))
 
     @property
     def total_channels_count(self):
@@ -991,6 +1009,13 @@ class Campaign(ExportModelOperationsMixin("campaign"), BaseModel):
         self.clean_start_date()
         self.clean_finish_date()
 
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        if update_fields is None:
+            # spent_amount is maintained with F() increments, never write back a stale copy;
+            # explicit update_fields and INSERT (row is gone) still write it
+            values = [value for value in values if value[0].name not in self.SPEND_FIELDS]
+        return super()._do_update(base_qs, using, pk_val, values, update_fields, forced_update)
+
     def save(self, *args, **kwargs):
         previous_status = getattr(self, "_previous_status", None)
         super().save(*args, **kwargs)
@@ -1001,41 +1026,19 @@ class Campaign(ExportModelOperationsMixin("campaign"), BaseModel):
             self._notify_pending_channels_on_exit_from_draft(previous_status)
 
     def _notify_pending_channels_on_exit_from_draft(self, previous_status: str | None):
-        pending_qs = self.campaigns_channel.select_related("channel", "channel_admin").filter(
-            publish_status__in=[
-                CampaignChannel.PublishStatusChoices.PLANNED,
-                CampaignChannel.PublishStatusChoices.REJECTED,
-            ],
-            channel__auto_approve_publications=False,
-            channel__is_deleted=False,
-            channel_admin__isnull=False,
-            channel_admin__is_bot_installed=True,
-            approval_notified_at__isnull=True,
+        """Approval requests go out in batches from a Celery task (core.approval_requests)"""
+        from core.tasks import send_campaign_channel_approval_requests
+
+        campaign_id = str(self.id)
+        logger.info(
+            "[Campaign] Scheduling approval requests after draft exit",
+            extra={
+                "campaign_id": campaign_id,
+                "campaign_status": self.status,
+                "previous_status": previous_status,
+            },
         )
-
-        for channel in pending_qs:
-            try:
-                CampaignChannel.send_approval_request(channel)
-                channel.approval_notified_at = timezone.now()
-                channel.save(update_fields=["approval_notified_at"])
-                logger.info(
-                    "[Campaign] Sent approval request after draft exit",
-                    extra={
-                        "campaign_id": str(self.id),
-                        "campaign_status": self.status,
-                        "previous_status": previous_status,
-                        "campaign_channel_id": str(channel.id),
-                        "channel_id": str(channel.channel_id),
-                    },
-                )
-            except Exception as exc:  # pragma: no cover - defensive logging
-                logger.error(
-                    f"[Campaign] Failed to notify channel admin after draft exit: {exc}",
-                    extra={
-                        "campaign_id": str(self.id),
-                        "campaign_channel_id": str(channel.id),
-                    },
-                )
+        transaction.on_commit(lambda: send_campaign_channel_approval_requests.delay(campaign_id=campaign_id))
 
     def has_publications(self) -> bool:
         """
@@ -1154,6 +1157,35 @@ class CampaignChannel(ExportModelOperationsMixin("campaignchannel"), BaseModel):
     def budget(self):
         return self.cpm * self.impressions_fact / 1000 if self.cpm and self.impressions_fact else 0
 
+    @property
+    def spend(self) -> Decimal:
+        """Contribution of this placement to Campaign.spent_amount"""
+        from core.budget_service import campaign_channel_spend
+
+        return campaign_channel_spend(self.cpm, self.impressions_fact)
+
+    SPEND_SOURCE_FIELDS = ("campaign", "campaign_id", "cpm", "impressions_fact")
+
+    def _lock_previous_spend(self):
+        """
+        Read the stored (campaign_id, spend) under a row lock for incremental budget
+        tracking (core.budget_service); concurrent saves of the row are serialized,
+        so each one applies its delta against the committed value
+        """
+        row = (
+            CampaignChannel.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values_list("campaign_id", "cpm", "impressions_fact")
+            .first()
+        )
+        if row is None:
+            self._spend_previous = (None, Decimal("0"))
+            return
+        from core.budget_service import campaign_channel_spend
+
+        campaign_id, cpm, impressions_fact = row
+        self._spend_previous = (campaign_id, campaign_channel_spend(cpm, impressions_fact))
+
     @property
     def is_message_published(self) -> bool:
         return self.publish_status == self.PublishStatusChoices.PUBLISHED
@@ -1225,33 +1257,17 @@ class CampaignChannel(ExportModelOperationsMixin("campaignchannel"), BaseModel):
         scheduled_dt = self._scheduled_datetime()
         if not interval or not scheduled_dt:
             return
-        lower = scheduled_dt - interval
-        upper = scheduled_dt + interval
-        conflict_qs = (
-            CampaignChannel.objects.filter(
-                channel=channel,
-                campaign__format=PlacementFormat.AUTOPILOT,
-                publish_status__in=self.ACTIVE_PUBLISH_STATUSES,
-            )
-            .exclude(pk=self.pk)
-            .filter(
-                message_publish_date__isnull=False,
-                message_publish_date__gte=lower,
-                message_publish_date__lte=upper,
-            )
-            .order_by("-message_publish_date")
-        )
-        conflict = conflict_qs.first()
-        if conflict:
-            suggested = conflict.message_publish_date + interval
-            if suggested <= scheduled_dt:
-                suggested = scheduled_dt + interval
-            suggested_local = timezone.localtime(suggested)
+        from core.slot_calendar import SlotCalendarService
+
+        calendar = SlotCalendarService.exact(channel, since=scheduled_dt - interval)
+        if calendar.autopilot_conflict(scheduled_dt, exclude_id=self.pk):
+            windows = calendar.next_free_windows(scheduled_dt, 3, autopilot=True, exclude_id=self.pk)
+            options = ", ".join(timezone.localtime(w).strftime('%d.%m.%Y %H:%M') for w in windows)
             raise ValidationError(
                 {
                     "message_publish_date": (
                         f"Для канала установлен интервал {channel.autopilot_min_interval} мин."
-                        f" Ближайшее доступное окно: {suggested_local.strftime('%d.%m.%Y %H:%M')}."
+                        f" Ближайшие доступные окна: {options}."
                     )
                 }
             )
@@ -1306,19 +1322,12 @@ class CampaignChannel(ExportModelOperationsMixin("campaignchannel"), BaseModel):
                         "publication_slot": "Выбранный слот не соответствует времени кампании."
                     }
                 )
-            if (
-                channel
-                and scheduled_dt
-                and CampaignChannel.objects.filter(
-                    channel=channel,
-                    publish_status__in=self.ACTIVE_PUBLISH_STATUSES,
-                    message_publish_date=scheduled_dt,
-                )
-                .exclude(pk=self.pk)
-                .exists()
-            ):
-                available = channel.get_weekday_slot_labels(slot.weekday) if channel else []
-                options = ", ".join(available[:5])
+            from core.slot_calendar import SlotCalendarService
+
+            calendar = SlotCalendarService.exact(channel, since=scheduled_dt) if channel and scheduled_dt else None
+            if calendar and calendar.is_taken(scheduled_dt, exclude_id=self.pk):
+                windows = calendar.next_free_windows(scheduled_dt, 5, exclude_id=self.pk)
+                options = ", ".join(timezone.localtime(w).strftime('%d.%m.%Y %H:%M') for w in windows)
                 hint = f" Доступные варианты: {options}" if options else ""
                 raise ValidationError(
                     {
@@ -1366,7 +1375,20 @@ class CampaignChannel(ExportModelOperationsMixin("campaignchannel"), BaseModel):
 
     def save(self, *args, **kwargs):
         self._sync_message_publish_date()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        tracks_spend = not self._state.adding and (
+            update_fields is None or set(update_fields) & set(self.SPEND_SOURCE_FIELDS)
+        )
+        with transaction.atomic():
+            # post_save (campaignchannel_track_spend) runs inside, while the row is locked
+            if tracks_spend:
+                self._lock_previous_spend()
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self._lock_previous_spend()
+            return super().delete(*args, **kwargs)
 
     @property
     def budget_cpm(self):
@@ -1382,6 +1404,20 @@ class CampaignChannel(ExportModelOperationsMixin("campaignchannel"), BaseModel):
         verbose_name = "Статистика"
         verbose_name_plural = "Статистика"
         ordering = ["-created_at"]
+        indexes = [
+            # строки, ожидающие публикации (sweep core.publication_scheduler)
+            models.Index(
+                fields=["message_publish_date"],
+                name="campaignchannel_due_pub_idx",
+                condition=Q(
+                    publish_status="confirmed",
+                    channel_post_id__isnull=True,
+                    message_publish_date__isnull=False,
+                ),
+            ),
+            # keyset-пагинация API (core.pagination.KeysetPagination)
+            models.Index(fields=["created_at", "id"], name="campaignchannel_keyset_idx"),
+        ]
 
     @property
     def path_click_analysis(self: Self):
@@ -1792,6 +1828,10 @@ class Payout(BaseModel):
         verbose_name = "Выплата"
         verbose_name_plural = "Выплаты"
         ordering = ["-created_at"]
+        indexes = [
+            # keyset-пагинация API (core.pagination.KeysetPagination)
+            models.Index(fields=["created_at", "id"], name="payout_keyset_idx"),
+        ]
 
     def clean(self):
         errors = {}
@@ -1832,7 +1872,7 @@ class Payout(BaseModel):
         REF: Financial system migration 2025-11-19
         """
         from core.models import LedgerEntry
-        from core.ledger_service import DoubleEntryLedgerService as BalanceService
+        from core.ledger_service import DoubleEntryLedgerService as BalanceService, LedgerBatch
 
         # Check if payout already processed (in new system)
         existing = LedgerEntry.objects.filter(
@@ -1845,6 +1885,8 @@ class Payout(BaseModel):
         amount_left = self.amount
         channels = list(self.legal_entity.channels.filter(is_deleted=False))
         balances = BalanceService.get_balance_for_channels(channels)
+        # balances above are read without a lock; the batch re-checks them inside its transaction
+        batch = LedgerBatch()
 
         for channel in channels:
             if amount_left <= 0:
@@ -1856,17 +1898,18 @@ class Payout(BaseModel):
 
             portion = min(available, amount_left)
 
-            # Use new double-entry ledger service
-            BalanceService.record_payout(
-                channel=channel,
-                amount=portion,
+            batch.add_payout(
+                channel,
+                portion,
                 description=f"Payout {self.id} for legal entity {self.legal_entity_id}",
                 source_type="payout",
                 source_id=self.id,
-                currency=self.currency
+                currency=self.currency,
             )
             amount_left -= portion
 
+        batch.commit()
+
         if amount_left > 0:
             logger.warning(
                 "Payout %s could not deduct full amount (lacked %s). Check channel balances.",
@@ -2284,3 +2327,65 @@ class LedgerEntry(ExportModelOperationsMixin("ledgerentry"), BaseModel):
             "Записи в главной книге нельзя удалять (append-only ledger). "
             "Создайте корректирующую транзакцию для отмены."
         )
+
+
+class LedgerCheckpoint(ExportModelOperationsMixin("ledgercheckpoint"), BaseModel):
+    """
+    CHANGE: Periodic cumulative totals per account
+    WHY: Point-in-time balances ("balance as of month end") without summing the whole history
+
+    debit_total/credit_total = сумма всех записей счёта с created_at < period_end.
+    Баланс на момент T = ближайший чекпоинт (period_end <= T) + записи [period_end, T].
+    Пишется задачей core.tasks.create_ledger_checkpoints; перед каждым прогоном
+    последний чекпоинт сверяется по числу записей (поздние коммиты) и при
+    расхождении пересобирается.
+    """
+
+    class Period(models.TextChoices):
+        DAY = "day", "День"
+        MONTH = "month", "Месяц"
+
+    account = models.ForeignKey(
+        "Account",
+        on_delete=models.PROTECT,
+        related_name="checkpoints",
+        verbose_name="Счёт",
+    )
+    period = models.CharField(
+        max_length=10,
+        choices=Period.choices,
+        default=Period.DAY,
+        verbose_name="Период",
+    )
+    period_end = models.DateTimeField(
+        verbose_name="Конец периода",
+        help_text="Учтены записи, созданные строго раньше этого момента",
+    )
+    debit_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=Decimal("0"),
+        verbose_name="Дебет (нарастающий итог)",
+    )
+    credit_total = models.DecimalField(
+        max_digits=16,
+        decimal_places=2,
+        default=Decimal("0"),
+        verbose_name="Кредит (нарастающий итог)",
+    )
+    entries_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Записей (нарастающий итог)",
+    )
+
+    class Meta:
+        verbose_name = "Чекпоинт главной книги"
+        verbose_name_plural = "Чекпоинты главной книги"
+        ordering = ["-period_end"]
+        unique_together = ("account", "period", "period_end")
+        indexes = [
+            models.Index(fields=["account", "-period_end"]),
+        ]
+
+    def __str__(self):
+        return f"{self.account} @ {self.period_end:%d.%m.%Y %H:%M}"
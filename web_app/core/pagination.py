@@ -0,0 +1,148 @@
+"""
+CHANGE: Keyset pagination of list APIs ordered by (created_at, id)
+WHY: ChannelViewSet, CampaignChannelViewSet and PayoutViewSet returned whole tables;
+     responses, worker memory and bot parse time grew with the database
+
+    GET /api/channel/?page_size=200
+    {"next": "...?cursor=<opaque>&page_size=200", "results": [...]}
+
+Курсор — позиция последней строки страницы (created_at, id), следующая страница
+выбирается условием по индексу (created_at, id), без OFFSET: глубина страницы на
+время запроса не влияет, новые строки не сдвигают уже прочитанные. Страницы
+длиннее STREAM_THRESHOLD строк в JSON отдаются потоком пачками по STREAM_CHUNK
+(get_list_response), без сборки всего ответа в памяти.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    ordering = ("created_at", "id")
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    STREAM_THRESHOLD = 200
+    STREAM_CHUNK = 100
+
+    def __init__(self):
+        self.request = None
+        self.page = []
+        self.next_position = None
+
+    def get_page_size(self, request) -> int:
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param], strict=True, cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def encode_cursor(self, position: tuple[datetime, object]) -> str:
+        created_at, pk = position
+        raw = json.dumps([created_at.isoformat(), str(pk)]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            created_at, pk = json.loads(raw)
+            created_at = parse_datetime(created_at)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return created_at, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        created_field, pk_field = self.ordering
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            created_at, pk = position
+            # created_at >= ... отдельно — чтобы условие шло по индексу (created_at, id)
+            queryset = queryset.filter(**{f"{created_field}__gte": created_at}).filter(
+                Q(**{f"{created_field}__gt": created_at}) | Q(**{f"{pk_field}__gt": pk})
+            )
+
+        rows = list(queryset[: page_size + 1])
+        self.page = rows[:page_size]
+        self.next_position = None
+        if len(rows) > page_size:
+            last = self.page[-1]
+            self.next_position = (getattr(last, created_field), getattr(last, pk_field))
+        return self.page
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([("next", self.get_next_link()), ("results", data)]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_list_response(self, serializer):
+        """
+        Response for the serializer of the current page: rendered at once, or streamed
+        chunk by chunk when the page is long and JSON was negotiated
+        """
+        renderer = getattr(self.request, "accepted_renderer", None)
+        if len(self.page) <= self.STREAM_THRESHOLD or not isinstance(renderer, JSONRenderer):
+            return self.get_paginated_response(serializer.data)
+        return StreamingHttpResponse(self._stream(serializer, renderer), content_type="application/json")
+
+    def _stream(self, serializer, renderer):
+        child = serializer.child
+        yield b'{"next":' + renderer.render(self.get_next_link()) + b',"results":['
+        for start in range(0, len(self.page), self.STREAM_CHUNK):
+            chunk = [child.to_representation(row) for row in self.page[start : start + self.STREAM_CHUNK]]
+            body = renderer.render(chunk)[1:-1]
+            if body:
+                yield (b"," if start else b"") + body
+        yield b"]}"
+
+
+class KeysetListMixin:
+    """ListModelMixin over KeysetPagination: bulk loading for the page and streamed long pages"""
+
+    pagination_class = KeysetPagination
+
+    def prepare_page(self, rows: list) -> None:
+        """Load in bulk what the serializer reads per row (balances and the like)"""
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        self.prepare_page(page)
+        return self.paginator.get_list_response(self.get_serializer(page, many=True))
@@ -0,0 +1,141 @@
+"""
+CHANGE: Preview tokens with the pre-rendered message in Redis, consumed in one call
+WHY: MessageViewSet.preview waited up to 15 s for the bot before answering, and resolve
+     did a lookup, an update and a full MessageSerializer per token; bursts of previews
+     from campaign managers held the sync workers
+
+Токен создаётся вместе с записью MessagePreviewToken (журнал для админки и
+статистики) и JSON-ответом resolve — креатив сериализуется один раз, при выдаче.
+JSON лежит в Redis до expires_at. Бот получает его одним POST preview/resolve:
+GETDEL отдаёт и удаляет ключ атомарно, поэтому из двух одновременных /start
+креатив получит только один, а в БД остаётся один UPDATE used_at.
+
+Если ключа нет (выдан до этой схемы, вытеснен, Redis недоступен) — прежний путь
+через БД: условный UPDATE по неиспользованному и неистёкшему токену, затем
+сериализация. Использованный через Redis токен в БД уже помечен и вернёт 410.
+
+Уведомление бота (/telegram/preview-token) под async_view идёт отложенным вызовом
+core.async_http, в синхронном воркере — задачей Celery после коммита.
+"""
+from __future__ import annotations
+
+import json
+import secrets
+from datetime import timedelta
+from typing import Optional
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django_redis import get_redis_connection
+from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.async_http import OutboundCall, defers, send_or_defer
+from core.models import Message, MessagePreviewToken
+from web_app.app_settings import app_settings
+from web_app.logger import logger
+
+
+class PreviewTokenRejected(Exception):
+    def __init__(self, detail: str, status_code: int):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+class PreviewTokenService:
+    TTL = timedelta(minutes=30)
+    SCHEMA = 1
+
+    @classmethod
+    def _key(cls, token: str) -> str:
+        return cache.make_key(f"preview_token:v{cls.SCHEMA}:{token}")
+
+    @classmethod
+    def _redis(cls):
+        return get_redis_connection("default")
+
+    @classmethod
+    def render(cls, token: MessagePreviewToken) -> dict:
+        """Response of preview/resolve, as the bot reads it"""
+        from core.serializers import MessageSerializer
+
+        return {"message": MessageSerializer(instance=token.message).data, "token": token.token}
+
+    @classmethod
+    def issue(cls, message: Message, user) -> MessagePreviewToken:
+        preview_token = MessagePreviewToken.objects.create(
+            token=secrets.token_urlsafe(32),
+            message=message,
+            created_by=user,
+            expires_at=timezone.now() + cls.TTL,
+        )
+        payload = json.dumps(cls.render(preview_token), cls=JSONEncoder)
+        try:
+            cls._redis().set(cls._key(preview_token.token), payload, ex=int(cls.TTL.total_seconds()))
+        except Exception as e:
+            # resolve найдёт токен в БД
+            logger.error(f"[PreviewTokenService] caching {preview_token.pk} failed: {e}")
+        return preview_token
+
+    @classmethod
+    def bot_call(cls, preview_token: MessagePreviewToken, on_done=None) -> OutboundCall:
+        return OutboundCall(
+            "POST",
+            f"{app_settings.DOMAIN_URI}/telegram/preview-token",
+            json={"token": preview_token.token, "message_id": str(preview_token.message_id)},
+            timeout=15,
+            on_done=on_done,
+        )
+
+    @classmethod
+    def notify_bot(cls, request, preview_token: MessagePreviewToken, on_done=None) -> None:
+        """Awaited after the view under async_view, otherwise sent by a task after commit"""
+        if defers(request):
+            send_or_defer(request, cls.bot_call(preview_token, on_done))
+            return
+
+        from core.tasks import notify_bot_preview_token
+
+        token_id = str(preview_token.pk)
+        transaction.on_commit(lambda: notify_bot_preview_token.delay(preview_token_id=token_id))
+
+    @classmethod
+    def _consume_cached(cls, token: str) -> Optional[dict]:
+        try:
+            payload = cls._redis().getdel(cls._key(token))
+        except Exception as e:
+            logger.error(f"[PreviewTokenService] reading {token[:8]}… failed: {e}")
+            return None
+        if payload is None:
+            return None
+        now = timezone.now()
+        MessagePreviewToken.objects.filter(token=token, used_at__isnull=True).update(used_at=now, updated_at=now)
+        return json.loads(payload)
+
+    @classmethod
+    def _consume_stored(cls, token: str) -> dict:
+        now = timezone.now()
+        consumed = MessagePreviewToken.objects.filter(
+            token=token, used_at__isnull=True, expires_at__gt=now
+        ).update(used_at=now, updated_at=now)
+        token_instance = MessagePreviewToken.objects.filter(token=token).select_related("message").first()
+        if not token_instance:
+            raise PreviewTokenRejected("Токен не найден", status.HTTP_404_NOT_FOUND)
+        if not consumed:
+            if token_instance.is_expired and token_instance.used_at is None:
+                raise PreviewTokenRejected("Срок действия токена истёк", status.HTTP_410_GONE)
+            raise PreviewTokenRejected("Токен уже использован", status.HTTP_410_GONE)
+        return cls.render(token_instance)
+
+    @classmethod
+    def consume(cls, token: str) -> dict:
+        """
+        Payload of a valid token, marked used; PreviewTokenRejected for unknown (404),
+        used or expired (410) tokens
+        """
+        payload = cls._consume_cached(token)
+        if payload is not None:
+            return payload
+        return cls._consume_stored(token)
@@ -0,0 +1,195 @@
+"""
+CHANGE: ETA-scheduled publication of confirmed campaign channels
+WHY: check_and_publish_scheduled_messages ran every 60 s with a multi-join scan, so
+     publications fired up to a minute late and the sweep cost grew with the table
+
+Когда CampaignChannel становится CONFIRMED с message_publish_date, после коммита
+ставится Celery-задача с eta = message_publish_date. Брокер — Redis, у которого
+задачи с eta дальше visibility_timeout (1 ч) передоставляются повторно, поэтому
+задача ставится только для публикаций в пределах ETA_HORIZON; более дальние
+подхватывает периодический sweep, когда они входят в горизонт.
+
+Sweep остаётся страховкой: публикует просроченные строки (потерянные задачи,
+рестарт воркера) по частичному индексу campaignchannel_due_pub_idx.
+Повторная отправка исключена claim-ключом в кэше на (id, message_publish_date).
+"""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+import requests
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from core.metrics import publication_publish_lag_seconds
+from core.models import CampaignChannel
+from web_app.app_settings import app_settings
+from web_app.logger import logger
+
+
+class PublicationScheduler:
+    """
+    Precise scheduling of campaign channel publications
+    """
+
+    ETA_HORIZON = timedelta(minutes=50)
+    # sweep публикует только строки, просроченные дольше grace: свежие ещё у ETA-задачи
+    SWEEP_GRACE = timedelta(seconds=30)
+    CLAIM_TTL = 10 * 60
+    REQUEST_TIMEOUT = 30
+
+    @classmethod
+    def _key(cls, prefix: str, campaign_channel_id, publish_date: datetime) -> str:
+        return f"publication:{prefix}:{campaign_channel_id}:{int(publish_date.timestamp())}"
+
+    @classmethod
+    def pending_queryset(cls):
+        """Confirmed, not yet published rows; matches the partial index condition"""
+        return CampaignChannel.objects.filter(
+            publish_status=CampaignChannel.PublishStatusChoices.CONFIRMED,
+            message_publish_date__isnull=False,
+            channel_post_id__isnull=True,
+        )
+
+    @classmethod
+    def is_publishable(cls, instance: CampaignChannel) -> bool:
+        return bool(
+            instance.publish_status == CampaignChannel.PublishStatusChoices.CONFIRMED
+            and instance.message_publish_date
+            and not instance.channel_post_id
+        )
+
+    @classmethod
+    def schedule(cls, instance: CampaignChannel, now: Optional[datetime] = None) -> bool:
+        """
+        Enqueue the ETA task after the current transaction commits
+
+        Repeated saves of the same row do not enqueue duplicates (the eta key is
+        added in the on_commit callback); a moved message_publish_date gets a new
+        task and the old one becomes a no-op.
+        """
+        if not cls.is_publishable(instance):
+            return False
+        now = now or timezone.now()
+        publish_date = instance.message_publish_date
+        if timezone.is_naive(publish_date):
+            publish_date = timezone.make_aware(publish_date)
+        if publish_date - now > cls.ETA_HORIZON:
+            return False
+
+        key = cls._key("eta", instance.pk, publish_date)
+        if cache.get(key):
+            return False
+
+        from core.tasks import publish_campaign_channel
+
+        campaign_channel_id = str(instance.pk)
+        planned_at = publish_date.isoformat()
+
+        def enqueue():
+            # ключ ставится только после коммита: откат транзакции не блокирует повторное планирование
+            if cache.add(key, 1, timeout=int(cls.ETA_HORIZON.total_seconds()) + cls.CLAIM_TTL):
+                publish_campaign_channel.apply_async(
+                    kwargs={"campaign_channel_id": campaign_channel_id, "planned_at": planned_at},
+                    eta=publish_date,
+                )
+
+        transaction.on_commit(enqueue)
+        return True
+
+    @classmethod
+    def schedule_upcoming(cls, now: Optional[datetime] = None) -> int:
+        """Enqueue ETA tasks for rows that entered the horizon since the last sweep"""
+        now = now or timezone.now()
+        upcoming = cls.pending_queryset().filter(
+            message_publish_date__gt=now,
+            message_publish_date__lte=now + cls.ETA_HORIZON,
+        ).only("id", "publish_status", "message_publish_date", "channel_post_id")
+        return sum(cls.schedule(cc, now=now) for cc in upcoming)
+
+    @classmethod
+    def publish(cls, campaign_channel: CampaignChannel, source: str = "eta") -> bool:
+        """
+        Send the publication to the bot once per (row, publish date)
+
+        The claim is released on failure so that the sweep retries the row.
+        """
+        if not cls.is_publishable(campaign_channel):
+            return False
+        planned_at = campaign_channel.message_publish_date
+        claim = cls._key("claim", campaign_channel.pk, planned_at)
+        if not cache.add(claim, 1, timeout=cls.CLAIM_TTL):
+            logger.info(f"[PublicationScheduler] CampaignChannel #{campaign_channel.id} already claimed")
+            return False
+
+        from core.publish_payload import PublishPayloadService
+
+        try:
+            data = JSONRenderer().render(PublishPayloadService.build(campaign_channel))
+            response = requests.post(
+                f"{app_settings.DOMAIN_URI}/telegram/public-campaign-channel",
+                data=data,
+                headers={"content-type": "application/json"},
+                timeout=cls.REQUEST_TIMEOUT,
+            )
+        except Exception as e:
+            cache.delete(claim)
+            logger.error(f"[PublicationScheduler] Error publishing CampaignChannel #{campaign_channel.id}: {e}")
+            return False
+
+        if response.status_code != 200:
+            cache.delete(claim)
+            logger.error(
+                f"[PublicationScheduler] Failed to publish CampaignChannel #{campaign_channel.id}: "
+                f"{response.status_code}"
+            )
+            return False
+
+        lag = (timezone.now() - planned_at).total_seconds()
+        publication_publish_lag_seconds.labels(source=source).observe(max(lag, 0))
+        logger.info(f"[PublicationScheduler] Published CampaignChannel #{campaign_channel.id} ({source}, lag {lag:.1f}s)")
+        return True
+
+    @classmethod
+    def publish_scheduled(cls, campaign_channel_id, planned_at: Optional[str] = None) -> bool:
+        """ETA task body: re-check the row, skip stale tasks of a rescheduled publication"""
+        campaign_channel = (
+            cls.pending_queryset()
+            .filter(pk=campaign_channel_id, channel__is_deleted=False, campaign__is_archived=False)
+            .select_related("campaign__message", "channel", "channel_admin", "publication_slot")
+            .first()
+        )
+        if not campaign_channel:
+            return False
+        if planned_at and campaign_channel.message_publish_date != datetime.fromisoformat(planned_at):
+            logger.info(f"[PublicationScheduler] CampaignChannel #{campaign_channel_id} was rescheduled, skip")
+            return False
+        if campaign_channel.message_publish_date > timezone.now():
+            # задача пришла раньше срока (часы воркера) — переставляем
+            cache.delete(cls._key("eta", campaign_channel.pk, campaign_channel.message_publish_date))
+            cls.schedule(campaign_channel)
+            return False
+        return cls.publish(campaign_channel, source="eta")
+
+    @classmethod
+    def sweep(cls, now: Optional[datetime] = None) -> dict:
+        """Safety net: publish overdue rows missed by ETA tasks, enqueue upcoming ones"""
+        now = now or timezone.now()
+        overdue = (
+            cls.pending_queryset()
+            .filter(
+                message_publish_date__lte=now - cls.SWEEP_GRACE,
+                channel__is_deleted=False,
+                campaign__is_archived=False,
+            )
+            .select_related("campaign__message", "channel", "channel_admin", "publication_slot")
+        )
+        checked = published = 0
+        for campaign_channel in overdue:
+            checked += 1
+            published += cls.publish(campaign_channel, source="sweep")
+        scheduled = cls.schedule_upcoming(now=now)
+        return {"checked": checked, "published": published, "scheduled": scheduled}
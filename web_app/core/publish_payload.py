@@ -0,0 +1,99 @@
+"""
+CHANGE: Slim versioned publication payload for the bot
+WHY: PublicationScheduler.publish and PublicationRequestViewSet sent the full
+     CampaignChannelSerializer (ChannelSerializer with live balance lookups, legal
+     entity, slots, CampaignSerializer, ChannelAdminSerializer) for every publication,
+     the bot used only the message and a few ids
+
+Payload (SCHEMA = 1) содержит только то, что бот использует при публикации:
+готовый HTML текста (Message.as_text), ссылки на медиа, кнопки и id для
+таргетинга. Часть креатива кэшируется по версии Message (updated_at), поэтому
+1000 публикаций одного креатива рендерят его один раз. Для каналов с ручным
+подтверждением добавляется блок approval (ApprovalRequestService.payload).
+Схема на стороне бота — parsers.PublishPayloadParserIn.
+"""
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.models import CampaignChannel, Message
+
+
+class PublishPayloadService:
+    """
+    Compact payload for /telegram/public-campaign-channel
+    """
+
+    SCHEMA = 1
+    MESSAGE_TTL = 60 * 60 * 24
+
+    @classmethod
+    def message_version(cls, message: Message) -> str:
+        return str(int(message.updated_at.timestamp() * 1_000_000)) if message.updated_at else "0"
+
+    @classmethod
+    def _message_key(cls, message: Message) -> str:
+        return f"publish_payload:v{cls.SCHEMA}:message:{message.pk}:{cls.message_version(message)}"
+
+    @classmethod
+    def render_message(cls, message: Message) -> dict:
+        return {
+            "id": str(message.pk),
+            "version": cls.message_version(message),
+            "text": message.as_text,
+            "image": message.image.name if message.image else None,
+            "video": message.video.name if message.video else None,
+            "buttons": [
+                {"text": button.get("text"), "url": button.get("url")}
+                for button in message.buttons or []
+                if isinstance(button, dict)
+            ],
+            "is_external": message.is_external,
+        }
+
+    @classmethod
+    def message_payload(cls, message: Message) -> dict:
+        """Message part, cached per Message version; a new save gets a new key"""
+        key = cls._message_key(message)
+        payload = cache.get(key)
+        if payload is None:
+            payload = cls.render_message(message)
+            cache.set(key, payload, timeout=cls.MESSAGE_TTL)
+        return payload
+
+    @classmethod
+    def build(cls, campaign_channel: CampaignChannel) -> dict:
+        from core.approval_requests import ApprovalRequestService
+
+        campaign = campaign_channel.campaign
+        channel = campaign_channel.channel
+        approval = None
+        if not channel.auto_approve_publications and campaign_channel.channel_admin_id:
+            approval = ApprovalRequestService.payload(campaign_channel)
+        return {
+            "schema": cls.SCHEMA,
+            "id": str(campaign_channel.pk),
+            "campaign_id": str(campaign.pk),
+            "channel": {
+                "id": str(channel.pk),
+                "tg_id": channel.tg_id,
+                "auto_approve_publications": channel.auto_approve_publications,
+            },
+            "message_publish_date": (
+                timezone.localtime(campaign_channel.message_publish_date).isoformat()
+                if campaign_channel.message_publish_date
+                else None
+            ),
+            "is_approved": campaign_channel.is_approved,
+            "path_click_analysis": campaign_channel.path_click_analysis,
+            "message": cls.message_payload(campaign.message),
+            "approval": approval,
+        }
+
+    @classmethod
+    def queryset(cls):
+        """Rows with everything build() reads, in one query"""
+        return CampaignChannel.objects.select_related(
+            "campaign__message", "channel", "channel_admin", "publication_slot"
+        )
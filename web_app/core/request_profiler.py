@@ -0,0 +1,299 @@
+"""
+CHANGE: Per-view DB query, cache and external HTTP instrumentation with N+1 detection
+WHY: core/metrics.py covered only publication requests and webhooks; admin pages and
+     API views issuing hundreds of queries (Campaign properties, balance lookups,
+     filter_words) were invisible
+
+RequestProfilerMiddleware на время запроса включает RequestProfile (contextvar):
+- запросы к БД — connection.execute_wrapper на всех соединениях: количество,
+  время и «форма» SQL (литералы и списки IN заменены на ?);
+- кэш — обёртки get/get_many классов бэкендов из CACHES (install() в CoreConfig.ready);
+- внешний HTTP — обёртки requests.Session.send и httpx.Client.send.
+
+Итог пишется в гистограммы view_* (core.metrics) с меткой имени view. Формы SQL,
+повторённые не меньше N_PLUS_ONE_THRESHOLD раз, логируются (самые дорогие первыми).
+Бюджет запросов объявляется атрибутом query_budget у view-функции, класса view /
+ViewSet или ModelAdmin (у ViewSet — число или словарь по action: {"list": 10}); превышение считается в view_query_budget_exceeded_total, а при
+settings.QUERY_BUDGET_STRICT (тесты) поднимает QueryBudgetExceeded.
+"""
+from __future__ import annotations
+
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
+
+from core.metrics import (
+    view_cache_requests_total,
+    view_db_duration_seconds,
+    view_db_queries,
+    view_duration_seconds,
+    view_external_http_duration_seconds,
+    view_query_budget_exceeded_total,
+)
+from web_app.logger import logger
+
+N_PLUS_ONE_THRESHOLD = 10
+SLOW_SHAPES_LOGGED = 3
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_MISSING = object()
+
+_SQL_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'(?:::[\w ]+)?"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),
+    (re.compile(r"\s+"), " "),
+]
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def sql_shape(sql: str) -> str:
+    """SQL without literal values: the same shape repeated in one request is an N+1 candidate"""
+    for pattern, replacement in _SQL_LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+@dataclass
+class RequestProfile:
+    view: str = ""
+    queries: int = 0
+    db_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    http_calls: int = 0
+    http_time: float = 0.0
+    shapes: Counter = field(default_factory=Counter)
+    shape_time: dict = field(default_factory=lambda: defaultdict(float))
+
+    def record_query(self, sql: str, elapsed: float) -> None:
+        shape = sql_shape(sql)
+        self.queries += 1
+        self.db_time += elapsed
+        self.shapes[shape] += 1
+        self.shape_time[shape] += elapsed
+
+    def repeated_shapes(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list[tuple[str, int, float]]:
+        """(shape, count, total time) of shapes repeated >= threshold times, slowest first"""
+        repeated = [
+            (shape, count, self.shape_time[shape]) for shape, count in self.shapes.items() if count >= threshold
+        ]
+        return sorted(repeated, key=lambda item: item[2], reverse=True)
+
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current.get()
+
+
+@contextmanager
+def profile_queries(profile: Optional[RequestProfile] = None):
+    """Collect a RequestProfile for the block (middleware, tests, management commands)"""
+    profile = profile or RequestProfile()
+
+    def execute_wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            profile.record_query(sql, time.perf_counter() - started)
+
+    token = _current.set(profile)
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(execute_wrapper))
+            yield profile
+    finally:
+        _current.reset(token)
+
+
+def query_budget(limit: int) -> Callable:
+    """Declare the query budget of a function-based view"""
+
+    def decorator(view):
+        view.query_budget = limit
+        return view
+
+    return decorator
+
+
+def declared_budget(resolver_match, method: Optional[str] = None) -> Optional[int]:
+    func = resolver_match.func
+    for owner in (
+        func,
+        getattr(func, "view_class", None),
+        getattr(func, "cls", None),  # DRF ViewSet
+        getattr(func, "model_admin", None),  # ModelAdmin views
+        getattr(getattr(func, "__self__", None), "__class__", None),  # bound AdminSite / ModelAdmin methods
+    ):
+        budget = getattr(owner, "query_budget", None)
+        if isinstance(budget, dict):
+            # ViewSet: бюджет по action (метод -> action из маршрута роутера)
+            action = (getattr(func, "actions", None) or {}).get((method or "").lower())
+            return budget.get(action)
+        if budget is not None:
+            return budget
+    return None
+
+
+def view_name(resolver_match) -> str:
+    if resolver_match is None:
+        return "unresolved"
+    return resolver_match.view_name or resolver_match._func_path
+
+
+class RequestProfilerMiddleware:
+    """
+    Records query count, DB time, cache hits/misses and external HTTP time per resolved view
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with profile_queries() as profile:
+            response = self.get_response(request)
+        profile.view = view_name(getattr(request, "resolver_match", None))
+        self.report(request, profile, time.perf_counter() - started)
+        response.request_profile = profile
+        return response
+
+    def report(self, request, profile: RequestProfile, elapsed: float) -> None:
+        view = profile.view
+        view_duration_seconds.labels(view=view).observe(elapsed)
+        view_db_queries.labels(view=view).observe(profile.queries)
+        view_db_duration_seconds.labels(view=view).observe(profile.db_time)
+        view_external_http_duration_seconds.labels(view=view).observe(profile.http_time)
+        if profile.cache_hits:
+            view_cache_requests_total.labels(view=view, result="hit").inc(profile.cache_hits)
+        if profile.cache_misses:
+            view_cache_requests_total.labels(view=view, result="miss").inc(profile.cache_misses)
+
+        for shape, count, total in profile.repeated_shapes()[:SLOW_SHAPES_LOGGED]:
+            logger.warning(
+                f"[RequestProfiler] {view}: {count}x {total * 1000:.1f}ms {shape[:500]}",
+                extra={"view": view, "path": request.path, "count": count},
+            )
+
+        match = getattr(request, "resolver_match", None)
+        budget = declared_budget(match, request.method) if match else None
+        if budget is not None and profile.queries > budget:
+            view_query_budget_exceeded_total.labels(view=view).inc()
+            message = f"{view} made {profile.queries} queries, budget {budget}"
+            logger.warning(f"[RequestProfiler] {message}")
+            if getattr(settings, "QUERY_BUDGET_STRICT", False):
+                raise QueryBudgetExceeded(message)
+
+
+def _record_http(send):
+    @wraps(send)
+    def wrapper(*args, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return send(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return send(*args, **kwargs)
+        finally:
+            profile.http_calls += 1
+            profile.http_time += time.perf_counter() - started
+
+    wrapper._request_profiler = True
+    return wrapper
+
+
+def _record_cache_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None, **kwargs):
+        profile = _current.get()
+        if profile is None:
+            return get(self, key, default, version=version, **kwargs)
+        value = get(self, key, _MISSING, version=version, **kwargs)
+        if value is _MISSING:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+
+    wrapper._request_profiler = True
+    return wrapper
+
+
+def _record_cache_get_many(get_many):
+    @wraps(get_many)
+    def wrapper(self, keys, *args, **kwargs):
+        result = get_many(self, keys, *args, **kwargs)
+        profile = _current.get()
+        if profile is not None:
+            keys = list(keys)
+            profile.cache_hits += len(result)
+            profile.cache_misses += len(keys) - len(result)
+        return result
+
+    wrapper._request_profiler = True
+    return wrapper
+
+
+def _patch(owner, name: str, decorator) -> None:
+    original = getattr(owner, name, None)
+    if original is None or getattr(original, "_request_profiler", False):
+        return
+    setattr(owner, name, decorator(original))
+
+
+def install() -> None:
+    """Hook cache backends and HTTP clients once per process (CoreConfig.ready)"""
+    import httpx
+    import requests
+
+    _patch(requests.Session, "send", _record_http)
+    _patch(httpx.Client, "send", _record_http)
+    for options in settings.CACHES.values():
+        try:
+            backend = import_string(options["BACKEND"])
+        except ImportError:
+            continue
+        _patch(backend, "get", _record_cache_get)
+        _patch(backend, "get_many", _record_cache_get_many)
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase helper: request a view and fail when it exceeds its query budget
+
+        response, profile = self.assertViewQueryBudget("get", "/api/channel/", budget=12)
+
+    Without `budget` the view's declared query_budget is used.
+    """
+
+    def assertViewQueryBudget(self, method: str, url: str, budget: Optional[int] = None, **kwargs):
+        from django.urls import resolve
+
+        client = kwargs.pop("client", None) or self.client
+        with profile_queries() as profile:
+            response = getattr(client, method)(url, **kwargs)
+        if budget is None:
+            budget = declared_budget(resolve(url.split("?")[0]), method)
+        self.assertIsNotNone(budget, f"{url}: no query budget declared")
+        repeated = "\n".join(
+            f"  {count}x {shape[:300]}" for shape, count, _ in profile.repeated_shapes(threshold=2)
+        )
+        self.assertLessEqual(
+            profile.queries,
+            budget,
+            f"{url} made {profile.queries} queries, budget {budget}\nrepeated:\n{repeated}",
+        )
+        return response, profile
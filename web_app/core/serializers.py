@@ -293,11 +293,14 @@ class ChannelSerializer(serializers.ModelSerializer):
     # endregion
 
     def create(self, validated_data):
+        from core.async_http import OutboundCall, defers, send_or_defer
         from core.external_clients import TGStatClient
-        import requests
+        from core.utils import channel_avatar_check_call
         from web_app.app_settings import app_settings
         from web_app.logger import logger
 
+        request = self.context.get("request")
+
         # CHANGE: Извлекаем список админов из validated_data
         admins_list = validated_data.pop("admins", [])
 
@@ -360,11 +363,12 @@ class ChannelSerializer(serializers.ModelSerializer):
                             f"Статус: Ожидает модерации\n"
                             f"Вы можете управлять каналом в личном кабинете: {app_settings.DOMAIN_URI}"
                         )
-                        requests.post(
+                        send_or_defer(request, OutboundCall(
+                            "POST",
                             f"{app_settings.DOMAIN_URI}/telegram/channeladmin-added",
                             json={"tg_id": channel_admin.tg_id, "msg": notification_text},
-                            timeout=10
-                        )
+                            timeout=10,
+                        ))
                         logger.info(f"Sent notification to {channel_admin.username} about channel {channel.name}")
                     except Exception as e:
                         logger.error(f"Failed to send notification: {e}")
@@ -376,13 +380,25 @@ class ChannelSerializer(serializers.ModelSerializer):
             logger.warning(f"No admins_list provided for channel {channel.name}")
 
         service = TGStatClient()
-        service.update_channel_info(channel=channel)
-        service.update_channel_stat(channel=channel)
+        if defers(request):
+            # CHANGE: TGStat и проверка аватара — после ответа БД, без блокировки воркера
+            # WHY: под ASGI (core.async_http.async_view) вызовы выполняются конкурентно
+            request.outbound_calls.extend(service.channel_calls(channel))
+            if channel.avatar_url and channel.avatar_url != "/static/custom/default.jpg":
+                request.outbound_calls.append(channel_avatar_check_call(channel))
+        else:
+            service.update_channel_info(channel=channel)
+            service.update_channel_stat(channel=channel)
 
         return channel
 
     def validate_avatar(self, url):
+        from core.async_http import defers
         from core.utils import validate_channel_avtar_url
+
+        if defers(self.context.get("request")):
+            # проверяется после сохранения канала (ChannelSerializer.create)
+            return url
         return validate_channel_avtar_url(url)
 
 
@@ -1,14 +1,14 @@
 import requests
-from django.db.models.signals import pre_save, post_save, post_delete
+from django.db.models.signals import m2m_changed, pre_delete, pre_save, post_save, post_delete
 from django.dispatch import receiver, Signal
 from rest_framework.renderers import JSONRenderer
 from datetime import time
 
 from web_app.app_settings import app_settings
-from core.models import CampaignChannel, ChannelAdmin, Channel, ChannelPublicationSlot, ChannelTransaction, LedgerEntry
+from core.models import Campaign, CampaignChannel, ChannelAdmin, Channel, ChannelPublicationSlot, ChannelTransaction, LedgerEntry, User
 from web_app.logger import logger
 from .models_qs import change_channeladmin_group
-from .serializers import CampaignChannelSerializer
+from .publish_payload import PublishPayloadService
 
 
 def get_create_channel_admin_user(**kwargs):
@@ -56,15 +56,7 @@ def send_message_to_channel_admin(instance: CampaignChannel) -> None:
             and instance.channel_admin.channels.filter(id=instance.channel.id).exists()
             and not instance.is_approved
         ):
-            payload = CampaignChannelSerializer(instance).data
-            payload["campaign_format"] = instance.campaign.format
-            payload["campaign_format_display"] = instance.campaign.get_format_display()
-            payload["scheduled_at"] = (
-                instance.message_publish_date.isoformat()
-                if instance.message_publish_date
-                else None
-            )
-            data = JSONRenderer().render(payload)
+            data = JSONRenderer().render(PublishPayloadService.build(instance))
             response = requests.post(
                 f"{app_settings.DOMAIN_URI}/telegram/public-campaign-channel",
                 data=data,
@@ -116,6 +108,44 @@ def campaignchannel_post_save(
             send_message_to_channel_admin(instance)
 
 
+@receiver(post_save, sender=CampaignChannel)
+def campaignchannel_schedule_publication(sender, instance: CampaignChannel, raw=False, **kwargs):
+    """Confirmed placement with a publish date -> ETA task instead of waiting for the sweep"""
+    from core.publication_scheduler import PublicationScheduler
+
+    if raw:
+        return
+    PublicationScheduler.schedule(instance)
+
+
+@receiver(post_save, sender=CampaignChannel)
+def campaignchannel_track_spend(sender, instance: CampaignChannel, created: bool, raw=False, **kwargs):
+    """Keep Campaign.spent_amount in sync with cpm / impressions_fact changes"""
+    from core.budget_service import CampaignBudgetService
+
+    if raw:
+        return
+    CampaignBudgetService.track_campaign_channel(instance, created=created)
+
+
+@receiver(post_delete, sender=CampaignChannel)
+def campaignchannel_untrack_spend(sender, instance: CampaignChannel, **kwargs):
+    from core.budget_service import CampaignBudgetService
+
+    CampaignBudgetService.track_campaign_channel(instance, deleted=True)
+
+
+@receiver(post_save, sender=Campaign)
+def campaign_pause_if_overspent(sender, instance: Campaign, raw=False, **kwargs):
+    """Budget lowered / campaign re-activated while already overspent -> pause right away"""
+    from core.budget_service import CampaignBudgetService
+
+    if raw or instance.status != Campaign.Statuses.ACTIVE:
+        return
+    if CampaignBudgetService.pause_overspent([instance.pk]):
+        instance.status = Campaign.Statuses.PAUSED
+
+
 @receiver(signal=pre_save, sender=ChannelAdmin)
 def change_channeladmin_group_receiver(
     signal: Signal,
@@ -171,6 +201,31 @@ def create_default_publication_slots(
         logger.info(f"Created {len(slots_to_create)} default publication slots for channel {instance.name}")
 
 
+@receiver(post_save, sender=Channel)
+@receiver(post_save, sender=ChannelPublicationSlot)
+@receiver(post_delete, sender=ChannelPublicationSlot)
+@receiver(post_save, sender=CampaignChannel)
+@receiver(post_delete, sender=CampaignChannel)
+def invalidate_slot_calendar(sender, instance, **kwargs):
+    """Slots, autopilot interval or placements changed -> drop the channel occupancy calendar"""
+    from core.slot_calendar import SlotCalendarService
+
+    channel_id = instance.pk if sender is Channel else instance.channel_id
+    SlotCalendarService.invalidate([channel_id])
+
+
+@receiver(post_save, sender=Campaign)
+def invalidate_campaign_slot_calendars(sender, instance: Campaign, created: bool, raw=False, **kwargs):
+    """Campaign format / publication time affects the occupancy of all its channels"""
+    from core.slot_calendar import SlotCalendarService
+
+    if created or raw:
+        return
+    SlotCalendarService.invalidate(
+        instance.campaigns_channel.values_list("channel_id", flat=True).distinct()
+    )
+
+
 @receiver(post_save, sender=ChannelTransaction)
 @receiver(post_delete, sender=ChannelTransaction)
 def invalidate_channel_balance_cache(sender, instance, **kwargs):
@@ -244,3 +299,52 @@ def invalidate_ledger_balance_cache(sender, instance, **kwargs):
     if instance.account and instance.account.channel:
         BalanceService.invalidate_cache(instance.account.channel)
         logger.debug(f"Invalidated balance cache for channel {instance.account.channel.name}")
+
+
+@receiver(post_save, sender=ChannelAdmin)
+@receiver(post_delete, sender=ChannelAdmin)
+def invalidate_admin_scope(sender, instance: ChannelAdmin, **kwargs):
+    """Profile or role changed -> drop the cached changelist scope of its user"""
+    from core.admin_scope import AdminScopeService
+
+    AdminScopeService.invalidate([instance.user_id])
+
+
+@receiver(m2m_changed, sender=ChannelAdmin.channels.through)
+def invalidate_admin_scope_channels(sender, instance, action, reverse, pk_set, **kwargs):
+    """Channels added to / removed from a profile (from either side of the relation)"""
+    from core.admin_scope import AdminScopeService
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        AdminScopeService.invalidate([instance.user_id])
+    elif action == "pre_clear":
+        AdminScopeService.invalidate_channels([instance.pk])
+    else:
+        AdminScopeService.invalidate_channel_admins(pk_set or [])
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_admin_scope_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    """Owner group membership is part of the scope"""
+    from core.admin_scope import AdminScopeService
+
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        AdminScopeService.invalidate([instance.pk])
+    elif pk_set:
+        AdminScopeService.invalidate(pk_set)
+
+
+@receiver(post_save, sender=Channel)
+@receiver(pre_delete, sender=Channel)
+def invalidate_channel_admin_scopes(sender, instance: Channel, **kwargs):
+    """A confirmed channel is part of the scope of each of its admins"""
+    from core.admin_scope import AdminScopeService
+
+    update_fields = kwargs.get("update_fields")
+    if kwargs.get("created") or (update_fields and not {"status", "is_deleted"} & set(update_fields)):
+        return
+    AdminScopeService.invalidate_channels([instance.pk])
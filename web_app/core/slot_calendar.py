@@ -0,0 +1,350 @@
+"""
+CHANGE: Per-channel publication occupancy calendar
+WHY: clean_publication_slot / _validate_autopilot_interval ran their own range queries
+     on every save, Channel.allows_publication_datetime / get_weekday_slot_labels hit
+     publication_slots every call, and a conflict only suggested one next window
+
+ChannelCalendar — интервальный индекс канала в памяти: слоты по дням недели и
+отсортированный список занятых дат активных размещений. Календарь строится из
+ChannelPublicationSlot и CampaignChannel, кэшируется в Redis и сбрасывается
+сигналами при изменении слотов, размещений или интервала автопилота.
+
+Кэшированный календарь — для планирования и подсказок: QuerySet.update() и
+bulk_create сигналов не шлют, а занятость старше LOOKBACK в него не попадает.
+Валидация размещения (CampaignChannel.clean) строит точный календарь из БД
+через SlotCalendarService.exact(), без кэша и без обрезки истории.
+
+Для N каналов календари читаются одним get_many, промахи строятся тремя запросами
+на всю пачку — планирование кампании на сотни каналов идёт за один проход.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Optional
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.models import Campaign, CampaignChannel, Channel, ChannelPublicationSlot, PlacementFormat
+
+
+@dataclass(frozen=True)
+class SlotWindow:
+    slot_id: str
+    weekday: int
+    start_time: time
+    end_time: time
+    label: str
+
+    def contains(self, moment: time) -> bool:
+        return self.start_time <= moment < self.end_time
+
+
+@dataclass
+class ChannelCalendar:
+    """Occupancy of one channel: weekly slots + sorted busy publication datetimes"""
+
+    channel_id: str
+    autopilot_interval: Optional[timedelta] = None
+    slots: dict[int, list[SlotWindow]] = field(default_factory=dict)
+    # параллельные списки, отсортированы по busy_at
+    busy_at: list[datetime] = field(default_factory=list)
+    busy_ids: list[str] = field(default_factory=list)
+    busy_autopilot: list[bool] = field(default_factory=list)
+
+    # region slots
+    @property
+    def has_slots(self) -> bool:
+        return any(self.slots.values())
+
+    def slot_labels(self, weekday: int) -> list[str]:
+        return [slot.label for slot in self.slots.get(weekday, [])]
+
+    def slot_at(self, moment: datetime) -> Optional[SlotWindow]:
+        local = timezone.localtime(moment)
+        for slot in self.slots.get(local.weekday(), []):
+            if slot.contains(local.time()):
+                return slot
+        return None
+
+    def allows(self, moment: Optional[datetime]) -> bool:
+        """Moment falls into one of the channel's publication slots"""
+        if not moment:
+            return True
+        return self.slot_at(moment) is not None
+    # endregion
+
+    # region occupancy
+    def _busy_between(
+        self, lower: datetime, upper: datetime, exclude_id=None, autopilot_only=False, inclusive=True
+    ):
+        if inclusive:
+            start, end = bisect_left(self.busy_at, lower), bisect_right(self.busy_at, upper)
+        else:
+            start, end = bisect_right(self.busy_at, lower), bisect_left(self.busy_at, upper)
+        for index in range(start, end):
+            if exclude_id is not None and self.busy_ids[index] == str(exclude_id):
+                continue
+            if autopilot_only and not self.busy_autopilot[index]:
+                continue
+            yield self.busy_at[index]
+
+    def is_taken(self, moment: datetime, exclude_id=None) -> bool:
+        """Another active placement is scheduled at exactly this moment"""
+        return next(self._busy_between(moment, moment, exclude_id), None) is not None
+
+    def autopilot_conflict(self, moment: datetime, exclude_id=None) -> Optional[datetime]:
+        """
+        Latest autopilot publication closer than the channel interval, if any
+
+        The window is open: a publication exactly `interval` away is allowed.
+        """
+        interval = self.autopilot_interval
+        if not interval:
+            return None
+        conflicts = list(
+            self._busy_between(
+                moment - interval, moment + interval, exclude_id, autopilot_only=True, inclusive=False
+            )
+        )
+        return conflicts[-1] if conflicts else None
+
+    def is_free(self, moment: datetime, autopilot: bool = False, exclude_id=None) -> bool:
+        if self.has_slots and not self.allows(moment):
+            return False
+        if self.is_taken(moment, exclude_id):
+            return False
+        return not (autopilot and self.autopilot_conflict(moment, exclude_id))
+
+    def _push_past_conflicts(self, moment: datetime, until: datetime, exclude_id=None) -> Optional[datetime]:
+        """First moment >= `moment` without autopilot conflicts, None if it is past `until`"""
+        conflict = self.autopilot_conflict(moment, exclude_id)
+        while conflict:
+            # конфликт строго ближе интервала, поэтому moment всегда сдвигается вперёд
+            moment = conflict + self.autopilot_interval
+            if moment > until:
+                return None
+            conflict = self.autopilot_conflict(moment, exclude_id)
+        return moment
+
+    def next_free_windows(
+        self,
+        after: datetime,
+        count: int = 3,
+        autopilot: bool = False,
+        exclude_id=None,
+        horizon_days: int = 28,
+    ) -> list[datetime]:
+        """
+        Next free publication moments starting at `after`
+
+        With slots: slot starts (or the earliest moment inside a slot that respects
+        the autopilot interval). Without slots: autopilot pushes past conflicts,
+        any other format is free unless the exact moment is taken.
+        """
+        windows: list[datetime] = []
+        until = after + timedelta(days=horizon_days)
+        if not self.has_slots:
+            moment = after
+            while len(windows) < count and moment <= until:
+                if autopilot and self.autopilot_interval:
+                    moment = self._push_past_conflicts(moment, until, exclude_id)
+                    if moment is None:
+                        break
+                elif self.is_taken(moment, exclude_id):
+                    moment += timedelta(minutes=1)
+                    continue
+                windows.append(moment)
+                moment += self.autopilot_interval if autopilot and self.autopilot_interval else timedelta(hours=1)
+            return windows
+
+        tz = timezone.get_current_timezone()
+        first_day: date = timezone.localtime(after).date()
+        for offset in range(horizon_days):
+            day = first_day + timedelta(days=offset)
+            for slot in self.slots.get(day.weekday(), []):
+                start = timezone.make_aware(datetime.combine(day, slot.start_time), tz)
+                end = timezone.make_aware(datetime.combine(day, slot.end_time), tz)
+                if end <= after:
+                    continue
+                if autopilot and self.autopilot_interval:
+                    candidate = self._push_past_conflicts(max(start, after), end, exclude_id)
+                    if candidate is None or candidate >= end:
+                        continue
+                else:
+                    candidate = start
+                    if candidate < after or self.is_taken(candidate, exclude_id):
+                        continue
+                windows.append(candidate)
+                if len(windows) >= count:
+                    return windows
+        return windows
+    # endregion
+
+
+@dataclass
+class PlacementOption:
+    """Result of planning one channel of a campaign"""
+
+    channel_id: str
+    available: bool
+    scheduled_at: Optional[datetime] = None
+    slot_id: Optional[str] = None
+    reason: str = ""
+    alternatives: list[datetime] = field(default_factory=list)
+
+
+class SlotCalendarService:
+    """
+    Building, caching and querying channel occupancy calendars
+    """
+
+    CACHE_TTL = 60 * 60
+    # занятость из прошлого нужна только для проверки интервала автопилота
+    LOOKBACK = timedelta(days=2)
+
+    @classmethod
+    def _cache_key(cls, channel_id) -> str:
+        return f"slot_calendar:{channel_id}"
+
+    @classmethod
+    def build(cls, channel_ids: Iterable, since: Optional[datetime] = None) -> dict[str, ChannelCalendar]:
+        """
+        Build calendars from the database: 3 queries for any number of channels
+
+        Occupancy is loaded from `since` (default: now - LOOKBACK).
+        """
+        channel_ids = [str(channel_id) for channel_id in channel_ids]
+        calendars = {
+            str(channel_id): ChannelCalendar(
+                channel_id=str(channel_id),
+                autopilot_interval=timedelta(minutes=interval) if interval else None,
+            )
+            for channel_id, interval in Channel.objects.filter(pk__in=channel_ids).values_list(
+                "id", "autopilot_min_interval"
+            )
+        }
+
+        for slot in ChannelPublicationSlot.objects.filter(channel_id__in=channel_ids).order_by(
+            "weekday", "start_time"
+        ):
+            calendars[str(slot.channel_id)].slots.setdefault(slot.weekday, []).append(
+                SlotWindow(
+                    slot_id=str(slot.id),
+                    weekday=slot.weekday,
+                    start_time=slot.start_time,
+                    end_time=slot.end_time,
+                    label=slot.label,
+                )
+            )
+
+        busy = (
+            CampaignChannel.objects.filter(
+                channel_id__in=channel_ids,
+                publish_status__in=CampaignChannel.ACTIVE_PUBLISH_STATUSES,
+                message_publish_date__gte=since or timezone.now() - cls.LOOKBACK,
+            )
+            .order_by("message_publish_date")
+            .values_list("channel_id", "id", "message_publish_date", "campaign__format")
+        )
+        for channel_id, campaign_channel_id, publish_date, campaign_format in busy:
+            calendar = calendars[str(channel_id)]
+            calendar.busy_at.append(publish_date)
+            calendar.busy_ids.append(str(campaign_channel_id))
+            calendar.busy_autopilot.append(campaign_format == PlacementFormat.AUTOPILOT)
+        return calendars
+
+    @classmethod
+    def get_many(cls, channel_ids: Iterable) -> dict[str, ChannelCalendar]:
+        """Cached calendars: one get_many, misses built in bulk and stored with set_many"""
+        channel_ids = list(dict.fromkeys(str(channel_id) for channel_id in channel_ids))
+        if not channel_ids:
+            return {}
+        keys = {cls._cache_key(channel_id): channel_id for channel_id in channel_ids}
+        calendars = {keys[key]: value for key, value in cache.get_many(list(keys)).items() if value}
+
+        missing = [channel_id for channel_id in channel_ids if channel_id not in calendars]
+        if missing:
+            built = cls.build(missing)
+            cache.set_many({cls._cache_key(cid): calendar for cid, calendar in built.items()}, cls.CACHE_TTL)
+            calendars.update(built)
+        return calendars
+
+    @classmethod
+    def get(cls, channel) -> ChannelCalendar:
+        channel_id = str(getattr(channel, "pk", channel))
+        return cls.get_many([channel_id]).get(channel_id) or ChannelCalendar(channel_id=channel_id)
+
+    @classmethod
+    def exact(cls, channel, since: datetime) -> ChannelCalendar:
+        """
+        Uncached calendar with all occupancy from `since`, for validation
+
+        Bypasses Redis so that rows changed by QuerySet.update() / bulk_create
+        (no signals) and placements older than LOOKBACK are taken into account.
+        """
+        channel_id = str(getattr(channel, "pk", channel))
+        return cls.build([channel_id], since=since).get(channel_id) or ChannelCalendar(channel_id=channel_id)
+
+    @classmethod
+    def invalidate(cls, channel_ids: Iterable) -> None:
+        keys = [cls._cache_key(channel_id) for channel_id in channel_ids if channel_id]
+        if keys:
+            cache.delete_many(keys)
+
+    @classmethod
+    def plan_campaign(
+        cls,
+        campaign: Campaign,
+        channels: Iterable,
+        alternatives: int = 3,
+        calendars: Optional[dict[str, ChannelCalendar]] = None,
+    ) -> dict[str, PlacementOption]:
+        """
+        Place a campaign across many channels in one pass
+
+        Fixed slot: the campaign moment must fall into a free slot of the channel.
+        Autopilot: the campaign moment must respect the channel interval.
+        Rejected channels get the next free windows as alternatives.
+        Cached calendars are used unless prebuilt `calendars` are passed
+        (exact ones from build() when the plan is written to the database).
+        """
+        channel_ids = [str(getattr(channel, "pk", channel)) for channel in channels]
+        if calendars is None:
+            calendars = cls.get_many(channel_ids)
+        tz = timezone.get_current_timezone()
+        if campaign.slot_publication_at:
+            moment = campaign.slot_publication_at
+        elif campaign.start_date:
+            moment = timezone.make_aware(datetime.combine(campaign.start_date, time.min), tz)
+        else:
+            moment = None
+        autopilot = campaign.format == PlacementFormat.AUTOPILOT
+
+        plan = {}
+        for channel_id in channel_ids:
+            calendar = calendars.get(channel_id) or ChannelCalendar(channel_id=channel_id)
+            option = PlacementOption(channel_id=channel_id, available=True, scheduled_at=moment)
+            if moment is None:
+                plan[channel_id] = option
+                continue
+
+            if campaign.format == PlacementFormat.FIXED_SLOT:
+                slot = calendar.slot_at(moment)
+                if slot is None:
+                    option.reason = "Нет слота публикации на это время"
+                elif calendar.is_taken(moment):
+                    option.reason = f"Слот {slot.label} уже занят"
+                else:
+                    option.slot_id = slot.slot_id
+            elif autopilot and calendar.autopilot_conflict(moment):
+                option.reason = "Не выдержан интервал автопилота"
+
+            if option.reason:
+                option.available = False
+                option.scheduled_at = None
+                option.alternatives = calendar.next_free_windows(moment, alternatives, autopilot=autopilot)
+            plan[channel_id] = option
+        return plan
@@ -0,0 +1,107 @@
+"""
+CHANGE: Sparse fieldsets for API responses (?fields= / ?expand=)
+WHY: the bot and other callers received fully nested objects (channel balances,
+     legal entity, publication slots, campaign channel ids) they never read
+
+    ?fields=id,publish_status,channel.tg_id,campaign.message&expand=campaign.message
+
+- fields — поля ответа через запятую, вложенные через точку; без fields ответ полный;
+- вложенный объект, указанный без подполей, отдаётся своим id, если его нет в expand;
+- неизвестное поле — 400.
+
+Применяется только к сериализаторам ответа (get_serializer без data=);
+SparseFieldset.includes(path) подсказывает view, какие связи нужно подгружать.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Optional
+
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value: Optional[str]) -> list[str]:
+    return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+
+@dataclass
+class SparseFieldset:
+    # дерево полей {"id": {}, "channel": {"tg_id": {}}}; None — все поля
+    tree: Optional[dict] = None
+    expand: set[str] = field(default_factory=set)
+
+    fields_query_param = "fields"
+    expand_query_param = "expand"
+
+    @classmethod
+    def from_request(cls, request) -> "SparseFieldset":
+        params = request.query_params if request is not None else {}
+        paths = _split(params.get(cls.fields_query_param))
+        tree = None
+        if paths:
+            tree = {}
+            for path in paths:
+                node = tree
+                for name in path.split("."):
+                    node = node.setdefault(name, {})
+        return cls(tree=tree, expand=set(_split(params.get(cls.expand_query_param))))
+
+    def includes(self, path: str) -> bool:
+        """Whether the dotted path is rendered (and its relation should be loaded)"""
+        if self.tree is None:
+            return True
+        node, prefix = self.tree, ""
+        for name in path.split("."):
+            if name not in node:
+                return False
+            prefix = f"{prefix}.{name}" if prefix else name
+            node = node[name]
+            if not node:
+                # объект без подполей — целиком, если раскрыт, иначе только id
+                return prefix in self.expand or prefix == path
+        return True
+
+    def apply(self, serializer: serializers.BaseSerializer) -> None:
+        if self.tree is not None:
+            self._prune(serializer, self.tree, "")
+
+    def _prune(self, serializer, tree: dict, prefix: str) -> None:
+        target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+        fields = target.fields
+        unknown = sorted(set(tree) - set(fields))
+        if unknown:
+            raise ValidationError({self.fields_query_param: [f"Unknown field: {prefix}{name}" for name in unknown]})
+
+        for name in list(fields):
+            if name not in tree:
+                fields.pop(name)
+
+        for name, subtree in tree.items():
+            nested = fields[name]
+            many = isinstance(nested, serializers.ListSerializer)
+            if not isinstance(nested.child if many else nested, serializers.Serializer):
+                if subtree:
+                    raise ValidationError({self.fields_query_param: [f"{prefix}{name} has no fields"]})
+                continue
+            path = f"{prefix}{name}"
+            if subtree:
+                self._prune(nested, subtree, f"{path}.")
+            elif path not in self.expand and nested.source != "*":
+                source = {} if nested.source == name else {"source": nested.source}
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, many=many, **source)
+
+
+class SparseFieldsetMixin:
+    """GenericAPIView mixin: ?fields= / ?expand= applied to response serializers"""
+
+    @cached_property
+    def sparse_fieldset(self) -> SparseFieldset:
+        return SparseFieldset.from_request(getattr(self, "request", None))
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if "data" not in kwargs:
+            self.sparse_fieldset.apply(serializer)
+        return serializer
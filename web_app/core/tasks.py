@@ -1,10 +1,11 @@
 from celery import app
 from decimal import Decimal
 
+from core.celery_results import AuditResultTask
 from core.utils import BotNotifier
 from web_app.logger import log_func, logger
 from core.external_clients import TGStatClient
-from core.models import CampaignChannel, LegalEntity, Payout
+from core.models import CampaignChannel, LegalEntity, MessagePreviewToken, Payout
 from core.ledger_service import DoubleEntryLedgerService as BalanceService
 
 
@@ -53,56 +54,67 @@ def task_notify_channeladmin_was_added_channel(*args, **kwargs) -> None:
         channeladmin_tgid=kwargs['channeladmin_tgid'])
 
 
+@app.shared_task(bind=True)
+@log_func
+def notify_bot_preview_token(*args, **kwargs):
+    """Tell the bot about a new preview token (core.preview_tokens) outside the request"""
+    from core.preview_tokens import PreviewTokenService
+
+    preview_token = MessagePreviewToken.objects.filter(pk=kwargs.get("preview_token_id")).first()
+    if not preview_token:
+        return None
+    call = PreviewTokenService.bot_call(preview_token).send()
+    return call.response.status_code if call.response is not None else None
+
+
 @app.shared_task(bind=True)
 @log_func
 def check_and_publish_scheduled_messages(*args, **kwargs):
-    """Check for scheduled messages that should be published now"""
-    from django.utils import timezone
-    import requests
-    from rest_framework.renderers import JSONRenderer
-    from core.serializers import CampaignChannelSerializer
-    from web_app.app_settings import app_settings
-
-    now = timezone.now()
-    logger.info(f"[Task] Checking scheduled messages at {now}")
-
-    # Получаем подтвержденные сообщения с наступившим временем публикации
-    campaign_channels = CampaignChannel.objects.filter(
-        publish_status=CampaignChannel.PublishStatusChoices.CONFIRMED,
-        message_publish_date__isnull=False,
-        message_publish_date__lte=now,
-        channel_post_id__isnull=True,  # Еще не опубликованы
-        channel__is_deleted=False,
-        campaign__is_archived=False,
-    ).select_related('campaign', 'channel', 'channel_admin')
-
-    count = campaign_channels.count()
-    logger.info(f"[Task] Found {count} messages to publish")
-
-    published = 0
-    for cc in campaign_channels:
-        try:
-            data = JSONRenderer().render(CampaignChannelSerializer(cc).data)
-            response = requests.post(
-                f"{app_settings.DOMAIN_URI}/telegram/public-campaign-channel",
-                data=data,
-                headers={"content-type": "application/json"},
-                timeout=30
-            )
-            if response.status_code == 200:
-                published += 1
-                logger.info(f"[Task] Published message for CampaignChannel #{cc.id}")
-            else:
-                logger.error(f"[Task] Failed to publish CampaignChannel #{cc.id}: {response.status_code}")
-        except Exception as e:
-            logger.error(f"[Task] Error publishing CampaignChannel #{cc.id}: {e}")
-
-    logger.info(f"[Task] Published {published}/{count} messages")
-    return {"checked": count, "published": published}
+    """
+    Safety net for ETA-scheduled publications (see core.publication_scheduler):
+    publishes overdue rows whose ETA task was lost and enqueues rows entering the horizon
+    """
+    from core.publication_scheduler import PublicationScheduler
+
+    result = PublicationScheduler.sweep()
+    logger.info(f"[Task] Publication sweep: {result}")
+    return result
 
 
 @app.shared_task(bind=True)
 @log_func
+def publish_campaign_channel(*args, **kwargs):
+    """Publish one campaign channel at its message_publish_date (enqueued with eta)"""
+    from core.publication_scheduler import PublicationScheduler
+
+    campaign_channel_id = kwargs.get("campaign_channel_id")
+    if not campaign_channel_id:
+        return False
+    return PublicationScheduler.publish_scheduled(campaign_channel_id, kwargs.get("planned_at"))
+
+
+@app.shared_task(bind=True)
+@log_func
+def send_campaign_channel_approval_requests(*args, **kwargs):
+    """
+    Approval requests to channel owners for new campaign channels
+    (core.campaign_assignment) or for a campaign leaving draft, sent in batches
+    outside the admin request
+    """
+    from core.approval_requests import ApprovalRequestService
+
+    queryset = CampaignChannel.objects.all()
+    if kwargs.get("campaign_id"):
+        queryset = queryset.filter(campaign_id=kwargs["campaign_id"])
+    if kwargs.get("campaign_channel_ids") is not None:
+        queryset = queryset.filter(pk__in=kwargs["campaign_channel_ids"])
+    notified = ApprovalRequestService.send(queryset)
+    logger.info(f"[Task] Approval requests sent: {notified}")
+    return notified
+
+
+@app.shared_task(bind=True, base=AuditResultTask)
+@log_func
 def create_payouts_for_legal_entities(*args, **kwargs):
     """
     Автоматическое создание выплат по юрлицам.
@@ -147,3 +159,34 @@ def create_payouts_for_legal_entities(*args, **kwargs):
 
     logger.info(f"[PayoutTask] done created={created} skipped={skipped} min_amount={min_amount}")
     return {"created": created, "skipped": skipped, "min_amount": str(min_amount)}
+
+
+@app.shared_task(bind=True, base=AuditResultTask)
+@log_func
+def create_ledger_checkpoints(*args, **kwargs):
+    """
+    Периодические чекпоинты главной книги (нарастающий итог дебет/кредит по счёту).
+
+    - period: "day" (по умолчанию) или "month".
+    - Пишется только для закрытых периодов и только по счетам с движением.
+    - Идемпотентна: повторный запуск за тот же период ничего не создаёт.
+    """
+    from core.models import LedgerCheckpoint
+
+    period = kwargs.get("period", LedgerCheckpoint.Period.DAY)
+    created = BalanceService.create_checkpoints(period=period)
+    logger.info(f"[LedgerCheckpointTask] period={period} created={created}")
+    return {"period": period, "created": created}
+
+
+@app.shared_task(bind=True)
+@log_func
+def cleanup_task_results(*args, **kwargs):
+    """
+    Удаление истёкших результатов задач из БД пачками (core.celery_results).
+    """
+    from core.celery_results import TaskResultRetention
+
+    deleted = TaskResultRetention.cleanup(batch_size=kwargs.get("batch_size"))
+    logger.info(f"[TaskResultCleanup] deleted={deleted}")
+    return deleted
@@ -1,10 +1,12 @@
 import re
+from decimal import Decimal
 
 from django import template
-from django.db.models import Sum, F, Q, Avg
+from django.db.models import Avg, ExpressionWrapper, F, FloatField, Q, Sum
 
 from django.utils.safestring import mark_safe
 
+from core.db_routing import using_reporting
 from core.models import ChannelAdmin
 
 register = template.Library()
@@ -12,8 +14,28 @@ register = template.Library()
 
 
 
+def campaign_channel_totals(queryset) -> dict:
+    """Totals of the changelist row and of the campaign totals bar, in one aggregate query"""
+    return using_reporting(queryset.order_by()).aggregate(
+        total_clicks=Sum("clicks", default=0),
+        total_impressions_fact=Sum("impressions_fact", default=0),
+        total_budget=Sum(F("cpm") * F('impressions_fact') / 1000, filter=Q(cpm__gte=1, impressions_fact__gte=1), default=0),
+        total_impressions_plan=Sum("impressions_plan", default=0),
+        total_ctr=Sum(
+            ExpressionWrapper(F('clicks') * 100.0 / F("impressions_fact"), output_field=FloatField()),
+            filter=Q(clicks__gte=1, impressions_fact__gte=1),
+            default=0,
+        ),
+        total_cpm=Sum('cpm'),
+        total_plan_cpm=Sum('plan_cpm'),
+        avg_cpm=Avg("cpm", default=0, filter=Q(cpm__gte=1)),
+        avg_cpm_plan=Avg("plan_cpm", default=0, filter=Q(plan_cpm__gte=1)),
+    )
+
+
 @register.simple_tag()
 def custom_result_list_totals(*args, **kwargs):
+    """Итого по всему отфильтрованному списку (cl.queryset), а не по странице"""
     result = kwargs["result"]
     cl = kwargs["cl"]
     totals = {
@@ -24,21 +46,12 @@ def custom_result_list_totals(*args, **kwargs):
         "ctr": 0,
     }
     if cl and cl.result_list:
-        for row in cl.result_list:
-            totals["impressions_plan"] += (
-                row.impressions_plan if row.impressions_plan else 0
-            )
-            totals["impressions_fact"] += (
-                row.impressions_fact if row.impressions_fact else 0
-            )
-            totals["clicks"] += row.clicks if row.clicks else 0
-            totals["ctr"] += (
-                row.clicks / row.impressions_fact * 100
-                if row.impressions_fact != 0
-                else 0
-            )
-            totals["earned_money"] += row.earned_money if row.earned_money else 0
-        totals["ctr"] = f"{totals['ctr']:.2f}%" if totals["ctr"] else "0"
+        aggregated = campaign_channel_totals(cl.queryset)
+        totals["impressions_plan"] = aggregated["total_impressions_plan"]
+        totals["impressions_fact"] = aggregated["total_impressions_fact"]
+        totals["clicks"] = aggregated["total_clicks"]
+        totals["earned_money"] = Decimal(aggregated["total_budget"]).quantize(Decimal("0.01"))
+        totals["ctr"] = f"{aggregated['total_ctr']:.2f}%" if aggregated["total_ctr"] else "0"
 
     html_str = ""
     p = r'<(?P<tg_nme>td|th) (?P<class_name>class=".*?")>(.+)(?P<tg_close><\/.*>)'
@@ -97,17 +110,7 @@ def campaign_channels_totals_bar(context, *args, **kwargs):
     """simply passing datas to javascript by data- attr"""
 
     formset = kwargs['form'].formset
-    totals = formset.queryset.aggregate(
-        total_clicks=Sum("clicks",default=0),
-        total_impressions_fact=Sum("impressions_fact",default=0),
-        total_budget=Sum(F("cpm") * F('impressions_fact') / 1000, filter=Q(cpm__gte=1 , impressions_fact__gte=1), default=0),
-        total_impressions_plan=Sum("impressions_plan", default=0),
-        total_ctr=Sum(F('clicks') / F("impressions_fact") * 100, filter=Q(clicks__gte=1, impressions_fact__gte=1), default=0),
-        total_cpm = Sum('cpm'),
-        total_plan_cpm=Sum('plan_cpm'),
-        avg_cpm=Avg("cpm", default=0, filter=Q(cpm__gte=1)),
-        avg_cpm_plan=Avg("plan_cpm", default=0, filter=Q(plan_cpm__gte=1)),
-        )
+    totals = campaign_channel_totals(formset.queryset)
     total_clicks, total_impressions_fact, total_budget, total_impressions_plan, total_ctr,total_cpm, total_plan_cpm, avg_cpm, avg_cpm_plan = totals.values()
     total_cpm_diff = (1- total_plan_cpm / total_cpm) * 100 *-1 if total_plan_cpm and total_cpm else 0
     hidden_tags = f"""
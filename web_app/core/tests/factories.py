@@ -5,7 +5,7 @@ from factory.django import DjangoModelFactory
 import factory.random
 from faker import Faker
 
-from core.models import Campaign, ChannelAdmin, Channel, PlacementFormat, default_supported_formats, ChannelPublicationSlot, ChannelTransaction, MediaPlanGeneration
+from core.models import Account, AccountType, Campaign, ChannelAdmin, Channel, LedgerEntry, PlacementFormat, default_supported_formats, ChannelPublicationSlot, ChannelTransaction, MediaPlanGeneration
 
 faker = Faker()
 
@@ -239,3 +239,29 @@ class MediaPlanGenerationFactory(DjangoModelFactory):
         campaigns = extracted or [CampaignFactory()]
         for campaign in campaigns:
             self.campaigns.add(campaign)
+
+
+class AccountFactory(DjangoModelFactory):
+    class Meta:
+        model = Account
+        django_get_or_create = ("channel", "account_type", "currency")
+
+    channel = factory.SubFactory(ChannelFactory)
+    account_type = AccountType.CASH
+    currency = "RUB"
+
+
+class LedgerEntryFactory(DjangoModelFactory):
+    """
+    Single ledger row; a balanced transaction is a DEBIT and a CREDIT
+    with the same transaction_id (core.ledger_service)
+    """
+    class Meta:
+        model = LedgerEntry
+
+    account = factory.SubFactory(AccountFactory)
+    amount = factory.fuzzy.FuzzyDecimal(1, 10000)
+    entry_type = LedgerEntry.EntryType.DEBIT
+    transaction_id = factory.Faker("uuid4", cast_to=None)
+    transaction_type = LedgerEntry.TransactionType.INCOME
+    source_type = "campaign_channel"
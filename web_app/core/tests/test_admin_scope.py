@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from core.admin_scope import AdminScopeService
+from core.models import CampaignChannel, Channel, ChannelAdmin
+from core.templatetags.core_tags import campaign_channel_totals
+from core.tests.factories import CampaignChannelFactory, CampaignFactory, ChannelAdminFactory, ChannelFactory
+
+CHANGELIST_URL = "/admin/core/campaignchannel/"
+
+
+class AdminScopeTests(TestCase):
+    def setUp(self):
+        self.owner = ChannelAdminFactory(username="scope-owner", role=ChannelAdmin.Role.OWNER)
+        self.user = self.owner.user
+        self.channel = ChannelFactory(name="scope channel", status=Channel.ChannelStatus.CONFIRMED, is_deleted=False)
+        self.owner.channels.add(self.channel)
+        AdminScopeService.invalidate([self.user.pk])
+        self.client.force_login(self.user)
+
+    def _changelist(self):
+        response = self.client.get(CHANGELIST_URL)
+        self.assertEqual(response.status_code, 200)
+        return response.context["cl"]
+
+    def test_owner_sees_only_own_placements_and_scope_is_cached(self):
+        own = CampaignChannelFactory(channel=self.channel, channel_admin=self.owner)
+        CampaignChannelFactory(channel=self.channel, channel_admin=ChannelAdminFactory(username="scope-other"))
+
+        with mock.patch.object(AdminScopeService, "build", wraps=AdminScopeService.build) as build:
+            first = self._changelist()
+            second = self._changelist()
+
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual([row.pk for row in first.result_list], [own.pk])
+        self.assertEqual([row.pk for row in second.result_list], [own.pk])
+        self.assertFalse(second.show_card or second.show_text)
+
+    def test_channel_status_change_invalidates_scope(self):
+        CampaignChannelFactory(channel=self.channel, channel_admin=self.owner)
+        self.assertTrue(AdminScopeService.for_user(self.user).confirmed_channel_ids)
+
+        self.channel.status = Channel.ChannelStatus.PENDING
+        self.channel.save()
+
+        cl = self._changelist()
+        self.assertTrue(cl.show_card)
+        self.assertEqual(list(cl.result_list), [])
+
+    def test_new_placement_is_seen_without_invalidation(self):
+        self.assertTrue(self._changelist().show_text)
+
+        CampaignChannel.objects.bulk_create(
+            [CampaignChannelFactory.build(campaign=CampaignFactory(), channel=self.channel, channel_admin=self.owner)]
+        )
+
+        cl = self._changelist()
+        self.assertFalse(cl.show_text)
+        self.assertEqual(len(cl.result_list), 1)
+
+    def test_totals_are_one_query_over_the_filtered_set(self):
+        rows = [
+            CampaignChannelFactory(
+                channel=ChannelFactory(name=f"totals {i}"), channel_admin=self.owner,
+                clicks=10, impressions_fact=1000, impressions_plan=2000, cpm=100,
+            )
+            for i in range(3)
+        ]
+        queryset = CampaignChannel.objects.filter(pk__in=[row.pk for row in rows])
+
+        with self.assertNumQueries(1):
+            totals = campaign_channel_totals(queryset)
+
+        self.assertEqual(totals["total_clicks"], 30)
+        self.assertEqual(totals["total_impressions_plan"], 6000)
+        self.assertEqual(totals["total_budget"], 300)
+        self.assertAlmostEqual(totals["total_ctr"], 3.0)
@@ -0,0 +1,101 @@
+import json
+from unittest.mock import patch
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.test import TestCase, override_settings
+from django.urls import include, path
+
+from core.async_http import OutboundCall, send_or_defer
+from core.models import Channel, ChannelAdmin, MessagePreviewToken
+from core.tests.factories import MessageFactory, UserFactory
+from core.urls import async_urls
+from web_app import urls as web_urls
+
+# как web_app/asgi.py (ASYNC_VIEWS): async-маршруты core.urls раньше обычных
+urlpatterns = [path("api/", include((async_urls, "core"))), *web_urls.urlpatterns]
+
+
+class FakeUpstream:
+    def __init__(self):
+        self.requests: list[httpx.Request] = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path == "/avatar.png":
+            return httpx.Response(200, headers={"Content-Type": "text/html"}, text="not an image")
+        if request.url.path.startswith("/channels/"):
+            return httpx.Response(200, json={"status": "error"})
+        return httpx.Response(202, json={})
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+    def paths(self):
+        return sorted(request.url.path for request in self.requests)
+
+
+@override_settings(ROOT_URLCONF=__name__)
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        self.upstream = FakeUpstream()
+        patcher = patch("core.async_http.async_client", side_effect=self.upstream.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_preview_awaits_bot_without_blocking_call(self):
+        user = await sync_to_async(UserFactory)(is_staff=True, is_superuser=True)
+        message = await sync_to_async(MessageFactory)()
+        await self.async_client.aforce_login(user)
+
+        with patch("requests.post") as blocking_post:
+            response = await self.async_client.post(f"/api/message/{message.pk}/preview/")
+
+        self.assertEqual(response.status_code, 201)
+        blocking_post.assert_not_called()
+        self.assertEqual(response.json()["bot_response_status"], 202)
+        self.assertEqual(self.upstream.paths(), ["/telegram/preview-token"])
+        self.assertTrue(await MessagePreviewToken.objects.filter(token=response.json()["token"]).aexists())
+
+    async def test_channel_create_defers_tgstat_avatar_and_notification(self):
+        payload = {
+            "tg_id": "-100777",
+            "name": "async channel",
+            "avatar": "https://cdn.example.com/avatar.png",
+            "admins": [{"user_id": 555, "status": "creator", "username": "async-owner"}],
+        }
+        with patch("requests.get") as blocking_get, patch("requests.post") as blocking_post:
+            response = await self.async_client.post(
+                "/api/channel/", json.dumps(payload), content_type="application/json"
+            )
+
+        self.assertEqual(response.status_code, 201, response.content)
+        blocking_get.assert_not_called()
+        blocking_post.assert_not_called()
+        self.assertEqual(
+            self.upstream.paths(),
+            ["/avatar.png", "/channels/get", "/channels/stat", "/telegram/channeladmin-added"],
+        )
+        channel = await Channel.objects.aget(tg_id="-100777")
+        # ответ не картинка — аватар заменён на стандартный после проверки
+        self.assertEqual(channel.avatar_url, "/static/custom/default.jpg")
+        self.assertTrue(await ChannelAdmin.objects.filter(tg_id="555", channels=channel).aexists())
+
+
+class OutboundCallTests(TestCase):
+    def test_sync_request_sends_immediately(self):
+        done = []
+        with patch("requests.post") as post:
+            post.return_value.status_code = 200
+            call = send_or_defer(None, OutboundCall("POST", "http://bot/x", json={"a": 1}, on_done=done.append))
+
+        post.assert_called_once_with("http://bot/x", headers={}, timeout=10, json={"a": 1})
+        self.assertEqual(done, [call])
+        self.assertIsNone(call.error)
+
+    def test_errors_are_reported_to_callback(self):
+        done = []
+        with patch("requests.get", side_effect=ConnectionError("down")):
+            call = OutboundCall("GET", "http://tgstat/x", on_done=done.append).send()
+        self.assertIsInstance(call.error, ConnectionError)
+        self.assertEqual(done, [call])
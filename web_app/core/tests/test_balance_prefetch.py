@@ -0,0 +1,87 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from core.ledger_service import DoubleEntryLedgerService as BalanceService
+from core.models import LegalEntity, User
+from core.tests.factories import ChannelFactory, LegalEntityFactory
+
+
+class BalancePrefetchTests(TestCase):
+    def setUp(self):
+        self.legal_entity = LegalEntityFactory(inn="7743013902")
+        self.channels = [
+            ChannelFactory(name=f"channel {i}", legal_entity=self.legal_entity) for i in range(3)
+        ]
+        BalanceService.record_income(self.channels[0], Decimal("100.00"))
+        BalanceService.record_income(self.channels[1], Decimal("40.00"))
+        BalanceService.freeze_amount(self.channels[1], Decimal("15.00"))
+        BalanceService.invalidate_cache_many([c.id for c in self.channels])
+
+    def _add_channels(self, count):
+        for i in range(count):
+            channel = ChannelFactory(name=f"extra {i}", legal_entity=self.legal_entity)
+            BalanceService.record_income(channel, Decimal("1.00"))
+            BalanceService.invalidate_cache(channel)
+
+    def test_prefetch_matches_calculate_balance_and_warms_cache(self):
+        with self.assertNumQueries(2):
+            balances = BalanceService.prefetch_balances(self.channels)
+
+        for channel in self.channels:
+            expected = BalanceService.calculate_balance(channel, use_cache=False)
+            self.assertEqual(balances[str(channel.id)], expected)
+            self.assertEqual(channel._balance_cache, expected)
+        self.assertEqual(balances[str(self.channels[1].id)].frozen, Decimal("15.00"))
+
+        with self.assertNumQueries(0):
+            BalanceService.prefetch_balances(self.channels)
+
+    def test_prefetch_legal_entity_totals(self):
+        totals = BalanceService.prefetch_legal_entity_balances([self.legal_entity])[str(self.legal_entity.id)]
+        self.assertEqual(totals, BalanceService.get_legal_entity_balance(self.legal_entity))
+        self.assertEqual(self.legal_entity._totals_cache, totals)
+
+    def _count_queries(self, url):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as ctx:
+            response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_channel_list_query_count_does_not_grow_with_page(self):
+        with patch.object(BalanceService, "calculate_balance") as calculate_balance:
+            small, response = self._count_queries("/api/channel/")
+            self._add_channels(4)
+            BalanceService.invalidate_cache_many([c.id for c in self.channels])
+            large, response = self._count_queries("/api/channel/")
+
+        calculate_balance.assert_not_called()
+        self.assertEqual(small, large)
+        data = {item["id"]: item for item in response.json()["results"]}
+        self.assertEqual(Decimal(str(data[str(self.channels[0].id)]["balance"])), Decimal("100.00"))
+
+    def test_legal_entity_channels_query_count_does_not_grow_with_page(self):
+        url = f"/api/legal-entity/{self.legal_entity.id}/channels/"
+        small, _ = self._count_queries(url)
+        self._add_channels(4)
+        BalanceService.invalidate_cache_many([c.id for c in self.channels])
+        large, response = self._count_queries(url)
+        self.assertEqual(small, large)
+        self.assertEqual(response.json()["count"], 7)
+
+    def test_admin_changelists_use_prefetch(self):
+        admin_user = User.objects.create_superuser(username="balance-admin", password="x")
+        self.client.force_login(admin_user)
+        with patch.object(BalanceService, "calculate_balance") as calculate_balance:
+            self.assertEqual(self.client.get("/admin/core/channel/").status_code, 200)
+            self.assertEqual(self.client.get("/admin/core/legalentity/").status_code, 200)
+            self.assertEqual(
+                self.client.get(f"/admin/core/legalentity/{self.legal_entity.id}/change/").status_code, 200
+            )
+        calculate_balance.assert_not_called()
+        self.assertTrue(LegalEntity.objects.filter(pk=self.legal_entity.pk).exists())
@@ -116,8 +116,8 @@ class CampaignArchivingAPITests(TestCase):
         response = self.client.get(url)
 
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["id"], str(active_cc.id))
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["id"], str(active_cc.id))
 
     def test_unpublished_campaigns_endpoint_excludes_archived(self):
         self._create_campaign_channel(archived=False)
@@ -178,7 +178,7 @@ class CampaignDeletionIntegrationTests(TestCase):
         url = reverse("core:campaignchannel-list")
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        ids = {item["id"] for item in response.data}
+        ids = {item["id"] for item in response.data["results"]}
         self.assertNotIn(str(cc.id), ids)
 
     def test_workflow_archived_campaign_excluded_from_bot_endpoints(self):
@@ -241,7 +241,7 @@ class CampaignDeletionIntegrationTests(TestCase):
         # Проверяем, что кампания скрыта
         url = reverse("core:campaignchannel-list")
         response = self.client.get(url)
-        ids = {item["id"] for item in response.data}
+        ids = {item["id"] for item in response.data["results"]}
         self.assertNotIn(str(cc.id), ids)
 
         # Разархивируем
@@ -251,7 +251,7 @@ class CampaignDeletionIntegrationTests(TestCase):
 
         # Проверяем, что кампания теперь видна
         response = self.client.get(url)
-        ids = {item["id"] for item in response.data}
+        ids = {item["id"] for item in response.data["results"]}
         self.assertIn(str(cc.id), ids)
 
     def test_archived_campaign_with_publications_still_cannot_be_deleted(self):
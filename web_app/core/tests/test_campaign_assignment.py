@@ -0,0 +1,126 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.campaign_assignment import CampaignAssignmentService
+from core.models import Campaign, CampaignChannel, ChannelAdmin, PlacementFormat, User
+from core.tests.factories import CampaignChannelFactory, CampaignFactory, ChannelAdminFactory, ChannelFactory
+
+
+def local_dt(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)), timezone.get_current_timezone())
+
+
+class CampaignAssignmentTests(TestCase):
+    def setUp(self):
+        self.day = timezone.localdate() + timedelta(days=3)
+        self.campaign = CampaignFactory(
+            name="assignment campaign",
+            status=Campaign.Statuses.ACTIVE,
+            budget=1000,
+            start_date=timezone.localdate(),
+            finish_date=self.day + timedelta(days=7),
+            format=PlacementFormat.FIXED_SLOT,
+            slot_publication_at=local_dt(self.day, 10),
+        )
+
+    def _channels(self, count, prefix="assign channel"):
+        return [ChannelFactory(name=f"{prefix} {i}", auto_approve_publications=False) for i in range(count)]
+
+    def _with_admin(self, channel, name):
+        admin = ChannelAdminFactory(username=name, role=ChannelAdmin.Role.OWNER, is_bot_installed=True)
+        admin.channels.add(channel)
+        return admin
+
+    def _assign(self, channels, **kwargs):
+        with patch("core.tasks.send_campaign_channel_approval_requests.delay") as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                result = CampaignAssignmentService.assign(self.campaign, channels, **kwargs)
+        return result, delay
+
+    def test_query_count_does_not_grow_with_channel_count(self):
+        small_batch = self._channels(2, "small")
+        large_batch = self._channels(12, "large")
+        # prefetch сигналов/настроек, не связанных с размером пачки
+        self._assign(self._channels(1, "warmup"))
+
+        with self.assertNumQueries(9):
+            small, _ = self._assign(small_batch)
+        with self.assertNumQueries(9):
+            large, _ = self._assign(large_batch)
+        self.assertEqual(len(small.created), 2)
+        self.assertEqual(len(large.created), 12)
+
+    def test_rejections_are_reported_per_channel(self):
+        existing, unsupported, taken, fine = self._channels(4)
+        CampaignChannelFactory(
+            campaign=self.campaign, channel=existing, is_message_published=False, is_approved=True
+        )
+        unsupported.supported_formats = [PlacementFormat.SPONSORSHIP]
+        unsupported.save()
+        other = CampaignFactory(
+            name="other campaign", format=PlacementFormat.FIXED_SLOT, slot_publication_at=local_dt(self.day, 10)
+        )
+        CampaignChannelFactory(campaign=other, channel=taken, is_message_published=False, is_approved=True)
+
+        result, _ = self._assign([existing, unsupported, taken, fine])
+
+        self.assertEqual([cc.channel_id for cc in result.created], [fine.pk])
+        self.assertEqual(
+            set(result.rejected), {str(existing.pk), str(unsupported.pk), str(taken.pk)}
+        )
+        self.assertIn("уже добавлен", result.rejected[str(existing.pk)])
+        self.assertEqual(result.alternatives[str(taken.pk)][0], local_dt(self.day, 11))
+        created = CampaignChannel.objects.get(campaign=self.campaign, channel=fine)
+        self.assertIsNotNone(created.publication_slot_id)
+        self.assertEqual(created.publish_status, CampaignChannel.PublishStatusChoices.PLANNED)
+
+    def test_budget_limit_and_draft_campaign(self):
+        channels = self._channels(3)
+        result, _ = self._assign(channels, cpm=Decimal("1000"), impressions_plan=400)
+        self.assertEqual(len(result.created), 2)
+        self.assertIn("бюджет", result.rejected[str(channels[2].pk)])
+
+        self.campaign.status = Campaign.Statuses.DRAFT
+        result, _ = self._assign(self._channels(1, "draft"))
+        self.assertFalse(result.created)
+
+    def test_approval_requests_are_sent_once_after_commit(self):
+        manual, auto, no_bot = self._channels(3)
+        auto.auto_approve_publications = True
+        auto.save()
+        self._with_admin(manual, "assign-owner-1")
+        self._with_admin(auto, "assign-owner-2")
+
+        result, delay = self._assign([manual, auto, no_bot])
+
+        self.assertEqual(len(result.created), 3)
+        self.assertEqual(result.notified, 1)
+        delay.assert_called_once()
+        pending = CampaignChannel.objects.get(campaign=self.campaign, channel=manual)
+        self.assertEqual(delay.call_args.kwargs["campaign_channel_ids"], [str(pending.pk)])
+        self.assertEqual(
+            CampaignChannel.objects.get(campaign=self.campaign, channel=auto).publish_status,
+            CampaignChannel.PublishStatusChoices.CONFIRMED,
+        )
+
+    def test_admin_action(self):
+        channels = self._channels(2)
+        admin_user = User.objects.create_superuser(username="assign-admin", password="x")
+        self.client.force_login(admin_user)
+        data = {"action": "assign_to_campaign", "_selected_action": [str(c.pk) for c in channels]}
+
+        response = self.client.post("/admin/core/channel/", data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "assign_to_campaign")
+
+        with patch("core.tasks.send_campaign_channel_approval_requests.delay"):
+            response = self.client.post(
+                "/admin/core/channel/",
+                {**data, "apply": "1", "campaign": str(self.campaign.pk), "cpm": 0, "impressions_plan": 0},
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(CampaignChannel.objects.filter(campaign=self.campaign).count(), 2)
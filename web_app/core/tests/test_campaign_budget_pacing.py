@@ -0,0 +1,113 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.budget_service import CampaignBudgetService
+from core.models import Campaign, CampaignChannel
+from core.tests.factories import CampaignChannelFactory, CampaignFactory
+from core.tasks import campaign_alter_activity
+
+
+class CampaignBudgetTrackingTests(TestCase):
+    def setUp(self):
+        self.campaign = CampaignFactory(status=Campaign.Statuses.ACTIVE, budget=Decimal("100.00"))
+
+    def _placement(self, **kwargs):
+        params = {"campaign": self.campaign, "cpm": Decimal("1000.00"), "impressions_fact": 0}
+        params.update(kwargs)
+        return CampaignChannelFactory(**params)
+
+    def test_spent_amount_follows_impressions(self):
+        placement = self._placement(impressions_fact=30)
+        self._placement(impressions_fact=20)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("50.00"))
+
+        placement = CampaignChannel.objects.get(pk=placement.pk)
+        placement.impressions_fact = 40
+        placement.save()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("60.00"))
+        self.assertEqual(self.campaign.status, Campaign.Statuses.ACTIVE)
+
+        placement.delete()
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("20.00"))
+
+    def test_overspend_pauses_immediately(self):
+        placement = self._placement(impressions_fact=50)
+        placement.cpm = Decimal("2000.00")
+        placement.save()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("100.00"))
+        self.assertEqual(self.campaign.status, Campaign.Statuses.PAUSED)
+
+    def test_campaign_save_does_not_overwrite_spent_amount(self):
+        stale = Campaign.objects.get(pk=self.campaign.pk)
+        self._placement(impressions_fact=10)
+        stale.name = "Renamed"
+        stale.save()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("10.00"))
+        self.assertEqual(self.campaign.name, "Renamed")
+
+    def test_deferred_instance_triggers_recalculation(self):
+        placement = self._placement(impressions_fact=10)
+        deferred = CampaignChannel.objects.only("id", "campaign", "clicks").get(pk=placement.pk)
+        deferred.clicks = 5
+        deferred.save()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("10.00"))
+
+    def test_stale_instances_do_not_double_count(self):
+        placement = self._placement(impressions_fact=10)
+        first = CampaignChannel.objects.get(pk=placement.pk)
+        second = CampaignChannel.objects.get(pk=placement.pk)
+        first.impressions_fact = 30
+        first.save()
+        second.impressions_fact = 30
+        second.save()
+        placement.refresh_from_db()
+        placement.impressions_fact = 40
+        placement.save()
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.spent_amount, Decimal("40.00"))
+
+    def test_deferred_campaign_save_keeps_deferred_fields(self):
+        self._placement(impressions_fact=10)
+        deferred = Campaign.objects.only("id", "name", "status").get(pk=self.campaign.pk)
+        deferred.name = "Deferred"
+        deferred.save()
+
+        self.assertIn("budget", deferred.get_deferred_fields())
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.name, "Deferred")
+        self.assertEqual(self.campaign.spent_amount, Decimal("10.00"))
+
+    def test_safety_net_catches_bulk_updates(self):
+        placement = self._placement(impressions_fact=10)
+        CampaignChannel.objects.filter(pk=placement.pk).update(impressions_fact=500)
+
+        self.assertEqual(campaign_alter_activity(), 1)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, Campaign.Statuses.PAUSED)
+
+    def test_forecast(self):
+        today = timezone.localdate()
+        self.campaign.start_date = today - timedelta(days=4)
+        self.campaign.finish_date = today + timedelta(days=30)
+        self.campaign.save()
+        self._placement(impressions_fact=25)  # 25 руб. за 5 дней -> 5 руб./день
+        self.campaign.refresh_from_db()
+
+        forecast = CampaignBudgetService.forecast(self.campaign, today=today)
+        self.assertEqual(forecast.daily_spend, Decimal("5.00"))
+        self.assertEqual(forecast.remaining, Decimal("75.00"))
+        self.assertEqual(forecast.exhaustion_date, today + timedelta(days=15))
+        self.assertTrue(forecast.exhausts_before_finish)
@@ -1,9 +1,11 @@
+import json
 from decimal import Decimal
 from unittest import mock
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
+from core.approval_requests import ApprovalRequestService
 from core.models import Campaign, CampaignChannel
 from core.tests.factories import (
     CampaignChannelFactory,
@@ -21,8 +23,8 @@ class CampaignNotificationTests(TestCase):
         self.channel_admin.channels.add(self.channel)
 
     @mock.patch("core.signals.send_message_to_channel_admin")
-    @mock.patch("core.models.CampaignChannel.send_approval_request")
-    def test_notifications_sent_once_on_exit_from_draft(self, notify_mock, _send_signal_mock):
+    @mock.patch("core.tasks.send_campaign_channel_approval_requests.delay")
+    def test_notifications_sent_once_on_exit_from_draft(self, delay_mock, _send_signal_mock):
         campaign = CampaignFactory(
             status=Campaign.Statuses.DRAFT,
             budget=Decimal("100000.00"),
@@ -36,15 +38,54 @@ class CampaignNotificationTests(TestCase):
             is_approved=False,
         )
 
-        campaign.status = Campaign.Statuses.ACTIVE
-        campaign.full_clean()
-        campaign.save(update_fields=["status"])
+        with self.captureOnCommitCallbacks(execute=True):
+            campaign.status = Campaign.Statuses.ACTIVE
+            campaign.full_clean()
+            campaign.save(update_fields=["status"])
 
-        campaign.status = Campaign.Statuses.PAUSED
-        campaign.full_clean()
-        campaign.save(update_fields=["status"])
+            campaign.status = Campaign.Statuses.PAUSED
+            campaign.full_clean()
+            campaign.save(update_fields=["status"])
 
-        notify_mock.assert_called_once()
+        delay_mock.assert_called_once_with(campaign_id=str(campaign.id))
+
+    @mock.patch("core.approval_requests.requests.post")
+    def test_approval_requests_are_batched(self, post_mock):
+        campaign = CampaignFactory(status=Campaign.Statuses.ACTIVE, budget=Decimal("100000.00"))
+        placements = []
+        for i in range(5):
+            channel = ChannelFactory(name=f"batched channel {i}", auto_approve_publications=False)
+            self.channel_admin.channels.add(channel)
+            with mock.patch("core.signals.send_message_to_channel_admin"):
+                placements.append(
+                    CampaignChannelFactory(
+                        campaign=campaign,
+                        channel=channel,
+                        channel_admin=self.channel_admin,
+                        is_message_published=False,
+                        is_approved=False,
+                        publish_status=CampaignChannel.PublishStatusChoices.PLANNED,
+                    )
+                )
+        # администратор больше не управляет каналом — запрос не отправляется
+        self.channel_admin.channels.remove(placements[4].channel)
+        # бот не доставил одно сообщение — строка остаётся без отметки
+        post_mock.return_value = mock.Mock(
+            status_code=200, json=lambda: {"sent": [str(p.id) for p in placements[:3]]}
+        )
+
+        with self.assertNumQueries(2):
+            notified = ApprovalRequestService.send(CampaignChannel.objects.filter(campaign=campaign))
+
+        self.assertEqual(notified, 3)
+        post_mock.assert_called_once()
+        payload = json.loads(post_mock.call_args.kwargs["data"])["requests"]
+        self.assertEqual({item["id"] for item in payload}, {str(p.id) for p in placements[:4]})
+        self.assertEqual(str(payload[0]["tg_id"]), str(self.channel_admin.tg_id))
+        self.assertNotIn("message", payload[0])
+        self.assertEqual(
+            CampaignChannel.objects.filter(campaign=campaign, approval_notified_at__isnull=True).count(), 2
+        )
 
     def test_buttons_validation_fixed_slot(self):
         campaign = CampaignFactory(format="fixed_slot")
@@ -0,0 +1,64 @@
+from datetime import timedelta
+from unittest import mock
+
+from celery.backends.redis import RedisBackend
+from django.test import TestCase
+from django.utils import timezone
+from django_celery_results.backends import DatabaseBackend
+from django_celery_results.models import GroupResult, TaskResult
+
+from core.celery_results import TaskResultRetention
+from core.tasks import (
+    check_and_publish_scheduled_messages,
+    create_ledger_checkpoints,
+    create_payouts_for_legal_entities,
+    update_campaign_channel_views,
+)
+from web_app.celery import app
+
+
+class ResultPolicyTests(TestCase):
+    def test_audit_tasks_write_to_database_others_to_redis(self):
+        for task in (create_payouts_for_legal_entities, create_ledger_checkpoints):
+            self.assertIsInstance(task.backend, DatabaseBackend, task.name)
+            self.assertTrue(task.track_started, task.name)
+        for task in (check_and_publish_scheduled_messages, update_campaign_channel_views):
+            self.assertIsInstance(task.backend, RedisBackend, task.name)
+            self.assertFalse(task.track_started, task.name)
+        self.assertEqual(app.conf.result_expires, timedelta(days=1))
+
+    def test_audit_task_result_is_persisted_with_name(self):
+        with mock.patch.object(create_ledger_checkpoints, "store_eager_result", True):
+            result = create_ledger_checkpoints.apply(kwargs={"period": "day"})
+
+        row = TaskResult.objects.get(task_id=result.id)
+        self.assertEqual(row.status, "SUCCESS")
+        self.assertEqual(row.task_name, create_ledger_checkpoints.name)
+
+
+class TaskResultRetentionTests(TestCase):
+    def _result(self, name, age: timedelta):
+        row = TaskResult.objects.create(task_id=f"{name}-{age.days}-{TaskResult.objects.count()}", task_name=name)
+        TaskResult.objects.filter(pk=row.pk).update(date_done=timezone.now() - age)
+        return row.task_id
+
+    def test_cleanup_keeps_audit_results_and_deletes_in_batches(self):
+        audit = create_payouts_for_legal_entities.name
+        regular = check_and_publish_scheduled_messages.name
+        kept = {
+            self._result(regular, timedelta(hours=1)),
+            self._result(audit, timedelta(days=30)),
+        }
+        for _ in range(5):
+            self._result(regular, timedelta(days=2))
+        self._result(None, timedelta(days=2))
+        self._result(audit, timedelta(days=400))
+        group = GroupResult.objects.create(group_id="old-group")
+        GroupResult.objects.filter(pk=group.pk).update(date_done=timezone.now() - timedelta(days=2))
+
+        deleted = TaskResultRetention.cleanup(batch_size=2)
+
+        self.assertEqual(deleted, {"task_results": 7, "group_results": 1})
+        self.assertEqual(set(TaskResult.objects.values_list("task_id", flat=True)), kept)
+        self.assertIn(audit, TaskResultRetention.audit_task_names())
+        self.assertNotIn(regular, TaskResultRetention.audit_task_names())
@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from core import channel_search
+from core.channel_search import ChannelSearch, create_trigram_indexes, drop_trigram_indexes
+from core.models import Channel, User
+from core.tests.factories import ChannelFactory, LegalEntityFactory
+
+
+class ChannelSearchTests(TestCase):
+    def setUp(self):
+        self.legal_entity = LegalEntityFactory(inn="7707083893")
+        self.exact = ChannelFactory(name="Cooking", username="chef", category="food", legal_entity=self.legal_entity)
+        self.prefix = ChannelFactory(name="Cooking daily", username="daily", legal_entity=self.legal_entity)
+        self.about = ChannelFactory(
+            name="Kitchen", username="kitchen", about="recipes and cooking tips", legal_entity=self.legal_entity
+        )
+        self.other = ChannelFactory(name="Football", username="ball", language="en", legal_entity=self.legal_entity)
+        channel_search._trigram_available.clear()
+        self.addCleanup(channel_search._trigram_available.clear)
+
+    def _names(self, qs):
+        return [channel.name for channel in qs]
+
+    def test_every_word_matches_some_field(self):
+        self.assertEqual(set(self._names(ChannelSearch.filter(Channel.objects.all(), "cook"))), {
+            "Cooking", "Cooking daily", "Kitchen",
+        })
+        self.assertEqual(self._names(ChannelSearch.filter(Channel.objects.all(), "kitchen tips")), ["Kitchen"])
+        self.assertEqual(self._names(ChannelSearch.filter(Channel.objects.all(), "EN ball")), ["Football"])
+
+    def test_fallback_rank_prefers_name_matches(self):
+        with mock.patch.object(channel_search, "trigram_available", return_value=False):
+            ranked = self._names(ChannelSearch.search(Channel.objects.all(), "cooking"))
+
+        self.assertEqual(ranked, ["Cooking", "Cooking daily", "Kitchen"])
+
+    def test_trigram_rank_and_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            create_trigram_indexes(schema_editor)
+        if not channel_search.trigram_available():
+            self.skipTest("pg_trgm is not available")
+
+        ranked = self._names(ChannelSearch.search(Channel.objects.all(), "cooking"))
+
+        self.assertEqual(ranked[0], "Cooking")
+        self.assertEqual(ranked[-1], "Kitchen")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE tablename = 'core_channel'")
+            indexes = {row[0] for row in cursor.fetchall()}
+        self.assertLessEqual(set(channel_search.TRIGRAM_INDEXES.values()), indexes)
+        with connection.schema_editor() as schema_editor:
+            drop_trigram_indexes(schema_editor)
+
+    def test_legal_entity_channels_endpoint(self):
+        url = f"/api/legal-entity/{self.legal_entity.id}/channels/"
+        client = APIClient()
+
+        ranked = client.get(url, {"search": "cooking"}).json()["results"]
+        ordered = client.get(url, {"search": "cooking", "ordering": "-name"}).json()["results"]
+
+        self.assertEqual([row["name"] for row in ranked], ["Cooking", "Cooking daily", "Kitchen"])
+        self.assertEqual([row["name"] for row in ordered], ["Kitchen", "Cooking daily", "Cooking"])
+
+    def test_admin_search_is_ranked(self):
+        client = APIClient()
+        client.force_login(User.objects.create_superuser(username="search-admin", password="x"))
+
+        response = client.get("/admin/core/channel/", {"q": "cooking"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [channel.name for channel in response.context["cl"].result_list], ["Cooking", "Cooking daily", "Kitchen"]
+        )
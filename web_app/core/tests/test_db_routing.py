@@ -0,0 +1,87 @@
+from unittest import mock
+
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TestCase, override_settings
+
+from core import db_routing
+from core.db_routing import REPORTING_DB, replica_health, replica_lag, reporting_alias, reporting_reads, using_reporting
+from core.exporter import QuerySetExporter
+from core.media_plan.generator import MediaPlanGenerator
+from core.models import CampaignChannel, LegalEntity
+from core.tests.factories import CampaignChannelFactory, LegalEntityFactory, UserFactory
+
+
+@override_settings(REPORTING_DB_ENABLED=True, REPORTING_MAX_LAG_SECONDS=30)
+class ReportingRouterTests(TestCase):
+    # "reporting" — отдельная тестовая база, а не зеркало: видно, куда ушёл запрос
+    databases = {DEFAULT_DB_ALIAS, REPORTING_DB}
+
+    def setUp(self):
+        replica_health.reset()
+        self.addCleanup(replica_health.reset)
+        self.primary_entity = LegalEntityFactory(name="primary entity", inn="7700000001")
+        self.replica_entity = LegalEntityFactory.build(name="replica entity", inn="7700000002")
+        self.replica_entity.save(using=REPORTING_DB)
+
+    def test_using_reporting_reads_the_replica(self):
+        self.assertEqual(reporting_alias(), REPORTING_DB)
+        self.assertEqual(
+            list(using_reporting(LegalEntity.objects.all()).values_list("name", flat=True)), ["replica entity"]
+        )
+        self.assertEqual(list(LegalEntity.objects.values_list("name", flat=True)), ["primary entity"])
+
+    def test_reporting_reads_route_reads_but_not_writes(self):
+        with reporting_reads():
+            self.assertEqual(LegalEntity.objects.get().name, "replica entity")
+            LegalEntityFactory(name="written inside block", inn="7700000003")
+        self.assertTrue(LegalEntity.objects.filter(name="written inside block").exists())
+        self.assertFalse(LegalEntity.objects.using(REPORTING_DB).filter(name="written inside block").exists())
+        # вне блока роутер не вмешивается
+        self.assertEqual(LegalEntity.objects.count(), 2)
+
+    def test_falls_back_to_primary_when_lagging_or_unavailable(self):
+        with mock.patch.object(db_routing, "replica_lag", return_value=31.0):
+            self.assertEqual(reporting_alias(), DEFAULT_DB_ALIAS)
+            self.assertEqual(using_reporting(LegalEntity.objects.all()).get().name, "primary entity")
+
+        replica_health.reset()
+        with mock.patch.object(db_routing, "replica_lag", return_value=None):
+            self.assertEqual(reporting_alias(), DEFAULT_DB_ALIAS)
+
+        replica_health.reset()
+        with mock.patch.object(db_routing, "replica_lag", return_value=2.0):
+            self.assertEqual(reporting_alias(), REPORTING_DB)
+
+    def test_lag_is_checked_once_per_interval(self):
+        with mock.patch.object(db_routing, "replica_lag", return_value=0.0) as lag:
+            for _ in range(5):
+                reporting_alias()
+        lag.assert_called_once()
+
+    def test_replica_lag_of_a_primary_is_zero(self):
+        self.assertEqual(replica_lag(REPORTING_DB), 0.0)
+
+    @override_settings(REPORTING_DB_ENABLED=False)
+    def test_disabled_without_replica_host(self):
+        with mock.patch.object(db_routing, "replica_lag") as lag:
+            self.assertEqual(reporting_alias(), DEFAULT_DB_ALIAS)
+            with reporting_reads():
+                self.assertEqual(LegalEntity.objects.get().name, "primary entity")
+        lag.assert_not_called()
+
+    def test_reporting_code_paths_read_the_replica(self):
+        campaign_channel = CampaignChannelFactory(clicks=7)
+        campaign = campaign_channel.campaign
+
+        # реплика пуста: статистика кампании и медиаплан считаются по ней
+        self.assertEqual(campaign.total_clicks, 0)
+        self.assertEqual(campaign.total_channels_count, 0)
+        with mock.patch.object(db_routing, "reporting_alias", return_value=DEFAULT_DB_ALIAS):
+            self.assertEqual(campaign.total_clicks, 7)
+
+        self.assertEqual(MediaPlanGenerator()._prepare_campaigns(type(campaign).objects.all()), [])
+        exporter = QuerySetExporter(
+            data=CampaignChannel.objects.all(), format="xlsx", cols=[], for_user=UserFactory(is_superuser=True)
+        )
+        self.assertEqual(exporter._data.db, REPORTING_DB)
+        self.assertEqual(exporter._export_data, [])
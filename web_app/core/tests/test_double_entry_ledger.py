@@ -7,11 +7,12 @@ REF: Financial system audit 2025-11-19
 import pytest
 import uuid
 from decimal import Decimal
+from unittest.mock import patch
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 
-from core.models import Account, LedgerEntry, AccountType, Channel
-from core.ledger_service import DoubleEntryLedgerService, ChannelBalance
+from core.models import Account, LedgerEntry, AccountType, Channel, Payout
+from core.ledger_service import DoubleEntryLedgerService, ChannelBalance, LedgerBatch
 from core.tests.factories import ChannelFactory, LegalEntityFactory
 
 
@@ -435,3 +436,100 @@ class TestDoubleEntryLedgerService(TestCase):
 
         self.assertNotEqual(balance1.balance, balance2.balance)
         self.assertEqual(balance2.balance, Decimal('1000.00'))
+
+
+class TestLedgerBatch(TestCase):
+    """Tests for batched ledger postings"""
+
+    def setUp(self):
+        self.channels = [ChannelFactory() for _ in range(3)]
+
+    def test_batch_income_balances(self):
+        """Batch income produces the same balances as record_income"""
+        batch = LedgerBatch()
+        tx_ids = [batch.add_income(channel, Decimal('100.00')) for channel in self.channels]
+        self.assertEqual(batch.commit(), tx_ids)
+
+        for tx_id in tx_ids:
+            self.assertTrue(DoubleEntryLedgerService.validate_transaction_balance(tx_id))
+        balances = DoubleEntryLedgerService.get_balance_for_channels(self.channels)
+        for channel in self.channels:
+            self.assertEqual(balances[str(channel.id)].available, Decimal('100.00'))
+        self.assertEqual(len(batch), 0)
+
+    def test_batch_query_count_independent_of_size(self):
+        """Accounts resolved and entries inserted in a constant number of queries"""
+        for channel in self.channels:
+            DoubleEntryLedgerService.ensure_accounts(channel)
+        more_channels = self.channels + [ChannelFactory() for _ in range(5)]
+        for channel in more_channels[3:]:
+            DoubleEntryLedgerService.ensure_accounts(channel)
+
+        batch = LedgerBatch()
+        for channel in more_channels:
+            batch.add_income(channel, Decimal('10.00'))
+        # SELECT accounts + bulk INSERT entries (+ savepoint pair from atomic)
+        with self.assertNumQueries(4):
+            batch.commit()
+        self.assertEqual(LedgerEntry.objects.count(), 2 * len(more_channels))
+
+    def test_batch_creates_missing_accounts(self):
+        """Missing accounts are created in bulk"""
+        batch = LedgerBatch()
+        batch.add_income(self.channels[0], Decimal('50.00'))
+        batch.commit()
+        self.assertEqual(Account.objects.filter(channel=self.channels[0]).count(), 4)
+
+    def test_batch_rejects_unbalanced_transaction(self):
+        """Unbalanced multi-leg transaction is rejected before commit"""
+        batch = LedgerBatch()
+        with self.assertRaises(ValidationError):
+            batch.add_transaction(
+                self.channels[0],
+                LedgerEntry.TransactionType.ADJUSTMENT,
+                lines=[
+                    (AccountType.CASH, LedgerEntry.EntryType.DEBIT, Decimal('10.00')),
+                    (AccountType.REVENUE, LedgerEntry.EntryType.CREDIT, Decimal('9.00')),
+                ],
+            )
+        self.assertEqual(len(batch), 0)
+
+    def test_batch_checks_running_balance(self):
+        """Outgoing postings are checked against balance plus earlier postings in the batch"""
+        channel = self.channels[0]
+        batch = LedgerBatch()
+        batch.add_income(channel, Decimal('100.00'))
+        batch.add_freeze(channel, Decimal('80.00'))
+        batch.add_payout(channel, Decimal('30.00'))
+        with self.assertRaises(ValidationError) as context:
+            batch.commit()
+        self.assertIn("Insufficient", str(context.exception))
+        self.assertFalse(LedgerEntry.objects.exists())
+
+    def test_batch_invalidates_cache(self):
+        """Cached balances are dropped for every channel in the batch"""
+        for channel in self.channels:
+            DoubleEntryLedgerService.calculate_balance(channel, use_cache=True)
+
+        batch = LedgerBatch()
+        for channel in self.channels:
+            batch.add_income(channel, Decimal('20.00'))
+        batch.commit()
+
+        for channel in self.channels:
+            balance = DoubleEntryLedgerService.calculate_balance(channel, use_cache=True)
+            self.assertEqual(balance.balance, Decimal('20.00'))
+
+    def test_payout_batch_rechecks_stale_balance(self):
+        """Payout portions are re-checked inside the batch, not trusted from an unlocked read"""
+        legal_entity = LegalEntityFactory()
+        channel = ChannelFactory(legal_entity=legal_entity)
+        DoubleEntryLedgerService.record_income(channel, Decimal('100.00'))
+        payout = Payout.objects.create(legal_entity=legal_entity, amount=Decimal('50.00'), currency="RUB")
+
+        stale = DoubleEntryLedgerService.get_balance_for_channels([channel])
+        DoubleEntryLedgerService.freeze_amount(channel, Decimal('80.00'))  # параллельная заморозка
+        with patch.object(DoubleEntryLedgerService, "get_balance_for_channels", return_value=stale):
+            with self.assertRaises(ValidationError):
+                payout._ensure_payout_transactions()
+        self.assertFalse(LedgerEntry.objects.filter(source_type="payout", source_id=payout.id).exists())
@@ -0,0 +1,141 @@
+"""
+Tests for ledger checkpoints and point-in-time balances
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.test import TestCase
+from django.utils import timezone
+
+from core.ledger_service import DoubleEntryLedgerService
+from core.models import AccountType, LedgerCheckpoint, LedgerEntry
+from core.tasks import create_ledger_checkpoints
+from core.tests.factories import ChannelFactory, LegalEntityFactory
+
+
+pytestmark = [pytest.mark.django_db]
+
+
+def aware(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+class TestPointInTimeBalance(TestCase):
+
+    def setUp(self):
+        self.channel = ChannelFactory()
+
+    def _post(self, method, amount, at):
+        tx_id = getattr(DoubleEntryLedgerService, method)(self.channel, Decimal(amount))
+        LedgerEntry.objects.filter(transaction_id=tx_id).update(created_at=at)
+        return tx_id
+
+    def test_balance_as_of_without_checkpoints(self):
+        self._post("record_income", "1000.00", aware(2025, 1, 10, 12))
+        self._post("freeze_amount", "300.00", aware(2025, 2, 5, 12))
+
+        january = DoubleEntryLedgerService.balance_as_of(self.channel, aware(2025, 1, 31, 23, 59))
+        self.assertEqual(january.balance, Decimal("1000.00"))
+        self.assertEqual(january.frozen, Decimal("0"))
+
+        february = DoubleEntryLedgerService.balance_as_of(self.channel, aware(2025, 2, 28, 23, 59))
+        self.assertEqual(february.balance, Decimal("1000.00"))
+        self.assertEqual(february.available, Decimal("700.00"))
+        self.assertEqual(february.frozen, Decimal("300.00"))
+
+    def test_checkpoint_plus_delta_matches_full_history(self):
+        self._post("record_income", "1000.00", aware(2025, 1, 10, 12))
+        self._post("record_income", "500.00", aware(2025, 1, 20, 12))
+
+        created = DoubleEntryLedgerService.create_checkpoints(
+            period=LedgerCheckpoint.Period.MONTH, period_end=aware(2025, 2, 1)
+        )
+        self.assertEqual(created, 2)  # CASH + REVENUE had activity
+        self._post("record_payout", "200.00", aware(2025, 2, 10, 12))
+
+        cash = self.channel.accounts.get(account_type=AccountType.CASH)
+        checkpoint = cash.checkpoints.get()
+        self.assertEqual(checkpoint.debit_total, Decimal("1500.00"))
+        self.assertEqual(checkpoint.entries_count, 2)
+
+        # checkpoint + delta, 4 queries: accounts, latest checkpoints, checkpoint rows, delta aggregate
+        with self.assertNumQueries(4):
+            balance = DoubleEntryLedgerService.balance_as_of(self.channel, aware(2025, 2, 15))
+        self.assertEqual(balance.available, Decimal("1300.00"))
+        self.assertEqual(
+            DoubleEntryLedgerService.balance_as_of(cash, aware(2025, 1, 15)), Decimal("1000.00")
+        )
+
+    def test_checkpoints_are_idempotent_and_skip_idle_accounts(self):
+        self._post("record_income", "100.00", aware(2025, 3, 1, 10))
+        period_end = aware(2025, 3, 2)
+
+        self.assertEqual(DoubleEntryLedgerService.create_checkpoints(period_end=period_end), 2)
+        self.assertEqual(DoubleEntryLedgerService.create_checkpoints(period_end=period_end), 0)
+        # no new entries on the next day -> nothing to write
+        self.assertEqual(DoubleEntryLedgerService.create_checkpoints(period_end=period_end + timedelta(days=1)), 0)
+
+    def test_late_committed_entry_rebuilds_checkpoint(self):
+        self._post("record_income", "100.00", aware(2025, 3, 1, 10))
+        DoubleEntryLedgerService.create_checkpoints(period_end=aware(2025, 3, 2))
+        self._post("record_income", "20.00", aware(2025, 3, 2, 10))
+        DoubleEntryLedgerService.create_checkpoints(period_end=aware(2025, 3, 3))
+        # транзакция закоммичена после прогона 03.03, но created_at раньше period_end
+        self._post("record_income", "5.00", aware(2025, 3, 2, 23, 59))
+        self._post("record_income", "1.00", aware(2025, 3, 3, 10))
+
+        cash = self.channel.accounts.get(account_type=AccountType.CASH)
+        # accounts + window count + DELETE of the stale checkpoint
+        with self.assertNumQueries(3):
+            self.assertEqual(
+                DoubleEntryLedgerService.reconcile_checkpoints([cash.id], LedgerCheckpoint.Period.DAY, aware(2025, 3, 4)),
+                1,
+            )
+        self.assertFalse(cash.checkpoints.filter(period_end=aware(2025, 3, 3)).exists())
+
+        DoubleEntryLedgerService.create_checkpoints(period_end=aware(2025, 3, 4))
+        checkpoint = cash.checkpoints.get(period_end=aware(2025, 3, 4))
+        self.assertEqual(checkpoint.debit_total, Decimal("126.00"))
+        self.assertEqual(checkpoint.entries_count, 4)
+        self.assertEqual(
+            DoubleEntryLedgerService.reconcile_checkpoints([cash.id], LedgerCheckpoint.Period.DAY, aware(2025, 3, 5)),
+            0,
+        )
+
+    def test_legal_entity_balance_as_of(self):
+        legal_entity = LegalEntityFactory()
+        other = ChannelFactory(legal_entity=legal_entity)
+        self.channel.legal_entity = legal_entity
+        self.channel.save()
+
+        self._post("record_income", "100.00", aware(2025, 4, 1, 10))
+        tx_id = DoubleEntryLedgerService.record_income(other, Decimal("50.00"))
+        LedgerEntry.objects.filter(transaction_id=tx_id).update(created_at=aware(2025, 4, 2, 10))
+
+        totals = DoubleEntryLedgerService.balance_as_of(legal_entity, aware(2025, 4, 1, 23))
+        self.assertEqual(totals.balance, Decimal("100.00"))
+        totals = DoubleEntryLedgerService.balance_as_of(legal_entity, aware(2025, 4, 30))
+        self.assertEqual(totals.balance, Decimal("150.00"))
+
+    def test_statement_for_range(self):
+        self._post("record_income", "1000.00", aware(2025, 5, 1, 10))
+        self._post("record_income", "200.00", aware(2025, 6, 3, 10))
+        self._post("freeze_amount", "100.00", aware(2025, 6, 10, 10))
+        self._post("record_payout", "50.00", aware(2025, 7, 2, 10))
+        DoubleEntryLedgerService.create_checkpoints(period_end=aware(2025, 6, 1))
+
+        statement = DoubleEntryLedgerService.get_statement(
+            self.channel, aware(2025, 6, 1), aware(2025, 7, 1)
+        )
+        self.assertEqual(statement.opening_balance, Decimal("1000.00"))
+        self.assertEqual(statement.closing_balance, Decimal("1200.00"))
+        # income debit 200 to CASH, freeze: debit FROZEN 100 / credit CASH 100
+        self.assertEqual(statement.debit_turnover, Decimal("300.00"))
+        self.assertEqual(statement.credit_turnover, Decimal("100.00"))
+        self.assertEqual(statement.entries.count(), 3)
+
+    def test_checkpoint_task(self):
+        self._post("record_income", "10.00", timezone.now() - timedelta(days=2))
+        result = create_ledger_checkpoints(period="day")
+        self.assertEqual(result["created"], 2)
@@ -0,0 +1,112 @@
+import json
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core.models import Channel
+from core.pagination import KeysetPagination
+from core.request_profiler import QueryBudgetTestMixin
+from core.tests.factories import CampaignChannelFactory, ChannelFactory
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.channels = [ChannelFactory(name=f"paged channel {i}") for i in range(5)]
+        # одинаковый created_at у части строк — порядок добивается id
+        Channel.objects.filter(pk__in=[c.pk for c in self.channels[1:4]]).update(created_at=timezone.now())
+
+    def _walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(item["id"] for item in response.json()["results"])
+            url = response.json()["next"]
+            pages += 1
+        return ids, pages
+
+    def test_pages_follow_created_at_and_id(self):
+        expected = [str(pk) for pk in Channel.objects.order_by("created_at", "id").values_list("id", flat=True)]
+
+        ids, pages = self._walk("/api/channel/?page_size=2")
+
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
+
+    def test_rows_added_between_pages_are_not_skipped_or_repeated(self):
+        first = self.client.get("/api/channel/?page_size=3").json()
+        ChannelFactory(name="added later")
+
+        ids, _ = self._walk(first["next"])
+
+        seen = [item["id"] for item in first["results"]] + ids
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), {str(pk) for pk in Channel.objects.values_list("id", flat=True)})
+
+    def test_page_size_is_capped_and_cursor_validated(self):
+        with mock.patch.object(KeysetPagination, "max_page_size", 2):
+            self.assertEqual(len(self.client.get("/api/channel/?page_size=50").json()["results"]), 2)
+        self.assertEqual(self.client.get("/api/channel/?cursor=not-a-cursor").status_code, 404)
+
+    def test_long_pages_are_streamed(self):
+        rendered = self.client.get("/api/channel/?page_size=4").json()
+        with mock.patch.object(KeysetPagination, "STREAM_THRESHOLD", 2), mock.patch.object(
+            KeysetPagination, "STREAM_CHUNK", 3
+        ):
+            response = self.client.get("/api/channel/?page_size=4")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(json.loads(b"".join(response.streaming_content)), rendered)
+
+
+class SparseFieldsetTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.campaign_channels = [CampaignChannelFactory() for _ in range(3)]
+
+    def test_top_level_fields(self):
+        response = self.client.get("/api/channel/?fields=id,tg_id")
+        self.assertEqual(set(response.json()["results"][0]), {"id", "tg_id"})
+
+    def test_nested_objects_collapse_to_id_unless_expanded(self):
+        cc = self.campaign_channels[0]
+        url = f"/api/campaign-channel/?channel_id={cc.channel_id}"
+
+        collapsed = self.client.get(f"{url}&fields=id,channel,campaign.name").json()["results"][0]
+        self.assertEqual(collapsed["channel"], str(cc.channel_id))
+        self.assertEqual(collapsed["campaign"], {"name": cc.campaign.name})
+
+        expanded = self.client.get(f"{url}&fields=id,channel&expand=channel").json()["results"][0]
+        self.assertEqual(expanded["channel"]["tg_id"], str(cc.channel.tg_id))
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get("/api/campaign-channel/?fields=id,channel.nope")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"fields": ["Unknown field: channel.nope"]})
+
+    def test_campaign_channel_queries_do_not_grow_with_page(self):
+        _, small = self.assertViewQueryBudget("get", "/api/campaign-channel/")
+        for _ in range(4):
+            CampaignChannelFactory()
+        _, large = self.assertViewQueryBudget("get", "/api/campaign-channel/")
+        self.assertEqual(small.queries, large.queries)
+
+        _, sparse = self.assertViewQueryBudget("get", "/api/campaign-channel/?fields=id,channel.tg_id")
+        self.assertLess(sparse.queries, large.queries)
+
+    def test_unpublished_campaigns_accept_sparse_fields(self):
+        cc = self.campaign_channels[0]
+
+        response = self.client.post(
+            "/api/campaign-channel/unpublished-campaigns/?fields=id,campaign.message&expand=campaign.message",
+            {"channel_tg_id": cc.channel.tg_id},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()
+        self.assertEqual(set(row), {"id", "campaign"})
+        self.assertEqual(row["campaign"]["message"]["id"], str(cc.campaign.message_id))
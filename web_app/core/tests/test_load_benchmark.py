@@ -0,0 +1,47 @@
+import json
+
+from django.test import TestCase
+
+from core.load_benchmark import SCENARIOS, BenchmarkContext, BenchmarkRunner, BenchmarkSeeder, compare, percentile
+from core.models import CampaignChannel, Channel, ChannelPublicationSlot, LedgerEntry
+
+
+class LoadBenchmarkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.seeder = BenchmarkSeeder(scale=0.001, seed=7)
+        cls.volumes = cls.seeder.seed_data()
+
+    def test_seeded_volumes(self):
+        self.assertTrue(self.seeder.is_seeded())
+        self.assertEqual(Channel.objects.count(), self.volumes["channels"])
+        self.assertEqual(ChannelPublicationSlot.objects.count(), self.volumes["channels"] * 7 * 13)
+        self.assertEqual(LedgerEntry.objects.count(), self.volumes["ledger_entries"])
+        # campaign_channels ограничены числом каналов на кампанию
+        self.assertEqual(CampaignChannel.objects.count(), self.volumes["channels"])
+
+    def test_ledger_transactions_are_balanced(self):
+        for transaction_id in LedgerEntry.objects.values_list("transaction_id", flat=True).distinct()[:20]:
+            entries = list(LedgerEntry.objects.filter(transaction_id=transaction_id))
+            self.assertEqual(sorted(entry.entry_type for entry in entries), ["credit", "debit"])
+            self.assertEqual(entries[0].amount, entries[1].amount)
+
+    def test_all_scenarios_replay_without_server_errors(self):
+        runner = BenchmarkRunner(BenchmarkContext.load(), requests_per_scenario=3, warmup=0, seed=7)
+        results = runner.run()
+
+        self.assertEqual(set(results), set(SCENARIOS))
+        report = {"scenarios": {name: result.as_dict() for name, result in results.items()}}
+        json.dumps(report)
+        for name, values in report["scenarios"].items():
+            self.assertEqual(values["requests"], 3, name)
+            self.assertEqual(values["errors"], 0, f"{name}: {values['statuses']}")
+            self.assertLessEqual(values["p50_ms"], values["p99_ms"], name)
+            self.assertGreater(values["queries_max"], 0, name)
+        self.assertEqual(len(compare(report, report)), len(SCENARIOS))
+
+    def test_percentile(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.5)
+        self.assertAlmostEqual(percentile(values, 99), 99.01)
+        self.assertEqual(percentile([], 95), 0.0)
@@ -1,10 +1,12 @@
 from datetime import timedelta
+from unittest import mock
 
 from django.test import TestCase
 from django.utils import timezone
 from rest_framework.test import APIClient
 
 from core.models import MessagePreviewToken
+from core.preview_tokens import PreviewTokenService
 from core.tests.factories import MessageFactory, UserFactory
 
 
@@ -85,3 +87,41 @@ class MessagePreviewAPITests(TestCase):
         response = self.client.post(self.url_resolve, {"token": token.token}, format="json")
 
         self.assertEqual(response.status_code, 410)
+
+    def _issue(self):
+        user = UserFactory(is_staff=True, is_superuser=True)
+        self.client.force_authenticate(user=user)
+        with mock.patch("requests.post") as blocking_post, self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(self.url_preview, format="json")
+        blocking_post.assert_not_called()
+        self.assertEqual(len(callbacks), 1)  # уведомление бота — задача после коммита
+        self.client.force_authenticate(user=None)
+        return response.json()["token"]
+
+    def test_resolve_consumes_cached_token_in_one_query(self):
+        token = self._issue()
+
+        with mock.patch("core.serializers.MessageSerializer.to_representation") as serialize:
+            with self.assertNumQueries(1):
+                response = self.client.post(self.url_resolve, {"token": token}, format="json")
+        serialize.assert_not_called()
+
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["token"], token)
+        self.assertEqual(body["message"]["id"], str(self.message.id))
+        self.assertEqual(body["message"]["as_text"], self.message.as_text)
+        self.assertIsNotNone(MessagePreviewToken.objects.get(token=token).used_at)
+
+        response = self.client.post(self.url_resolve, {"token": token}, format="json")
+        self.assertEqual(response.status_code, 410)
+
+    def test_resolve_falls_back_to_db_without_redis(self):
+        token = self._issue()
+
+        with mock.patch.object(PreviewTokenService, "_redis", side_effect=ConnectionError("down")):
+            response = self.client.post(self.url_resolve, {"token": token}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["message"]["id"], str(self.message.id))
+        self.assertIsNotNone(MessagePreviewToken.objects.get(token=token).used_at)
@@ -1,3 +1,4 @@
+import json
 from unittest import mock
 from datetime import time
 
@@ -5,6 +6,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from core.models import CampaignChannel, PlacementFormat
+from core.publish_payload import PublishPayloadService
 from core.signals import send_message_to_channel_admin
 from core.tests.factories import (
     CampaignChannelFactory,
@@ -58,8 +60,9 @@ class NotificationPayloadTests(TestCase):
         _, kwargs = post_mock.call_args
         sent_json = kwargs.get("data")
         self.assertIsNotNone(sent_json)
-        payload = sent_json.decode()
-        self.assertIn("campaign_format", payload)
-        self.assertIn("scheduled_at", payload)
-        self.assertIn("https://one", payload)
-        self.assertIn(campaign.format, payload)
+        payload = json.loads(sent_json)
+        self.assertEqual(payload["schema"], PublishPayloadService.SCHEMA)
+        self.assertEqual(payload["approval"]["format"], campaign.format)
+        self.assertIn("scheduled_at", payload["approval"])
+        self.assertEqual(payload["message"]["buttons"][0]["url"], "https://one")
+        self.assertNotIn("campaign", payload)
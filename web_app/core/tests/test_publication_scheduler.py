@@ -0,0 +1,113 @@
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.metrics import publication_publish_lag_seconds
+from core.models import Campaign
+from core.publication_scheduler import PublicationScheduler
+from core.tasks import check_and_publish_scheduled_messages, publish_campaign_channel
+from core.tests.factories import CampaignChannelFactory, CampaignFactory
+
+
+def _ok_response():
+    return MagicMock(status_code=200, content=b"ok")
+
+
+class PublicationSchedulerTests(TestCase):
+    def _placement(self, publish_at, **kwargs):
+        campaign = CampaignFactory(status=Campaign.Statuses.ACTIVE, slot_publication_at=publish_at)
+        params = {
+            "campaign": campaign,
+            "is_message_published": False,
+            "is_approved": True,
+            "channel_post_id": None,
+        }
+        params.update(kwargs)
+        return CampaignChannelFactory(**params)
+
+    def _lag_count(self, source):
+        for metric in publication_publish_lag_seconds.collect():
+            for sample in metric.samples:
+                if sample.name.endswith("_count") and sample.labels.get("source") == source:
+                    return sample.value
+        return 0
+
+    @patch.object(publish_campaign_channel, "apply_async")
+    def test_confirm_enqueues_eta_task_on_commit(self, apply_async):
+        publish_at = timezone.now() + timedelta(minutes=10)
+        placement = self._placement(publish_at, is_approved=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            placement.is_approved = True
+            placement.save()
+            placement.save()
+
+        apply_async.assert_called_once()
+        kwargs = apply_async.call_args.kwargs
+        self.assertEqual(kwargs["eta"], placement.message_publish_date)
+        self.assertEqual(kwargs["kwargs"]["campaign_channel_id"], str(placement.pk))
+
+    @patch.object(publish_campaign_channel, "apply_async")
+    def test_rolled_back_schedule_does_not_block_rescheduling(self, apply_async):
+        publish_at = timezone.now() + timedelta(minutes=10)
+        # on_commit callbacks are dropped, as on rollback
+        with self.captureOnCommitCallbacks(execute=False):
+            placement = self._placement(publish_at)
+        apply_async.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(PublicationScheduler.schedule(placement))
+        apply_async.assert_called_once()
+
+    @patch.object(publish_campaign_channel, "apply_async")
+    def test_far_publication_is_left_to_sweep_horizon(self, apply_async):
+        publish_at = timezone.now() + timedelta(hours=5)
+        with self.captureOnCommitCallbacks(execute=True):
+            placement = self._placement(publish_at)
+        apply_async.assert_not_called()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            scheduled = PublicationScheduler.schedule_upcoming(now=publish_at - timedelta(minutes=20))
+        self.assertEqual(scheduled, 1)
+        self.assertEqual(apply_async.call_args.kwargs["kwargs"]["campaign_channel_id"], str(placement.pk))
+
+    @patch("core.publication_scheduler.requests.post", return_value=_ok_response())
+    def test_eta_task_publishes_once_and_records_lag(self, post):
+        placement = self._placement(timezone.now() - timedelta(seconds=5))
+        planned_at = placement.message_publish_date.isoformat()
+        before = self._lag_count("eta")
+
+        self.assertTrue(publish_campaign_channel(campaign_channel_id=str(placement.pk), planned_at=planned_at))
+        # повторная доставка задачи / sweep не публикуют второй раз
+        self.assertFalse(publish_campaign_channel(campaign_channel_id=str(placement.pk), planned_at=planned_at))
+        self.assertEqual(check_and_publish_scheduled_messages()["published"], 0)
+
+        post.assert_called_once()
+        self.assertEqual(self._lag_count("eta"), before + 1)
+
+    @patch("core.publication_scheduler.requests.post", return_value=_ok_response())
+    def test_rescheduled_task_is_skipped(self, post):
+        placement = self._placement(timezone.now() - timedelta(minutes=1))
+        stale_planned_at = (placement.message_publish_date - timedelta(hours=1)).isoformat()
+
+        self.assertFalse(
+            publish_campaign_channel(campaign_channel_id=str(placement.pk), planned_at=stale_planned_at)
+        )
+        post.assert_not_called()
+
+    @patch("core.publication_scheduler.requests.post")
+    def test_sweep_publishes_overdue_and_retries_failures(self, post):
+        self._placement(timezone.now() - timedelta(minutes=5))
+        self._placement(timezone.now() - timedelta(minutes=5), channel_post_id="42")
+        self._placement(
+            timezone.now() - timedelta(minutes=5),
+            is_approved=False,
+        )
+
+        post.return_value = MagicMock(status_code=500, content=b"")
+        self.assertEqual(check_and_publish_scheduled_messages(), {"checked": 1, "published": 0, "scheduled": 0})
+
+        post.return_value = _ok_response()
+        self.assertEqual(check_and_publish_scheduled_messages()["published"], 1)
+        self.assertEqual(post.call_count, 2)
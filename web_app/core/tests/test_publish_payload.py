@@ -0,0 +1,79 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import CampaignChannel, PlacementFormat
+from core.publish_payload import PublishPayloadService
+from core.tests.factories import (
+    CampaignChannelFactory,
+    CampaignFactory,
+    ChannelAdminFactory,
+    ChannelFactory,
+    MessageFactory,
+)
+
+
+class PublishPayloadTests(TestCase):
+    def setUp(self):
+        self.message = MessageFactory(
+            title="Title",
+            body="Body",
+            buttons=[{"text": "Go", "url": "https://go"}],
+        )
+        self.channel = ChannelFactory(name="payload channel", auto_approve_publications=True)
+        with mock.patch("core.signals.send_message_to_channel_admin"):
+            self.campaign_channel = CampaignChannelFactory(
+                campaign=CampaignFactory(
+                    name="payload campaign",
+                    format=PlacementFormat.FIXED_SLOT,
+                    message=self.message,
+                    slot_publication_at=timezone.now(),
+                ),
+                channel=self.channel,
+                channel_admin=ChannelAdminFactory(is_bot_installed=True),
+                is_message_published=False,
+                is_approved=True,
+            )
+
+    def _row(self):
+        return PublishPayloadService.queryset().get(pk=self.campaign_channel.pk)
+
+    def test_payload_is_slim_and_needs_no_queries(self):
+        row = self._row()
+        PublishPayloadService.build(row)
+
+        with mock.patch("core.ledger_service.DoubleEntryLedgerService.calculate_balance") as balance:
+            with self.assertNumQueries(0):
+                payload = PublishPayloadService.build(row)
+        balance.assert_not_called()
+
+        self.assertEqual(payload["schema"], PublishPayloadService.SCHEMA)
+        self.assertEqual(str(payload["channel"]["tg_id"]), str(self.channel.tg_id))
+        self.assertTrue(payload["is_approved"])
+        self.assertIsNone(payload["approval"])
+        self.assertEqual(payload["message"]["text"], self.message.as_text)
+        self.assertEqual(payload["message"]["buttons"], [{"text": "Go", "url": "https://go"}])
+        self.assertNotIn("campaign", payload)
+
+    def test_message_part_is_cached_per_version(self):
+        with mock.patch.object(PublishPayloadService, "render_message", wraps=PublishPayloadService.render_message) as render:
+            PublishPayloadService.build(self._row())
+            PublishPayloadService.build(self._row())
+            self.assertEqual(render.call_count, 1)
+
+            self.message.body = "New body"
+            self.message.save()
+            payload = PublishPayloadService.build(self._row())
+            self.assertEqual(render.call_count, 2)
+        self.assertIn("New body", payload["message"]["text"])
+
+    def test_manual_channel_gets_approval_block(self):
+        self.channel.auto_approve_publications = False
+        self.channel.save()
+        CampaignChannel.objects.filter(pk=self.campaign_channel.pk).update(
+            publish_status=CampaignChannel.PublishStatusChoices.PLANNED
+        )
+        payload = PublishPayloadService.build(self._row())
+        self.assertFalse(payload["is_approved"])
+        self.assertEqual(payload["approval"]["id"], str(self.campaign_channel.pk))
@@ -0,0 +1,69 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from prometheus_client import REGISTRY
+
+from core.models import Channel
+from core.request_profiler import QueryBudgetExceeded, QueryBudgetTestMixin, profile_queries, sql_shape
+from core.tests.factories import ChannelFactory, LegalEntityFactory
+from core.views import ChannelViewSet
+
+
+class RequestProfilerTests(QueryBudgetTestMixin, TestCase):
+    def setUp(self):
+        self.legal_entity = LegalEntityFactory(inn="7743013902")
+        self.channels = [
+            ChannelFactory(name=f"profiled channel {i}", legal_entity=self.legal_entity) for i in range(3)
+        ]
+
+    def test_sql_shape_drops_literals(self):
+        self.assertEqual(
+            sql_shape("SELECT * FROM t WHERE id = 5 AND name = 'x''y' AND pk IN (1, 2,  3)"),
+            "SELECT * FROM t WHERE id = ? AND name = ? AND pk IN (...)",
+        )
+
+    def test_profile_collects_queries_cache_and_repeated_shapes(self):
+        cache.set("profiler-test", 1)
+        with profile_queries() as profile:
+            for channel in self.channels * 4:
+                Channel.objects.get(pk=channel.pk)
+            cache.get("profiler-test")
+            cache.get("profiler-missing")
+            cache.get_many(["profiler-test", "profiler-missing"])
+
+        self.assertEqual(profile.queries, 12)
+        self.assertEqual((profile.cache_hits, profile.cache_misses), (2, 2))
+        [(shape, count, _)] = profile.repeated_shapes()
+        self.assertEqual(count, 12)
+        self.assertIn('FROM "core_channel"', shape)
+
+    def test_middleware_exports_per_view_metrics(self):
+        labels = {"view": "core:channel-list"}
+        before = REGISTRY.get_sample_value("view_db_queries_count", labels) or 0
+        response = self.client.get("/api/channel/")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(response.request_profile.queries, 0)
+        self.assertEqual(response.request_profile.view, "core:channel-list")
+        self.assertEqual(REGISTRY.get_sample_value("view_db_queries_count", labels), before + 1)
+
+    def test_declared_budgets_hold_when_the_page_grows(self):
+        self.assertViewQueryBudget("get", "/api/channel/")
+        self.assertViewQueryBudget("get", f"/api/legal-entity/{self.legal_entity.id}/channels/")
+        for i in range(10):
+            ChannelFactory(name=f"more profiled channel {i}", legal_entity=self.legal_entity)
+        self.assertViewQueryBudget("get", "/api/channel/")
+        self.assertViewQueryBudget("get", f"/api/legal-entity/{self.legal_entity.id}/channels/")
+
+    def test_exceeded_budget_fails_in_strict_mode(self):
+        with mock.patch.object(ChannelViewSet, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/channel/")
+        with self.settings(QUERY_BUDGET_STRICT=False), mock.patch.object(ChannelViewSet, "query_budget", 1):
+            self.assertEqual(self.client.get("/api/channel/").status_code, 200)
+
+    def test_budget_per_viewset_action(self):
+        with mock.patch.object(ChannelViewSet, "query_budget", {"list": 1}):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get("/api/channel/")
+            self.assertEqual(self.client.get(f"/api/channel/{self.channels[0].tg_id}/").status_code, 200)
@@ -0,0 +1,103 @@
+from datetime import datetime, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import PlacementFormat
+from core.slot_calendar import SlotCalendarService
+from core.tests.factories import CampaignChannelFactory, CampaignFactory, ChannelFactory
+
+
+def local_dt(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)), timezone.get_current_timezone())
+
+
+class SlotCalendarTests(TestCase):
+    def setUp(self):
+        # каналы получают дефолтные слоты 8:00-21:00 по часу (signals.create_default_publication_slots)
+        self.channel = ChannelFactory(name="calendar channel", autopilot_min_interval=60)
+        self.day = timezone.localdate() + timedelta(days=3)
+
+    def _placement(self, moment, campaign_format=PlacementFormat.FIXED_SLOT, channel=None):
+        campaign = CampaignFactory(format=campaign_format, slot_publication_at=moment)
+        return CampaignChannelFactory(
+            campaign=campaign,
+            channel=channel or self.channel,
+            is_message_published=False,
+            is_approved=True,
+            channel_post_id=None,
+        )
+
+    def test_slots_and_labels(self):
+        calendar = SlotCalendarService.get(self.channel)
+        self.assertTrue(calendar.allows(local_dt(self.day, 10, 30)))
+        self.assertFalse(calendar.allows(local_dt(self.day, 22)))
+        self.assertEqual(len(calendar.slot_labels(self.day.weekday())), 13)
+        self.assertTrue(self.channel.allows_publication_datetime(local_dt(self.day, 8)))
+
+    def test_occupancy_is_invalidated_on_placement_change(self):
+        SlotCalendarService.get(self.channel)
+        placement = self._placement(local_dt(self.day, 10))
+
+        calendar = SlotCalendarService.get(self.channel)
+        self.assertTrue(calendar.is_taken(local_dt(self.day, 10)))
+        self.assertFalse(calendar.is_taken(local_dt(self.day, 10), exclude_id=placement.pk))
+        self.assertEqual(
+            calendar.next_free_windows(local_dt(self.day, 10), 3),
+            [local_dt(self.day, 11), local_dt(self.day, 12), local_dt(self.day, 13)],
+        )
+
+        placement.delete()
+        self.assertFalse(SlotCalendarService.get(self.channel).is_taken(local_dt(self.day, 10)))
+
+    def test_autopilot_validation_suggests_several_windows(self):
+        self._placement(local_dt(self.day, 12), campaign_format=PlacementFormat.AUTOPILOT)
+        calendar = SlotCalendarService.get(self.channel)
+        self.assertEqual(calendar.autopilot_conflict(local_dt(self.day, 12, 30)), local_dt(self.day, 12))
+        self.assertEqual(
+            calendar.next_free_windows(local_dt(self.day, 12, 30), 2, autopilot=True),
+            [local_dt(self.day, 13), local_dt(self.day, 14)],
+        )
+
+        placement = self._placement(
+            local_dt(self.day, 12, 30),
+            campaign_format=PlacementFormat.AUTOPILOT,
+            channel=ChannelFactory(name="other channel"),
+        )
+        placement.channel = self.channel
+        with self.assertRaisesMessage(ValidationError, "Ближайшие доступные окна"):
+            placement._validate_autopilot_interval()
+
+        # ровно через интервал — уже не конфликт
+        placement.campaign.slot_publication_at = local_dt(self.day, 13)
+        placement._validate_autopilot_interval()
+
+    def test_validation_bypasses_stale_cache_and_lookback(self):
+        placement = self._placement(local_dt(self.day, 10))
+        SlotCalendarService.get(self.channel)
+        # update() не шлёт сигналов — кэш устаревает, валидация всё равно видит строку
+        past = timezone.now() - timedelta(days=30)
+        type(placement).objects.filter(pk=placement.pk).update(message_publish_date=past)
+
+        self.assertTrue(SlotCalendarService.get(self.channel).is_taken(local_dt(self.day, 10)))
+        self.assertFalse(SlotCalendarService.build([self.channel.pk])[str(self.channel.pk)].is_taken(past))
+        self.assertTrue(SlotCalendarService.exact(self.channel, since=past).is_taken(past))
+
+    def test_plan_campaign_across_channels_in_one_pass(self):
+        channels = [ChannelFactory(name=f"plan channel {i}") for i in range(20)]
+        self._placement(local_dt(self.day, 10), channel=channels[0])
+        SlotCalendarService.invalidate([c.pk for c in channels])
+
+        campaign = CampaignFactory(format=PlacementFormat.FIXED_SLOT, slot_publication_at=local_dt(self.day, 10))
+        with self.assertNumQueries(3):
+            plan = SlotCalendarService.plan_campaign(campaign, channels)
+        with self.assertNumQueries(0):
+            SlotCalendarService.plan_campaign(campaign, channels)
+
+        rejected = plan[str(channels[0].pk)]
+        self.assertFalse(rejected.available)
+        self.assertEqual(rejected.alternatives[0], local_dt(self.day, 11))
+        accepted = plan[str(channels[1].pk)]
+        self.assertTrue(accepted.available)
+        self.assertIsNotNone(accepted.slot_id)
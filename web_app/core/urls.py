@@ -1,5 +1,8 @@
-from django.urls import path, include
+from django.urls import path, include, re_path
 from rest_framework.routers import DefaultRouter
+
+from web_app.app_settings import app_settings
+from .async_http import async_view
 from .views import (
     ChannelViewSet,
     MessageViewSet,
@@ -46,8 +49,31 @@ api_urls = [
     path("publication-request/", include(publication_request_router.urls)),
 ]
 
+
+
+def async_routes(router, *names):
+    """Router urls `names` with the DRF view wrapped in core.async_http.async_view"""
+    return [
+        re_path(pattern.pattern.regex.pattern, async_view(pattern.callback), name=pattern.name)
+        for pattern in router.urls
+        if pattern.name in names
+    ]
+
+
+# CHANGE: async versions of views waiting on the bot / TGStat / avatar URLs
+# WHY: under ASGI they do not hold a worker while the upstream answers (core.async_http)
+async_urls = [
+    path("channel/", include(async_routes(channel_router, "channel-list"))),
+    path("message/", include(async_routes(message_router, "message-preview"))),
+    path(
+        "publication-request/",
+        include(async_routes(publication_request_router, "publicationrequest-request-publication")),
+    ),
+]
+
 urlpatterns = [
     path("about", AboutView.as_view()),
     path("login/tg", TGLoginView.as_view()),
+    *([path("", include(async_urls))] if app_settings.ASYNC_VIEWS else []),
     path("", include(api_urls)),
 ]
@@ -272,3 +272,24 @@ def validate_channel_avtar_url(url):
             url=default_path
 
     return url
+
+
+def channel_avatar_check_call(channel):
+    """
+    validate_channel_avtar_url as a deferred call (core.async_http.async_view):
+    the channel is saved with the given url, the default one is written if it is not an image
+    """
+    from core.async_http import OutboundCall
+    from core.models import Channel
+
+    default_path = '/static/custom/default.jpg'
+    url = channel.avatar_url
+    if url.startswith('//static'):
+        url = 'https:' + url
+
+    def on_done(call):
+        if call.error is None and call.response.headers.get('Content-Type', '').startswith('image/'):
+            return
+        Channel.objects.filter(pk=channel.pk).update(avatar_url=default_path)
+
+    return OutboundCall("GET", url, timeout=10, on_done=on_done)
@@ -1,11 +1,7 @@
-import secrets
-from datetime import timedelta
-
 import requests
 from django.contrib.auth import login
 from django.contrib.auth.views import LoginView
 from django.core.files.base import ContentFile
-from django.db.models import Q
 from django.http import HttpResponsePermanentRedirect, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
@@ -18,14 +14,18 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
+from core.async_http import OutboundCall, send_or_defer
+from core.channel_search import ChannelSearch
 from core.filterset_classes import CampaignChannelFilterSet
 from core.media_plan import MediaPlanGenerator, MediaPlanGenerationError
+from core.pagination import KeysetListMixin
+from core.preview_tokens import PreviewTokenRejected, PreviewTokenService
+from core.sparse_fields import SparseFieldsetMixin
 from core.models import (
     Channel,
     Message,
     CampaignChannel,
     ChannelAdmin,
-    MessagePreviewToken,
     UserLoginToken,
     LegalEntity,
     Payout,
@@ -67,19 +67,32 @@ from core.utils import get_template_side_data
 from web_app.app_settings import app_settings
 
 
-class ChannelViewSet(ModelViewSet):
+class ChannelViewSet(SparseFieldsetMixin, KeysetListMixin, ModelViewSet):
     queryset = Channel.objects.all()
     serializer_class = ChannelSerializer
     permission_classes = [AllowAny]
     filter_backends = (DjangoFilterBackend,)
     filterset_fields = ["tg_id"]
+    # core.request_profiler: balances and slots are prefetched, the count must not grow with the page;
+    # create (admins, slots, TGStat) is not budgeted
+    query_budget = {"list": 10}
 
     def get_queryset(self):
         qs = super().get_queryset()
+        if getattr(self, "action", None) == "list":
+            if self.sparse_fieldset.includes("legal_entity_detail"):
+                qs = qs.select_related("legal_entity")
+            if self.sparse_fieldset.includes("publication_slots"):
+                qs = qs.prefetch_related("publication_slots")
         if not getattr(self.request, "user", None) or not self.request.user.is_superuser:
             return qs.filter(is_deleted=False)
         return qs
 
+    def prepare_page(self, rows):
+        # балансы всей страницы: один get_many + расчёт промахов одним запросом
+        if any(self.sparse_fieldset.includes(name) for name in ("balance", "frozen", "available")):
+            BalanceService.prefetch_balances(rows)
+
     def get_object(self):
         if self.kwargs.get("id"):
             return get_object_or_404(self.get_queryset(), id=self.kwargs["id"])
@@ -166,27 +179,16 @@ class MessageViewSet(ModelViewSet):
         if not user.has_perm("core.view_message"):
             return Response({"detail": "Недостаточно прав"}, status=status.HTTP_403_FORBIDDEN)
 
-        expires_at = timezone.now() + timedelta(minutes=30)
-        preview_token = MessagePreviewToken.objects.create(
-            token=secrets.token_urlsafe(32),
-            message=message,
-            created_by=user,
-            expires_at=expires_at,
-        )
-
-        bot_response_status = None
-        try:
-            response = requests.post(
-                f"{app_settings.DOMAIN_URI}/telegram/preview-token",
-                json={"token": preview_token.token, "message_id": str(message.id)},
-                timeout=15,
-            )
-            bot_response_status = response.status_code
-        except Exception:
-            bot_response_status = None
+        preview_token = PreviewTokenService.issue(message, user)
 
         data = MessagePreviewTokenSerializer(instance=preview_token).data
-        data["bot_response_status"] = bot_response_status
+        data["bot_response_status"] = None
+
+        def on_done(call: OutboundCall):
+            # под async_view выполняется до рендера ответа, data ещё не отдана
+            data["bot_response_status"] = call.response.status_code if call.response is not None else None
+
+        PreviewTokenService.notify_bot(request, preview_token, on_done)
         return Response(data=data, status=status.HTTP_201_CREATED)
 
     @action(
@@ -201,31 +203,14 @@ class MessageViewSet(ModelViewSet):
             data=request.data, context=self.get_serializer_context()
         )
         serializer.is_valid(raise_exception=True)
-        token_value = serializer.validated_data["token"]
-
-        token_instance = MessagePreviewToken.objects.filter(
-            token=token_value
-        ).select_related("message").first()
-        if not token_instance:
-            return Response({"detail": "Токен не найден"}, status=status.HTTP_404_NOT_FOUND)
-        if token_instance.is_used:
-            return Response({"detail": "Токен уже использован"}, status=status.HTTP_410_GONE)
-        if token_instance.is_expired:
-            return Response({"detail": "Срок действия токена истёк"}, status=status.HTTP_410_GONE)
-
-        token_instance.used_at = timezone.now()
-        token_instance.save(update_fields=["used_at", "updated_at"])
-        message_data = MessageSerializer(
-            instance=token_instance.message,
-            context=self.get_serializer_context(),
-        ).data
-        return Response(
-            data={"message": message_data, "token": token_instance.token},
-            status=status.HTTP_200_OK,
-        )
+        try:
+            data = PreviewTokenService.consume(serializer.validated_data["token"])
+        except PreviewTokenRejected as e:
+            return Response({"detail": e.detail}, status=e.status_code)
+        return Response(data=data, status=status.HTTP_200_OK)
 
 
-class CampaignChannelViewSet(ModelViewSet):
+class CampaignChannelViewSet(SparseFieldsetMixin, KeysetListMixin, ModelViewSet):
     queryset = CampaignChannel.objects.select_related("channel").filter(
         channel__is_deleted=False,
         campaign__is_archived=False,
@@ -235,12 +220,45 @@ class CampaignChannelViewSet(ModelViewSet):
     permission_classes = [AllowAny]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = CampaignChannelFilterSet
+    # core.request_profiler: relations of the page are loaded in bulk, the count must not grow with it
+    query_budget = {"list": 12, "unpublished_campaigns": 12}
+
+    # поле ответа (core.sparse_fields) -> связь, которая для него подгружается
+    LIST_SELECT_RELATED = {
+        "campaign": "campaign",
+        "campaign.message": "campaign__message",
+        "channel_admin": "channel_admin",
+        "publication_slot": "publication_slot",
+        "channel.legal_entity_detail": "channel__legal_entity",
+    }
+    LIST_PREFETCH_RELATED = {
+        "campaign.channels": "campaign__channels",
+        "channel_admin.channels": "channel_admin__channels",
+        "channel.publication_slots": "channel__publication_slots",
+    }
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if getattr(self, "action", None) in ("list", "unpublished_campaigns"):
+            fieldset = self.sparse_fieldset
+            qs = qs.select_related(
+                *(name for path, name in self.LIST_SELECT_RELATED.items() if fieldset.includes(path))
+            ).prefetch_related(
+                *(name for path, name in self.LIST_PREFETCH_RELATED.items() if fieldset.includes(path))
+            )
+        return qs
+
+    def prepare_page(self, rows):
+        if any(self.sparse_fieldset.includes(f"channel.{name}") for name in ("balance", "frozen", "available")):
+            BalanceService.prefetch_balances([row.channel for row in rows])
 
     @action(methods=["POST"], detail=False, url_path="unpublished-campaigns")
     def unpublished_campaigns(self, request, *args, **kwargs):
         filter_class = self.filterset_class(request.data, queryset=self.get_queryset())
+        rows = list(filter_class.qs)
+        self.prepare_page(rows)
         return Response(
-            data=self.get_serializer(instance=filter_class.qs, many=True).data,
+            data=self.get_serializer(instance=rows, many=True).data,
             status=status.HTTP_200_OK,
         )
 
@@ -361,6 +379,7 @@ class LegalEntityViewSet(ModelViewSet):
     serializer_class = LegalEntitySerializer
     permission_classes = [AllowAny]
     filter_backends = (DjangoFilterBackend,)
+    query_budget = 10
 
     def get_serializer_class(self):
         if getattr(self, "action", None) == "retrieve":
@@ -372,21 +391,22 @@ class LegalEntityViewSet(ModelViewSet):
         legal_entity = self.get_object()
         qs = legal_entity.channels.filter(is_deleted=False)
 
+        # без явного ordering результаты поиска идут по релевантности (core.channel_search)
         search = request.query_params.get("search")
         if search:
-            qs = qs.filter(Q(name__icontains=search) | Q(username__icontains=search))
+            qs = ChannelSearch.search(qs, search)
 
-        ordering = request.query_params.get("ordering") or "name"
+        ordering = request.query_params.get("ordering") or ("" if search else "name")
         allowed_ordering = {"name", "-name", "members_count", "-members_count", "created_at", "-created_at"}
         if ordering in allowed_ordering:
             qs = qs.order_by(ordering)
 
         page = self.paginate_queryset(qs)
-        target_qs = page if page is not None else qs
-        balances = BalanceService.get_balance_for_channels(list(target_qs))
+        channels = page if page is not None else list(qs)
+        balances = BalanceService.prefetch_balances(channels)
 
         serializer = ChannelBalanceSerializer(
-            target_qs,
+            channels,
             many=True,
             context={"balances": balances},
         )
@@ -396,7 +416,7 @@ class LegalEntityViewSet(ModelViewSet):
         return Response({"count": len(serializer.data), "results": serializer.data})
 
 
-class PayoutViewSet(ModelViewSet):
+class PayoutViewSet(SparseFieldsetMixin, KeysetListMixin, ModelViewSet):
     queryset = Payout.objects.select_related("legal_entity")
     serializer_class = PayoutSerializer
     permission_classes = [AllowAny]
@@ -512,7 +532,6 @@ class PublicationRequestViewSet(ModelViewSet):
         from core.services import CreativeSelectionService
         from core.serializers import PublicationRequestSerializer, PublicationResponseSerializer, ChannelSerializer, MessageSerializer
         from core.models import PublicationRequest
-        import requests
         from rest_framework.renderers import JSONRenderer
 
         # CHANGE: Added metrics tracking for monitoring
@@ -625,24 +644,24 @@ class PublicationRequestViewSet(ModelViewSet):
             pub_request.save()
 
             # Отправляем запрос на публикацию в бот
-            bot_start = time.time()
-            try:
-                from core.serializers import CampaignChannelSerializer
-                payload = CampaignChannelSerializer(campaign_channel).data
-                data = JSONRenderer().render(payload)
-                response = requests.post(
-                    f"{app_settings.DOMAIN_URI}/telegram/public-campaign-channel",
-                    data=data,
-                    headers={"content-type": "application/json"},
-                    timeout=30
-                )
-                bot_duration = time.time() - bot_start
-                bot_publication_duration_seconds.observe(bot_duration)
+            def on_bot_done(call: OutboundCall):
+                if call.error is not None:
+                    bot_publication_attempts.labels(status="error").inc()
+                    logger.error(f"Failed to send publication request to bot: {call.error}")
+                    return
+                bot_publication_duration_seconds.observe(call.elapsed)
                 bot_publication_attempts.labels(status="success").inc()
-                logger.info(f"Sent publication request to bot: {response.status_code}")
-            except Exception as e:
-                bot_publication_attempts.labels(status="error").inc()
-                logger.error(f"Failed to send publication request to bot: {e}")
+                logger.info(f"Sent publication request to bot: {call.response.status_code}")
+
+            from core.publish_payload import PublishPayloadService
+            send_or_defer(request, OutboundCall(
+                "POST",
+                f"{app_settings.DOMAIN_URI}/telegram/public-campaign-channel",
+                content=JSONRenderer().render(PublishPayloadService.build(campaign_channel)),
+                headers={"content-type": "application/json"},
+                timeout=30,
+                on_done=on_bot_done,
+            ))
 
             # Track success metrics
             publication_requests_success.labels(format=format).inc()
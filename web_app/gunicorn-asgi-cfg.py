@@ -0,0 +1,21 @@
+# -*- encoding: utf-8 -*-
+"""
+ASGI mode: gunicorn manages uvicorn workers running web_app.asgi:application
+
+    gunicorn --config gunicorn-asgi-cfg.py web_app.asgi:application
+
+Воркер не блокируется на ответах бота, TGStat и проверке аватаров
+(core.async_http), поэтому воркеров меньше, чем в gunicorn-cfg.py, а timeout
+ограничивает только зависший воркер, а не медленный upstream.
+"""
+
+bind = "0.0.0.0:8000"
+workers = 4
+worker_class = "uvicorn_worker.UvicornWorker"
+loglevel = "info"
+capture_output = True
+enable_stdio_inheritance = True
+reload = False
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
@@ -32,5 +32,27 @@ class AppSettings(BaseSettings):
     PARSER_MICROSERVICE_API_KEY: str = ""
     PARSER_MICROSERVICE_ENABLED: bool = False
 
+    # CHANGE: Prometheus exporter of the Celery worker (0 = disabled)
+    # WHY: metrics observed inside tasks (publication_publish_lag_seconds) are not visible to /metrics of web-app
+    CELERY_METRICS_PORT: int = 0
+
+    # CHANGE: Result backend of Celery tasks; audit tasks keep writing to django-db (core.celery_results)
+    # WHY: per-execution DB rows of high-frequency tasks made django_celery_results grow without bound
+    CELERY_RESULT_BACKEND: str = "redis://redis:6379/2"
+
+    # CHANGE: Per-view query budgets (core.request_profiler)
+    # WHY: a view over its declared query_budget fails instead of only being counted; on in tests
+    QUERY_BUDGET_STRICT: bool = False
+
+    # CHANGE: Async routes for views with outbound HTTP (core.async_http, core.urls.async_urls)
+    # WHY: only useful under ASGI; web_app/asgi.py turns it on unless set explicitly
+    ASYNC_VIEWS: bool = False
+
+    # CHANGE: Read replica for admin statistics and exports (core.db_routing)
+    # WHY: heavy aggregates ran on the primary serving publishing writes; empty host = reads stay on the primary
+    REPORTING_DB_HOST: str = ""
+    REPORTING_DB_PORT: str = ""
+    REPORTING_MAX_LAG_SECONDS: float = 30
+
 
 app_settings = AppSettings()
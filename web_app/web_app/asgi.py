@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_app.settings")
+# CHANGE: ASGI serves the async routes of core.urls (core.async_http) unless ASYNC_VIEWS=false
+# WHY: production ASGI mode, gunicorn-asgi-cfg.py
+os.environ.setdefault("ASYNC_VIEWS", "true")
 
 application = get_asgi_application()
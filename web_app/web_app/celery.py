@@ -1,6 +1,10 @@
 import os
+from pathlib import Path
 
 from celery import Celery
+from celery.signals import worker_init, worker_process_shutdown
+
+from web_app.app_settings import app_settings
 
 # Set the default Django settings module for the 'celery' program.
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "web_app.settings")
@@ -15,3 +19,38 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 
 # Load task modules from all registered Django apps.
 app.autodiscover_tasks()
+
+
+# CHANGE: Prometheus exporter for metrics observed inside tasks
+# WHY: the worker had no /metrics, publication_publish_lag_seconds was never scraped
+# prefork-дочерние процессы пишут метрики в PROMETHEUS_MULTIPROC_DIR,
+# главный процесс воркера отдаёт их агрегатом на CELERY_METRICS_PORT
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if MULTIPROC_DIR:
+    Path(MULTIPROC_DIR).mkdir(parents=True, exist_ok=True)
+
+
+@worker_init.connect
+def start_metrics_exporter(**kwargs):
+    if not app_settings.CELERY_METRICS_PORT:
+        return
+    from prometheus_client import REGISTRY, CollectorRegistry, start_http_server
+
+    registry = REGISTRY
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        # значения прошлого запуска воркера
+        for stale in Path(MULTIPROC_DIR).glob("*.db"):
+            stale.unlink()
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    start_http_server(app_settings.CELERY_METRICS_PORT, registry=registry)
+
+
+@worker_process_shutdown.connect
+def mark_metrics_process_dead(pid=None, **kwargs):
+    if MULTIPROC_DIR:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid or os.getpid())
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 
+from celery.schedules import crontab
+
 from django.utils.safestring import mark_safe
 
 from .app_settings import AppSettings
@@ -84,6 +87,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusBeforeMiddleware",
+    "core.request_profiler.RequestProfilerMiddleware",
     "core.middlewares.DatabaseMigrationCheckMiddleware",  # Должен быть первым для перехвата ошибок БД
     "django.middleware.security.SecurityMiddleware",
     # "core.middlewares.IPMiddleware",
@@ -99,6 +103,7 @@ MIDDLEWARE = [
     "django_prometheus.middleware.PrometheusAfterMiddleware",
 ]
 
+QUERY_BUDGET_STRICT = app_settings.QUERY_BUDGET_STRICT
 
 # to allow TG-login
 SECURE_CROSS_ORIGIN_OPENER_POLICY = "same-origin-allow-popups"
@@ -168,6 +173,21 @@ DATABASES = {
     },
 }
 
+# CHANGE: Read replica alias for reports (core.db_routing)
+# WHY: admin statistics and exports must not load the primary; without REPORTING_DB_HOST it is not used
+DATABASES["reporting"] = {
+    **DATABASES["default"],
+    "HOST": app_settings.REPORTING_DB_HOST or app_settings.DB_HOST,
+    "PORT": app_settings.REPORTING_DB_PORT or app_settings.DB_PORT,
+    "TEST": {
+        "NAME": "app_test_db_reporting",
+        "TEMPLATE": "template0",
+    },
+}
+DATABASE_ROUTERS = ["core.db_routing.ReportingRouter"]
+REPORTING_DB_ENABLED = bool(app_settings.REPORTING_DB_HOST)
+REPORTING_MAX_LAG_SECONDS = app_settings.REPORTING_MAX_LAG_SECONDS
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -299,16 +319,35 @@ SWAGGER_SETTINGS = {
 
 # Celery Configuration Options
 CELERY_TIMEZONE = "Europe/Moscow"
-CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60
-CELERY_RESULT_BACKEND = "django-db"
+# CHANGE: Results in Redis with TTL, in the DB only for audit tasks (core.celery_results.AuditResultTask)
+# WHY: "django-db" + TASK_TRACK_STARTED wrote two rows per execution of every task
+CELERY_TASK_TRACK_STARTED = False
+CELERY_RESULT_BACKEND = app_settings.CELERY_RESULT_BACKEND
+CELERY_RESULT_EXPIRES = timedelta(days=1)
+CELERY_RESULT_EXTENDED = True  # task_name в django_celery_results — для очистки по задачам
 CELERY_CACHE_BACKEND = "default"
 
 # Celery Beat Schedule
 CELERY_BEAT_SCHEDULE = {
     'check-scheduled-messages-every-minute': {
         'task': 'core.tasks.check_and_publish_scheduled_messages',
-        'schedule': 60.0,  # Каждую минуту
+        # страховка для ETA-публикаций (core.publication_scheduler); имя задачи сохранено для beat
+        'schedule': 300.0,
+    },
+    'ledger-daily-checkpoints': {
+        'task': 'core.tasks.create_ledger_checkpoints',
+        'schedule': crontab(hour=0, minute=30),  # закрытый день, с запасом на поздние коммиты
+        'kwargs': {'period': 'day'},
+    },
+    'ledger-monthly-checkpoints': {
+        'task': 'core.tasks.create_ledger_checkpoints',
+        'schedule': crontab(day_of_month=1, hour=0, minute=45),
+        'kwargs': {'period': 'month'},
+    },
+    'task-results-cleanup': {
+        'task': 'core.tasks.cleanup_task_results',
+        'schedule': crontab(hour=3, minute=15),
     },
 }
 